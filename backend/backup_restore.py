@@ -0,0 +1,293 @@
+"""
+DB 복구 엔진
+
+백업 파일을 테이블 단위로 스트리밍하며
+- 테이블마다 하나의 트랜잭션 (DELETE + 배치 INSERT, 실패 시 롤백해 기존 데이터 유지)
+- executemany 배치 INSERT, 허용된 경우 LOAD DATA LOCAL INFILE
+- 복구 중에는 FOREIGN_KEY_CHECKS=0 (테이블 순서와 무관하게 적재, 종료 시 복원)
+- 행 단위 오류를 무시하지 않고 테이블 실패로 보고
+- 테이블별 처리 행 수 / 소요 시간 / 초당 행 수 보고
+
+TRUNCATE는 암묵적으로 커밋되어 롤백할 수 없으므로 트랜잭션 안의 DELETE를 사용한다.
+
+증분 백업의 delta 테이블은 비우지 않고, 백업 시점 기본키 목록에 없는 행을 삭제한 뒤
+변경된 행을 INSERT ... ON DUPLICATE KEY UPDATE 로 반영한다.
+UNIQUE 키가 나중에 추가된 테이블(DEDUP_TABLES)은 예전 백업에 중복 행이 있을 수 있으므로
+INSERT IGNORE로 적재해 중복 중 먼저 나온 행만 남긴다. (마이그레이션과 같은 결과)
+restore_chain()은 backup_store.backup_chain()이 만든 전체 백업 + 증분 백업 목록을 순서대로 적용한다.
+"""
+
+import os
+import time
+import tempfile
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime, date, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional
+
+import pymysql
+
+from backup_store import BackupReader, BackupTable
+from fast_json import format_timedelta
+
+logger = logging.getLogger("riselms")
+
+RESTORE_BATCH_SIZE = 1000
+
+# 복구하지 않는 테이블 (복구 작업 자체의 로그)
+SKIP_TABLES = {'db_management_logs'}
+
+# UNIQUE 키 추가 전 백업에 중복 행이 있을 수 있는 테이블 (INSERT IGNORE로 중복 제거)
+# holidays: 마이그레이션 11 uq_holidays_date_name (holiday_date, name)
+DEDUP_TABLES = {'holidays'}
+
+
+class RestoreError(Exception):
+    """테이블 복구 실패 (해당 테이블은 롤백됨)"""
+    pass
+
+
+@dataclass
+class TableRestoreResult:
+    table: str
+    rows: int
+    seconds: float
+    method: str
+    error: Optional[str] = None
+    deleted: int = 0
+    file: Optional[str] = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        return round(self.rows / self.seconds, 1) if self.seconds > 0 else float(self.rows)
+
+    def to_dict(self) -> dict:
+        result = asdict(self)
+        result['seconds'] = round(self.seconds, 3)
+        result['rows_per_sec'] = self.rows_per_sec
+        return result
+
+
+def _batches(rows: Iterator[list], size: int) -> Iterator[List[list]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ==================== executemany ====================
+
+def _insert_rows(cursor, table: BackupTable, batch_size: int, upsert: bool = False, ignore: bool = False) -> int:
+    """배치 INSERT, 적재한 행 수 반환 (ignore면 중복으로 건너뛴 행은 제외)"""
+    columns_str = ', '.join(f'`{col}`' for col in table.columns)
+    placeholders = ', '.join(['%s'] * len(table.columns))
+    insert_sql = f"INSERT {'IGNORE ' if ignore else ''}INTO `{table.name}` ({columns_str}) VALUES ({placeholders})"
+    if upsert:
+        insert_sql += " ON DUPLICATE KEY UPDATE " + ', '.join(f'`{col}` = VALUES(`{col}`)' for col in table.columns)
+
+    count = 0
+    skipped = 0
+    for batch in _batches(table.rows, batch_size):
+        try:
+            cursor.executemany(insert_sql, batch)
+        except pymysql.MySQLError as e:
+            raise RestoreError(f"{count + skipped + 1}~{count + skipped + len(batch)}번째 행 INSERT 실패: {e}") from e
+        inserted = cursor.rowcount if ignore else len(batch)
+        count += inserted
+        skipped += len(batch) - inserted
+    if skipped:
+        logger.warning(f"{table.name} 복구: 중복 {skipped}행 건너뜀")
+    return count
+
+
+# ==================== 증분 (delta) ====================
+
+def _key_value(value):
+    """기본키 비교용 정규화 (DB 조회 값과 백업 JSON 값을 같은 형태로)"""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return format_timedelta(value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return str(value)
+
+
+def _delete_missing(cursor, table: BackupTable, batch_size: int) -> int:
+    """백업 시점 기본키 목록에 없는 행 삭제 (백업 이후 삭제된 행)"""
+    key_str = ', '.join(f'`{col}`' for col in table.key_columns)
+    cursor.execute(f"SELECT {key_str} FROM `{table.name}`")
+    keep = {tuple(_key_value(v) for v in key) for key in table.keys}
+    missing = [row for row in cursor.fetchall() if tuple(_key_value(v) for v in row) not in keep]
+
+    where = ' AND '.join(f'`{col}` = %s' for col in table.key_columns)
+    for batch in _batches(iter(missing), batch_size):
+        cursor.executemany(f"DELETE FROM `{table.name}` WHERE {where}", batch)
+    return len(missing)
+
+
+# ==================== LOAD DATA LOCAL INFILE ====================
+
+def _tsv_value(value) -> bytes:
+    """LOAD DATA 기본 형식(탭 구분, \\ 이스케이프)으로 값 인코딩"""
+    if value is None:
+        return b'\\N'
+    if isinstance(value, bool):
+        return b'1' if value else b'0'
+    if isinstance(value, (bytes, bytearray)):
+        raw = bytes(value)
+    else:
+        if isinstance(value, (datetime, date, dt_time, Decimal)):
+            value = value.isoformat() if not isinstance(value, Decimal) else str(value)
+        raw = str(value).encode('utf-8')
+    return (
+        raw.replace(b'\\', b'\\\\')
+        .replace(b'\t', b'\\t')
+        .replace(b'\n', b'\\n')
+        .replace(b'\r', b'\\r')
+        .replace(b'\x00', b'\\0')
+    )
+
+
+def local_infile_allowed(conn) -> bool:
+    """클라이언트 연결(local_infile=True)과 서버(@@local_infile) 모두 허용하는지"""
+    raw = getattr(conn, 'raw', conn)
+    if not getattr(raw, '_local_infile', False):
+        return False
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT @@GLOBAL.local_infile")
+        return bool(cursor.fetchone()[0])
+    except pymysql.MySQLError:
+        return False
+    finally:
+        cursor.close()
+
+
+def _load_rows(cursor, table: BackupTable) -> int:
+    fd, path = tempfile.mkstemp(prefix='restore_', suffix='.tsv')
+    try:
+        count = 0
+        with os.fdopen(fd, 'wb') as f:
+            for row in table.rows:
+                f.write(b'\t'.join(_tsv_value(v) for v in row) + b'\n')
+                count += 1
+
+        columns_str = ', '.join(f'`{col}`' for col in table.columns)
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table.name}` CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({columns_str})",
+            (path,)
+        )
+        loaded = cursor.rowcount
+        # LOCAL 적재는 변환 오류를 경고로만 남기므로 경고/행 수로 검증
+        cursor.execute("SHOW COUNT(*) WARNINGS")
+        warnings = cursor.fetchone()[0]
+        if loaded != count or warnings:
+            raise RestoreError(f"LOAD DATA 검증 실패 (파일 {count}행, 적재 {loaded}행, 경고 {warnings}건)")
+        return count
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# ==================== 복구 ====================
+
+def restore_tables(conn, reader: BackupReader, tables: Iterable[str],
+                   batch_size: int = RESTORE_BATCH_SIZE, use_load_data: bool = False) -> List[TableRestoreResult]:
+    """
+    백업 파일에서 지정한 테이블 복구
+
+    테이블마다 DELETE + INSERT를 한 트랜잭션으로 실행해 커밋하고,
+    실패한 테이블은 롤백해 기존 데이터를 유지한 채 다음 테이블을 계속 복구한다.
+
+    Args:
+        conn: DB 연결 (autocommit 꺼짐)
+        reader: 열린 BackupReader
+        tables: 복구할 테이블 (외래키 순서)
+        use_load_data: LOAD DATA LOCAL INFILE 사용 (연결/서버가 허용할 때만)
+    """
+    tables = [t for t in tables if t not in SKIP_TABLES]
+    method = 'load_data' if use_load_data and local_infile_allowed(conn) else 'executemany'
+
+    results = []
+    cursor = conn.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for backup_table in reader.tables(order=tables):
+            if backup_table.name not in tables:
+                continue
+
+            started = time.perf_counter()
+            table_method = method
+            deleted = 0
+            try:
+                if backup_table.mode == 'delta':
+                    table_method = 'upsert'
+                    deleted = _delete_missing(cursor, backup_table, batch_size)
+                    count = _insert_rows(cursor, backup_table, batch_size, upsert=True)
+                else:
+                    cursor.execute(f"DELETE FROM `{backup_table.name}`")
+                    dedup = backup_table.name in DEDUP_TABLES
+                    if not backup_table.columns:
+                        count = 0
+                    elif method == 'load_data' and not dedup:
+                        count = _load_rows(cursor, backup_table)
+                    else:
+                        # LOAD DATA는 중복 행을 건너뛰면 행 수 검증에 실패하므로 executemany
+                        table_method = 'executemany'
+                        count = _insert_rows(cursor, backup_table, batch_size, ignore=dedup)
+                conn.commit()
+            except (RestoreError, pymysql.MySQLError) as e:
+                conn.rollback()
+                elapsed = time.perf_counter() - started
+                logger.error(f"{backup_table.name} 복구 실패 (롤백): {e}")
+                results.append(TableRestoreResult(backup_table.name, 0, elapsed, table_method, str(e)))
+                continue
+
+            result = TableRestoreResult(
+                backup_table.name, count, time.perf_counter() - started, table_method, deleted=deleted
+            )
+            logger.info(
+                f"{result.table} 복구: {result.rows}행 (삭제 {result.deleted}행), "
+                f"{result.seconds:.2f}초 ({result.rows_per_sec} rows/s)"
+            )
+            results.append(result)
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    return results
+
+
+def restore_chain(conn, paths: List[str], tables: Iterable[str],
+                  batch_size: int = RESTORE_BATCH_SIZE, use_load_data: bool = False) -> List[TableRestoreResult]:
+    """
+    전체 백업 + 증분 백업을 순서대로 복구 (paths는 backup_chain() 결과의 경로)
+
+    앞 파일에서 실패(롤백)한 테이블은 기준 데이터가 없으므로 이후 증분을 적용하지 않는다.
+    결과는 파일마다 테이블별로 반환된다 (file 필드).
+    """
+    tables = list(tables)
+    failed = set()
+    results = []
+    for path in paths:
+        with BackupReader(path) as reader:
+            file_results = restore_tables(
+                conn, reader, [t for t in tables if t not in failed],
+                batch_size=batch_size, use_load_data=use_load_data
+            )
+        for result in file_results:
+            result.file = os.path.basename(path)
+            if result.error:
+                failed.add(result.table)
+        results.extend(file_results)
+    return results
@@ -0,0 +1,795 @@
+"""
+DB 백업 파일 모듈 (스트리밍 NDJSON + 압축)
+
+테이블 전체를 fetchall()로 메모리에 올려 json.dump(indent=2) 하던 방식 대신
+- 서버 측 커서(SSCursor)로 행을 조금씩 읽어 바로 압축 스트림에 기록 (메모리 사용량 일정)
+- 테이블마다 컬럼 목록 한 줄 + 행마다 JSON 배열 한 줄 (NDJSON)
+- zstd(zstandard 설치 시) 또는 gzip 압축
+- 테이블별 행 수 / SHA-256 체크섬을 테이블 끝과 파일 끝(manifest)에 기록
+- 모든 테이블을 하나의 일관된 스냅샷(START TRANSACTION WITH CONSISTENT SNAPSHOT)에서 읽음
+
+파일 구성 (한 줄에 JSON 하나):
+    {"type": "header", "format": "riselms-backup", "version": 2, "kind": "full", "tables": [...],
+     "watermarks": {"training_logs": "2025-01-01 10:00:00", ...}, ...}
+    {"type": "table", "table": "courses", "columns": ["code", "name", ...], "mode": "full"}
+    ["C001", "과정명", ...]
+    {"type": "table_end", "table": "courses", "rows": 12, "sha256": "..."}
+    ...
+    {"type": "manifest", "tables": {"courses": {"rows": 12, "sha256": "..."}}, "total_records": ...}
+
+증분 백업 (kind = "incremental", 파일명 *_inc.*):
+    updated_at이 ON UPDATE CURRENT_TIMESTAMP로 자동 갱신되고 기본키가 있는 테이블은
+    직전 백업(parent) header의 워터마크(MAX(updated_at)) 이후 변경된 행만 기록한다 (mode = "delta").
+    삭제 추적을 위해 delta 테이블은 행 앞에 현재 기본키 전체 목록을 기록하며,
+    복구 시 목록에 없는 행을 삭제한다. 그 외 테이블은 매번 전체 기록한다.
+        {"type": "table", "table": "training_logs", "columns": [...], "mode": "delta", "key": ["id"], "since": "..."}
+        {"type": "keys", "table": "training_logs"}
+        [1]
+        [2]
+        {"type": "keys_end", "table": "training_logs", "rows": 2}
+        [2, ...]   (변경된 행)
+        {"type": "table_end", ...}
+
+기존 db_backup_*.json (테이블 → 행 목록) 파일도 같은 리더로 읽을 수 있다.
+
+사이드카 manifest ({백업 파일명}.manifest.json):
+    목록/정보 API가 백업 파일을 열지 않고 읽을 수 있도록 테이블별 행 수 / 크기(압축 전 바이트),
+    스키마 해시(테이블별 컬럼 목록), 시각, 증분 체인 정보를 작은 JSON으로 따로 기록한다.
+    사이드카가 없거나 백업 파일 크기와 맞지 않으면 한 번 파일을 읽어 다시 만든다.
+
+CLI 사용법 (사이드카가 없는 기존 백업 일괄 색인):
+    python backend/backup_store.py --index [백업 디렉토리] [--force]
+"""
+
+import io
+import os
+import gzip
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional
+
+import pymysql
+
+from fast_json import format_timedelta
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger("riselms")
+
+BACKUP_FORMAT = 'riselms-backup'
+BACKUP_FORMAT_VERSION = 2
+BACKUP_PREFIX = 'db_backup_'
+INCREMENTAL_SUFFIX = '_inc'
+LEGACY_EXTENSION = '.json'
+MANIFEST_SUFFIX = '.manifest.json'
+COMPRESSION_EXTENSIONS = {'zstd': '.ndjson.zst', 'gzip': '.ndjson.gz'}
+BACKUP_EXTENSIONS = tuple(COMPRESSION_EXTENSIONS.values()) + (LEGACY_EXTENSION,)
+
+FETCH_SIZE = 1000
+
+# 워터마크 직전에 시작해 늦게 커밋된 트랜잭션의 행도 다음 증분에 포함되도록 겹쳐 읽는 구간
+DELTA_LOOKBACK = timedelta(minutes=10)
+
+# 백업 테이블 (복구 순서 = 외래키 참조 순서로 기록해 복구 시 한 번에 순서대로 읽음)
+BACKUP_TABLES = [
+    'system_settings', 'holidays', 'courses', 'subjects', 'instructors',
+    'students', 'course_subjects', 'projects', 'timetables',
+    'training_logs', 'class_notes', 'consultations', 'notices',
+    'team_activity_logs',
+]
+
+
+def is_backup_filename(filename: str) -> bool:
+    """백업 파일 이름 검사 (경로 구분자 포함 금지)"""
+    return (
+        filename.startswith(BACKUP_PREFIX)
+        and filename.endswith(BACKUP_EXTENSIONS)
+        and not filename.endswith(MANIFEST_SUFFIX)
+        and os.path.basename(filename) == filename
+    )
+
+
+def default_compression() -> str:
+    """BACKUP_COMPRESSION 환경변수 (zstd/gzip), zstandard 미설치 시 gzip"""
+    compression = os.getenv('BACKUP_COMPRESSION', 'zstd').lower()
+    if compression == 'zstd' and zstandard is None:
+        return 'gzip'
+    return compression if compression in COMPRESSION_EXTENSIONS else 'gzip'
+
+
+def is_incremental_filename(filename: str) -> bool:
+    return filename.startswith(BACKUP_PREFIX) and INCREMENTAL_SUFFIX + '.' in filename
+
+
+def compression_of(path: str) -> Optional[str]:
+    for compression, ext in COMPRESSION_EXTENSIONS.items():
+        if path.endswith(ext):
+            return compression
+    return None
+
+
+# ==================== 값 인코딩 ====================
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return format_timedelta(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return {'$b64': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, (set, frozenset)):
+        return ','.join(sorted(value))
+    raise TypeError(f"백업 직렬화 불가 타입: {type(value).__name__}")
+
+
+def encode_line(obj) -> bytes:
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and '$b64' in value:
+        return base64.b64decode(value['$b64'])
+    return value
+
+
+# ==================== 압축 스트림 ====================
+
+def _open_write(path: str, compression: str):
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=10).stream_writer(open(path, 'wb'), closefd=True)
+    return gzip.open(path, 'wb', compresslevel=6)
+
+
+def _open_read(path: str):
+    compression = compression_of(path)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd 백업을 읽으려면 zstandard 패키지가 필요합니다")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+    return gzip.open(path, 'rb')
+
+
+# ==================== 쓰기 ====================
+
+def incremental_candidates(cursor, tables: List[str]) -> Dict[str, List[str]]:
+    """
+    증분 백업 가능한 테이블 → 기본키 컬럼
+
+    updated_at이 ON UPDATE CURRENT_TIMESTAMP로 자동 갱신되는 테이블만 대상으로 한다
+    (애플리케이션이 직접 갱신하는 updated_at은 누락될 수 있음). 기본키가 없으면 삭제를 추적할 수 없어 제외.
+    """
+    cursor.execute("""
+        SELECT TABLE_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND COLUMN_NAME = 'updated_at'
+          AND UPPER(EXTRA) LIKE '%ON UPDATE%'
+    """)
+    tracked = {row[0] for row in cursor.fetchall()} & set(tables)
+
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND CONSTRAINT_NAME = 'PRIMARY'
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """)
+    keys: Dict[str, List[str]] = {}
+    for table, column in cursor.fetchall():
+        if table in tracked:
+            keys.setdefault(table, []).append(column)
+    return keys
+
+
+def _watermark(cursor, table: str) -> Optional[str]:
+    cursor.execute(f"SELECT MAX(`updated_at`) FROM `{table}`")
+    value = cursor.fetchone()[0]
+    return value.isoformat(sep=' ') if value is not None else None
+
+
+def _write_rows(out, cursor, digest=None):
+    """SSCursor 결과를 행마다 한 줄로 기록하고 (행 수, 압축 전 바이트) 반환"""
+    count = 0
+    size = 0
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            return count, size
+        for row in rows:
+            line = encode_line(row)
+            if digest is not None:
+                digest.update(line)
+            out.write(line)
+            size += len(line)
+        count += len(rows)
+
+
+def schema_hash(columns: Dict[str, List[str]]) -> str:
+    """테이블별 컬럼 목록 해시 (복구 대상 스키마와 비교용)"""
+    canonical = json.dumps({table: list(cols) for table, cols in columns.items()}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def write_backup(conn, backup_dir: str, tables: List[str], timestamp: Optional[str] = None,
+                 compression: Optional[str] = None, parent: Optional[dict] = None) -> dict:
+    """
+    테이블을 스트리밍으로 백업 파일에 기록
+
+    parent(직전 백업의 header)를 주면 증분 백업으로, parent의 워터마크 이후 변경된 행과
+    현재 기본키 목록만 기록한다. 없는 테이블 등 조회 실패는 경고 후 건너뛴다 (manifest에 오류 기록).
+
+    Returns:
+        manifest (file, path, size, compression, kind, tables{rows, sha256, mode}, total_records, ...)
+    """
+    compression = compression or default_compression()
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    os.makedirs(backup_dir, exist_ok=True)
+
+    kind = 'incremental' if parent is not None else 'full'
+    suffix = INCREMENTAL_SUFFIX if parent is not None else ''
+    filename = f"{BACKUP_PREFIX}{timestamp}{suffix}{COMPRESSION_EXTENSIONS[compression]}"
+    path = os.path.join(backup_dir, filename)
+    tmp_path = path + '.tmp'
+
+    created_at = datetime.now().isoformat()
+    manifest = {
+        'type': 'manifest',
+        'format': BACKUP_FORMAT,
+        'version': BACKUP_FORMAT_VERSION,
+        'file': filename,
+        'kind': kind,
+        'timestamp': timestamp,
+        'created_at': created_at,
+        'compression': compression,
+        'tables': {},
+        'errors': {},
+    }
+    parent_marks = (parent or {}).get('watermarks') or {}
+    table_columns: Dict[str, List[str]] = {}
+
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+    # 모든 테이블(워터마크 포함)을 같은 시점 기준으로 읽음
+    cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+    try:
+        key_columns = incremental_candidates(cursor, tables)
+        watermarks = {}
+        for table in key_columns:
+            try:
+                watermarks[table] = _watermark(cursor, table)
+            except pymysql.MySQLError as e:
+                logger.warning(f"{table} 워터마크 조회 실패: {e}")
+
+        header = {
+            'type': 'header',
+            'format': BACKUP_FORMAT,
+            'version': BACKUP_FORMAT_VERSION,
+            'file': filename,
+            'kind': kind,
+            'timestamp': timestamp,
+            'created_at': created_at,
+            'tables': tables,
+            'watermarks': watermarks,
+            'parent': parent['file'] if parent else None,
+            'base': (parent.get('base') or parent['file']) if parent else None,
+            'chain_length': parent.get('chain_length', 0) + 1 if parent else 0,
+        }
+        manifest.update({k: header[k] for k in ('parent', 'base', 'chain_length')})
+
+        with _open_write(tmp_path, compression) as out:
+            out.write(encode_line(header))
+            for table in tables:
+                delta = table in parent_marks and table in watermarks
+                try:
+                    cursor.execute(f"SELECT * FROM `{table}` LIMIT 0")
+                except pymysql.MySQLError as e:
+                    logger.warning(f"{table} 백업 실패: {e}")
+                    manifest['errors'][table] = str(e)
+                    continue
+                columns = [col[0] for col in cursor.description]
+                table_columns[table] = columns
+
+                ss_cursor = conn.cursor(pymysql.cursors.SSCursor)
+                try:
+                    stats = {'mode': 'delta' if delta else 'full'}
+                    if not delta:
+                        out.write(encode_line({'type': 'table', 'table': table, 'columns': columns, 'mode': 'full'}))
+                        ss_cursor.execute(f"SELECT * FROM `{table}`")
+                    else:
+                        mark = parent_marks[table]
+                        since = (datetime.fromisoformat(mark) - DELTA_LOOKBACK).isoformat(sep=' ') if mark else None
+                        out.write(encode_line({
+                            'type': 'table', 'table': table, 'columns': columns,
+                            'mode': 'delta', 'key': key_columns[table], 'since': since,
+                        }))
+
+                        # 삭제 추적용 현재 기본키 목록
+                        out.write(encode_line({'type': 'keys', 'table': table}))
+                        ss_cursor.execute(
+                            f"SELECT {', '.join(f'`{col}`' for col in key_columns[table])} FROM `{table}`"
+                        )
+                        stats['keys'], _ = _write_rows(out, ss_cursor)
+                        out.write(encode_line({'type': 'keys_end', 'table': table, 'rows': stats['keys']}))
+
+                        if since is None:
+                            ss_cursor.execute(f"SELECT * FROM `{table}`")
+                        else:
+                            ss_cursor.execute(
+                                f"SELECT * FROM `{table}` WHERE `updated_at` >= %s OR `updated_at` IS NULL",
+                                (since,)
+                            )
+
+                    digest = hashlib.sha256()
+                    stats['rows'], stats['bytes'] = _write_rows(out, ss_cursor, digest)
+                    stats['sha256'] = digest.hexdigest()
+                    manifest['tables'][table] = stats
+                    out.write(encode_line({'type': 'table_end', 'table': table, **stats}))
+                finally:
+                    ss_cursor.close()
+
+            manifest['total_records'] = sum(t['rows'] for t in manifest['tables'].values())
+            manifest['schema_hash'] = schema_hash(table_columns)
+            out.write(encode_line(manifest))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        # 읽기 전용 스냅샷 종료
+        conn.rollback()
+        cursor.close()
+
+    manifest['size'] = os.path.getsize(path)
+    manifest['watermarks'] = header['watermarks']
+    write_sidecar(path, manifest)
+    manifest['path'] = path
+    return manifest
+
+
+# ==================== 읽기 ====================
+
+def _legacy_rows(rows: List[dict], columns: List[str]) -> Iterator[list]:
+    for row in rows:
+        yield [row.get(col) for col in columns]
+
+
+class BackupTable:
+    """
+    백업 파일의 테이블 하나 (rows는 한 번만 순회 가능)
+
+    mode가 'delta'이면 rows는 변경된 행만이며, keys는 백업 시점의 기본키(key_columns) 전체 목록이다.
+    """
+
+    def __init__(self, name: str, columns: List[str], rows: Iterator[list], mode: str = 'full',
+                 key_columns: Optional[List[str]] = None, keys: Optional[List[list]] = None):
+        self.name = name
+        self.columns = columns
+        self.rows = rows
+        self.mode = mode
+        self.key_columns = key_columns or []
+        self.keys = keys
+
+
+class BackupReader:
+    """
+    백업 파일 리더 (스트리밍 형식 / 기존 JSON 형식 공용)
+
+    with BackupReader(path) as reader:
+        for table in reader.tables():
+            for row in table.rows: ...
+
+    스트리밍 형식은 파일에 기록된 순서대로 한 번만 읽을 수 있으며,
+    다음 테이블로 넘어가면 이전 테이블의 남은 행은 건너뛴다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.legacy = path.endswith(LEGACY_EXTENSION)
+        self.header: dict = {}
+        self.manifest: Optional[dict] = None
+        self._stream = None
+        self._legacy_data = None
+
+    def __enter__(self):
+        if self.legacy:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._legacy_data = json.load(f)
+            self.header = {
+                'kind': 'full',
+                'tables': [t for t, rows in self._legacy_data.items() if isinstance(rows, list)],
+            }
+        else:
+            self._stream = _open_read(self.path)
+            first = self._stream.readline()
+            self.header = json.loads(first) if first else {}
+            if self.header.get('format') != BACKUP_FORMAT:
+                self.close()
+                raise ValueError("백업 파일 형식이 올바르지 않습니다")
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    @property
+    def table_names(self) -> List[str]:
+        return list(self.header.get('tables', []))
+
+    def tables(self, order: Optional[List[str]] = None) -> Iterator[BackupTable]:
+        """
+        테이블 순회
+
+        order는 기존 JSON 형식에만 적용된다 (스트리밍 형식은 기록된 순서 = BACKUP_TABLES 순서).
+        """
+        if self.legacy:
+            names = [name for name, rows in self._legacy_data.items() if isinstance(rows, list)]
+            if order:
+                names.sort(key=lambda name: order.index(name) if name in order else len(order))
+            for name in names:
+                rows = self._legacy_data[name]
+                columns = list(rows[0].keys()) if rows else []
+                yield BackupTable(name, columns, _legacy_rows(rows, columns))
+            return
+
+        pending = None  # 다음 테이블 시작 레코드
+        while True:
+            record = pending or self._next_record()
+            pending = None
+            if record is None:
+                return
+            if record['type'] == 'manifest':
+                self.manifest = record
+                return
+            if record['type'] != 'table':
+                continue
+
+            keys = self._read_keys() if record.get('mode') == 'delta' else None
+            state = {'next': None}
+
+            def rows(state=state):
+                for line in self._stream:
+                    if line.startswith(b'['):
+                        yield [_decode_value(v) for v in json.loads(line)]
+                        continue
+                    state['next'] = json.loads(line)
+                    return
+
+            table = BackupTable(
+                record['table'], record['columns'], rows(),
+                mode=record.get('mode', 'full'), key_columns=record.get('key'), keys=keys,
+            )
+            yield table
+            # 남은 행 건너뛰기
+            for _ in table.rows:
+                pass
+            end = state['next']
+            if end is not None and end.get('type') != 'table_end':
+                pending = end
+
+    def _read_keys(self) -> List[list]:
+        """delta 테이블의 기본키 목록 (keys ~ keys_end)"""
+        record = self._next_record()
+        if record is None or record.get('type') != 'keys':
+            raise ValueError("증분 백업 파일 형식이 올바르지 않습니다 (기본키 목록 없음)")
+        keys = []
+        for line in self._stream:
+            if not line.startswith(b'['):
+                break
+            keys.append([_decode_value(v) for v in json.loads(line)])
+        return keys
+
+    def _next_record(self) -> Optional[dict]:
+        for line in self._stream:
+            if not line.startswith(b'['):
+                return json.loads(line)
+        return None
+
+
+# ==================== 사이드카 manifest ====================
+
+def manifest_path(path: str) -> str:
+    return path + MANIFEST_SUFFIX
+
+
+def _sidecar(manifest: dict) -> dict:
+    sidecar = {k: v for k, v in manifest.items() if k not in ('type', 'path')}
+    sidecar['indexed_at'] = datetime.now().isoformat()
+    return sidecar
+
+
+def write_sidecar(path: str, manifest: dict):
+    """백업 파일 옆에 사이드카 manifest 기록 (실패해도 백업은 유효하므로 경고만)"""
+    target = manifest_path(path)
+    try:
+        # 여러 워커가 동시에 색인해도 서로의 임시 파일을 덮어쓰지 않도록 고유 이름 사용
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(target) + '.', suffix='.tmp',
+                                        dir=os.path.dirname(target) or '.')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(_sidecar(manifest), f, ensure_ascii=False, default=_default)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    except OSError as e:
+        logger.warning(f"백업 manifest 기록 실패 ({target}): {e}")
+
+
+def _legacy_timestamp(filename: str) -> str:
+    return filename[len(BACKUP_PREFIX):-len(LEGACY_EXTENSION)]
+
+
+def build_manifest(path: str) -> dict:
+    """
+    백업 파일을 끝까지 읽어 manifest 생성 (사이드카가 없는 기존 백업 색인용)
+
+    스트리밍 형식은 행을 해석하지 않고 레코드 줄만 해석하며,
+    기존 JSON 형식은 파일 전체를 읽는다.
+    """
+    filename = os.path.basename(path)
+    size = os.path.getsize(path)
+
+    if path.endswith(LEGACY_EXTENSION):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        tables = {}
+        columns = {}
+        for table, rows in data.items():
+            if not isinstance(rows, list):
+                continue
+            columns[table] = list(rows[0].keys()) if rows else []
+            tables[table] = {
+                'mode': 'full',
+                'rows': len(rows),
+                'bytes': len(json.dumps(rows, ensure_ascii=False, default=str).encode('utf-8')),
+            }
+        return {
+            'format': BACKUP_FORMAT,
+            'version': 0,
+            'file': filename,
+            'kind': 'full',
+            'timestamp': _legacy_timestamp(filename),
+            'created_at': datetime.fromtimestamp(os.path.getmtime(path)).isoformat(),
+            'compression': None,
+            'parent': None,
+            'base': None,
+            'chain_length': 0,
+            'tables': tables,
+            'errors': {},
+            'total_records': sum(t['rows'] for t in tables.values()),
+            'schema_hash': schema_hash(columns),
+            'size': size,
+        }
+
+    header = None
+    found = None
+    columns = {}
+    table_bytes = {}
+    current = None
+    in_keys = False
+    with _open_read(path) as stream:
+        for line in stream:
+            if line.startswith(b'['):
+                if current is not None and not in_keys:
+                    table_bytes[current] += len(line)
+                continue
+            record = json.loads(line)
+            kind = record.get('type')
+            if kind == 'header':
+                header = record
+            elif kind == 'table':
+                current = record['table']
+                columns[current] = record['columns']
+                table_bytes[current] = 0
+            elif kind == 'keys':
+                in_keys = True
+            elif kind == 'keys_end':
+                in_keys = False
+            elif kind == 'table_end':
+                current = None
+            elif kind == 'manifest':
+                found = record
+    if header is None or header.get('format') != BACKUP_FORMAT:
+        raise ValueError("백업 파일 형식이 올바르지 않습니다")
+    if found is None:
+        raise ValueError("백업 파일 형식이 올바르지 않습니다 (manifest 없음)")
+
+    manifest = dict(found)
+    for key in ('kind', 'parent', 'base', 'chain_length', 'watermarks'):
+        manifest.setdefault(key, header.get(key))
+    manifest['kind'] = manifest['kind'] or 'full'
+    manifest['chain_length'] = manifest['chain_length'] or 0
+    for table, stats in manifest['tables'].items():
+        stats.setdefault('mode', 'full')
+        stats.setdefault('bytes', table_bytes.get(table, 0))
+    manifest.setdefault('schema_hash', schema_hash(columns))
+    manifest['file'] = filename
+    manifest['size'] = size
+    return manifest
+
+
+def read_manifest(path: str, build: bool = True) -> Optional[dict]:
+    """
+    백업 manifest (사이드카가 있고 파일 크기가 같으면 사이드카만 읽음)
+
+    사이드카가 없거나 오래되었으면 build=True일 때 파일을 읽어 만들고 사이드카로 저장한다.
+    build=False이면 None.
+    """
+    try:
+        with open(manifest_path(path), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar.get('size') == os.path.getsize(path):
+            return sidecar
+    except (OSError, ValueError):
+        pass
+    if not build:
+        return None
+    manifest = build_manifest(path)
+    write_sidecar(path, manifest)
+    return manifest
+
+
+def delete_backup_file(path: str):
+    """백업 파일과 사이드카 manifest 삭제"""
+    os.remove(path)
+    try:
+        os.remove(manifest_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def index_backups(backup_dir: str, force: bool = False) -> Dict[str, str]:
+    """
+    백업 디렉토리의 사이드카 manifest 일괄 생성 (한 번 실행)
+
+    Returns:
+        파일명 → 'indexed' / 'skipped' / 오류 메시지
+    """
+    results = {}
+    for filename in list_backup_files(backup_dir):
+        path = os.path.join(backup_dir, filename)
+        if not force and read_manifest(path, build=False) is not None:
+            results[filename] = 'skipped'
+            continue
+        try:
+            write_sidecar(path, build_manifest(path))
+            results[filename] = 'indexed'
+        except (ValueError, OSError, RuntimeError) as e:
+            results[filename] = f"실패: {e}"
+    return results
+
+
+# ==================== 백업 체인 ====================
+
+def read_backup_header(path: str) -> dict:
+    """
+    백업 파일 header (첫 줄만 읽음)
+
+    기존 JSON 형식과 워터마크가 없는 이전 버전 파일은 전체 백업으로 본다.
+    """
+    filename = os.path.basename(path)
+    if path.endswith(LEGACY_EXTENSION):
+        return {'file': filename, 'kind': 'full', 'chain_length': 0}
+    with _open_read(path) as stream:
+        first = stream.readline()
+    header = json.loads(first) if first else {}
+    if header.get('format') != BACKUP_FORMAT:
+        raise ValueError("백업 파일 형식이 올바르지 않습니다")
+    header.setdefault('file', filename)
+    header.setdefault('kind', 'full')
+    header.setdefault('chain_length', 0)
+    return header
+
+
+def _backup_sort_key(backup_dir: str, filename: str):
+    # 파일명 타임스탬프(YYYYmmdd_HHMMSS) 기준, 같은 초면 수정 시각
+    timestamp = filename[len(BACKUP_PREFIX):len(BACKUP_PREFIX) + 15]
+    return timestamp, os.path.getmtime(os.path.join(backup_dir, filename))
+
+
+def list_backup_files(backup_dir: str) -> List[str]:
+    """백업 파일명 목록 (오래된 순)"""
+    if not os.path.isdir(backup_dir):
+        return []
+    names = [name for name in os.listdir(backup_dir) if is_backup_filename(name)]
+    return sorted(names, key=lambda name: _backup_sort_key(backup_dir, name))
+
+
+def incremental_parent(backup_dir: str, max_chain: int, not_before: Optional[datetime] = None) -> Optional[dict]:
+    """
+    증분 백업의 기준이 될 가장 최근 백업 header
+
+    다음 경우에는 None (전체 백업 필요):
+    - 백업이 없거나 가장 최근 백업에 워터마크가 없음 (기존 형식)
+    - 증분 체인 길이가 max_chain에 도달 (복구 시 적용할 파일 수 제한)
+    - 가장 최근 백업이 not_before(마지막 DB 복구 시각) 이전 — 복구된 행은 과거 updated_at을
+      그대로 가지므로 워터마크로 변경을 찾을 수 없음
+    """
+    names = list_backup_files(backup_dir)
+    if not names:
+        return None
+    try:
+        header = read_backup_header(os.path.join(backup_dir, names[-1]))
+    except (ValueError, OSError, RuntimeError) as e:
+        logger.warning(f"최근 백업 header 읽기 실패 ({names[-1]}): {e}")
+        return None
+    if 'watermarks' not in header or header['chain_length'] >= max_chain:
+        return None
+    if not_before is not None and datetime.fromisoformat(header['created_at']) <= not_before:
+        return None
+    return header
+
+
+def backup_chain(backup_dir: str, filename: str) -> List[str]:
+    """
+    복구에 필요한 백업 파일 목록 (전체 백업 → 증분 백업 순서, 마지막이 filename)
+
+    parent를 따라 전체 백업까지 거슬러 올라가며, 중간 파일이 없으면 ValueError.
+    """
+    chain = []
+    seen = set()
+    current = filename
+    while current:
+        if current in seen or not is_backup_filename(current):
+            raise ValueError(f"증분 백업 체인이 올바르지 않습니다: {current}")
+        path = os.path.join(backup_dir, current)
+        if not os.path.exists(path):
+            raise ValueError(f"증분 백업 체인이 끊어졌습니다: {current} 파일이 없습니다")
+        seen.add(current)
+        chain.append(current)
+        header = read_backup_header(path)
+        current = header.get('parent') if header['kind'] == 'incremental' else None
+    chain.reverse()
+    return chain
+
+
+def required_backups(backup_dir: str, keep: List[str]) -> set:
+    """keep 파일을 복구하는 데 필요한 모든 파일 (keep 포함, 끊어진 체인은 있는 파일까지)"""
+    required = set()
+    for filename in keep:
+        current = filename
+        while current and current not in required:
+            path = os.path.join(backup_dir, current)
+            if not os.path.exists(path):
+                break
+            required.add(current)
+            try:
+                header = read_backup_header(path)
+            except (ValueError, OSError, RuntimeError):
+                break
+            current = header.get('parent') if header['kind'] == 'incremental' else None
+    return required
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+    logging.basicConfig(level=logging.INFO)
+
+    if '--index' not in sys.argv:
+        print("사용법: python backend/backup_store.py --index [백업 디렉토리] [--force]")
+        sys.exit(1)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    target_dir = args[0] if args else os.getenv(
+        'BACKUP_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
+    )
+    for name, result in index_backups(target_dir, force='--force' in sys.argv).items():
+        print(f"{result:<10} {name}")
@@ -0,0 +1,120 @@
+"""
+이벤트 루프 블로킹 방지 유틸리티
+
+pymysql / ftplib / requests 같은 동기 I/O는 이벤트 루프에서 직접 실행하면
+uvicorn 워커 전체가 멈춘다. 엔드포인트는 다음 규칙을 따른다.
+- 동기 I/O만 하는 핸들러는 `def`로 선언 (FastAPI가 스레드풀에서 실행)
+- `async def`가 꼭 필요한 핸들러는 블로킹 구간을 `await run_blocking(...)`으로 감싼다
+
+두 경로 모두 anyio 기본 스레드풀(BLOCKING_THREADS로 크기 제한)을 공유한다.
+
+서버 시작 시 띄우는 백그라운드 태스크는 start_background()로 시작해
+참조를 유지하고(GC로 사라지지 않도록) 실패하면 로그를 남기며, 종료 시 stop_background()로 정리한다.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import functools
+from typing import Set
+
+from anyio import to_thread
+
+logger = logging.getLogger("riselms")
+
+# 블로킹 작업 동시 실행 스레드 수 (anyio 기본값 40)
+BLOCKING_THREADS = int(os.getenv('BLOCKING_THREADS', '40'))
+
+# 이벤트 루프 지연 감시 설정
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', '0.5'))
+LOOP_LAG_THRESHOLD = float(os.getenv('LOOP_LAG_THRESHOLD', '0.2'))
+
+# 실행 중인 백그라운드 태스크 (이벤트 루프는 태스크를 약한 참조로만 보관)
+_background_tasks: Set[asyncio.Task] = set()
+
+# 종료 시 백그라운드 태스크 종료 대기 시간 (초)
+BACKGROUND_STOP_TIMEOUT = 5.0
+
+_loop_stats = {
+    'checks': 0,
+    'blocked': 0,
+    'max_lag_ms': 0.0,
+    'last_blocked_at': None,
+}
+
+
+def configure_threadpool(threads: int = BLOCKING_THREADS):
+    """스레드풀 크기 설정 (이벤트 루프 안에서 호출)"""
+    to_thread.current_default_thread_limiter().total_tokens = threads
+
+
+async def run_blocking(func, *args, **kwargs):
+    """동기 함수를 공유 스레드풀에서 실행하고 결과를 반환"""
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL, threshold: float = LOOP_LAG_THRESHOLD):
+    """
+    이벤트 루프 지연 감시 태스크
+
+    interval마다 깨어나 예정보다 늦게 깨어난 시간(지연)을 측정한다.
+    지연이 threshold를 넘으면 루프 위에서 블로킹 호출이 실행된 것이므로 경고 로그를 남긴다.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = loop.time() - expected
+        _loop_stats['checks'] += 1
+        _loop_stats['max_lag_ms'] = max(_loop_stats['max_lag_ms'], lag * 1000)
+        if lag > threshold:
+            _loop_stats['blocked'] += 1
+            _loop_stats['last_blocked_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            logger.warning(f"이벤트 루프 블로킹 감지: {lag * 1000:.0f}ms 지연")
+
+def start_background(coro, name: str) -> asyncio.Task:
+    """백그라운드 태스크 시작 (완료되면 목록에서 제거, 예외는 로그로 남김)"""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+
+def _background_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error(f"백그라운드 태스크 실패 ({task.get_name()}): {error!r}", exc_info=error)
+
+
+async def stop_background(timeout: float = BACKGROUND_STOP_TIMEOUT):
+    """
+    실행 중인 백그라운드 태스크 취소 (서버 종료 시)
+
+    run_blocking으로 스레드에서 실행 중인 작업은 스레드가 끝나야 취소되므로 timeout까지만 기다린다.
+    """
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            logger.warning(f"백그라운드 태스크가 종료되지 않음: {task.get_name()}")
+
+
+def loop_stats() -> dict:
+    """이벤트 루프 지연 / 스레드풀 사용 현황"""
+    stats = dict(_loop_stats)
+    stats['max_lag_ms'] = round(stats['max_lag_ms'], 2)
+    stats['background_tasks'] = sorted(task.get_name() for task in _background_tasks)
+    try:
+        limiter = to_thread.current_default_thread_limiter()
+        stats['threads_total'] = limiter.total_tokens
+        stats['threads_busy'] = limiter.borrowed_tokens
+    except Exception:
+        # 이벤트 루프 밖에서 호출된 경우
+        pass
+    return stats
@@ -0,0 +1,334 @@
+"""
+내용 주소 기반(content-addressed) 업로드 저장소
+
+업로드마다 타임스탬프/uuid 파일명으로 새로 저장하던 것을
+SHA-256 해시 파일명({해시}{확장자})으로 한 번만 저장한다.
+- 해시는 청크 단위로 계산 (파일 전체를 메모리에 올리지 않음)
+  - 로컬: 임시 파일에 쓰면서 해시 계산 → 해시 파일명으로 rename (한 번만 읽음)
+  - FTP: 전송 전에 해시만 먼저 계산 → 같은 내용이 이미 있으면 FTP 전송 없이 기존 URL 반환
+- content_objects 테이블에 저장 위치/크기/마지막 업로드 시각 기록
+- photo_urls / attachments / profile_photo 등 기존 컬럼이 URL을 참조하며,
+  참조 수는 따로 유지하지 않는다. collect_garbage()가 mark-and-sweep으로
+  참조 컬럼을 훑어(mark) 참조되지 않는 객체를 삭제(sweep)
+"""
+
+import os
+import posixpath
+import re
+import hashlib
+import logging
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pymysql
+
+logger = logging.getLogger("riselms")
+
+CHUNK_SIZE = 1024 * 1024
+OBJECTS_DIR = 'objects'
+
+# 저장 객체 URL/경로를 참조하는 컬럼 (테이블, 컬럼)
+REFERENCE_COLUMNS = [
+    ('training_logs', 'photo_urls'),
+    ('consultations', 'photo_urls'),
+    ('class_notes', 'photo_urls'),
+    ('projects', 'photo_urls'),
+    ('team_activity_logs', 'photo_urls'),
+    ('students', 'profile_photo'),
+    ('students', 'attachments'),
+    ('instructors', 'profile_photo'),
+    ('instructors', 'attachments'),
+    ('student_registrations', 'profile_photo'),
+    ('system_settings', 'setting_value'),
+    ('online_exam_participants', 'file_path'),
+]
+
+# 컬럼 값(JSON 배열, 콤마 구분 문자열, 단일 URL)에서 저장 객체 참조 추출
+OBJECT_REF_PATTERN = re.compile(
+    r'[^\s"\',\[\]]*/' + OBJECTS_DIR + r'/[0-9a-f]{64}(?:\.[A-Za-z0-9]+)?'
+)
+
+
+@dataclass
+class StoredObject:
+    """저장 결과"""
+    url: str
+    filename: str
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+def _object_lock_name(sha256: str) -> str:
+    # MySQL 사용자 락 이름은 64자 제한
+    return f"content_obj:{sha256[:40]}"
+
+
+def hash_stream(fileobj, chunk_size: int = CHUNK_SIZE):
+    """
+    파일 객체를 처음부터 청크 단위로 읽어 (SHA-256 hex, 크기) 반환
+
+    읽은 뒤 파일 포인터는 처음으로 되돌린다.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+class ContentStore:
+    """FTP / 로컬 디스크 공용 내용 주소 저장소"""
+
+    def __init__(self, ftp_pool, ftp_base_url: str, ftp_paths: Dict[str, str],
+                 get_connection: Callable):
+        """
+        Args:
+            ftp_pool: FTPPool
+            ftp_base_url: 'ftp://host:port' (URL 생성용)
+            ftp_paths: 카테고리 → FTP 디렉토리
+            get_connection: DB 연결 함수
+        """
+        self.ftp_pool = ftp_pool
+        self.ftp_base_url = ftp_base_url
+        self.ftp_paths = ftp_paths
+        self.get_connection = get_connection
+
+    # ---------- 객체 기록 ----------
+
+    def _find(self, cursor, location: str, category: str, sha256: str, ext: str) -> Optional[dict]:
+        cursor.execute("""
+            SELECT id, url, size FROM content_objects
+            WHERE location = %s AND category = %s AND sha256 = %s AND ext = %s
+        """, (location, category, sha256, ext))
+        return cursor.fetchone()
+
+    def _lock(self, cursor, sha256: str, timeout: int = 30):
+        """같은 해시의 파일 쓰기(업로드)와 삭제(GC)를 직렬화"""
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (_object_lock_name(sha256), timeout))
+        if cursor.fetchone()['locked'] != 1:
+            raise TimeoutError(f"저장 객체 락 대기 시간 초과: {sha256}")
+
+    def _unlock(self, cursor, sha256: str):
+        try:
+            cursor.execute("SELECT RELEASE_LOCK(%s) AS released", (_object_lock_name(sha256),))
+            cursor.fetchone()
+        except Exception:
+            pass
+
+    def _put(self, location: str, category: str, digest: Tuple[str, int], ext: str,
+             url_for: Callable[[str], str], write: Callable[[str], None]) -> StoredObject:
+        """기존 객체 조회 → 없으면 write(파일명) 후 기록 (digest: (SHA-256 hex, 크기))"""
+        ext = ext.lower()
+        sha256, size = digest
+        filename = f"{sha256}{ext}"
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            existing = self._find(cursor, location, category, sha256, ext)
+            if existing:
+                # 재업로드 시각 갱신 (아직 저장 전인 첨부가 GC되지 않도록)
+                cursor.execute(
+                    "UPDATE content_objects SET last_uploaded_at = NOW() WHERE id = %s",
+                    (existing['id'],)
+                )
+                conn.commit()
+                if cursor.rowcount:
+                    return StoredObject(existing['url'], filename, sha256, size, True)
+                # 조회와 갱신 사이에 GC가 행을 삭제함 → 다시 저장
+
+            # GC가 같은 파일을 지우는 중이면 끝날 때까지 기다린 뒤 쓴다
+            self._lock(cursor, sha256)
+            try:
+                write(filename)
+                url = url_for(filename)
+                cursor.execute("""
+                    INSERT INTO content_objects (location, category, sha256, ext, url, size, last_uploaded_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, NOW())
+                    ON DUPLICATE KEY UPDATE last_uploaded_at = NOW()
+                """, (location, category, sha256, ext, url, size))
+                conn.commit()
+            finally:
+                self._unlock(cursor, sha256)
+            return StoredObject(url, filename, sha256, size, False)
+        finally:
+            conn.close()
+
+    def put_ftp(self, fileobj, ext: str, category: str) -> StoredObject:
+        """
+        FTP 카테고리 디렉토리의 objects/ 아래에 저장하고 FTP URL 반환
+
+        같은 내용이 이미 있으면 전송하지 않는다.
+        """
+        target_path = self.ftp_paths.get(category)
+        if not target_path:
+            raise ValueError(f"Invalid category: {category}")
+        directory = f"{target_path}/{OBJECTS_DIR}"
+
+        def write(filename: str):
+            def _store(ftp):
+                fileobj.seek(0)  # 재시도 시에도 처음부터
+                ftp.store(directory, filename, fileobj, blocksize=CHUNK_SIZE)
+            self.ftp_pool.call(_store)
+
+        return self._put(
+            'ftp', category, hash_stream(fileobj), ext,
+            url_for=lambda filename: f"{self.ftp_base_url}{directory}/{filename}",
+            write=write,
+        )
+
+    def put_local(self, fileobj, ext: str, base_dir: str, category: str) -> StoredObject:
+        """
+        로컬 디렉토리의 objects/ 아래에 저장하고 파일 경로를 url로 반환
+
+        임시 파일에 쓰면서 해시를 계산하고, 새 객체면 해시 파일명으로 rename,
+        이미 있으면 임시 파일을 지운다.
+        url은 OBJECT_REF_PATTERN('/objects/')과 맞도록 OS와 무관하게 '/'로 구분한다.
+        """
+        directory = posixpath.join(base_dir.replace(os.sep, '/'), OBJECTS_DIR)
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                fileobj.seek(0)
+                while True:
+                    chunk = fileobj.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            return self._put(
+                'local', category, (digest.hexdigest(), size), ext,
+                url_for=lambda filename: posixpath.join(directory, filename),
+                write=lambda filename: os.replace(tmp_path, posixpath.join(directory, filename)),
+            )
+        finally:
+            # 중복이거나 실패해서 rename되지 않은 임시 파일 정리
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    # ---------- GC (mark-and-sweep) ----------
+
+    def count_references(self, cursor) -> Counter:
+        """참조 컬럼 전체에서 저장 객체 URL/경로별 참조 행 수 집계"""
+        refs = Counter()
+        for table, column in REFERENCE_COLUMNS:
+            try:
+                cursor.execute(
+                    f"SELECT `{column}` AS value FROM `{table}` WHERE `{column}` LIKE %s",
+                    (f'%/{OBJECTS_DIR}/%',)
+                )
+            except (pymysql.err.ProgrammingError, pymysql.err.OperationalError):
+                # 아직 생성되지 않은 테이블/컬럼
+                continue
+            for row in cursor.fetchall():
+                refs.update(set(OBJECT_REF_PATTERN.findall(row['value'] or '')))
+        return refs
+
+    def _delete(self, obj: dict):
+        if obj['location'] == 'ftp':
+            path = '/' + obj['url'].replace('ftp://', '').split('/', 1)[1]
+            self.ftp_pool.call(lambda ftp: ftp.delete(path))
+        else:
+            try:
+                os.remove(obj['url'])
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self, grace_hours: int = 24, dry_run: bool = True) -> dict:
+        """
+        참조 없는 객체 삭제 (mark-and-sweep)
+
+        참조 컬럼 전체에서 객체 URL을 모은 뒤(mark), 어디서도 참조되지 않고 마지막 업로드 후
+        grace_hours가 지난 객체만 삭제한다 (업로드 직후 아직 저장되지 않은 첨부 보호).
+        객체마다 행을 잠그고(FOR UPDATE) 조건을 다시 확인한 뒤 행 삭제를 커밋하고 나서
+        파일을 지운다. 목록 조회 후 같은 내용이 다시 업로드되면(last_uploaded_at 갱신)
+        건너뛰므로, 방금 반환된 URL의 파일을 지우지 않는다.
+        행 삭제 커밋 ~ 파일 삭제 사이의 새 업로드는 해시별 락(GET_LOCK)에서 기다린다.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            refs = self.count_references(cursor)
+            cursor.execute("""
+                SELECT id, location, category, sha256, url, size FROM content_objects
+                WHERE last_uploaded_at < NOW() - INTERVAL %s HOUR
+            """, (grace_hours,))
+            orphans = [obj for obj in cursor.fetchall() if obj['url'] not in refs]
+            conn.commit()
+
+            deleted: List[str] = []
+            freed = 0
+            if not dry_run:
+                for obj in orphans:
+                    self._lock(cursor, obj['sha256'])
+                    try:
+                        cursor.execute("""
+                            SELECT id FROM content_objects
+                            WHERE id = %s AND last_uploaded_at < NOW() - INTERVAL %s HOUR
+                            FOR UPDATE
+                        """, (obj['id'], grace_hours))
+                        if not cursor.fetchone():
+                            conn.rollback()
+                            continue
+                        cursor.execute("DELETE FROM content_objects WHERE id = %s", (obj['id'],))
+                        conn.commit()
+                        try:
+                            self._delete(obj)
+                        except Exception as e:
+                            # 행은 이미 없으므로 같은 내용이 업로드되면 새로 저장(덮어쓰기)된다
+                            logger.warning(f"저장 객체 삭제 실패 ({obj['url']}): {e}")
+                            continue
+                    finally:
+                        self._unlock(cursor, obj['sha256'])
+                    deleted.append(obj['url'])
+                    freed += obj['size'] or 0
+
+            return {
+                'dry_run': dry_run,
+                'referenced_urls': len(refs),
+                'orphans': [obj['url'] for obj in orphans],
+                'orphan_bytes': sum(obj['size'] or 0 for obj in orphans),
+                'deleted': len(deleted),
+                'freed_bytes': freed,
+            }
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        """저장 객체 수 / 용량 / 참조 없는 객체 수"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            refs = self.count_references(cursor)
+            cursor.execute("SELECT location, category, url, size FROM content_objects")
+            by_category: Dict[tuple, dict] = {}
+            for row in cursor.fetchall():
+                key = (row['location'], row['category'])
+                entry = by_category.setdefault(key, {
+                    'location': row['location'], 'category': row['category'],
+                    'objects': 0, 'bytes': 0, 'unreferenced': 0,
+                })
+                entry['objects'] += 1
+                entry['bytes'] += row['size'] or 0
+                if row['url'] not in refs:
+                    entry['unreferenced'] += 1
+            return {'by_category': list(by_category.values())}
+        finally:
+            conn.close()
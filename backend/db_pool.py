@@ -0,0 +1,282 @@
+"""
+데이터베이스 커넥션 풀 모듈
+
+원격(NAS) MySQL 연결 비용(TCP + 인증 왕복)을 줄이기 위해
+pymysql 연결을 재사용하는 스레드 안전한 커넥션 풀
+- 최대 크기 제한 (초과 시 대기, 타임아웃)
+- 대여 시 헬스체크 (ping)
+- 일정 시간 경과한 연결 재생성 (recycle)
+- 대여 대기 시간 / 포화도 통계
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from typing import Optional
+
+import pymysql
+
+logger = logging.getLogger("riselms")
+
+
+class PoolTimeoutError(Exception):
+    """풀에서 연결을 대여하지 못하고 타임아웃된 경우"""
+    pass
+
+
+class PooledConnection:
+    """
+    풀에서 대여한 pymysql 연결 래퍼
+
+    기존 코드의 conn.cursor() / conn.commit() / conn.close() 사용 방식을 그대로 지원하며,
+    close() 호출 시 실제 연결을 닫지 않고 풀에 반환한다.
+    """
+
+    def __init__(self, pool, raw, created_at: float):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    @property
+    def raw(self):
+        """실제 pymysql 연결 객체"""
+        return self._raw
+
+    def close(self):
+        """풀에 연결 반환 (중복 호출 무시)"""
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+    def discard(self):
+        """연결을 풀에 돌려보내지 않고 폐기 (세션 상태가 오염된 경우)"""
+        if self._released:
+            return
+        self._released = True
+        self._pool._discard(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        # close()를 누락한 경로에서도 풀 슬롯이 새지 않도록 폐기 처리
+        try:
+            if not self._released:
+                self._released = True
+                self._pool._discard(self._raw)
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """스레드 안전한 pymysql 커넥션 풀"""
+
+    def __init__(
+        self,
+        config: dict,
+        max_size: int = 10,
+        recycle_seconds: int = 1800,
+        checkout_timeout: float = 30.0,
+        ping_interval: float = 5.0,
+        slow_checkout_seconds: float = 1.0,
+    ):
+        """
+        Args:
+            config: pymysql.connect()에 전달할 설정
+            max_size: 동시에 열 수 있는 최대 연결 수
+            recycle_seconds: 생성 후 이 시간이 지난 연결은 폐기 후 재생성
+            checkout_timeout: 연결 대여 최대 대기 시간 (초)
+            ping_interval: 마지막 사용 후 이 시간이 지난 연결은 대여 시 ping 확인
+            slow_checkout_seconds: 대기 시간이 이 값을 넘으면 경고 로그
+        """
+        self.config = dict(config)
+        self.max_size = max_size
+        self.recycle_seconds = recycle_seconds
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+        self.slow_checkout_seconds = slow_checkout_seconds
+
+        self._cond = threading.Condition(threading.RLock())
+        self._idle = deque()  # (raw, created_at, last_used)
+        self._size = 0        # 열려 있는 전체 연결 수 (대여 중 + 유휴)
+        self._waiting = 0
+
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'discarded': 0,
+            'wait_total_ms': 0.0,
+            'wait_max_ms': 0.0,
+            'peak_in_use': 0,
+        }
+
+    # ---------- 내부 유틸 ----------
+
+    def _connect(self):
+        return pymysql.connect(**self.config)
+
+    @staticmethod
+    def _close_raw(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, raw, last_used: float) -> bool:
+        if time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    # ---------- 대여 / 반환 ----------
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        풀에서 연결 대여
+
+        유휴 연결이 있으면 헬스체크/재생성 후 반환하고,
+        없으면 max_size 이내에서 새 연결을 만들거나 반환될 때까지 대기한다.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, created_at, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # 슬롯을 먼저 확보하고 실제 연결은 락 밖에서 생성
+                    self._size += 1
+                    raw = None
+                    created_at = None
+                    last_used = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"DB 커넥션 풀 대기 시간 초과 ({timeout}초, 최대 {self.max_size}개 사용 중)"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            now = time.monotonic()
+            if raw is not None and now - created_at > self.recycle_seconds:
+                self._close_raw(raw)
+                raw = None
+                with self._cond:
+                    self._stats['recycled'] += 1
+            elif raw is not None and not self._is_healthy(raw, last_used):
+                self._close_raw(raw)
+                raw = None
+                with self._cond:
+                    self._stats['ping_failures'] += 1
+
+            if raw is None:
+                raw = self._connect()
+                created_at = time.monotonic()
+                with self._cond:
+                    self._stats['created'] += 1
+        except Exception:
+            # 연결 생성 실패 시 확보한 슬롯 반납
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._cond:
+            self._stats['checkouts'] += 1
+            self._stats['wait_total_ms'] += wait_ms
+            self._stats['wait_max_ms'] = max(self._stats['wait_max_ms'], wait_ms)
+            in_use = self._size - len(self._idle)
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], in_use)
+
+        if wait_ms / 1000 > self.slow_checkout_seconds:
+            logger.warning(f"DB 연결 대여 지연: {wait_ms:.0f}ms (사용 중 {in_use}/{self.max_size})")
+
+        return PooledConnection(self, raw, created_at)
+
+    def connection(self, timeout: Optional[float] = None) -> PooledConnection:
+        """컨텍스트 매니저용 대여 (with pool.connection() as conn:)"""
+        return self.acquire(timeout)
+
+    def _release(self, raw, created_at: float):
+        # 커밋되지 않은 트랜잭션/스냅샷이 다음 사용자에게 넘어가지 않도록 롤백
+        try:
+            if raw.open:
+                raw.rollback()
+            else:
+                raise pymysql.err.InterfaceError("connection closed")
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            self._idle.append((raw, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, raw):
+        self._close_raw(raw)
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+
+    # ---------- 관리 ----------
+
+    def close_all(self):
+        """유휴 연결 모두 닫기 (대여 중인 연결은 반환 시 정상 처리)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for raw, _, _ in idle:
+            self._close_raw(raw)
+
+    def stats(self) -> dict:
+        """풀 상태 및 대여 지표"""
+        with self._cond:
+            idle = len(self._idle)
+            in_use = self._size - idle
+            checkouts = self._stats['checkouts']
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': in_use,
+                'idle': idle,
+                'waiting': self._waiting,
+                'saturation': round(in_use / self.max_size, 3) if self.max_size else 0,
+                'checkouts': checkouts,
+                'timeouts': self._stats['timeouts'],
+                'created': self._stats['created'],
+                'recycled': self._stats['recycled'],
+                'ping_failures': self._stats['ping_failures'],
+                'discarded': self._stats['discarded'],
+                'peak_in_use': self._stats['peak_in_use'],
+                'wait_avg_ms': round(self._stats['wait_total_ms'] / checkouts, 2) if checkouts else 0,
+                'wait_max_ms': round(self._stats['wait_max_ms'], 2),
+            }
@@ -0,0 +1,162 @@
+"""
+Excel 스트리밍 읽기 모듈
+
+pd.read_excel()은 워크북 전체를 메모리에 올리고 전체 DataFrame을 만든 뒤에야
+미리보기(첫 몇 행)도 반환할 수 있다. openpyxl read_only 모드로 시트를 행 단위로 읽어
+- 미리보기: 헤더 + 처음 N행만 읽고 중단
+- 등록: chunk_size 행씩 DataFrame으로 만들어 순서대로 처리
+하도록 한다. 구형 .xls(BIFF)는 openpyxl이 읽지 못하므로 pandas로 읽는다.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import pandas as pd
+from fastapi import HTTPException
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class ExcelPreview:
+    """미리보기 결과"""
+    columns: List[str]
+    sample: pd.DataFrame
+    total_rows: Optional[int]
+    sheet_names: List[str]
+    sheet: str
+
+
+def _header_names(values) -> List[str]:
+    """헤더 행을 pandas.read_excel()과 같은 규칙의 컬럼 이름으로 변환 (빈칸/중복 처리)"""
+    names = []
+    counts = {}
+    for idx, value in enumerate(values):
+        name = f"Unnamed: {idx}" if value is None or str(value).strip() == '' else str(value)
+        if name in counts:
+            counts[name] += 1
+            name = f"{name}.{counts[name]}"
+        else:
+            counts[name] = 0
+        names.append(name)
+    # 뒤쪽 빈 헤더 컬럼 제거
+    while names and names[-1].startswith('Unnamed: ') and values[len(names) - 1] is None:
+        names.pop()
+    return names
+
+
+def _is_xls(filename: str) -> bool:
+    return filename.lower().endswith('.xls')
+
+
+class ExcelSheetReader:
+    """
+    업로드된 Excel 파일의 한 시트를 행 단위로 읽는 리더
+
+    with ExcelSheetReader(file.file, file.filename, sheet) as reader:
+        for chunk in reader.iter_chunks(): ...
+    """
+
+    def __init__(self, fileobj, filename: str, sheet: Optional[str] = None):
+        self.fileobj = fileobj
+        self.filename = filename
+        self.sheet = sheet
+        self._workbook = None
+        self._frame = None  # .xls 전용
+
+    def __enter__(self):
+        self.fileobj.seek(0)
+        if _is_xls(self.filename):
+            # 구형 형식은 스트리밍 리더가 없어 pandas로 전체 로드
+            sheet = self.sheet if self.sheet is not None else 0
+            try:
+                sheets = pd.read_excel(self.fileobj, sheet_name=None)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Excel 파일을 읽을 수 없습니다: {e}")
+            self.sheet_names = list(sheets)
+            if isinstance(sheet, int):
+                sheet = self.sheet_names[sheet]
+            if sheet not in sheets:
+                raise HTTPException(status_code=400, detail=f"시트를 찾을 수 없습니다: {sheet}")
+            self.sheet_name = sheet
+            self._frame = sheets[sheet]
+            self.columns = self._frame.columns.tolist()
+            return self
+
+        from openpyxl import load_workbook
+        try:
+            self._workbook = load_workbook(self.fileobj, read_only=True, data_only=True)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Excel 파일을 읽을 수 없습니다: {e}")
+        self.sheet_names = self._workbook.sheetnames
+        if self.sheet is None:
+            self.sheet_name = self.sheet_names[0]
+        elif self.sheet in self.sheet_names:
+            self.sheet_name = self.sheet
+        else:
+            self.close()
+            raise HTTPException(status_code=400, detail=f"시트를 찾을 수 없습니다: {self.sheet}")
+        self._worksheet = self._workbook[self.sheet_name]
+        self._rows = self._worksheet.iter_rows(values_only=True)
+        self.columns = _header_names(list(next(self._rows, ())))
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    def row_count(self) -> Optional[int]:
+        """
+        데이터 행 수 (헤더 제외)
+
+        시트 dimension 정보로 계산하며, 정보가 없는 파일은 None (행을 모두 읽지 않음).
+        """
+        if self._frame is not None:
+            return len(self._frame)
+        max_row = self._worksheet.max_row
+        return max(max_row - 1, 0) if max_row else None
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE, limit: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        chunk_size 행씩 DataFrame 반환
+
+        index는 0부터 시작하는 데이터 행 번호이며 Excel 행 번호는 index + 2 이다.
+        빈 행은 건너뛰고, limit는 빈 행을 제외한 데이터 행 수이다.
+        셀 값은 object 그대로 두어 청크마다 dtype 추론이 달라지지 않게 한다
+        (예: 빈칸이 섞인 청크에서만 전화번호 1012345678이 1012345678.0이 되는 문제).
+        """
+        if self._frame is not None:
+            frame = self._frame if limit is None else self._frame.head(limit)
+            for start in range(0, len(frame), chunk_size):
+                yield frame.iloc[start:start + chunk_size]
+            return
+
+        width = len(self.columns)
+        batch, index = [], []
+        count = 0
+        for offset, values in enumerate(self._rows):
+            if limit is not None and count >= limit:
+                break
+            values = tuple(values[:width])
+            if all(v is None or (isinstance(v, str) and not v.strip()) for v in values):
+                continue
+            batch.append(values + (None,) * (width - len(values)))
+            index.append(offset)
+            count += 1
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=self.columns, index=index, dtype=object)
+                batch, index = [], []
+        if batch:
+            yield pd.DataFrame(batch, columns=self.columns, index=index, dtype=object)
+
+
+def preview_excel_file(fileobj, filename: str, sample_rows: int = 3, sheet: Optional[str] = None) -> ExcelPreview:
+    """헤더와 처음 sample_rows행만 읽어 미리보기 생성"""
+    with ExcelSheetReader(fileobj, filename, sheet) as reader:
+        chunks = list(reader.iter_chunks(chunk_size=sample_rows, limit=sample_rows))
+        sample = chunks[0] if chunks else pd.DataFrame(columns=reader.columns)
+        return ExcelPreview(reader.columns, sample, reader.row_count(), reader.sheet_names, reader.sheet_name)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+로컬 가짜 LLM 서버 (llm_gateway 확인용, 표준 라이브러리만 사용)
+
+Groq(OpenAI 호환) / Gemini 응답 형식을 흉내 낸다.
+    python fake_llm_server.py --port 8765 --latency 0.2 --rate-limit-every 3
+
+.env:
+    GROQ_BASE_URL=http://127.0.0.1:8765/openai/v1
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta
+
+옵션
+- --latency: 응답 지연(초)
+- --rate-limit-every N: Groq 요청 N번마다 한 번 429 (Retry-After: 1)
+- --fail-groq: Groq 요청은 모두 503 (Gemini 전환 확인)
+"""
+
+import re
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GEMINI_PATH = re.compile(r'^/v1beta/models/([^/:]+):generateContent$')
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    options = None
+    counter = {'groq': 0, 'gemini': 0}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        print(f"[FAKE-LLM] {self.command} {self.path} - {format % args}")
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        time.sleep(self.options.latency)
+
+        if self.path == '/openai/v1/chat/completions':
+            with self.lock:
+                self.counter['groq'] += 1
+                count = self.counter['groq']
+            if self.options.fail_groq:
+                return self._send(503, {'error': {'message': 'service unavailable (fake)'}})
+            every = self.options.rate_limit_every
+            if every and count % every == 0:
+                return self._send(429, {'error': {'message': 'rate limit (fake)'}}, {'Retry-After': '1'})
+            prompt = ' '.join(m.get('content', '') for m in payload.get('messages', []))
+            text = f"[fake groq:{payload.get('model')}] {prompt[-80:]}"
+            return self._send(200, {
+                'id': f'fake-{count}',
+                'model': payload.get('model'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': len(prompt.split()), 'completion_tokens': len(text.split()),
+                          'total_tokens': len(prompt.split()) + len(text.split())},
+            })
+
+        match = GEMINI_PATH.match(self.path.split('?')[0])
+        if match:
+            with self.lock:
+                self.counter['gemini'] += 1
+            prompt = ' '.join(part.get('text', '') for content in payload.get('contents', [])
+                              for part in content.get('parts', []))
+            text = f"[fake gemini:{match.group(1)}] {prompt[-80:]}"
+            return self._send(200, {
+                'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+                'usageMetadata': {'promptTokenCount': len(prompt.split()), 'candidatesTokenCount': len(text.split())},
+            })
+
+        self._send(404, {'error': {'message': f'unknown path {self.path}'}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 가짜 LLM 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--rate-limit-every', type=int, default=0)
+    parser.add_argument('--fail-groq', action='store_true')
+    FakeLLMHandler.options = parser.parse_args()
+
+    server = ThreadingHTTPServer((FakeLLMHandler.options.host, FakeLLMHandler.options.port), FakeLLMHandler)
+    print(f"[FAKE-LLM] http://{FakeLLMHandler.options.host}:{FakeLLMHandler.options.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
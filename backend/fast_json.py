@@ -0,0 +1,78 @@
+"""
+고속 JSON 직렬화 모듈
+
+DB 조회 결과(dict 목록)를 한 번에 JSON 바이트로 직렬화한다.
+핸들러에서 행/컬럼마다 isinstance + isoformat() 변환 루프를 돌고
+FastAPI가 jsonable_encoder로 다시 순회하던 이중 변환을 없앤다.
+- orjson 설치 시 orjson 사용 (datetime/date는 네이티브 처리)
+- 미설치 시 표준 json 모듈로 동일한 규칙 적용
+"""
+
+import json
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def format_timedelta(value: timedelta) -> str:
+    """MySQL TIME(timedelta)을 HH:MM:SS 문자열로 변환"""
+    total_seconds = int(value.total_seconds())
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def _default(timedelta_as_text: bool):
+    """JSON 기본 타입이 아닌 DB 값 변환 규칙 (jsonable_encoder와 동일한 결과)"""
+    def default(value: Any):
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, timedelta):
+            return format_timedelta(value) if timedelta_as_text else value.total_seconds()
+        if isinstance(value, Decimal):
+            return int(value) if value.as_tuple().exponent >= 0 else float(value)
+        if isinstance(value, (bytes, bytearray)):
+            # BLOB(썸네일 등)은 응답에서 제외
+            return None
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        raise TypeError(f"JSON 직렬화 불가 타입: {type(value).__name__}")
+    return default
+
+
+_default_seconds = _default(False)
+_default_text = _default(True)
+
+
+def dumps(content: Any, timedelta_as_text: bool = False) -> bytes:
+    """DB 행을 포함한 객체를 UTF-8 JSON 바이트로 직렬화"""
+    default = _default_text if timedelta_as_text else _default_seconds
+    if orjson is not None:
+        return orjson.dumps(content, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=default, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    DB 행을 그대로 받아 한 번에 직렬화하는 JSON 응답
+
+    핸들러에서 직접 반환하면 jsonable_encoder를 거치지 않는다.
+    timedelta_as_text=True이면 TIME 컬럼을 convert_datetime()과 같은 HH:MM:SS로 내려준다.
+    """
+
+    def __init__(self, content: Any, *args, timedelta_as_text: bool = False, **kwargs):
+        self.timedelta_as_text = timedelta_as_text
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, getattr(self, 'timedelta_as_text', False))
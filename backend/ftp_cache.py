@@ -0,0 +1,491 @@
+"""
+FTP 원본 파일 로컬 디스크 캐시 모듈
+
+사진/첨부 원본을 조회할 때마다 NAS에서 전체 파일을 다시 내려받던 것을
+로컬 디스크 LRU 캐시로 대체한다.
+- 캐시 키: FTP 경로 + SIZE + MDTM (원본이 바뀌면 자동으로 새 키)
+- 임시 파일에 받은 뒤 os.replace로 원자적 교체 (동시 요청이 서로 덮어쓰지 않음)
+- 전체 용량 상한 초과 시 가장 오래 사용하지 않은 파일부터 삭제
+- 캐시 적중 시 파일에서 바로 응답 (Range / 강한 ETag / 304 지원)
+  조회할 때 파일을 열어 두므로 응답 전송 중 LRU 삭제가 일어나도 끝까지 읽을 수 있음
+- 캐시 미적중 시 FTP 데이터 연결에서 읽는 대로 클라이언트에 전송하면서 캐시에 기록
+  (Range는 REST로 해당 위치부터 전송, 클라이언트 연결이 끊기면 FTP 전송 중단)
+"""
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from concurrency import run_blocking
+
+logger = logging.getLogger("riselms")
+
+# 부분 응답 스트리밍 청크 크기
+CHUNK_SIZE = 256 * 1024
+
+
+class CachedFile:
+    """
+    캐시에 저장된 원본 파일
+
+    file은 조회 시점에 연 파일 객체로, 이후 LRU 삭제로 경로가 지워져도
+    열린 파일은 끝까지 읽을 수 있다. 사용 후 close()로 닫는다.
+    """
+
+    __slots__ = ('path', 'size', 'etag', 'mtime', 'file')
+
+    def __init__(self, path: str, size: int, etag: str, mtime: float, file=None):
+        self.path = path
+        self.size = size
+        self.etag = etag
+        self.mtime = mtime
+        self.file = file
+
+    @classmethod
+    def open(cls, key: str, path: str) -> 'CachedFile':
+        """캐시 파일을 열어 반환 (삭제된 경우 FileNotFoundError)"""
+        f = open(path, 'rb')
+        st = os.fstat(f.fileno())
+        return cls(path, st.st_size, f'"{key[:32]}"', st.st_mtime, f)
+
+    def read(self) -> bytes:
+        with self.file:
+            return self.file.read()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class FTPFileCache:
+    """FTP 경로 + 크기/수정시각 기준 디스크 LRU 캐시"""
+
+    def __init__(self, ftp_pool, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024, stat_ttl: float = 60.0):
+        """
+        Args:
+            ftp_pool: FTPPool (SIZE/MDTM 조회 및 다운로드)
+            cache_dir: 캐시 디렉토리
+            max_bytes: 캐시 전체 용량 상한
+            stat_ttl: 같은 경로의 SIZE/MDTM 조회 결과 재사용 시간 (초)
+        """
+        self.ftp_pool = ftp_pool
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stat_ttl = stat_ttl
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size (LRU 순서)
+        self._total_bytes = 0
+        self._stat_memo: Dict[str, Tuple[int, str, float]] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._stats = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'stat_calls': 0, 'errors': 0,
+            'streams': 0, 'streams_aborted': 0,
+        }
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    # ---------- 인덱스 ----------
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _load_index(self):
+        """재시작 후에도 기존 캐시 파일을 사용하도록 디스크에서 인덱스 복원 (접근 시각 순)"""
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.startswith('.tmp'):
+                    # 다운로드 도중 종료된 임시 파일 정리
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, name, st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _touch(self, key: str, path: str):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        try:
+            # 재시작 후 LRU 순서 복원용
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _add(self, key: str, size: int):
+        evicted = []
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = size
+                self._total_bytes += size
+            self._entries.move_to_end(key)
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                self._stats['evictions'] += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._entry_path(old_key))
+            except OSError:
+                pass
+
+    # ---------- FTP 조회 ----------
+
+    def stat(self, ftp_path: str) -> Tuple[int, str]:
+        """FTP 파일 크기 / 수정시각 (SIZE, MDTM) - stat_ttl 동안 재사용"""
+        memo = self._stat_memo.get(ftp_path)
+        if memo and time.monotonic() - memo[2] < self.stat_ttl:
+            return memo[0], memo[1]
+
+        def _stat(ftp):
+            ftp.voidcmd('TYPE I')  # SIZE는 바이너리 모드에서만 정확
+            size = ftp.size(ftp_path)
+            try:
+                mtime = ftp.sendcmd(f'MDTM {ftp_path}').split()[-1]
+            except Exception:
+                # MDTM 미지원 서버는 크기만으로 구분
+                mtime = ''
+            return size, mtime
+
+        size, mtime = self.ftp_pool.call(_stat)
+        self._stats['stat_calls'] += 1
+        self._stat_memo[ftp_path] = (size, mtime, time.monotonic())
+        return size, mtime
+
+    def cache_key(self, ftp_path: str, size: int, mtime: str) -> str:
+        return hashlib.sha256(f"{ftp_path}\0{size}\0{mtime}".encode('utf-8')).hexdigest()
+
+    def lookup(self, ftp_path: str) -> Tuple[str, int, Optional[CachedFile]]:
+        """
+        캐시 조회 (다운로드하지 않음)
+
+        Returns:
+            (캐시 키, 원본 크기, 적중 시 CachedFile / 미적중 시 None)
+        """
+        size, mtime = self.stat(ftp_path)
+        key = self.cache_key(ftp_path, size, mtime)
+        path = self._entry_path(key)
+        try:
+            # 먼저 열어 두어야 응답 전에 LRU 삭제되어도 읽을 수 있음
+            cached = CachedFile.open(key, path)
+        except FileNotFoundError:
+            return key, size, None
+        self._stats['hits'] += 1
+        self._touch(key, path)
+        return key, size, cached
+
+    def fetch(self, ftp_path: str) -> CachedFile:
+        """캐시에서 원본 파일 반환 (열린 상태), 없으면 FTP에서 내려받아 저장"""
+        key, size, cached = self.lookup(ftp_path)
+        if cached:
+            return cached
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            path = self._entry_path(key)
+            try:
+                # 동시에 요청한 다른 스레드가 방금 받아 둔 경우
+                cached = CachedFile.open(key, path)
+                self._stats['hits'] += 1
+                self._touch(key, path)
+            except FileNotFoundError:
+                self._stats['misses'] += 1
+
+                def download(f):
+                    def retrieve(ftp):
+                        # 연결 오류로 재시도되면 처음부터 다시 기록
+                        f.seek(0)
+                        f.truncate()
+                        ftp.retrieve(ftp_path, f.write, blocksize=CHUNK_SIZE)
+                    self.ftp_pool.call(retrieve)
+
+                self.store(key, download)
+                # 키 잠금 안에서 열어 다른 요청의 LRU 삭제보다 먼저 파일을 확보
+                cached = CachedFile.open(key, path)
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+        return cached
+
+    def store(self, key: str, download):
+        """
+        download(f)가 임시 파일 f에 쓴 내용을 원자적으로 캐시에 등록
+
+        실패하면 임시 파일을 지우고 예외를 그대로 전달한다.
+        """
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                download(f)
+            self._publish(key, tmp_path)
+        except BaseException:
+            self._stats['errors'] += 1
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def _publish(self, key: str, tmp_path: str):
+        """다 받은 임시 파일을 캐시 항목으로 원자적 교체"""
+        path = self._entry_path(key)
+        os.replace(tmp_path, path)
+        self._add(key, os.path.getsize(path))
+
+    def iter_ftp(self, ftp_path: str, start: int = 0, length: Optional[int] = None):
+        """
+        FTP 파일을 청크 단위로 읽는 제너레이터 (retrbinary와 같은 데이터 연결을 직접 읽음)
+
+        클라이언트가 다음 청크를 요청할 때만 소켓에서 읽으므로 전송 속도가 클라이언트에 맞춰진다.
+        start가 있으면 REST로 해당 위치부터 받고, length만큼 읽으면 ABOR로 전송을 중단한 뒤
+        세션을 풀에 반환한다 (ABOR 실패 시에만 폐기).
+        중간에 close()되면(클라이언트 연결 끊김) 데이터 연결과 세션을 닫아 FTP 전송을 중단한다.
+        """
+        session = self.ftp_pool.acquire()
+        completed = False
+        try:
+            session.voidcmd('TYPE I')
+            conn = session.transfercmd(f'RETR {ftp_path}', rest=start or None)
+            try:
+                remaining = length
+                while remaining is None or remaining > 0:
+                    data = conn.recv(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                    if not data:
+                        break
+                    if remaining is not None:
+                        remaining -= len(data)
+                    yield data
+                if remaining is not None and remaining <= 0:
+                    # 요청 범위만 읽음 → 나머지 전송을 ABOR로 끊고 응답을 읽어 세션 재사용
+                    session.abort()
+                else:
+                    session.voidresp()
+                completed = True
+            finally:
+                conn.close()
+        finally:
+            if completed:
+                self.ftp_pool.release(session)
+            else:
+                # 전송 도중 중단된 세션(또는 ABOR 실패)은 상태를 알 수 없으므로 QUIT 없이 폐기
+                self.ftp_pool.discard(session, graceful=False)
+
+    def _iter_and_store(self, key: str, ftp_path: str, size: int):
+        """FTP에서 받은 청크를 전송하면서 임시 파일에 기록, 끝까지 받으면 캐시에 등록"""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if not key_lock.acquire(blocking=False):
+            # 같은 파일을 다른 요청이 이미 캐시에 기록 중이면 전송만
+            yield from self.iter_ftp(ftp_path)
+            return
+
+        tmp_path = None
+        try:
+            path = self._entry_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp', dir=os.path.dirname(path))
+            received = 0
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in self.iter_ftp(ftp_path):
+                    f.write(chunk)
+                    received += len(chunk)
+                    yield chunk
+            if received == size:
+                self._publish(key, tmp_path)
+                tmp_path = None
+        finally:
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            with self._lock:
+                self._key_locks.pop(key, None)
+            key_lock.release()
+
+    def respond(self, request: Request, ftp_path: str, media_type: str, headers: Optional[dict] = None) -> Response:
+        """
+        FTP 원본 파일 응답
+
+        캐시 적중 시 file_response()로 파일에서 응답하고,
+        미적중 시 FTP에서 받는 대로 스트리밍한다 (전체 요청이면 동시에 캐시에 기록).
+        """
+        key, size, cached = self.lookup(ftp_path)
+        if cached:
+            return file_response(request, cached, media_type, headers)
+
+        self._stats['misses'] += 1
+        headers = dict(headers or {})
+        etag = f'"{key[:32]}"'
+        early, byte_range = conditional_response(request, etag, size, headers)
+        if early:
+            return early
+
+        self._stats['streams'] += 1
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+            headers['Content-Length'] = str(length)
+            chunks = self.iter_ftp(ftp_path, start, length)
+            status_code = 206
+        else:
+            headers['Content-Length'] = str(size)
+            chunks = self._iter_and_store(key, ftp_path, size)
+            status_code = 200
+
+        return StreamingResponse(
+            self._stream(chunks), status_code=status_code, media_type=media_type, headers=headers
+        )
+
+    async def _stream(self, chunks):
+        """
+        동기 제너레이터를 스레드풀에서 한 청크씩 읽어 전송
+
+        클라이언트 연결이 끊겨 응답 태스크가 취소되면 제너레이터를 닫아 FTP 전송을 중단한다.
+        """
+        finished = False
+        try:
+            while True:
+                chunk = await run_blocking(next, chunks, None)
+                if chunk is None:
+                    finished = True
+                    break
+                yield chunk
+        finally:
+            if not finished:
+                self._stats['streams_aborted'] += 1
+            chunks.close()
+
+    def stats(self) -> dict:
+        """캐시 적중/미적중/삭제 횟수 및 사용량"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            })
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0
+        return stats
+
+
+# ==================== 파일 응답 (Range / ETag) ====================
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    단일 바이트 범위 헤더 해석 (bytes=start-end, bytes=start-, bytes=-suffix)
+
+    Returns:
+        (start, end) 포함 범위, 헤더가 없거나 다중 범위면 None
+    Raises:
+        ValueError: 만족할 수 없는 범위 (416)
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start_text, _, end_text = range_header[6:].strip().partition('-')
+    if start_text:
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    else:
+        if not end_text:
+            raise ValueError("empty range")
+        start = max(size - int(end_text), 0)
+        end = size - 1
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+def conditional_response(request: Request, etag: str, size: int, headers: dict) -> Tuple[Optional[Response], Optional[Tuple[int, int]]]:
+    """
+    ETag / Range 조건 처리 (headers에 ETag, Accept-Ranges 추가)
+
+    Returns:
+        (304/416 등 바로 반환할 응답 또는 None, 부분 요청 범위 또는 None)
+    """
+    headers['ETag'] = etag
+    headers['Accept-Ranges'] = 'bytes'
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers), None
+
+    range_header = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            return None, parse_range(range_header, size)
+        except ValueError:
+            headers['Content-Range'] = f'bytes */{size}'
+            return Response(status_code=416, headers=headers), None
+
+    return None, None
+
+
+def _iter_file(f, start: int, length: int):
+    with f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(request: Request, cached: CachedFile, media_type: str, headers: Optional[dict] = None) -> Response:
+    """
+    캐시 파일 응답
+
+    If-None-Match 일치 시 304, Range 요청 시 206 부분 응답,
+    그 외에는 파일 전체를 전송한다. (cached.file은 전송이 끝나면 닫힘)
+    """
+    headers = dict(headers or {})
+    early, byte_range = conditional_response(request, cached.etag, cached.size, headers)
+    if early:
+        cached.close()
+        return early
+
+    # FileResponse처럼 경로로 다시 열면 그 사이 LRU 삭제될 수 있으므로 조회 때 연 파일에서 전송
+    start, length, status_code = 0, cached.size, 200
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        headers['Content-Range'] = f'bytes {start}-{end}/{cached.size}'
+        status_code = 206
+    headers['Content-Length'] = str(length)
+    return StreamingResponse(
+        _iter_file(cached.file, start, length),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
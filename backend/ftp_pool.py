@@ -0,0 +1,336 @@
+"""
+FTP 세션 풀 모듈
+
+NAS FTP 서버에 요청마다 connect + login + cwd/mkd 를 반복하던 비용을 줄이기 위해
+로그인된 FTP 세션을 재사용하는 스레드 안전한 풀
+- 최대 세션 수 제한 (초과 시 대기, 타임아웃)
+- 대여 시 유휴 시간이 길면 NOOP으로 keepalive 확인, 실패 시 재연결
+- 카테고리 디렉토리 생성 여부 / 세션별 현재 디렉토리 캐시 (cwd/mkd 왕복 생략)
+- 연결 오류 시 새 세션으로 1회 자동 재시도
+"""
+
+import time
+import ftplib
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+logger = logging.getLogger("riselms")
+
+# 세션을 폐기하고 재연결해야 하는 오류 (권한/경로 오류인 error_perm은 제외)
+CONNECTION_ERRORS = (ftplib.error_temp, ftplib.error_proto, EOFError, OSError)
+
+
+class FTPPoolTimeoutError(Exception):
+    """풀에서 FTP 세션을 대여하지 못하고 타임아웃된 경우"""
+    pass
+
+
+class FTPSession:
+    """
+    풀에서 대여한 로그인된 FTP 세션
+
+    ftplib.FTP 메서드는 그대로 프록시하며, 디렉토리 이동/생성과 업로드/다운로드
+    헬퍼를 제공한다.
+    """
+
+    def __init__(self, pool, ftp: ftplib.FTP, created_at: float):
+        self._pool = pool
+        self.ftp = ftp
+        self.created_at = created_at
+        self.last_used = time.monotonic()
+        self.current_dir: Optional[str] = None
+
+    def __getattr__(self, name):
+        return getattr(self.ftp, name)
+
+    def chdir(self, path: str, create: bool = False):
+        """
+        디렉토리 이동 (이미 해당 경로면 생략)
+
+        create=True이면 경로가 없을 때 상위부터 생성한다.
+        존재가 확인된 경로는 풀 전체에서 기억하고(stats의 known_dirs), cwd가 실패하면 잊는다.
+        """
+        if self.current_dir == path:
+            return
+        # 중간에 실패하면 서버 쪽 현재 디렉토리를 알 수 없으므로 캐시를 먼저 비움
+        # (실패한 세션이 풀로 돌아간 뒤 chdir(이전 경로)가 생략되어 엉뚱한 곳에 STOR 방지)
+        self.current_dir = None
+        try:
+            self.ftp.cwd(path)
+        except ftplib.error_perm:
+            # 서버에서 삭제된 경로일 수 있으므로 기억을 지우고 (create면) 다시 생성
+            self._pool._known_dirs.discard(path)
+            if not create:
+                raise
+            current_path = ''
+            for part in path.split('/'):
+                if not part:
+                    continue
+                current_path += '/' + part
+                try:
+                    self.ftp.cwd(current_path)
+                except ftplib.error_perm:
+                    self.ftp.mkd(current_path)
+                    self.ftp.cwd(current_path)
+        self.current_dir = path
+        self._pool._known_dirs.add(path)
+
+    def store(self, directory: str, filename: str, fileobj, blocksize: int = 8192):
+        """디렉토리(없으면 생성)에 파일 업로드"""
+        self.chdir(directory, create=True)
+        self.ftp.storbinary(f'STOR {filename}', fileobj, blocksize=blocksize)
+
+    def retrieve(self, path: str, callback: Callable[[bytes], None], blocksize: int = 8192):
+        """절대 경로 파일 다운로드 (청크마다 callback 호출)"""
+        self.ftp.retrbinary(f'RETR {path}', callback, blocksize=blocksize)
+
+    def abort(self):
+        """
+        진행 중인 전송 중단 (ABOR)
+
+        전송 완료 응답(226)과 ABOR 응답(426/225/226)의 개수와 순서는 서버와 타이밍에 따라
+        달라지므로, NOOP을 보내 그 응답(200)이 올 때까지 남은 응답을 읽어 제어 연결을 맞춘다.
+        이후 세션은 풀에 반환해 재사용할 수 있다.
+        """
+        self.ftp.abort()
+        self.ftp.putcmd('NOOP')
+        while True:
+            resp = self.ftp.getmultiline()
+            if resp.startswith('200'):
+                return
+            if not resp.startswith(('2', '426', '451')):
+                raise ftplib.error_proto(resp)
+
+    def read_bytes(self, path: str) -> bytes:
+        """절대 경로 파일 전체를 bytes로 다운로드"""
+        chunks = []
+        self.retrieve(path, chunks.append)
+        return b''.join(chunks)
+
+
+class FTPPool:
+    """스레드 안전한 FTP 세션 풀"""
+
+    def __init__(
+        self,
+        config: dict,
+        max_size: int = 4,
+        checkout_timeout: float = 30.0,
+        keepalive_interval: float = 30.0,
+        idle_timeout: float = 240.0,
+        connect_timeout: float = 15.0,
+    ):
+        """
+        Args:
+            config: host, port, user, passwd
+            max_size: 동시에 열 수 있는 최대 세션 수 (NAS 동시 접속 제한 고려)
+            checkout_timeout: 세션 대여 최대 대기 시간 (초)
+            keepalive_interval: 마지막 사용 후 이 시간이 지난 세션은 대여 시 NOOP 확인
+            idle_timeout: 마지막 사용 후 이 시간이 지난 세션은 서버 타임아웃 전에 폐기
+            connect_timeout: 소켓 연결/응답 타임아웃 (초)
+        """
+        self.config = dict(config)
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+
+        self._cond = threading.Condition(threading.RLock())
+        self._idle = deque()  # FTPSession
+        self._size = 0
+        self._known_dirs = set()
+
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'logins': 0,
+            'reused': 0,
+            'keepalive_failures': 0,
+            'expired': 0,
+            'retries': 0,
+            'discarded': 0,
+        }
+
+    # ---------- 내부 유틸 ----------
+
+    def _connect(self) -> FTPSession:
+        ftp = ftplib.FTP(timeout=self.connect_timeout)
+        ftp.encoding = 'utf-8'  # 한글 파일명 지원
+        ftp.connect(self.config['host'], self.config['port'])
+        ftp.login(self.config['user'], self.config['passwd'])
+        with self._cond:
+            self._stats['logins'] += 1
+        return FTPSession(self, ftp, time.monotonic())
+
+    @staticmethod
+    def _close_ftp(ftp: ftplib.FTP):
+        try:
+            ftp.quit()
+        except Exception:
+            try:
+                ftp.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, session: FTPSession) -> bool:
+        idle = time.monotonic() - session.last_used
+        if idle > self.idle_timeout:
+            with self._cond:
+                self._stats['expired'] += 1
+            return False
+        if idle < self.keepalive_interval:
+            return True
+        try:
+            session.ftp.voidcmd('NOOP')
+            return True
+        except Exception:
+            with self._cond:
+                self._stats['keepalive_failures'] += 1
+            return False
+
+    # ---------- 대여 / 반환 ----------
+
+    def acquire(self, timeout: Optional[float] = None) -> FTPSession:
+        """
+        풀에서 세션 대여
+
+        유휴 세션이 있으면 keepalive 확인 후 반환하고,
+        없으면 max_size 이내에서 새로 로그인하거나 반환될 때까지 대기한다.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    session = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    session = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise FTPPoolTimeoutError(
+                        f"FTP 세션 대기 시간 초과 ({timeout}초, 최대 {self.max_size}개 사용 중)"
+                    )
+                self._cond.wait(remaining)
+
+        if session is not None:
+            if self._is_alive(session):
+                with self._cond:
+                    self._stats['checkouts'] += 1
+                    self._stats['reused'] += 1
+                return session
+            # 끊긴 세션은 소켓만 닫고 슬롯을 유지한 채 새로 로그인
+            try:
+                session.ftp.close()
+            except Exception:
+                pass
+
+        try:
+            session = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats['checkouts'] += 1
+        return session
+
+    def release(self, session: FTPSession):
+        """세션을 풀에 반환"""
+        session.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    def discard(self, session: FTPSession, graceful: bool = True):
+        """
+        오류가 난 세션 폐기
+
+        graceful=False이면 QUIT 응답을 기다리지 않고 소켓만 닫는다 (전송 중단 시).
+        """
+        if graceful:
+            self._close_ftp(session.ftp)
+        else:
+            try:
+                session.ftp.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """
+        세션 대여 컨텍스트 (with ftp_pool.session() as ftp:)
+
+        정상 종료 또는 서버의 권한/경로 오류(5xx 응답)면 풀에 반환하고,
+        그 외 오류는 전송 도중 중단되었을 수 있어 세션을 폐기한다.
+        """
+        session = self.acquire(timeout)
+        try:
+            yield session
+        except ftplib.error_perm:
+            self.release(session)
+            raise
+        except BaseException:
+            self.discard(session)
+            raise
+        else:
+            self.release(session)
+
+    def call(self, func: Callable[[FTPSession], object], retries: int = 1):
+        """
+        세션을 대여해 func(session) 실행
+
+        연결 오류(서버 타임아웃으로 끊긴 세션 등)면 새 세션으로 retries회 재시도한다.
+        func는 재실행되어도 안전해야 한다 (업로드 시 파일 포인터를 func 안에서 되감기).
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.session() as session:
+                    return func(session)
+            except CONNECTION_ERRORS as e:
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                with self._cond:
+                    self._stats['retries'] += 1
+                logger.warning(f"FTP 연결 오류로 재시도 ({attempt}/{retries}): {e}")
+
+    # ---------- 관리 ----------
+
+    def close_all(self):
+        """유휴 세션 모두 종료"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for session in idle:
+            self._close_ftp(session.ftp)
+
+    def stats(self) -> dict:
+        """풀 상태 및 재사용 지표"""
+        with self._cond:
+            idle = len(self._idle)
+            stats = dict(self._stats)
+            stats.update({
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._size - idle,
+                'idle': idle,
+                'known_dirs': len(self._known_dirs),
+            })
+            return stats
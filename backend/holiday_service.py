@@ -0,0 +1,173 @@
+"""
+공휴일 서비스
+
+공휴일을 쓰는 모든 경로(공휴일 목록 API, 과정 날짜 계산, 시간표 자동 생성)가
+프로세스에 한 번 적재한 공휴일 스냅샷을 함께 사용한다.
+- 날짜순 정렬 배열 + bisect로 연도/기간 조회, 공휴일 여부를 O(log n)으로 확인
+- 근무일 달력(WorkCalendar)도 같은 스냅샷에서 생성
+- 공휴일 쓰기 API가 ref_cache.invalidate('holidays')를 호출하면 (다른 워커 포함) 다시 적재
+- 법정공휴일 음력 → 양력 변환표는 연도별로 한 번만 계산 (korean_lunar_calendar)
+- 자동 추가는 INSERT ... ON DUPLICATE KEY UPDATE 한 번으로 일괄 반영
+  (holidays (holiday_date, name) UNIQUE 키, schema_migrations 11)
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from work_calendar import CalendarCache, WorkCalendar
+
+logger = logging.getLogger("riselms")
+
+# 법정공휴일 (양력)
+SOLAR_HOLIDAYS = [
+    (1, 1, "신정"),
+    (3, 1, "삼일절"),
+    (5, 5, "어린이날"),
+    (6, 6, "현충일"),
+    (8, 15, "광복절"),
+    (10, 3, "개천절"),
+    (10, 9, "한글날"),
+    (12, 25, "성탄절"),
+]
+
+# 법정공휴일 (음력) - 설날 전날은 음력 12월 말일(전년도 음력)
+LUNAR_HOLIDAYS = [
+    ((12, 30), "설날 연휴"),
+    ((1, 1), "설날"),
+    ((1, 2), "설날 연휴"),
+    ((4, 8), "부처님오신날"),
+    ((8, 14), "추석 연휴"),
+    ((8, 15), "추석"),
+    ((8, 16), "추석 연휴"),
+]
+
+
+def _date_value(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+# ==================== 음력 변환표 ====================
+
+@lru_cache(maxsize=None)
+def lunar_holiday_table(year: int) -> Tuple[Tuple[date, str], ...]:
+    """
+    year의 음력 법정공휴일 양력 날짜 (연도별 한 번만 계산)
+
+    korean_lunar_calendar가 없으면 ImportError.
+    """
+    from korean_lunar_calendar import KoreanLunarCalendar
+
+    calendar = KoreanLunarCalendar()
+    result = []
+    for (lunar_month, lunar_day), name in LUNAR_HOLIDAYS:
+        lunar_year = year - 1 if lunar_month == 12 else year
+        if not calendar.setLunarDate(lunar_year, lunar_month, lunar_day, False) and lunar_day == 30:
+            # 작은달(29일)이면 설 전날은 29일
+            calendar.setLunarDate(lunar_year, lunar_month, 29, False)
+        result.append((_date_value(calendar.SolarIsoFormat()), name))
+    return tuple(result)
+
+
+def warm_lunar_table(years: Iterable[int]) -> int:
+    """음력 변환표 미리 계산 (계산한 연도 수, 라이브러리가 없으면 0)"""
+    count = 0
+    for year in years:
+        try:
+            lunar_holiday_table(year)
+        except ImportError:
+            return count
+        except Exception as e:
+            logger.warning(f"{year}년 음력 공휴일 변환 실패: {e}")
+            continue
+        count += 1
+    return count
+
+
+def legal_holidays(year: int) -> Tuple[List[Tuple[date, str]], Optional[str]]:
+    """
+    year의 법정공휴일 (날짜, 이름) 목록과 음력 변환 실패 사유 (성공이면 None)
+    """
+    holidays = [(date(year, month, day), name) for month, day, name in SOLAR_HOLIDAYS]
+    try:
+        holidays.extend(lunar_holiday_table(year))
+        error = None
+    except Exception as e:
+        error = str(e)
+    return sorted(holidays), error
+
+
+# ==================== 스냅샷 ====================
+
+class HolidaySnapshot:
+    """적재 시점 공휴일 행 (날짜순, 변경 없음)"""
+
+    def __init__(self, rows: Iterable[dict]):
+        self.rows = sorted(rows, key=lambda row: (_date_value(row['holiday_date']), row.get('id') or 0))
+        self.dates = [_date_value(row['holiday_date']) for row in self.rows]
+        self.calendar = WorkCalendar((day, row.get('name')) for day, row in zip(self.dates, self.rows))
+
+    def between(self, start: date, end: date) -> List[dict]:
+        """start ~ end (양 끝 포함) 공휴일 행"""
+        return self.rows[bisect_left(self.dates, start):bisect_right(self.dates, end)]
+
+    def contains(self, day: date) -> bool:
+        i = bisect_left(self.dates, day)
+        return i < len(self.dates) and self.dates[i] == day
+
+
+class HolidayService:
+    """
+    공휴일 스냅샷 프로세스 캐시
+
+    loader는 holidays 전체 행(dict)을 반환하고, version()은 ref_cache.version('holidays') 이다.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[dict]], version: Callable[[], int], ttl: float = 300.0):
+        self._cache = CalendarCache(loader, version, ttl, factory=HolidaySnapshot)
+
+    def snapshot(self) -> HolidaySnapshot:
+        return self._cache.get()
+
+    def calendar(self) -> WorkCalendar:
+        return self.snapshot().calendar
+
+    def is_holiday(self, day: date) -> bool:
+        return self.snapshot().contains(day)
+
+    def list(self, year: Optional[int] = None) -> List[dict]:
+        """공휴일 행 (연도 필터, 복사본)"""
+        snapshot = self.snapshot()
+        rows = snapshot.rows if year is None else snapshot.between(date(year, 1, 1), date(year, 12, 31))
+        return [dict(row) for row in rows]
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats['lunar_years'] = lunar_holiday_table.cache_info().currsize
+        return stats
+
+
+# ==================== 일괄 등록 ====================
+
+def upsert_holidays(cursor, holidays: Iterable[Tuple[date, str]], is_legal: int = 1) -> int:
+    """
+    (날짜, 이름) 일괄 등록, 이미 있으면 건너뜀 (새로 추가된 행 수 반환)
+
+    ON DUPLICATE KEY UPDATE id = id 는 기존 행을 바꾸지 않아 영향 행 수가 0이므로
+    rowcount가 곧 추가된 행 수이다.
+    """
+    values = [(day, name, is_legal) for day, name in holidays]
+    if not values:
+        return 0
+    cursor.executemany("""
+        INSERT INTO holidays (holiday_date, name, is_legal)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE id = id
+    """, values)
+    return cursor.rowcount
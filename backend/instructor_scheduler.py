@@ -0,0 +1,338 @@
+"""
+강사 중복 배정 검사 / 과정 간 강사 배정 엔진
+
+시간표 자동 생성은 과정마다 따로 실행되어 같은 강사가 동시에 진행되는 다른 과정에
+같은 시간으로 배정되는 것을 막지 못했다.
+- InstructorIndex: 강사 + 수업일 → 시작 시각 순 구간 목록 (기존 시간표를 한 번의 조회로 적재)
+- solve_instructor_assignments(): 여러 과정의 새 시간표를 한 번에 받아
+  슬롯마다 후보 강사(교과목 주강사 → 예비강사, 프로젝트/현장실습은 과정 강사 순환) 중
+  기존 배정과 이번 실행의 다른 슬롯과 겹치지 않는 강사를 고른다.
+  수업일 단위로 후보가 적은 슬롯부터 배정하고(MRV) 겹치는 슬롯의 후보를 제거하며(forward checking)
+  막히면 되돌아간다. 수업일/시간은 바꾸지 않으므로 공휴일·요일 배정은 생성 단계 그대로 유지된다.
+배정할 수 없는 슬롯은 우선 강사를 그대로 두고 충돌로 보고한다.
+"""
+
+import time
+from bisect import insort
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 수업일 하나를 풀 때 되돌아가기 최대 횟수 (넘으면 순서대로 배정)
+MAX_BACKTRACK_STEPS = 2000
+
+
+def _minutes(value) -> int:
+    """TIME 값(timedelta / 'HH:MM[:SS]')을 자정 기준 분으로"""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    parts = str(value).split(':')
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def _clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _date_value(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+@dataclass
+class Booking:
+    """강사 배정 구간 [start, end) (분 단위)"""
+    instructor: str
+    class_date: date
+    start: int
+    end: int
+    course_code: str
+    timetable_id: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        result = asdict(self)
+        result['class_date'] = self.class_date.isoformat()
+        result['start'] = _clock(self.start)
+        result['end'] = _clock(self.end)
+        return result
+
+    def __lt__(self, other: 'Booking') -> bool:
+        return (self.start, self.end) < (other.start, other.end)
+
+
+class InstructorIndex:
+    """강사별 배정 구간 인덱스"""
+
+    def __init__(self, bookings: Iterable[Booking] = ()):
+        self._slots: Dict[Tuple[str, date], List[Booking]] = {}
+        for booking in bookings:
+            self.add(booking)
+
+    @classmethod
+    def load(cls, cursor, start_date: date, end_date: date,
+             exclude_courses: Iterable[str] = (), instructor_code: Optional[str] = None) -> 'InstructorIndex':
+        """기간 내 기존 시간표 적재 (exclude_courses: 이번에 다시 생성할 과정)"""
+        query = """
+            SELECT id, course_code, instructor_code, class_date, start_time, end_time
+            FROM timetables
+            WHERE class_date BETWEEN %s AND %s AND instructor_code IS NOT NULL
+        """
+        params = [start_date, end_date]
+        exclude = list(exclude_courses)
+        if exclude:
+            query += f" AND course_code NOT IN ({', '.join(['%s'] * len(exclude))})"
+            params.extend(exclude)
+        if instructor_code:
+            query += " AND instructor_code = %s"
+            params.append(instructor_code)
+        cursor.execute(query, params)
+
+        index = cls()
+        for row in cursor.fetchall():
+            if isinstance(row, dict):
+                row = (row['id'], row['course_code'], row['instructor_code'],
+                       row['class_date'], row['start_time'], row['end_time'])
+            timetable_id, course_code, instructor, class_date, start_time, end_time = row
+            if start_time is None or end_time is None:
+                continue
+            index.add(Booking(instructor, _date_value(class_date), _minutes(start_time), _minutes(end_time),
+                              course_code, timetable_id))
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(slots) for slots in self._slots.values())
+
+    def add(self, booking: Booking) -> None:
+        insort(self._slots.setdefault((booking.instructor, booking.class_date), []), booking)
+
+    def overlapping(self, instructor: str, class_date: date, start: int, end: int) -> List[Booking]:
+        result = []
+        for booking in self._slots.get((instructor, class_date), ()):
+            if booking.start >= end:
+                break
+            if booking.end > start:
+                result.append(booking)
+        return result
+
+    def double_bookings(self) -> List[Tuple[Booking, Booking]]:
+        """같은 강사가 같은 날 겹치는 시간에 배정된 쌍 (날짜/강사 순)"""
+        pairs = []
+        for key in sorted(self._slots, key=lambda k: (k[1], k[0])):
+            slots = self._slots[key]
+            for i, first in enumerate(slots):
+                for second in slots[i + 1:]:
+                    if second.start >= first.end:
+                        break
+                    pairs.append((first, second))
+        return pairs
+
+
+@dataclass
+class SolveResult:
+    assigned: int
+    reassigned: List[dict]
+    conflicts: List[dict]
+    seconds: float
+
+    def to_dict(self) -> dict:
+        return {
+            'assigned': self.assigned,
+            'reassigned_count': len(self.reassigned),
+            'conflict_count': len(self.conflicts),
+            'reassigned': self.reassigned,
+            'conflicts': self.conflicts,
+            'solve_ms': round(self.seconds * 1000, 2),
+        }
+
+
+class _Slot:
+    __slots__ = ('course_code', 'row', 'class_date', 'start', 'end', 'candidates', 'domain', 'neighbors')
+
+    def __init__(self, course_code: str, row: dict):
+        self.course_code = course_code
+        self.row = row
+        self.class_date = _date_value(row['class_date'])
+        self.start = _minutes(row['start_time'])
+        self.end = _minutes(row['end_time'])
+        candidates = row.get('instructor_candidates') or [row.get('instructor_code')]
+        self.candidates = list(dict.fromkeys(c for c in candidates if c))
+        self.domain: List[str] = []
+        self.neighbors: List['_Slot'] = []
+
+    def describe(self) -> dict:
+        return {
+            'course_code': self.course_code,
+            'class_date': self.class_date.isoformat(),
+            'start_time': _clock(self.start),
+            'end_time': _clock(self.end),
+            'type': self.row.get('type'),
+            'subject_code': self.row.get('subject_code'),
+        }
+
+
+def _backtrack(slots: List[_Slot], max_steps: int) -> Optional[Dict[int, str]]:
+    """겹치는 슬롯끼리 강사가 다르도록 배정 (후보 순서 = 선호 순서)"""
+    domains = {id(slot): list(slot.domain) for slot in slots}
+    assignment: Dict[int, str] = {}
+    steps = 0
+
+    def select() -> Optional[_Slot]:
+        best = None
+        for slot in slots:
+            if id(slot) in assignment:
+                continue
+            if best is None or len(domains[id(slot)]) < len(domains[id(best)]):
+                best = slot
+        return best
+
+    def solve() -> bool:
+        nonlocal steps
+        slot = select()
+        if slot is None:
+            return True
+        for instructor in list(domains[id(slot)]):
+            steps += 1
+            if steps > max_steps:
+                return False
+            pruned = []
+            feasible = True
+            for other in slot.neighbors:
+                if id(other) in assignment or id(other) not in domains:
+                    continue
+                other_domain = domains[id(other)]
+                if instructor in other_domain:
+                    other_domain.remove(instructor)
+                    pruned.append(other)
+                    if not other_domain:
+                        feasible = False
+            if feasible:
+                assignment[id(slot)] = instructor
+                if solve():
+                    return True
+                del assignment[id(slot)]
+            for other in pruned:
+                domains[id(other)].append(instructor)
+                domains[id(other)].sort(key=other.candidates.index)
+            if steps > max_steps:
+                return False
+        return False
+
+    return assignment if solve() else None
+
+
+def _greedy(slots: List[_Slot]) -> Dict[int, str]:
+    """되돌아가기로 풀지 못한 날: 후보가 적은 슬롯부터 겹치지 않는 첫 강사 (없으면 빈 값)"""
+    assignment: Dict[int, str] = {}
+    for slot in sorted(slots, key=lambda s: (len(s.domain), s.start)):
+        taken = {assignment.get(id(other)) for other in slot.neighbors}
+        assignment[id(slot)] = next((c for c in slot.domain if c not in taken), '')
+    return assignment
+
+
+def _components(slots: List[_Slot]) -> List[List[_Slot]]:
+    """시간이 겹치는 슬롯끼리 묶음 (묶음마다 따로 풀 수 있음)"""
+    members = {id(slot) for slot in slots}
+    seen = set()
+    components = []
+    for slot in slots:
+        if id(slot) in seen:
+            continue
+        seen.add(id(slot))
+        component, stack = [], [slot]
+        while stack:
+            current = stack.pop()
+            component.append(current)
+            for other in current.neighbors:
+                if id(other) in members and id(other) not in seen:
+                    seen.add(id(other))
+                    stack.append(other)
+        components.append(component)
+    return components
+
+
+def _solve_component(slots: List[_Slot], max_steps: int) -> Dict[int, str]:
+    members = {id(slot) for slot in slots}
+    is_clique = all(sum(id(other) in members for other in slot.neighbors) == len(slots) - 1 for slot in slots)
+    # 모두 서로 겹치는데 후보 강사 수가 슬롯 수보다 적으면 해가 없음 → 바로 순서대로 배정
+    if is_clique and len({c for slot in slots for c in slot.domain}) < len(slots):
+        return _greedy(slots)
+    assignment = _backtrack(slots, max_steps)
+    return assignment if assignment is not None else _greedy(slots)
+
+
+def solve_instructor_assignments(plans: Dict[str, List[dict]], index: InstructorIndex,
+                                 max_steps: int = MAX_BACKTRACK_STEPS) -> SolveResult:
+    """
+    여러 과정의 새 시간표 강사 배정 (rows의 instructor_code를 직접 수정)
+
+    Args:
+        plans: 과정 코드 → 새 시간표 행 목록 (instructor_candidates: 선호 순 후보 강사)
+        index: 이번에 생성하지 않는 기존 시간표 배정
+    """
+    started = time.perf_counter()
+    by_date: Dict[date, List[_Slot]] = {}
+    for course_code, rows in plans.items():
+        for row in rows:
+            slot = _Slot(course_code, row)
+            if slot.candidates:
+                by_date.setdefault(slot.class_date, []).append(slot)
+
+    reassigned, conflicts = [], []
+    assigned = 0
+    for class_date in sorted(by_date):
+        slots = by_date[class_date]
+        for slot in slots:
+            slot.domain = [c for c in slot.candidates
+                           if not index.overlapping(c, class_date, slot.start, slot.end)]
+        for i, slot in enumerate(slots):
+            for other in slots[i + 1:]:
+                if slot.start < other.end and other.start < slot.end:
+                    slot.neighbors.append(other)
+                    other.neighbors.append(slot)
+
+        # 후보가 없는 슬롯은 우선 강사로 고정 → 겹치는 슬롯의 후보에서 제외 (새로 막히면 반복)
+        fixed = set()
+        changed = True
+        while changed:
+            changed = False
+            for slot in slots:
+                if slot.domain or id(slot) in fixed:
+                    continue
+                fixed.add(id(slot))
+                for other in slot.neighbors:
+                    if slot.candidates[0] in other.domain:
+                        other.domain.remove(slot.candidates[0])
+                        changed = True
+
+        assignment: Dict[int, str] = {}
+        for component in _components([slot for slot in slots if slot.domain]):
+            assignment.update(_solve_component(component, max_steps))
+
+        for slot in slots:
+            instructor = assignment.get(id(slot)) or ''
+            if not instructor:
+                # 후보가 모두 막힘 → 우선 강사 유지하고 충돌 보고
+                instructor = slot.candidates[0]
+                clashes = index.overlapping(instructor, class_date, slot.start, slot.end)
+                clashes += [
+                    Booking(instructor, class_date, other.start, other.end, other.course_code)
+                    for other in slot.neighbors
+                    if (assignment.get(id(other)) or other.candidates[0]) == instructor
+                ]
+                conflicts.append({**slot.describe(), 'instructor_code': instructor,
+                                  'candidates': slot.candidates,
+                                  'with': [booking.to_dict() for booking in clashes]})
+            else:
+                assigned += 1
+            original = slot.row.get('instructor_code')
+            if instructor != original:
+                reassigned.append({**slot.describe(), 'from': original, 'to': instructor})
+            slot.row['instructor_code'] = instructor
+        # 같은 날 충돌은 neighbors로 판단했으므로 인덱스에는 마지막에 추가
+        for slot in slots:
+            index.add(Booking(slot.row['instructor_code'], class_date, slot.start, slot.end, slot.course_code))
+
+    return SolveResult(assigned, reassigned, conflicts, time.perf_counter() - started)
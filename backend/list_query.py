@@ -0,0 +1,192 @@
+"""
+목록 API 공통 조회 유틸리티
+
+행 수가 계속 늘어나는 목록(학생/시간표/훈련일지/상담/수업일지)에서
+- fields=: 요청한 컬럼만 SQL에서 선택 (profile_photo, photo_urls 같은 큰 TEXT 제외)
+- limit= / cursor=: 기존 ORDER BY 키 기반 keyset 페이지네이션 (OFFSET 없이 다음 페이지 조회)
+- include_total=: 전체 건수는 요청한 경우에만 COUNT 실행
+
+limit/cursor 없이 호출하면 기존과 같이 전체 목록(list)을 반환한다.
+"""
+
+import json
+import base64
+import binascii
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from fast_json import dumps
+
+# 한 페이지 최대 행 수
+MAX_PAGE_SIZE = 1000
+
+
+def select_fields(fields: Optional[str], available: Dict[str, str], always: Iterable[str] = ()) -> Optional[str]:
+    """
+    fields= 파라미터를 SELECT 목록으로 변환
+
+    Args:
+        fields: 쉼표로 구분한 필드 이름 (없으면 None 반환 → 기존 SELECT 사용)
+        available: 응답 필드 이름 → SQL 식 (허용 목록, 그 외 이름은 400)
+        always: 페이지네이션 키처럼 항상 포함해야 하는 필드
+    """
+    if not fields:
+        return None
+
+    requested = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 필드: {', '.join(unknown)}")
+
+    names = list(dict.fromkeys(list(always) + requested))
+    return ', '.join(f"{available[name]} AS `{name}`" for name in names)
+
+
+def table_fields(alias: str, columns: Iterable[str]) -> Dict[str, str]:
+    """테이블 컬럼 목록을 select_fields()용 매핑으로 변환"""
+    return {col: f"{alias}.`{col}`" for col in columns}
+
+
+def period_range(year: int, month: Optional[int] = None) -> Tuple[date, date]:
+    """
+    연/월 필터를 반열린 날짜 구간 [시작, 끝)으로 변환
+
+    YEAR(col) = %s 같은 함수 조건 대신 col >= 시작 AND col < 끝 으로 조회해야
+    날짜 컬럼 인덱스를 사용할 수 있다.
+    """
+    try:
+        if month is None:
+            return date(year, 1, 1), date(year + 1, 1, 1)
+        start = date(year, month, 1)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="잘못된 연/월입니다")
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def month_range(month: str) -> Tuple[date, date]:
+    """'YYYY-MM' 문자열을 반열린 날짜 구간으로 변환"""
+    try:
+        year, mon = (int(part) for part in month.split('-'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="월 형식은 YYYY-MM 입니다")
+    return period_range(year, mon)
+
+
+def encode_cursor(values: Sequence) -> str:
+    """마지막 행의 정렬 키 값을 불투명한 커서 문자열로 변환"""
+    return base64.urlsafe_b64encode(dumps(list(values), timedelta_as_text=True)).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """커서 문자열을 정렬 키 값 목록으로 복원"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다")
+    return values
+
+
+class Keyset:
+    """
+    ORDER BY 키 기반 keyset 페이지네이션
+
+    keys는 (응답 필드 이름, SQL 식, 내림차순 여부) 목록이며
+    마지막 키는 고유값(id)이어야 페이지 경계에서 행이 중복/누락되지 않는다.
+    """
+
+    def __init__(self, keys: List[Tuple[str, str, bool]]):
+        self.keys = keys
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _, _ in self.keys]
+
+    def order_by(self) -> str:
+        return ', '.join(f"{expr} {'DESC' if desc else 'ASC'}" for _, expr, desc in self.keys)
+
+    def after(self, values: list) -> Tuple[str, list]:
+        """
+        커서 다음 행 조건: (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+
+        LEFT JOIN 컬럼처럼 키가 NULL일 수 있으므로 MySQL 정렬 규칙(ASC는 NULL이 먼저,
+        DESC는 NULL이 나중)에 맞춰 NULL을 비교한다. (NULL과의 >, = 비교는 행을 빠뜨림)
+        """
+        clauses = []
+        params = []
+        for i, (_, expr, desc) in enumerate(self.keys):
+            parts = []
+            for j in range(i):
+                parts.append(f"{self.keys[j][1]} <=> %s")
+                params.append(values[j])
+            value = values[i]
+            if value is None:
+                # ASC: NULL 다음은 NULL이 아닌 모든 값, DESC: NULL 뒤에는 없음
+                parts.append(f"{expr} IS NOT NULL" if not desc else "1 = 0")
+            elif desc:
+                parts.append(f"({expr} < %s OR {expr} IS NULL)")
+                params.append(value)
+            else:
+                parts.append(f"{expr} > %s")
+                params.append(value)
+            clauses.append('(' + ' AND '.join(parts) + ')')
+        return '(' + ' OR '.join(clauses) + ')', params
+
+
+def fetch_list(
+    cursor,
+    select_sql: str,
+    from_sql: str,
+    params: list,
+    keyset: Keyset,
+    limit: Optional[int] = None,
+    page_cursor: Optional[str] = None,
+    include_total: bool = False,
+):
+    """
+    목록 조회 실행
+
+    from_sql은 'FROM ... WHERE ...' 부분이며 ORDER BY / LIMIT은 여기서 붙인다.
+    limit과 cursor가 모두 없으면 전체 행 list를 반환하고,
+    있으면 {"items", "next_cursor", "total"(요청 시)} 형태로 반환한다.
+    """
+    if limit is None and page_cursor is None:
+        cursor.execute(f"SELECT {select_sql} {from_sql} ORDER BY {keyset.order_by()}", params)
+        return cursor.fetchall()
+
+    limit = min(limit or 100, MAX_PAGE_SIZE)
+
+    total = None
+    if include_total:
+        cursor.execute(f"SELECT COUNT(*) AS cnt {from_sql}", params)
+        total = cursor.fetchone()['cnt']
+
+    page_sql = from_sql
+    page_params = list(params)
+    if page_cursor:
+        condition, condition_params = keyset.after(decode_cursor(page_cursor, len(keyset.keys)))
+        page_sql += f" AND {condition}"
+        page_params.extend(condition_params)
+
+    # 다음 페이지 존재 여부 확인용으로 1행 더 조회
+    cursor.execute(
+        f"SELECT {select_sql} {page_sql} ORDER BY {keyset.order_by()} LIMIT %s",
+        page_params + [limit + 1]
+    )
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[name] for name in keyset.names])
+
+    page = {'items': rows, 'next_cursor': next_cursor}
+    if include_total:
+        page['total'] = total
+    return page
@@ -0,0 +1,403 @@
+"""
+LLM 호출 게이트웨이
+
+Groq / Gemini 호출이 엔드포인트마다 requests.post 또는 호출마다 새 httpx.AsyncClient로
+흩어져 있어 연결 재사용, 동시 호출 제한, 재시도가 없었다. 모든 호출은 이 모듈을 거친다.
+- 프로세스 공용 httpx.AsyncClient (h2가 있으면 HTTP/2, keep-alive 연결 풀)
+- 제공자별 동시 호출 세마포어 + 토큰 버킷(분당 요청 수) 제한
+- 429 / 5xx / 연결 오류는 지수 백오프(+지터, Retry-After 우선)로 재시도
+- 시간 초과 / 응답 형식 오류는 같은 제공자에 재시도하지 않고 바로 다음 제공자로 전환
+- 재시도 후에도 실패하면 다음 제공자로 전환 (Groq → Gemini, 키가 있을 때만)
+- 제공자별 호출 수 / 실패 / 재시도 / 전환 / 지연시간(p50, p95) / 토큰 사용량 집계
+
+동기 핸들러(def, 스레드풀)에서는 complete_sync()를 사용한다.
+GROQ_BASE_URL / GEMINI_BASE_URL을 fake_llm_server.py 주소로 바꾸면 외부 호출 없이 확인할 수 있다.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import functools
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+from anyio import from_thread
+
+logger = logging.getLogger("riselms")
+
+try:
+    import h2  # noqa: F401  (httpx HTTP/2 지원)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+GROQ = 'groq'
+GEMINI = 'gemini'
+
+# 재시도 대상 상태 코드
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+LATENCY_WINDOW = 500
+
+
+class LLMError(Exception):
+    """LLM 호출 실패 (모든 제공자 / 재시도 소진)"""
+
+    def __init__(self, message: str, provider: Optional[str] = None, status: Optional[int] = None,
+                 retryable: Optional[bool] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status = status
+        # 같은 제공자에 재시도할지 (지정하지 않으면 상태 코드로 판단, 연결 오류는 재시도)
+        self.retryable = (status is None or status in RETRY_STATUS) if retryable is None else retryable
+
+
+@dataclass
+class ProviderConfig:
+    name: str
+    base_url: str
+    default_model: str
+    max_concurrency: int = 4
+    requests_per_minute: float = 30.0
+    timeout: float = 30.0
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    provider: str
+    model: str
+    latency_ms: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: int = 1
+    fallback: bool = False          # 요청한 제공자가 아닌 다른 제공자가 응답
+
+    def to_dict(self) -> dict:
+        return {
+            'provider': self.provider,
+            'model': self.model,
+            'latency_ms': round(self.latency_ms, 1),
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'attempts': self.attempts,
+            'fallback': self.fallback,
+        }
+
+
+class TokenBucket:
+    """분당 요청 수 제한 (rate개/초 충전, 최대 capacity개 누적)"""
+
+    def __init__(self, requests_per_minute: float, capacity: Optional[float] = None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = capacity or max(1.0, requests_per_minute / 6)  # 최대 10초 분량 몰아쓰기
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, max_wait: float) -> bool:
+        """토큰 하나 사용, max_wait 안에 충전되지 않으면 False"""
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                if wait > max_wait:
+                    return False
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+            return True
+
+
+class _ProviderStats:
+    def __init__(self):
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0       # 429 응답
+        self.timeouts = 0           # 응답 시간 초과 (재시도 없이 다음 제공자로)
+        self.throttled = 0          # 토큰 버킷에서 대기 한도 초과
+        self.fallbacks = 0          # 이 제공자가 대신 응답한 횟수
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1)
+
+        return {
+            'calls': self.calls,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'timeouts': self.timeouts,
+            'throttled': self.throttled,
+            'fallbacks': self.fallbacks,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'latency_avg_ms': round(sum(latencies) / len(latencies), 1) if latencies else None,
+            'latency_p50_ms': percentile(0.5),
+            'latency_p95_ms': percentile(0.95),
+        }
+
+
+# ==================== 제공자별 요청/응답 변환 ====================
+
+def _groq_request(config: ProviderConfig, api_key: str, model: str, messages: List[dict], options: dict):
+    payload = {'model': model, 'messages': messages}
+    for name in ('temperature', 'max_tokens', 'top_p'):
+        if options.get(name) is not None:
+            payload[name] = options[name]
+    headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
+    return f"{config.base_url}/chat/completions", headers, payload
+
+
+def _groq_parse(data: dict) -> tuple:
+    choices = data.get('choices') or []
+    text = choices[0]['message']['content'] if choices else ''
+    usage = data.get('usage') or {}
+    return text, usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+
+
+def _gemini_request(config: ProviderConfig, api_key: str, model: str, messages: List[dict], options: dict):
+    # system 메시지는 systemInstruction, 나머지는 user/model 턴으로
+    system = '\n\n'.join(m['content'] for m in messages if m['role'] == 'system')
+    contents = [
+        {'role': 'model' if m['role'] == 'assistant' else 'user', 'parts': [{'text': m['content']}]}
+        for m in messages if m['role'] != 'system'
+    ]
+    generation = {}
+    for name, key in (('temperature', 'temperature'), ('max_tokens', 'maxOutputTokens'), ('top_p', 'topP')):
+        if options.get(name) is not None:
+            generation[key] = options[name]
+    payload = {'contents': contents, 'generationConfig': generation}
+    if system:
+        payload['systemInstruction'] = {'parts': [{'text': system}]}
+    headers = {'x-goog-api-key': api_key, 'Content-Type': 'application/json'}
+    return f"{config.base_url}/models/{model}:generateContent", headers, payload
+
+
+def _gemini_parse(data: dict) -> tuple:
+    candidates = data.get('candidates') or []
+    parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+    text = ''.join(part.get('text', '') for part in parts)
+    usage = data.get('usageMetadata') or {}
+    return text, usage.get('promptTokenCount', 0), usage.get('candidatesTokenCount', 0)
+
+
+_ADAPTERS = {
+    GROQ: (_groq_request, _groq_parse),
+    GEMINI: (_gemini_request, _gemini_parse),
+}
+
+
+def default_providers() -> Dict[str, ProviderConfig]:
+    """환경변수 기반 제공자 설정"""
+    return {
+        GROQ: ProviderConfig(
+            GROQ,
+            os.getenv('GROQ_BASE_URL', 'https://api.groq.com/openai/v1').rstrip('/'),
+            'llama-3.3-70b-versatile',
+            max_concurrency=int(os.getenv('LLM_GROQ_CONCURRENCY', '4')),
+            requests_per_minute=float(os.getenv('LLM_GROQ_RPM', '30')),
+        ),
+        GEMINI: ProviderConfig(
+            GEMINI,
+            os.getenv('GEMINI_BASE_URL', 'https://generativelanguage.googleapis.com/v1beta').rstrip('/'),
+            'gemini-2.0-flash-exp',
+            max_concurrency=int(os.getenv('LLM_GEMINI_CONCURRENCY', '4')),
+            requests_per_minute=float(os.getenv('LLM_GEMINI_RPM', '15')),
+        ),
+    }
+
+
+# ==================== 게이트웨이 ====================
+
+class LLMGateway:
+    """프로세스 공용 LLM 호출 게이트웨이"""
+
+    def __init__(self, providers: Optional[Dict[str, ProviderConfig]] = None,
+                 fallback_order: Sequence[str] = (GROQ, GEMINI),
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 max_queue_wait: float = 10.0, http2: bool = True):
+        self.providers = providers or default_providers()
+        self.fallback_order = list(fallback_order)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_queue_wait = max_queue_wait
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats = {name: _ProviderStats() for name in self.providers}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # 이벤트 루프 안에서 처음 호출될 때 생성 (서버 수명 동안 재사용)
+        if self._client is None:
+            total = sum(config.max_concurrency for config in self.providers.values())
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=total * 2, max_keepalive_connections=total),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+            )
+        return self._client
+
+    def _limits(self, provider: str):
+        if provider not in self._semaphores:
+            config = self.providers[provider]
+            self._semaphores[provider] = asyncio.Semaphore(config.max_concurrency)
+            self._buckets[provider] = TokenBucket(config.requests_per_minute)
+        return self._semaphores[provider], self._buckets[provider]
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            if retry_after:
+                try:
+                    return min(self.backoff_max, float(retry_after))
+                except ValueError:
+                    pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _call(self, provider: str, api_key: str, model: str, messages: List[dict],
+                    options: dict, timeout: Optional[float]) -> LLMResponse:
+        """한 제공자에 재시도 포함 호출"""
+        config = self.providers[provider]
+        stats = self._stats[provider]
+        build, parse = _ADAPTERS[provider]
+        url, headers, payload = build(config, api_key, model, messages, options)
+        semaphore, bucket = self._limits(provider)
+
+        last_error: Optional[LLMError] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                stats.retries += 1
+            if not await bucket.acquire(self.max_queue_wait):
+                stats.throttled += 1
+                raise LLMError(f"{provider} 요청 한도 초과 (대기 {self.max_queue_wait}초 초과)", provider, 429)
+
+            response = None
+            async with semaphore:
+                stats.calls += 1
+                started = time.perf_counter()
+                try:
+                    response = await self._get_client().post(
+                        url, headers=headers, json=payload, timeout=timeout or config.timeout
+                    )
+                except httpx.TimeoutException as e:
+                    # 멈춘 제공자를 timeout마다 다시 기다리지 않고 바로 전환
+                    stats.timeouts += 1
+                    last_error = LLMError(f"{provider} 시간 초과: {type(e).__name__}: {e}", provider,
+                                          retryable=False)
+                except httpx.TransportError as e:
+                    last_error = LLMError(f"{provider} 연결 오류: {type(e).__name__}: {e}", provider)
+                else:
+                    latency_ms = (time.perf_counter() - started) * 1000
+                    if response.status_code == 200:
+                        try:
+                            text, prompt_tokens, completion_tokens = parse(response.json())
+                        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                            last_error = LLMError(
+                                f"{provider} 응답 형식 오류: {type(e).__name__}: {response.text[:300]}",
+                                provider, response.status_code, retryable=False
+                            )
+                        else:
+                            stats.succeeded += 1
+                            stats.latencies.append(latency_ms)
+                            stats.prompt_tokens += prompt_tokens
+                            stats.completion_tokens += completion_tokens
+                            return LLMResponse(text, provider, model, latency_ms,
+                                               prompt_tokens, completion_tokens, attempt + 1)
+                    else:
+                        if response.status_code == 429:
+                            stats.rate_limited += 1
+                        last_error = LLMError(
+                            f"{provider} API 오류 ({response.status_code}): {response.text[:300]}",
+                            provider, response.status_code
+                        )
+
+            stats.failed += 1
+            if not last_error.retryable:
+                break
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, response))
+        raise last_error
+
+    async def complete(self, messages: List[dict], provider: str = GROQ, model: Optional[str] = None,
+                       api_keys: Optional[Dict[str, str]] = None, fallback: bool = True,
+                       timeout: Optional[float] = None, **options) -> LLMResponse:
+        """
+        채팅 완성 호출
+
+        messages: [{'role': 'system'|'user'|'assistant', 'content': ...}]
+        api_keys: {'groq': ..., 'gemini': ...} (DB 설정 / 헤더에서 읽은 키, 비어 있는 제공자는 건너뜀)
+        options: temperature, max_tokens, top_p
+        model은 요청한 제공자에만 적용되고, 전환된 제공자는 기본 모델을 사용한다.
+        """
+        api_keys = api_keys or {}
+        order = [provider] + ([name for name in self.fallback_order if name != provider] if fallback else [])
+        candidates = [name for name in order if name in self.providers and api_keys.get(name)]
+        if not candidates:
+            raise LLMError(f"{provider.upper()} API 키가 설정되지 않았습니다. 시스템 등록에서 API 키를 입력해주세요.",
+                           provider)
+
+        errors = []
+        for name in candidates:
+            use_model = model if name == provider and model else self.providers[name].default_model
+            try:
+                result = await self._call(name, api_keys[name], use_model, messages, options, timeout)
+            except LLMError as e:
+                logger.warning(f"LLM 호출 실패 ({name}): {e}")
+                errors.append(str(e))
+                continue
+            if name != provider:
+                result.fallback = True
+                self._stats[name].fallbacks += 1
+            return result
+        raise LLMError(' / '.join(errors), provider)
+
+    def complete_sync(self, messages: List[dict], **kwargs) -> LLMResponse:
+        """동기 핸들러(FastAPI 스레드풀)에서 호출 - 이벤트 루프의 공용 클라이언트를 사용"""
+        return from_thread.run(functools.partial(self.complete, messages, **kwargs))
+
+    def stats(self) -> dict:
+        return {
+            'http2': self.http2,
+            'providers': {
+                name: dict(self._stats[name].to_dict(),
+                           max_concurrency=config.max_concurrency,
+                           requests_per_minute=config.requests_per_minute,
+                           base_url=config.base_url)
+                for name, config in self.providers.items()
+            },
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+
+def chat_messages(user: str, system: Optional[str] = None) -> List[dict]:
+    """system / user 메시지 목록"""
+    messages = [{'role': 'system', 'content': system}] if system else []
+    messages.append({'role': 'user', 'content': user})
+    return messages
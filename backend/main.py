@@ -7,7 +7,7 @@ if _backend_dir not in _sys.path:
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, RedirectResponse
+from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from typing import Optional, List
 import pymysql
@@ -15,25 +15,40 @@ import pandas as pd
 import io
 import os
 import logging
+import time
 from logging.handlers import TimedRotatingFileHandler
 from datetime import datetime, timedelta, date
 from openai import OpenAI
 from dotenv import load_dotenv
 import requests
-from ftplib import FTP
 import uuid
 import threading
+import asyncio
 import base64
-from PIL import Image
 from pathlib import Path
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from urllib.parse import urlparse
+from db_pool import ConnectionPool
+from ftp_pool import FTPPool
+from ftp_cache import FTPFileCache
+from excel_reader import ExcelSheetReader, preview_excel_file
+from backup_restore import RESTORE_BATCH_SIZE, restore_chain
+from backup_store import (
+    BACKUP_TABLES, is_backup_filename, is_incremental_filename, read_manifest, delete_backup_file, index_backups,
+    write_backup, incremental_parent, backup_chain, required_backups,
+)
+from student_import import import_students, acquire_student_code_lock, release_student_code_lock, next_student_number
+from content_store import ContentStore, StoredObject
+from thumbnails import ThumbnailService, THUMBNAIL_SIZES, THUMBNAIL_FORMATS, MEDIA_TYPES
+from pdf_service import PDFService
+from llm_gateway import LLMGateway, GROQ, GEMINI, chat_messages
+from concurrency import run_blocking, configure_threadpool, monitor_loop_lag, loop_stats, start_background, stop_background
+from schema_migrations import apply_migrations, table_columns
+from ref_cache import ReferenceCache, LocalVersionBackend, DBVersionBackend
+from holiday_service import HolidayService, legal_holidays, upsert_holidays, warm_lunar_table
+from timetable_sync import load_course_timetables, diff_timetables, apply_timetable_diff
+from instructor_scheduler import InstructorIndex, SolveResult, solve_instructor_assignments
+from fast_json import FastJSONResponse
+from list_query import Keyset, select_fields, table_fields, fetch_list, period_range, month_range, MAX_PAGE_SIZE
 
 # .env 파일을 상위 디렉토리에서 로드
 env_path = Path(__file__).parent.parent / '.env'
@@ -41,6 +56,7 @@ load_dotenv(dotenv_path=env_path)
 
 app = FastAPI(
     title="학급 관리 시스템 API",
+    default_response_class=FastJSONResponse,
     # 요청 크기 제한 설정 (기본 10MB)
     # Cafe24 배포 시 nginx client_max_body_size도 조정 필요
 )
@@ -109,7 +125,7 @@ from fastapi import HTTPException
 
 # 방법 1: 루트 경로에서 서빙 (프록시 서버와 충돌 가능)
 @app.get("/{filename}.glb")
-async def serve_glb_file_root(filename: str):
+def serve_glb_file_root(filename: str):
     """루트 경로에서 GLB 파일 서빙 (3D 모델용)"""
     glb_path = os.path.join(frontend_dir, f"{filename}.glb")
     if os.path.exists(glb_path):
@@ -119,7 +135,7 @@ async def serve_glb_file_root(filename: str):
 
 # 방법 2: /api/models/ 경로에서 서빙 (권장)
 @app.get("/api/models/{filename}.glb")
-async def serve_glb_file_api(filename: str):
+def serve_glb_file_api(filename: str):
     """API 경로에서 GLB 파일 서빙 (3D 모델용)"""
     glb_path = os.path.join(frontend_dir, f"{filename}.glb")
     if os.path.exists(glb_path):
@@ -129,7 +145,7 @@ async def serve_glb_file_api(filename: str):
 
 # README.md 파일 서빙
 @app.get("/README.md")
-async def serve_readme():
+def serve_readme():
     """README.md 파일 서빙"""
     readme_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "README.md")
     if os.path.exists(readme_path):
@@ -139,7 +155,7 @@ async def serve_readme():
 
 # 버전 정보 API (README.md에서 자동 추출)
 @app.get("/api/version")
-async def get_version():
+def get_version():
     """README.md에서 버전 정보 추출"""
     import re
     readme_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "README.md")
@@ -165,63 +181,48 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', '3306'))
 }
 
-def get_db_connection():
-    """데이터베이스 연결"""
-    return pymysql.connect(**DB_CONFIG)
-
-def ensure_photo_urls_column(cursor, table_name: str):
-    """photo_urls 컬럼이 없으면 추가"""
-    try:
-        cursor.execute(f"SHOW COLUMNS FROM {table_name} LIKE 'photo_urls'")
-        if not cursor.fetchone():
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN photo_urls TEXT")
-    except:
-        pass  # 이미 존재하거나 권한 문제
+# 커넥션 풀 (원격 DB 연결 비용 절감 - 요청마다 connect 하지 않고 재사용)
+db_pool = ConnectionPool(
+    DB_CONFIG,
+    max_size=int(os.getenv('DB_POOL_SIZE', '10')),
+    recycle_seconds=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+)
 
-def ensure_career_path_column(cursor):
-    """students 테이블에 career_path 컬럼이 없으면 추가하고 기본값 설정"""
-    try:
-        cursor.execute("SHOW COLUMNS FROM students LIKE 'career_path'")
-        if not cursor.fetchone():
-            # 컬럼 추가
-            cursor.execute("ALTER TABLE students ADD COLUMN career_path VARCHAR(50) DEFAULT '4. 미정'")
-            # 기존 데이터의 NULL 값을 '4. 미정'으로 업데이트
-            cursor.execute("UPDATE students SET career_path = '4. 미정' WHERE career_path IS NULL")
-    except Exception as e:
-        pass  # 이미 존재하거나 권한 문제
+def get_db_connection():
+    """데이터베이스 연결 (풀에서 대여, close() 시 풀에 반환)"""
+    return db_pool.acquire()
+
+# 참조 데이터 캐시 (과정/교과목/강사/강사코드/공휴일 목록)
+# REF_CACHE_BACKEND=db: 워커 간 무효화 공유 (cache_versions 테이블), local: 단일 프로세스
+if os.getenv('REF_CACHE_BACKEND', 'db') == 'local':
+    _ref_cache_backend = LocalVersionBackend()
+else:
+    _ref_cache_backend = DBVersionBackend(
+        get_db_connection,
+        poll_interval=float(os.getenv('REF_CACHE_POLL', '2')),
+    )
+ref_cache = ReferenceCache(_ref_cache_backend, ttl=float(os.getenv('REF_CACHE_TTL', '300')))
 
-def ensure_career_decision_column(cursor):
-    """consultations 테이블에 career_decision 컬럼이 없으면 추가"""
-    try:
-        cursor.execute("SHOW COLUMNS FROM consultations LIKE 'career_decision'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE consultations ADD COLUMN career_decision VARCHAR(50) DEFAULT NULL")
-    except Exception as e:
-        pass
 
-def ensure_profile_photo_columns(cursor, table_name: str):
-    """profile_photo와 attachments 컬럼이 없으면 추가"""
+def _load_holiday_rows():
+    """공휴일 전체 행 (공휴일 서비스 적재용)"""
+    conn = get_db_connection()
     try:
-        # profile_photo 컬럼 확인 및 추가 (단일 프로필 사진)
-        cursor.execute(f"SHOW COLUMNS FROM {table_name} LIKE 'profile_photo'")
-        if not cursor.fetchone():
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN profile_photo VARCHAR(500) DEFAULT NULL")
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("SELECT * FROM holidays ORDER BY holiday_date, id")
+        return cursor.fetchall()
+    finally:
+        conn.close()
 
-        # attachments 컬럼 확인 및 추가 (첨부 파일 배열, 최대 20개)
-        cursor.execute(f"SHOW COLUMNS FROM {table_name} LIKE 'attachments'")
-        if not cursor.fetchone():
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN attachments TEXT DEFAULT NULL")
-    except Exception as e:
-        pass  # 이미 존재하거나 권한 문제
 
-def ensure_menu_permissions_column(cursor):
-    """instructor_codes 테이블에 menu_permissions 컬럼이 없으면 추가"""
-    try:
-        cursor.execute("SHOW COLUMNS FROM instructor_codes LIKE 'menu_permissions'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE instructor_codes ADD COLUMN menu_permissions TEXT DEFAULT NULL")
-    except Exception as e:
-        pass
+# 공휴일 목록 / 과정 날짜 계산 / 시간표 생성이 함께 쓰는 공휴일 스냅샷 + 근무일 달력
+# (공휴일 캐시 버전이 바뀌면 다시 적재)
+holiday_service = HolidayService(
+    _load_holiday_rows,
+    version=lambda: ref_cache.version('holidays'),
+    ttl=ref_cache.ttl,
+)
 
 # FTP 설정 (환경 변수에서 로드)
 FTP_CONFIG = {
@@ -231,6 +232,52 @@ FTP_CONFIG = {
     'passwd': os.getenv('FTP_PASSWORD', 'dodan1004~')
 }
 
+# FTP 세션 풀 (요청마다 로그인하지 않고 세션 재사용)
+ftp_pool = FTPPool(
+    FTP_CONFIG,
+    max_size=int(os.getenv('FTP_POOL_SIZE', '4')),
+    keepalive_interval=float(os.getenv('FTP_KEEPALIVE', '30')),
+    idle_timeout=float(os.getenv('FTP_IDLE_TIMEOUT', '240')),
+)
+
+def check_ftp_url_server(url: str):
+    """
+    FTP URL의 서버가 FTP_CONFIG 서버인지 확인 (아니면 400)
+
+    원본은 항상 FTP_CONFIG 서버(세션 풀/캐시)에서 받으므로, 다른 서버 URL을 허용하면
+    설정된 NAS의 같은 경로 파일을 대신 응답하고 캐시하게 된다.
+    """
+    try:
+        parsed = urlparse(url)
+        server = ((parsed.hostname or '').lower(), parsed.port or 21)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 FTP URL입니다")
+    if parsed.scheme != 'ftp' or server != (FTP_CONFIG['host'].lower(), FTP_CONFIG['port']):
+        raise HTTPException(status_code=400, detail="허용되지 않은 FTP 서버입니다")
+
+# FTP 원본 파일 로컬 캐시 (이미지/첨부 조회 시 NAS 재다운로드 방지)
+ftp_file_cache = FTPFileCache(
+    ftp_pool,
+    cache_dir=os.getenv('FTP_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ftp_cache')),
+    max_bytes=int(os.getenv('FTP_CACHE_MAX_MB', '1024')) * 1024 * 1024,
+    stat_ttl=float(os.getenv('FTP_CACHE_STAT_TTL', '60')),
+)
+
+# 썸네일 생성 서비스 (여러 크기/형식, 프로세스 풀에서 생성)
+thumbnail_service = ThumbnailService(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thumbnails'),
+    max_workers=int(os.getenv('THUMBNAIL_WORKERS', '2')),
+)
+
+# PDF 생성 서비스 (프로세스 풀, 폰트는 워커마다 한 번 등록, 작업 결과는 uvicorn 워커 간 공유 디렉터리에 저장)
+pdf_service = PDFService(
+    max_workers=int(os.getenv('PDF_WORKERS', '2')),
+    job_dir=os.getenv('PDF_JOB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_jobs')),
+)
+
+# Groq / Gemini 호출 게이트웨이 (공용 연결 풀, 동시 호출/분당 요청 제한, 재시도, Groq → Gemini 전환)
+llm_gateway = LLMGateway()
+
 # FTP 경로 설정
 FTP_PATHS = {
     'guidance': '/home/minilms_ftp/minilms/guidance',  # 상담일지
@@ -240,56 +287,16 @@ FTP_PATHS = {
     'team': '/home/minilms_ftp/minilms/team'           # 팀(프로젝트)
 }
 
-def create_thumbnail(file_data: bytes, filename: str) -> str:
-    """
-    이미지 썸네일 생성 및 로컬 저장
-    
-    Args:
-        file_data: 원본 이미지 바이트 데이터
-        filename: 파일명
-    
-    Returns:
-        썸네일 파일명
-    """
-    try:
-        # 이미지 열기
-        image = Image.open(io.BytesIO(file_data))
-        
-        # EXIF 방향 정보 처리
-        try:
-            from PIL import ImageOps
-            image = ImageOps.exif_transpose(image)
-        except:
-            pass
-        
-        # RGB로 변환 (PNG 투명도 처리)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # 썸네일 크기 (최대 200x200)
-        image.thumbnail((200, 200), Image.Resampling.LANCZOS)
-        
-        # 썸네일 저장 경로 (크로스 플랫폼 지원)
-        thumb_filename = f"thumb_{filename}"
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        thumbnails_dir = os.path.join(backend_dir, 'thumbnails')
-        os.makedirs(thumbnails_dir, exist_ok=True)
-        thumb_path = os.path.join(thumbnails_dir, thumb_filename)
-        
-        # 썸네일 저장
-        image.save(thumb_path, 'JPEG', quality=85, optimize=True)
-        
-        return thumb_filename
-        
-    except Exception as e:
-        print(f"썸네일 생성 실패: {str(e)}")
-        return None
+# 내용 주소 기반 업로드 저장소 (같은 파일은 한 번만 저장)
+content_store = ContentStore(
+    ftp_pool,
+    ftp_base_url=f"ftp://{FTP_CONFIG['host']}:{FTP_CONFIG['port']}",
+    ftp_paths=FTP_PATHS,
+    get_connection=get_db_connection,
+)
+
+# 과제 제출 파일 로컬 저장 경로
+ASSIGNMENT_UPLOAD_DIR = "/usr/miniLMS/uploads/assignments"
 
 def upload_to_ftp(file_data: bytes, filename: str, category: str) -> str:
     """
@@ -304,53 +311,26 @@ def upload_to_ftp(file_data: bytes, filename: str, category: str) -> str:
         업로드된 파일의 FTP URL
     """
     try:
-        # 썸네일 생성 (백그라운드에서 실행, 실패해도 업로드는 계속)
-        try:
-            create_thumbnail(file_data, filename)
-        except Exception as e:
-            print(f"썸네일 생성 중 오류 (무시): {str(e)}")
+        # 썸네일 생성 (프로세스 풀에서 백그라운드 실행, 실패해도 업로드는 계속)
+        thumbnail_service.pregenerate(filename, file_data)
         
-        # FTP 연결
-        ftp = FTP()
-        ftp.encoding = 'utf-8'  # 한글 파일명 지원
-        ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
-        ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
-        
-        # 경로 이동
         target_path = FTP_PATHS.get(category)
         if not target_path:
             raise ValueError(f"Invalid category: {category}")
         
-        try:
-            ftp.cwd(target_path)
-        except:
-            # 경로가 없으면 생성
-            path_parts = target_path.split('/')
-            current_path = ''
-            for part in path_parts:
-                if not part:
-                    continue
-                current_path += '/' + part
-                try:
-                    ftp.cwd(current_path)
-                except:
-                    ftp.mkd(current_path)
-                    ftp.cwd(current_path)
-        
-        # 파일 업로드
-        ftp.storbinary(f'STOR {filename}', io.BytesIO(file_data))
+        # 파일 업로드 (풀 세션 사용, 경로가 없으면 생성)
+        ftp_pool.call(lambda ftp: ftp.store(target_path, filename, io.BytesIO(file_data)))
         
         # URL 생성 (FTP URL)
         file_url = f"ftp://{FTP_CONFIG['host']}:{FTP_CONFIG['port']}{target_path}/{filename}"
         
-        ftp.quit()
         return file_url
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"FTP 업로드 실패: {str(e)}")
 
 
-async def upload_stream_to_ftp(file: UploadFile, filename: str, category: str) -> str:
+def upload_stream_to_ftp(file: UploadFile, filename: str, category: str) -> str:
     """
     FTP 서버에 파일 스트리밍 업로드 (메모리 절약형 - 대용량 파일용)
     
@@ -363,117 +343,113 @@ async def upload_stream_to_ftp(file: UploadFile, filename: str, category: str) -
         업로드된 파일의 FTP URL
     """
     try:
-        # FTP 연결
-        ftp = FTP()
-        ftp.encoding = 'utf-8'  # 한글 파일명 지원
-        ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
-        ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
-        
-        # 경로 이동
         target_path = FTP_PATHS.get(category)
         if not target_path:
             raise ValueError(f"Invalid category: {category}")
         
-        try:
-            ftp.cwd(target_path)
-        except:
-            # 경로가 없으면 생성
-            path_parts = target_path.split('/')
-            current_path = ''
-            for part in path_parts:
-                if not part:
-                    continue
-                current_path += '/' + part
-                try:
-                    ftp.cwd(current_path)
-                except:
-                    ftp.mkd(current_path)
-                    ftp.cwd(current_path)
+        # 썸네일 생성 (이미지만, 프로세스 풀에서 FTP 전송과 동시에 진행)
+        # 썸네일용으로 파일 일부만 읽기 (처음 10MB만)
+        if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')):
+            try:
+                file.file.seek(0)
+                thumbnail_data = file.file.read(10 * 1024 * 1024)
+                if thumbnail_data:
+                    thumbnail_service.pregenerate(filename, thumbnail_data)
+            except Exception as e:
+                print(f"썸네일 생성 실패: {str(e)}")
         
         # 파일 스트리밍 업로드 (1MB 청크 단위로 읽어서 전송)
         # 메모리에 전체 파일을 올리지 않음
-        await file.seek(0)  # 파일 포인터를 처음으로
-        ftp.storbinary(f'STOR {filename}', file.file, blocksize=1024*1024)
+        def _store(ftp):
+            file.file.seek(0)  # 파일 포인터를 처음으로 (재시도 시에도)
+            ftp.store(target_path, filename, file.file, blocksize=1024*1024)
+        
+        ftp_pool.call(_store)
         
         # URL 생성 (FTP URL)
         file_url = f"ftp://{FTP_CONFIG['host']}:{FTP_CONFIG['port']}{target_path}/{filename}"
         
-        ftp.quit()
-        
-        # 썸네일 생성 (백그라운드에서, 실패해도 무시)
-        # 이미지 파일인 경우에만 썸네일 생성 시도
-        if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')):
-            try:
-                # 썸네일용으로 파일 일부만 읽기 (처음 10MB만)
-                await file.seek(0)
-                thumbnail_data = await file.read(10 * 1024 * 1024)
-                if thumbnail_data:
-                    create_thumbnail(thumbnail_data, filename)
-            except Exception as e:
-                print(f"썸네일 생성 실패: {str(e)}")
-        
         return file_url
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"FTP 스트리밍 업로드 실패: {str(e)}")
 
+
+def store_upload(fileobj, file_ext: str, category: str) -> StoredObject:
+    """
+    업로드 파일을 내용 해시 파일명으로 FTP에 저장 (이미 있으면 전송 생략)
+    
+    Args:
+        fileobj: 읽기 가능한 파일 객체 (UploadFile.file, BytesIO)
+        file_ext: 확장자 (.jpg 등)
+        category: 카테고리 (guidance, train, student, teacher, team)
+    
+    Returns:
+        StoredObject (url, filename, size, deduplicated)
+    """
+    try:
+        stored = content_store.put_ftp(fileobj, file_ext, category)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"FTP 업로드 실패: {str(e)}")
+    
+    # 새로 저장한 이미지만 썸네일 생성 (썸네일용으로 처음 10MB만)
+    if not stored.deduplicated and stored.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')):
+        try:
+            fileobj.seek(0)
+            thumbnail_data = fileobj.read(10 * 1024 * 1024)
+            if thumbnail_data:
+                thumbnail_service.pregenerate(stored.filename, thumbnail_data)
+        except Exception as e:
+            print(f"썸네일 생성 실패: {str(e)}")
+    
+    return stored
+
 # ==================== 학생 관리 API ====================
 
 @app.get("/api/students")
-async def get_students(
+def get_students(
     course_code: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False
 ):
-    """학생 목록 조회"""
+    """학생 목록 조회 (fields=로 컬럼 선택, limit/cursor로 페이지 조회)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # career_path 컬럼 확인 및 추가
-        ensure_career_path_column(cursor)
-        
-        # profile_photo, attachments 컬럼 확인 및 추가
-        ensure_profile_photo_columns(cursor, 'students')
-        
-        query = "SELECT * FROM students WHERE 1=1"
+        keyset = Keyset([('code', 's.code', False), ('id', 's.id', False)])
+        select_sql = select_fields(
+            fields, table_fields('s', table_columns(cursor, 'students')), keyset.names
+        ) or "s.*"
+        query = "FROM students s WHERE 1=1"
         params = []
         
         if course_code:
-            query += " AND course_code = %s"
+            query += " AND s.course_code = %s"
             params.append(course_code)
         
         if search:
-            query += " AND (name LIKE %s OR code LIKE %s OR phone LIKE %s)"
+            query += " AND (s.name LIKE %s OR s.code LIKE %s OR s.phone LIKE %s)"
             search_pattern = f"%{search}%"
             params.extend([search_pattern, search_pattern, search_pattern])
         
-        query += " ORDER BY code"
-        
-        cursor.execute(query, params)
-        students = cursor.fetchall()
-        
-        # datetime 객체를 문자열로 변환
-        for student in students:
-            for key, value in student.items():
-                if isinstance(value, (datetime, date)):
-                    student[key] = value.isoformat()
-                elif isinstance(value, bytes):
-                    student[key] = None  # thumbnail은 제외
+        students = fetch_list(cursor, select_sql, query, params, keyset, limit, page_cursor, include_total)
         
-        return students
+        # datetime / thumbnail(bytes) 변환은 응답 직렬화 시 한 번에 처리
+        return FastJSONResponse(students)
     finally:
         conn.close()
 
 @app.get("/api/students/{student_id}")
-async def get_student(student_id: int):
+def get_student(student_id: int):
     """특정 학생 조회 (과정 정보 포함)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # profile_photo, attachments 컬럼 확인 및 추가
-        ensure_profile_photo_columns(cursor, 'students')
-        
         # 학생 정보와 과정 정보를 JOIN하여 가져오기
         query = """
             SELECT s.*, c.name as course_name
@@ -499,19 +475,15 @@ async def get_student(student_id: int):
         conn.close()
 
 @app.post("/api/students")
-async def create_student(data: dict):
+def create_student(data: dict):
     """학생 생성 (프로필/첨부 파일 분리)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # profile_photo와 attachments 컬럼이 없으면 자동 생성
-        ensure_profile_photo_columns(cursor, 'students')
-        
-        # 자동으로 학생 코드 생성
-        cursor.execute("SELECT MAX(CAST(SUBSTRING(code, 2) AS UNSIGNED)) as max_code FROM students WHERE code LIKE 'S%'")
-        result = cursor.fetchone()
-        next_num = (result[0] or 0) + 1
+        # 자동으로 학생 코드 생성 (커밋까지 코드 할당 락 유지)
+        acquire_student_code_lock(cursor)
+        next_num = next_student_number(cursor)
         code = data.get('code', f"S{next_num:03d}")
         
         # 필수 필드 검증
@@ -560,20 +532,19 @@ async def create_student(data: dict):
         ))
         
         conn.commit()
+        ref_cache.invalidate('courses')
         return {"id": cursor.lastrowid, "code": code}
     finally:
+        release_student_code_lock(conn.cursor())
         conn.close()
 
 @app.put("/api/students/{student_id}")
-async def update_student(student_id: int, data: dict):
+def update_student(student_id: int, data: dict):
     """학생 수정 (JSON 데이터 지원 - 프로필/첨부 파일 분리)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # 새로운 컬럼 자동 생성 (profile_photo, attachments)
-        ensure_profile_photo_columns(cursor, 'students')
-        
         # 데이터 추출
         name = data.get('name')
         if not name:
@@ -607,9 +578,8 @@ async def update_student(student_id: int, data: dict):
             except json.JSONDecodeError:
                 attachments = None
         
-        # type 컬럼 확인 및 기본값 처리
-        cursor.execute("SHOW COLUMNS FROM students LIKE 'type'")
-        has_type_column = cursor.fetchone() is not None
+        # type 컬럼 존재 여부 (프로세스당 한 번만 조회)
+        has_type_column = 'type' in table_columns(cursor, 'students')
         
         if has_type_column:
             # type 컬럼이 있으면 포함
@@ -649,22 +619,27 @@ async def update_student(student_id: int, data: dict):
             ))
         
         conn.commit()
+        ref_cache.invalidate('courses')
         return {"id": student_id}
     finally:
         conn.close()
 
 @app.delete("/api/students/{student_id}")
-async def delete_student(student_id: int):
+def delete_student(student_id: int):
     """학생 삭제"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM students WHERE id = %s", (student_id,))
         conn.commit()
+        ref_cache.invalidate('courses')
         return {"message": "학생이 삭제되었습니다"}
     finally:
         conn.close()
 
+# Excel 일괄 등록 시 한 번에 읽어 처리하는 행 수
+EXCEL_IMPORT_CHUNK_SIZE = int(os.getenv('EXCEL_IMPORT_CHUNK_SIZE', '1000'))
+
 # 시스템 필드 정의 (학생 등록용)
 STUDENT_FIELDS = [
     {"key": "name", "label": "이름", "required": True},
@@ -708,176 +683,114 @@ def auto_match_columns(excel_columns):
     return mapping
 
 @app.post("/api/students/preview-excel")
-async def preview_excel(file: UploadFile = File(...)):
-    """Excel 파일 미리보기 - 컬럼 추출 및 자동 매핑"""
+def preview_excel(file: UploadFile = File(...), sheet: Optional[str] = None):
+    """Excel 파일 미리보기 - 컬럼 추출 및 자동 매핑 (헤더와 처음 3행만 읽음)"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Excel 파일만 업로드 가능합니다")
 
     try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
+        preview = preview_excel_file(file.file, file.filename, sample_rows=3, sheet=sheet)
 
-        excel_columns = df.columns.tolist()
+        excel_columns = preview.columns
         auto_mapping = auto_match_columns(excel_columns)
 
         # 샘플 데이터 (첫 3행)
-        sample_data = df.head(3).fillna('').astype(str).to_dict('records')
+        sample_data = preview.sample.fillna('').astype(str).to_dict('records')
 
         return {
             "excel_columns": excel_columns,
             "system_fields": STUDENT_FIELDS,
             "auto_mapping": auto_mapping,
             "sample_data": sample_data,
-            "total_rows": len(df)
+            "total_rows": preview.total_rows,
+            "sheet": preview.sheet,
+            "sheet_names": preview.sheet_names
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"파일 처리 중 오류: {str(e)}")
 
 @app.post("/api/students/upload-excel")
-async def upload_excel(file: UploadFile = File(...), course_code: str = None, mapping: str = None):
-    """Excel 파일로 학생 일괄 등록 (매핑 지원)"""
+def upload_excel(
+    file: UploadFile = File(...),
+    course_code: str = None,
+    mapping: str = None,
+    dry_run: bool = False,
+    sheet: Optional[str] = None
+):
+    """
+    Excel 파일로 학생 일괄 등록 (매핑 지원)
+    
+    시트를 EXCEL_IMPORT_CHUNK_SIZE 행씩 읽어 등록하며,
+    dry_run=true이면 등록하지 않고 등록/중복/오류 결과만 반환
+    """
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Excel 파일만 업로드 가능합니다")
 
     try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-
         # 매핑 정보 파싱 (JSON 문자열)
         field_mapping = {}
         if mapping:
             import json
             field_mapping = json.loads(mapping)
-        else:
-            # 기본 매핑 (기존 호환성 유지)
-            field_mapping = auto_match_columns(df.columns.tolist())
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        print(f"[UPLOAD] course_code: {course_code}, mapping: {mapping}")
-
-        cursor.execute("SELECT MAX(CAST(SUBSTRING(code, 2) AS UNSIGNED)) as max_code FROM students WHERE code LIKE 'S%'")
-        result = cursor.fetchone()
-        next_num = (result[0] or 0) + 1
 
-        # 과정명 조회 (캠퍼스 자동 입력용)
-        course_name = ''
-        if course_code:
-            cursor.execute("SELECT name FROM courses WHERE code = %s", (course_code,))
-            course_result = cursor.fetchone()
-            if course_result:
-                course_name = course_result[0]
-
-        # 기존 학생 목록 조회 (중복 체크용: 이름, 전화번호, 성별)
-        cursor.execute("SELECT name, phone, gender FROM students")
-        existing_students = set()
-        for row in cursor.fetchall():
-            phone_normalized = str(row[1] or '').replace('-', '').replace(' ', '')
-            existing_students.add((str(row[0] or '').strip(), phone_normalized, str(row[2] or '').strip()))
+        print(f"[UPLOAD] course_code: {course_code}, mapping: {mapping}, dry_run: {dry_run}")
 
-        success_count = 0
-        duplicate_list = []  # 중복 학생 목록
-        skipped_list = []  # 건너뛴 학생 목록 (이름 없음)
-        registered_list = []  # 등록된 학생 목록
-        total_count = len(df)
+        with ExcelSheetReader(file.file, file.filename, sheet) as reader:
+            if not field_mapping:
+                # 기본 매핑 (기존 호환성 유지)
+                field_mapping = auto_match_columns(reader.columns)
 
-        for idx, row in df.iterrows():
+            conn = get_db_connection()
             try:
-                # 매핑에 따라 값 추출 (없으면 빈칸)
-                def get_value(field_key):
-                    col_name = field_mapping.get(field_key)
-                    if col_name and col_name in row:
-                        val = row[col_name]
-                        if pd.isna(val):
-                            return ''
-                        return str(val).strip()
-                    return ''
-
-                name = get_value('name')
-                if not name:  # 이름은 필수
-                    skipped_list.append(f"행 {idx+2}: 이름 없음")
-                    continue
-
-                birth_date = get_value('birth_date')
-                gender = get_value('gender')
-                phone = get_value('phone')
-                phone_normalized = phone.replace('-', '').replace(' ', '')
-                email = get_value('email')
-                address = get_value('address')
-                interests = get_value('interests')
-                education = get_value('education')
-                introduction = get_value('introduction')
-                campus = get_value('campus')
-
-                # 캠퍼스가 빈칸이면 과정명으로 자동 입력
-                if not campus and course_name:
-                    campus = course_name
-
-                # 생년월일이 빈칸이면 기본 비밀번호 설정
-                password = ''
-                if not birth_date:
-                    password = 'kdt2025'
-
-                # 중복 체크 (이름, 전화번호, 성별)
-                student_key = (name, phone_normalized, gender)
-                if student_key in existing_students:
-                    duplicate_list.append({"name": name, "phone": phone, "gender": gender})
-                    continue
-
-                code = f"S{next_num:03d}"
-
-                query = """
-                    INSERT INTO students
-                    (code, name, birth_date, gender, phone, email, address, interests, education, introduction, campus, course_code, password)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-
-                cursor.execute(query, (
-                    code, name, birth_date, gender, phone, email,
-                    address, interests, education, introduction, campus, course_code, password
-                ))
-
-                existing_students.add(student_key)
-                registered_list.append({"code": code, "name": name})
-                next_num += 1
-                success_count += 1
-
-            except Exception as e:
-                skipped_list.append(f"행 {idx+2}: {str(e)}")
+                result = import_students(
+                    conn, reader.iter_chunks(EXCEL_IMPORT_CHUNK_SIZE), field_mapping, course_code, dry_run=dry_run
+                )
+            finally:
+                conn.close()
+        if not dry_run:
+            ref_cache.invalidate('courses')
 
-        conn.commit()
-        conn.close()
+        total_count = result['total']
+        registered_list = result['registered']
+        duplicate_list = result['duplicates']
+        error_list = result['errors']
+        success_count = len(registered_list)
 
         # 상세 메시지 생성
         msg_parts = [f"총 {total_count}명"]
         if success_count > 0:
-            msg_parts.append(f"{success_count}명 등록")
+            msg_parts.append(f"{success_count}명 {'등록 예정' if dry_run else '등록'}")
         if duplicate_list:
             dup_names = ', '.join([d['name'] for d in duplicate_list[:5]])
             if len(duplicate_list) > 5:
                 dup_names += f" 외 {len(duplicate_list)-5}명"
             msg_parts.append(f"{len(duplicate_list)}명 중복({dup_names})")
-        if skipped_list:
-            msg_parts.append(f"{len(skipped_list)}명 건너뜀")
+        if error_list:
+            msg_parts.append(f"{len(error_list)}명 건너뜀")
 
         return {
             "success": True,
+            "dry_run": dry_run,
             "message": " / ".join(msg_parts),
             "total": total_count,
             "success_count": success_count,
             "duplicate_count": len(duplicate_list),
             "duplicate_list": duplicate_list,
-            "skipped_count": len(skipped_list),
-            "registered_list": registered_list[:10],
+            "skipped_count": len(error_list),
+            "errors": error_list,
+            "registered_list": registered_list if dry_run else registered_list[:10],
             "course_code": course_code
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"파일 처리 중 오류: {str(e)}")
 
 @app.get("/api/template/students")
-async def download_template():
+def download_template():
     """학생 등록 템플릿 다운로드"""
     template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "student_template.xlsx")
     if os.path.exists(template_path):
@@ -890,9 +803,8 @@ async def download_template():
 
 # ==================== 과목 관리 API ====================
 
-@app.get("/api/subjects")
-async def get_subjects():
-    """과목 목록 조회"""
+def _load_subjects():
+    """과목 목록 DB 조회"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
@@ -913,8 +825,13 @@ async def get_subjects():
     finally:
         conn.close()
 
+@app.get("/api/subjects")
+def get_subjects(request: Request):
+    """과목 목록 조회 (캐시)"""
+    return ref_cache.respond(request, 'subjects', 'all', _load_subjects)
+
 @app.get("/api/subjects/{subject_code}")
-async def get_subject(subject_code: str):
+def get_subject(subject_code: str):
     """특정 과목 조회"""
     conn = get_db_connection()
     try:
@@ -939,7 +856,7 @@ async def get_subject(subject_code: str):
         conn.close()
 
 @app.post("/api/subjects")
-async def create_subject(data: dict):
+def create_subject(data: dict):
     """과목 생성"""
     conn = get_db_connection()
     try:
@@ -975,6 +892,7 @@ async def create_subject(data: dict):
         ))
         
         conn.commit()
+        ref_cache.invalidate('subjects', 'courses')
         return {"code": data.get('code')}
     except pymysql.err.OperationalError as e:
         raise HTTPException(status_code=500, detail=f"데이터베이스 오류: {str(e)}")
@@ -982,7 +900,7 @@ async def create_subject(data: dict):
         conn.close()
 
 @app.put("/api/subjects/{subject_code}")
-async def update_subject(subject_code: str, data: dict):
+def update_subject(subject_code: str, data: dict):
     """과목 수정"""
     conn = get_db_connection()
     try:
@@ -1049,6 +967,7 @@ async def update_subject(subject_code: str, data: dict):
         
         cursor.execute(query, tuple(update_values))
         conn.commit()
+        ref_cache.invalidate('subjects', 'courses')
         return {"code": subject_code}
     except Exception as e:
         import traceback
@@ -1059,19 +978,20 @@ async def update_subject(subject_code: str, data: dict):
         conn.close()
 
 @app.delete("/api/subjects/{subject_code}")
-async def delete_subject(subject_code: str):
+def delete_subject(subject_code: str):
     """과목 삭제"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM subjects WHERE code = %s", (subject_code,))
         conn.commit()
+        ref_cache.invalidate('subjects', 'courses')
         return {"message": "과목이 삭제되었습니다"}
     finally:
         conn.close()
 
 @app.get("/api/instructors/{instructor_code}/subjects")
-async def get_instructor_subjects(instructor_code: str):
+def get_instructor_subjects(instructor_code: str):
     """강사의 담당 교과목 조회"""
     conn = get_db_connection()
     try:
@@ -1088,7 +1008,7 @@ async def get_instructor_subjects(instructor_code: str):
         conn.close()
 
 @app.post("/api/courses/{course_code}/subjects")
-async def save_course_subjects(course_code: str, data: dict):
+def save_course_subjects(course_code: str, data: dict):
     """과정-교과목 관계 저장"""
     subject_codes = data.get('subject_codes', [])
     
@@ -1107,6 +1027,7 @@ async def save_course_subjects(course_code: str, data: dict):
             """, (course_code, subject_code, idx))
         
         conn.commit()
+        ref_cache.invalidate('courses')
         return {
             "message": f"{len(subject_codes)}개의 교과목이 저장되었습니다",
             "course_code": course_code,
@@ -1146,39 +1067,12 @@ def convert_datetime(obj):
 
 # ==================== 강사코드 관리 API ====================
 
-@app.get("/api/instructor-codes")
-async def get_instructor_codes():
-    """강사코드 목록 조회"""
+def _load_instructor_codes():
+    """강사코드 목록 DB 조회"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # menu_permissions 컬럼 확인 및 추가
-        ensure_menu_permissions_column(cursor)
-        conn.commit()
-        
-        # permissions 컬럼 존재 여부 확인 및 추가
-        cursor.execute("SHOW COLUMNS FROM instructor_codes LIKE 'permissions'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE instructor_codes ADD COLUMN permissions TEXT DEFAULT NULL")
-            conn.commit()
-
-        # 관리자(IC-999) 타입이 없으면 추가
-        cursor.execute("SELECT * FROM instructor_codes WHERE code = 'IC-999'")
-        if not cursor.fetchone():
-            cursor.execute("""
-                INSERT INTO instructor_codes (code, name, type, permissions)
-                VALUES ('IC-999', '관리자', '0. 관리자', NULL)
-            """)
-            conn.commit()
-
-        # 레거시 코드 '0'이 남아있으면 IC-999로 마이그레이션
-        cursor.execute("SELECT * FROM instructor_codes WHERE code = '0'")
-        if cursor.fetchone():
-            cursor.execute("UPDATE instructors SET instructor_type = 'IC-999' WHERE instructor_type = '0'")
-            cursor.execute("DELETE FROM instructor_codes WHERE code = '0'")
-            conn.commit()
-        
         cursor.execute("SELECT * FROM instructor_codes ORDER BY code")
         codes = cursor.fetchall()
         
@@ -1200,29 +1094,18 @@ async def get_instructor_codes():
     finally:
         conn.close()
 
+@app.get("/api/instructor-codes")
+def get_instructor_codes(request: Request):
+    """강사코드 목록 조회 (캐시)"""
+    return ref_cache.respond(request, 'instructor_codes', 'all', _load_instructor_codes)
+
 @app.post("/api/instructor-codes")
-async def create_instructor_code(data: dict):
+def create_instructor_code(data: dict):
     """강사코드 생성"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # menu_permissions 컬럼 확인 및 추가
-        ensure_menu_permissions_column(cursor)
-        conn.commit()
-        
-        # default_screen 컬럼이 없으면 추가
-        cursor.execute("SHOW COLUMNS FROM instructor_codes LIKE 'default_screen'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE instructor_codes ADD COLUMN default_screen VARCHAR(50) DEFAULT NULL")
-            conn.commit()
-
-        # dashboard_charts 컬럼이 없으면 추가
-        cursor.execute("SHOW COLUMNS FROM instructor_codes LIKE 'dashboard_charts'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE instructor_codes ADD COLUMN dashboard_charts TEXT DEFAULT NULL")
-            conn.commit()
-
         import json
         permissions_json = json.dumps(data.get('permissions', {})) if data.get('permissions') else None
         menu_permissions_json = json.dumps(data.get('menu_permissions', [])) if data.get('menu_permissions') else None
@@ -1235,33 +1118,18 @@ async def create_instructor_code(data: dict):
         """
         cursor.execute(query, (data['code'], data['name'], data['type'], permissions_json, menu_permissions_json, default_screen, dashboard_charts_json))
         conn.commit()
+        ref_cache.invalidate('instructor_codes', 'instructors')
         return {"code": data['code']}
     finally:
         conn.close()
 
 @app.put("/api/instructor-codes/{code}")
-async def update_instructor_code(code: str, data: dict):
+def update_instructor_code(code: str, data: dict):
     """강사코드 수정 (권한 설정 포함)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
 
-        # menu_permissions 컬럼 확인 및 추가
-        ensure_menu_permissions_column(cursor)
-        conn.commit()
-
-        # default_screen 컬럼이 없으면 추가
-        cursor.execute("SHOW COLUMNS FROM instructor_codes LIKE 'default_screen'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE instructor_codes ADD COLUMN default_screen VARCHAR(50) DEFAULT NULL")
-            conn.commit()
-
-        # dashboard_charts 컬럼이 없으면 추가
-        cursor.execute("SHOW COLUMNS FROM instructor_codes LIKE 'dashboard_charts'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE instructor_codes ADD COLUMN dashboard_charts TEXT DEFAULT NULL")
-            conn.commit()
-
         import json
         permissions_json = json.dumps(data.get('permissions', {})) if data.get('permissions') else None
         menu_permissions_json = json.dumps(data.get('menu_permissions', [])) if data.get('menu_permissions') else None
@@ -1275,12 +1143,13 @@ async def update_instructor_code(code: str, data: dict):
         """
         cursor.execute(query, (data['name'], data['type'], permissions_json, menu_permissions_json, default_screen, dashboard_charts_json, code))
         conn.commit()
+        ref_cache.invalidate('instructor_codes', 'instructors')
         return {"code": code}
     finally:
         conn.close()
 
 @app.delete("/api/instructor-codes/{code}")
-async def delete_instructor_code(code: str):
+def delete_instructor_code(code: str):
     """강사코드 삭제"""
     conn = get_db_connection()
     try:
@@ -1297,6 +1166,7 @@ async def delete_instructor_code(code: str):
             raise HTTPException(status_code=404, detail="강사코드를 찾을 수 없습니다")
         
         conn.commit()
+        ref_cache.invalidate('instructor_codes', 'instructors')
         return {"message": "강사코드가 삭제되었습니다"}
     except HTTPException:
         raise
@@ -1307,7 +1177,7 @@ async def delete_instructor_code(code: str):
         conn.close()
 
 @app.post("/api/admin/migrate-admin-code")
-async def migrate_admin_code():
+def migrate_admin_code():
     """관리자 코드를 0에서 IC-999로 마이그레이션"""
     conn = get_db_connection()
     try:
@@ -1377,6 +1247,7 @@ async def migrate_admin_code():
         """)
         
         conn.commit()
+        ref_cache.invalidate('instructor_codes', 'instructors')
         
         # 7. 결과 확인
         cursor.execute("SELECT * FROM instructor_codes WHERE code = 'IC-999'")
@@ -1401,35 +1272,14 @@ async def migrate_admin_code():
 
 # ==================== 강사 관리 API ====================
 
-def ensure_instructor_courses_table(cursor):
-    """instructor_courses 테이블이 없으면 생성"""
-    try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS instructor_courses (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                instructor_code VARCHAR(50) NOT NULL,
-                course_code VARCHAR(50) NOT NULL,
-                UNIQUE KEY uk_instructor_course (instructor_code, course_code),
-                INDEX idx_instructor_code (instructor_code),
-                INDEX idx_course_code (course_code)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-    except Exception as e:
-        pass
-
-@app.get("/api/instructors")
-async def get_instructors(search: Optional[str] = None):
-    """강사 목록 조회 (검색 기능 포함)"""
+def _load_instructors(search: Optional[str] = None):
+    """강사 목록 DB 조회 (검색 기능 포함)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # password 컬럼 존재 여부 확인
-        cursor.execute("SHOW COLUMNS FROM instructors LIKE 'password'")
-        has_password = cursor.fetchone() is not None
-        
-        # profile_photo와 attachments 컬럼 자동 생성
-        ensure_profile_photo_columns(cursor, 'instructors')
+        # password 컬럼 존재 여부 확인 (프로세스당 한 번만 조회)
+        has_password = 'password' in table_columns(cursor, 'instructors')
         
         if has_password:
             query = """
@@ -1463,22 +1313,33 @@ async def get_instructors(search: Optional[str] = None):
         cursor.execute(query, params)
         instructors = cursor.fetchall()
 
-        # instructor_courses 테이블에서 과정 배정 정보 조회
-        ensure_instructor_courses_table(cursor)
-        conn.commit()
-        for inst in instructors:
+        # instructor_courses 테이블에서 과정 배정 정보 한 번에 조회
+        courses_by_instructor = {}
+        if instructors:
+            codes = [inst['code'] for inst in instructors]
+            placeholders = ', '.join(['%s'] * len(codes))
             cursor.execute(
-                "SELECT course_code FROM instructor_courses WHERE instructor_code = %s",
-                (inst['code'],)
+                f"SELECT instructor_code, course_code FROM instructor_courses WHERE instructor_code IN ({placeholders})",
+                codes
             )
-            inst['course_codes'] = [row['course_code'] for row in cursor.fetchall()]
+            for row in cursor.fetchall():
+                courses_by_instructor.setdefault(row['instructor_code'], []).append(row['course_code'])
+        for inst in instructors:
+            inst['course_codes'] = courses_by_instructor.get(inst['code'], [])
 
         return [convert_datetime(inst) for inst in instructors]
     finally:
         conn.close()
 
+@app.get("/api/instructors")
+def get_instructors(request: Request, search: Optional[str] = None):
+    """강사 목록 조회 (검색 기능 포함, 전체 목록만 캐시)"""
+    if search:
+        return _load_instructors(search)
+    return ref_cache.respond(request, 'instructors', 'all', _load_instructors)
+
 @app.get("/api/instructors/{code}")
-async def get_instructor(code: str):
+def get_instructor(code: str):
     """특정 강사 조회"""
     conn = get_db_connection()
     try:
@@ -1497,27 +1358,12 @@ async def get_instructor(code: str):
         conn.close()
 
 @app.post("/api/instructors")
-async def create_instructor(data: dict):
+def create_instructor(data: dict):
     """강사 생성 (프로필/첨부 파일 분리)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # profile_photo와 attachments 컬럼이 없으면 자동 생성
-        ensure_profile_photo_columns(cursor, 'instructors')
-        
-        # motto, affiliation 컬럼 자동 생성
-        try:
-            cursor.execute("ALTER TABLE instructors ADD COLUMN motto TEXT")
-            conn.commit()
-        except:
-            pass
-        try:
-            cursor.execute("ALTER TABLE instructors ADD COLUMN affiliation VARCHAR(255)")
-            conn.commit()
-        except:
-            pass
-
         query = """
             INSERT INTO instructors (code, name, phone, major, instructor_type, email, profile_photo, attachments, motto, affiliation)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
@@ -1529,7 +1375,6 @@ async def create_instructor(data: dict):
         ))
 
         # 과정 배정 저장
-        ensure_instructor_courses_table(cursor)
         course_codes = data.get('course_codes', [])
         if course_codes and course_codes != ['ALL']:
             for cc in course_codes:
@@ -1539,20 +1384,18 @@ async def create_instructor(data: dict):
                 )
 
         conn.commit()
+        ref_cache.invalidate('instructors', 'subjects')
         return {"code": data['code']}
     finally:
         conn.close()
 
 @app.put("/api/instructors/{code}")
-async def update_instructor(code: str, data: dict):
+def update_instructor(code: str, data: dict):
     """강사 수정 (JSON 데이터 지원 - 프로필/첨부 파일 분리)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # 새로운 컬럼 자동 생성 (profile_photo, attachments)
-        ensure_profile_photo_columns(cursor, 'instructors')
-        
         # 데이터 추출
         name = data.get('name')
         if not name:
@@ -1581,18 +1424,6 @@ async def update_instructor(code: str, data: dict):
         motto = data.get('motto')
         affiliation = data.get('affiliation')
 
-        # motto, affiliation 컬럼 자동 생성
-        try:
-            cursor.execute("ALTER TABLE instructors ADD COLUMN motto TEXT")
-            conn.commit()
-        except:
-            pass
-        try:
-            cursor.execute("ALTER TABLE instructors ADD COLUMN affiliation VARCHAR(255)")
-            conn.commit()
-        except:
-            pass
-
         # instructor_type은 MyPage에서 변경하지 않음 (외래 키 제약 조건)
         query = """
             UPDATE instructors
@@ -1605,7 +1436,6 @@ async def update_instructor(code: str, data: dict):
         ))
 
         # 과정 배정 업데이트 (DELETE + INSERT)
-        ensure_instructor_courses_table(cursor)
         course_codes = data.get('course_codes')
         if course_codes is not None:
             cursor.execute("DELETE FROM instructor_courses WHERE instructor_code = %s", (code,))
@@ -1617,18 +1447,18 @@ async def update_instructor(code: str, data: dict):
                     )
 
         conn.commit()
+        ref_cache.invalidate('instructors', 'subjects')
         return {"code": code}
     finally:
         conn.close()
 
 @app.delete("/api/instructors/{code}")
-async def delete_instructor(code: str):
+def delete_instructor(code: str):
     """강사 삭제"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         # 과정 배정 삭제
-        ensure_instructor_courses_table(cursor)
         cursor.execute("DELETE FROM instructor_courses WHERE instructor_code = %s", (code,))
 
         # FK RESTRICT 참조 해제: consultations, subjects, timetables
@@ -1656,6 +1486,7 @@ async def delete_instructor(code: str):
 
         cursor.execute("DELETE FROM instructors WHERE code = %s", (code,))
         conn.commit()
+        ref_cache.invalidate('instructors', 'subjects')
         return {"message": "강사가 삭제되었습니다"}
     finally:
         conn.close()
@@ -1663,28 +1494,14 @@ async def delete_instructor(code: str):
 # ==================== 공휴일 관리 API ====================
 
 @app.get("/api/holidays")
-async def get_holidays(year: Optional[int] = None):
-    """공휴일 목록 조회 (연도별 필터)"""
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-        
-        if year:
-            cursor.execute("""
-                SELECT * FROM holidays
-                WHERE YEAR(holiday_date) = %s
-                ORDER BY holiday_date
-            """, (year,))
-        else:
-            cursor.execute("SELECT * FROM holidays ORDER BY holiday_date")
-        
-        holidays = cursor.fetchall()
-        return [convert_datetime(h) for h in holidays]
-    finally:
-        conn.close()
+def get_holidays(request: Request, year: Optional[int] = None):
+    """공휴일 목록 조회 (연도별 필터, 공휴일 서비스 스냅샷에서)"""
+    return ref_cache.respond(
+        request, 'holidays', year, lambda: [convert_datetime(h) for h in holiday_service.list(year)]
+    )
 
 @app.post("/api/holidays")
-async def create_holiday(data: dict):
+def create_holiday(data: dict):
     """공휴일 생성 (중복 시 조용히 무시)"""
     conn = get_db_connection()
     try:
@@ -1707,14 +1524,25 @@ async def create_holiday(data: dict):
             INSERT INTO holidays (holiday_date, name, is_legal)
             VALUES (%s, %s, %s)
         """
-        cursor.execute(query, (data['holiday_date'], data['name'], data.get('is_legal', 0)))
+        try:
+            cursor.execute(query, (data['holiday_date'], data['name'], data.get('is_legal', 0)))
+        except pymysql.err.IntegrityError:
+            # 중복 체크 이후 다른 요청이 먼저 등록한 경우 (uq_holidays_date_name)
+            conn.rollback()
+            cursor.execute("""
+                SELECT id FROM holidays
+                WHERE holiday_date = %s AND name = %s
+            """, (data['holiday_date'], data['name']))
+            existing = cursor.fetchone()
+            return {"id": existing['id'] if existing else None, "message": "이미 등록된 공휴일입니다"}
         conn.commit()
+        ref_cache.invalidate('holidays')
         return {"id": cursor.lastrowid, "message": "공휴일이 추가되었습니다"}
     finally:
         conn.close()
 
 @app.put("/api/holidays/{holiday_id}")
-async def update_holiday(holiday_id: int, data: dict):
+def update_holiday(holiday_id: int, data: dict):
     """공휴일 수정"""
     conn = get_db_connection()
     try:
@@ -1724,125 +1552,53 @@ async def update_holiday(holiday_id: int, data: dict):
             SET holiday_date = %s, name = %s, is_legal = %s
             WHERE id = %s
         """
-        cursor.execute(query, (data['holiday_date'], data['name'], data.get('is_legal', 0), holiday_id))
+        try:
+            cursor.execute(query, (data['holiday_date'], data['name'], data.get('is_legal', 0), holiday_id))
+        except pymysql.err.IntegrityError:
+            # uq_holidays_date_name: 같은 날짜에 같은 이름의 공휴일이 이미 있음
+            conn.rollback()
+            raise HTTPException(status_code=409, detail="같은 날짜에 같은 이름의 공휴일이 이미 있습니다")
         conn.commit()
+        ref_cache.invalidate('holidays')
         return {"id": holiday_id}
     finally:
         conn.close()
 
 @app.delete("/api/holidays/{holiday_id}")
-async def delete_holiday(holiday_id: int):
+def delete_holiday(holiday_id: int):
     """공휴일 삭제"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM holidays WHERE id = %s", (holiday_id,))
         conn.commit()
+        ref_cache.invalidate('holidays')
         return {"message": "공휴일이 삭제되었습니다"}
     finally:
         conn.close()
 
 @app.post("/api/holidays/auto-add/{year}")
-async def auto_add_holidays(year: int):
-    """법정공휴일 자동 추가"""
-    from datetime import datetime, timedelta
-    import korean_lunar_calendar
+def auto_add_holidays(year: int):
+    """법정공휴일 자동 추가 (음력 변환표 캐시 + 일괄 INSERT ... ON DUPLICATE KEY)"""
+    holidays, lunar_error = legal_holidays(year)
+    if lunar_error:
+        print(f"[WARN]  음력 변환 실패 (korean_lunar_calendar 라이브러리 필요): {lunar_error}")
+        print("ℹ️  음력 공휴일은 추가되지 않았습니다. 수동으로 추가해주세요.")
     
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
+        added = upsert_holidays(cursor, holidays, is_legal=1)
+        conn.commit()
+        if added:
+            ref_cache.invalidate('holidays')
         
-        # 법정공휴일 정의 (양력)
-        solar_holidays = [
-            (1, 1, "신정"),
-            (3, 1, "삼일절"),
-            (5, 5, "어린이날"),
-            (6, 6, "현충일"),
-            (8, 15, "광복절"),
-            (10, 3, "개천절"),
-            (10, 9, "한글날"),
-            (12, 25, "성탄절"),
-        ]
-        
-        # 음력 공휴일 (설날, 추석, 부처님오신날)
-        lunar_holidays = [
-            # 설날: 음력 12/30, 1/1, 1/2
-            ((12, 30), "설날 연휴"),
-            ((1, 1), "설날"),
-            ((1, 2), "설날 연휴"),
-            # 부처님오신날: 음력 4/8
-            ((4, 8), "부처님오신날"),
-            # 추석: 음력 8/14, 8/15, 8/16
-            ((8, 14), "추석 연휴"),
-            ((8, 15), "추석"),
-            ((8, 16), "추석 연휴"),
-        ]
-        
-        added = 0
-        skipped = 0
-        
-        # 양력 공휴일 추가
-        for month, day, name in solar_holidays:
-            holiday_date = f"{year}-{month:02d}-{day:02d}"
-            
-            # 중복 체크
-            cursor.execute("""
-                SELECT id FROM holidays 
-                WHERE holiday_date = %s AND name = %s
-            """, (holiday_date, name))
-            
-            if cursor.fetchone():
-                skipped += 1
-                print(f"ℹ️  이미 등록됨: {holiday_date} - {name}")
-            else:
-                cursor.execute("""
-                    INSERT INTO holidays (holiday_date, name, is_legal)
-                    VALUES (%s, %s, 1)
-                """, (holiday_date, name))
-                added += 1
-                print(f"[OK] 추가됨: {holiday_date} - {name}")
-        
-        # 음력 공휴일 추가
-        try:
-            for (lunar_month, lunar_day), name in lunar_holidays:
-                # 음력을 양력으로 변환
-                calendar = korean_lunar_calendar.KoreanLunarCalendar()
-                
-                # 설날 전날(음력 12/30)의 경우 전년도 기준
-                if lunar_month == 12 and lunar_day == 30:
-                    calendar.setLunarDate(year - 1, lunar_month, lunar_day, False)
-                else:
-                    calendar.setLunarDate(year, lunar_month, lunar_day, False)
-                
-                solar_date = calendar.SolarIsoFormat()
-                
-                # 중복 체크
-                cursor.execute("""
-                    SELECT id FROM holidays 
-                    WHERE holiday_date = %s AND name = %s
-                """, (solar_date, name))
-                
-                if cursor.fetchone():
-                    skipped += 1
-                    print(f"ℹ️  이미 등록됨: {solar_date} - {name} (음력)")
-                else:
-                    cursor.execute("""
-                        INSERT INTO holidays (holiday_date, name, is_legal)
-                        VALUES (%s, %s, 1)
-                    """, (solar_date, name))
-                    added += 1
-                    print(f"[OK] 추가됨: {solar_date} - {name} (음력)")
-        except Exception as e:
-            print(f"[WARN]  음력 변환 실패 (korean_lunar_calendar 라이브러리 필요): {e}")
-            print("ℹ️  음력 공휴일은 추가되지 않았습니다. 수동으로 추가해주세요.")
-        
-        conn.commit()
-        
-        total = added + skipped
+        total = len(holidays)
+        print(f"[OK] {year}년 법정공휴일: 추가 {added}개, 이미 등록 {total - added}개")
         return {
             "year": year,
             "added": added,
-            "skipped": skipped,
+            "skipped": total - added,
             "total": total,
             "message": f"{year}년 법정공휴일 자동 추가 완료"
         }
@@ -1851,41 +1607,50 @@ async def auto_add_holidays(year: int):
 
 # ==================== 과정(학급) 관리 API ====================
 
-@app.get("/api/courses")
-async def get_courses():
-    """과정 목록 조회 (학생수, 과목수, 교과목 목록 포함)"""
+def _load_courses():
+    """과정 목록 DB 조회 (학생수, 과목수, 교과목 목록 포함)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
+        # 학생수는 과정별로 미리 집계 후 조인 (students x course_subjects 곱 집계 방지)
         cursor.execute("""
             SELECT c.*, 
-                   COUNT(DISTINCT s.id) as student_count,
-                   COUNT(DISTINCT cs.subject_code) as subject_count
+                   COALESCE(sc.student_count, 0) as student_count
             FROM courses c
-            LEFT JOIN students s ON c.code = s.course_code
-            LEFT JOIN course_subjects cs ON c.code = cs.course_code
-            GROUP BY c.code
+            LEFT JOIN (
+                SELECT course_code, COUNT(*) as student_count
+                FROM students
+                GROUP BY course_code
+            ) sc ON c.code = sc.course_code
             ORDER BY c.code
         """)
         courses = cursor.fetchall()
         
-        # 각 과정의 교과목 목록 조회
+        # 전체 과정의 교과목 목록을 한 번에 조회 후 과정별로 묶기
+        cursor.execute("""
+            SELECT course_code, subject_code
+            FROM course_subjects
+            ORDER BY course_code, subject_code
+        """)
+        subjects_by_course = {}
+        for row in cursor.fetchall():
+            subjects_by_course.setdefault(row['course_code'], []).append(row['subject_code'])
+        
         for course in courses:
-            cursor.execute("""
-                SELECT subject_code
-                FROM course_subjects
-                WHERE course_code = %s
-                ORDER BY subject_code
-            """, (course['code'],))
-            subjects = cursor.fetchall()
-            course['subjects'] = [s['subject_code'] for s in subjects]
+            course['subjects'] = subjects_by_course.get(course['code'], [])
+            course['subject_count'] = len(set(course['subjects']))
         
         return [convert_datetime(course) for course in courses]
     finally:
         conn.close()
 
+@app.get("/api/courses")
+def get_courses(request: Request):
+    """과정 목록 조회 (학생수, 과목수, 교과목 목록 포함, 캐시)"""
+    return ref_cache.respond(request, 'courses', 'all', _load_courses)
+
 @app.get("/api/courses/{code}")
-async def get_course(code: str):
+def get_course(code: str):
     """특정 과정 조회 (교과목 포함)"""
     conn = get_db_connection()
     try:
@@ -1917,7 +1682,7 @@ async def get_course(code: str):
         conn.close()
 
 @app.post("/api/courses")
-async def create_course(data: dict):
+def create_course(data: dict):
     """과정 생성"""
     conn = get_db_connection()
     try:
@@ -1933,23 +1698,6 @@ async def create_course(data: dict):
             except:
                 return text
         
-        # morning_hours, afternoon_hours 컬럼이 없으면 추가
-        try:
-            cursor.execute("""
-                ALTER TABLE courses 
-                ADD COLUMN morning_hours INT DEFAULT 4
-            """)
-        except:
-            pass  # 이미 존재하면 무시
-        
-        try:
-            cursor.execute("""
-                ALTER TABLE courses 
-                ADD COLUMN afternoon_hours INT DEFAULT 4
-            """)
-        except:
-            pass  # 이미 존재하면 무시
-        
         # notes 필드 이모지 제거
         notes_cleaned = remove_emoji(data.get('notes'))
         
@@ -1969,6 +1717,7 @@ async def create_course(data: dict):
             data.get('morning_hours', 4), data.get('afternoon_hours', 4)
         ))
         conn.commit()
+        ref_cache.invalidate('courses')
         return {"code": data['code']}
     except Exception as e:
         conn.rollback()
@@ -1980,7 +1729,7 @@ async def create_course(data: dict):
         conn.close()
 
 @app.put("/api/courses/{code}")
-async def update_course(code: str, data: dict):
+def update_course(code: str, data: dict):
     """과정 수정"""
     conn = get_db_connection()
     try:
@@ -2035,6 +1784,7 @@ async def update_course(code: str, data: dict):
         
         cursor.execute(query, tuple(values))
         conn.commit()
+        ref_cache.invalidate('courses')
         return {"code": code}
     except Exception as e:
         import traceback
@@ -2045,7 +1795,7 @@ async def update_course(code: str, data: dict):
         conn.close()
 
 @app.delete("/api/courses/{code}")
-async def delete_course(code: str):
+def delete_course(code: str):
     """과정 삭제 (관련 데이터 cascade) - [WARN] 위험: 시간표, 훈련일지 모두 삭제됨!"""
     conn = get_db_connection()
     try:
@@ -2088,6 +1838,7 @@ async def delete_course(code: str):
         cursor.execute("DELETE FROM courses WHERE code = %s", (code,))
         
         conn.commit()
+        ref_cache.invalidate('courses')
         return {
             "message": "과정 및 관련 데이터가 삭제되었습니다",
             "deleted": {
@@ -2107,40 +1858,12 @@ async def delete_course(code: str):
 # ==================== 프로젝트 관리 API ====================
 
 @app.get("/api/projects")
-async def get_projects(course_code: Optional[str] = None):
+def get_projects(course_code: Optional[str] = None):
     """팀 목록 조회 (과정별 필터)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # Check if new columns exist, if not, add them
-        try:
-            cursor.execute("SHOW COLUMNS FROM projects LIKE 'group_type'")
-            if not cursor.fetchone():
-                # Add new columns
-                cursor.execute("ALTER TABLE projects ADD COLUMN group_type VARCHAR(50)")
-                cursor.execute("ALTER TABLE projects ADD COLUMN instructor_code VARCHAR(50)")
-                cursor.execute("ALTER TABLE projects ADD COLUMN mentor_code VARCHAR(50)")
-                conn.commit()
-        except:
-            pass  # Columns might already exist
-        
-        # Check if account columns exist, if not, add them
-        try:
-            cursor.execute("SHOW COLUMNS FROM projects LIKE 'account1_name'")
-            if not cursor.fetchone():
-                # Add shared account columns (5 sets of 3 fields = 15 columns)
-                for i in range(1, 6):
-                    cursor.execute(f"ALTER TABLE projects ADD COLUMN account{i}_name VARCHAR(100)")
-                    cursor.execute(f"ALTER TABLE projects ADD COLUMN account{i}_id VARCHAR(100)")
-                    cursor.execute(f"ALTER TABLE projects ADD COLUMN account{i}_pw VARCHAR(100)")
-                conn.commit()
-        except:
-            pass  # Columns might already exist
-        
-        # Check if photo_urls column exists, if not, add it
-        ensure_photo_urls_column(cursor, 'projects')
-        
         query = """
             SELECT p.*, 
                    c.name as course_name,
@@ -2167,7 +1890,7 @@ async def get_projects(course_code: Optional[str] = None):
         conn.close()
 
 @app.get("/api/projects/{code}")
-async def get_project(code: str):
+def get_project(code: str):
     """특정 팀 조회"""
     conn = get_db_connection()
     try:
@@ -2191,56 +1914,12 @@ async def get_project(code: str):
         conn.close()
 
 @app.post("/api/projects")
-async def create_project(data: dict):
+def create_project(data: dict):
     """팀 생성 (5명의 팀원 정보)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # Check if new columns exist, if not, add them
-        try:
-            cursor.execute("SHOW COLUMNS FROM projects LIKE 'member1_code'")
-            if not cursor.fetchone():
-                # Add new columns
-                for i in range(1, 6):
-                    cursor.execute(f"ALTER TABLE projects ADD COLUMN member{i}_code VARCHAR(50)")
-                cursor.execute("ALTER TABLE projects ADD COLUMN group_type VARCHAR(50)")
-                cursor.execute("ALTER TABLE projects ADD COLUMN instructor_code VARCHAR(50)")
-                cursor.execute("ALTER TABLE projects ADD COLUMN mentor_code VARCHAR(50)")
-                conn.commit()
-        except:
-            pass  # Columns might already exist
-        
-        # Check if account columns exist, if not, add them
-        try:
-            cursor.execute("SHOW COLUMNS FROM projects LIKE 'account1_name'")
-            if not cursor.fetchone():
-                # Add shared account columns (5 sets of 3 fields = 15 columns)
-                for i in range(1, 6):
-                    cursor.execute(f"ALTER TABLE projects ADD COLUMN account{i}_name VARCHAR(100)")
-                    cursor.execute(f"ALTER TABLE projects ADD COLUMN account{i}_id VARCHAR(100)")
-                    cursor.execute(f"ALTER TABLE projects ADD COLUMN account{i}_pw VARCHAR(100)")
-                conn.commit()
-        except:
-            pass  # Columns might already exist
-        
-        # Ensure photo_urls column exists
-        ensure_photo_urls_column(cursor, 'projects')
-        
-        # Ensure description column exists (TEXT type for markdown support)
-        try:
-            cursor.execute("SHOW COLUMNS FROM projects LIKE 'description'")
-            result = cursor.fetchone()
-            if not result:
-                print("[INFO] Adding description column to projects table...")
-                cursor.execute("ALTER TABLE projects ADD COLUMN description TEXT")
-                conn.commit()
-                print("[OK] Description column added successfully")
-        except Exception as e:
-            print(f"[WARN] Description column check failed: {e}")
-            # Column might already exist, continue anyway
-            pass
-        
         query = """
             INSERT INTO projects (code, name, description, group_type, course_code, instructor_code, mentor_code,
                                  member1_name, member1_phone, member1_code,
@@ -2280,27 +1959,11 @@ async def create_project(data: dict):
         conn.close()
 
 @app.put("/api/projects/{code}")
-async def update_project(code: str, data: dict):
+def update_project(code: str, data: dict):
     """팀 수정"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        # Ensure photo_urls column exists
-        ensure_photo_urls_column(cursor, 'projects')
-        
-        # Ensure description column exists (TEXT type for markdown support)
-        try:
-            cursor.execute("SHOW COLUMNS FROM projects LIKE 'description'")
-            result = cursor.fetchone()
-            if not result:
-                print("[INFO] Adding description column to projects table...")
-                cursor.execute("ALTER TABLE projects ADD COLUMN description TEXT")
-                conn.commit()
-                print("[OK] Description column added successfully")
-        except Exception as e:
-            print(f"[WARN] Description column check failed: {e}")
-            # Column might already exist, continue anyway
-            pass
         
         query = """
             UPDATE projects
@@ -2343,7 +2006,7 @@ async def update_project(code: str, data: dict):
         conn.close()
 
 @app.delete("/api/projects/{code}")
-async def delete_project(code: str):
+def delete_project(code: str):
     """팀 삭제"""
     conn = get_db_connection()
     try:
@@ -2359,24 +2022,44 @@ async def delete_project(code: str):
 # ==================== 수업관리(시간표) API ====================
 
 @app.get("/api/timetables")
-async def get_timetables(
+def get_timetables(
     course_code: Optional[str] = None,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False
 ):
-    """시간표 목록 조회 (과정/기간별 필터)"""
+    """시간표 목록 조회 (과정/기간별 필터, fields=로 컬럼 선택, limit/cursor로 페이지 조회)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
+        # 주차/일차는 과정 시작일 기준으로 SQL에서 계산
+        joined_fields = {
+            'course_name': 'c.name',
+            'course_start_date': 'c.start_date',
+            'subject_name': 's.name',
+            'instructor_name': 'i.name',
+            'training_log_id': 'tl.id',
+            'training_content': 'tl.content',
+            'training_log_photo_urls': 'tl.photo_urls',
+            'week_number': 'FLOOR(DATEDIFF(t.class_date, c.start_date) / 7) + 1',
+            'day_number': 'DATEDIFF(t.class_date, c.start_date) + 1',
+        }
+        keyset = Keyset([
+            ('class_date', 't.class_date', False),
+            ('start_time', 't.start_time', False),
+            ('id', 't.id', False),
+        ])
+        select_sql = select_fields(
+            fields,
+            {**table_fields('t', table_columns(cursor, 'timetables')), **joined_fields},
+            keyset.names
+        ) or "t.*, " + ', '.join(f"{expr} as {name}" for name, expr in joined_fields.items())
+        
         query = """
-            SELECT t.*, 
-                   c.name as course_name, c.start_date as course_start_date,
-                   s.name as subject_name,
-                   i.name as instructor_name,
-                   tl.id as training_log_id,
-                   tl.content as training_content,
-                   tl.photo_urls as training_log_photo_urls
             FROM timetables t
             LEFT JOIN courses c ON t.course_code = c.code
             LEFT JOIN subjects s ON t.subject_code = s.code
@@ -2398,26 +2081,35 @@ async def get_timetables(
             query += " AND t.class_date <= %s"
             params.append(end_date)
         
-        query += " ORDER BY t.class_date, t.start_time"
-        
-        cursor.execute(query, params)
-        timetables = cursor.fetchall()
-        
-        # 주차/일차 계산
-        for tt in timetables:
-            if tt.get('course_start_date') and tt.get('class_date'):
-                delta = (tt['class_date'] - tt['course_start_date']).days
-                tt['week_number'] = (delta // 7) + 1
-                tt['day_number'] = delta + 1
-            else:
-                tt['week_number'] = None
-                tt['day_number'] = None
-        return [convert_datetime(tt) for tt in timetables]
+        timetables = fetch_list(cursor, select_sql, query, params, keyset, limit, page_cursor, include_total)
+        return FastJSONResponse(timetables, timedelta_as_text=True)
+    finally:
+        conn.close()
+
+@app.get("/api/timetables/instructor-conflicts")
+def get_instructor_conflicts(start_date: str, end_date: str, instructor_code: Optional[str] = None):
+    """기간 내 강사 중복 배정 (같은 강사가 같은 날 겹치는 시간에 여러 시간표에 배정된 경우)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        started = time.perf_counter()
+        index = InstructorIndex.load(cursor, start_date, end_date, instructor_code=instructor_code)
+        pairs = index.double_bookings()
+        return {
+            "slot_count": len(index),
+            "conflict_count": len(pairs),
+            "conflicts": [
+                {"instructor_code": first.instructor, "class_date": first.class_date.isoformat(),
+                 "bookings": [first.to_dict(), second.to_dict()]}
+                for first, second in pairs
+            ],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
     finally:
         conn.close()
 
 @app.get("/api/timetables/{timetable_id}")
-async def get_timetable(timetable_id: int):
+def get_timetable(timetable_id: int):
     """특정 시간표 조회"""
     conn = get_db_connection()
     try:
@@ -2441,7 +2133,7 @@ async def get_timetable(timetable_id: int):
         conn.close()
 
 @app.post("/api/timetables")
-async def create_timetable(data: dict):
+def create_timetable(data: dict):
     """시간표 생성"""
     conn = get_db_connection()
     try:
@@ -2462,7 +2154,7 @@ async def create_timetable(data: dict):
         conn.close()
 
 @app.put("/api/timetables/{timetable_id}")
-async def update_timetable(timetable_id: int, data: dict):
+def update_timetable(timetable_id: int, data: dict):
     """시간표 수정"""
     conn = get_db_connection()
     try:
@@ -2490,7 +2182,7 @@ async def update_timetable(timetable_id: int, data: dict):
         conn.close()
 
 @app.delete("/api/timetables/{timetable_id}")
-async def delete_timetable(timetable_id: int):
+def delete_timetable(timetable_id: int):
     """시간표 삭제"""
     conn = get_db_connection()
     try:
@@ -2504,23 +2196,37 @@ async def delete_timetable(timetable_id: int):
 # ==================== 상담 관리 API ====================
 
 @app.get("/api/counselings")
-async def get_counselings(
+def get_counselings(
     student_id: Optional[int] = None,
     month: Optional[str] = None,
-    course_code: Optional[str] = None
+    course_code: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False
 ):
-    """상담 목록 조회 (학생별/월별/학급별 필터)"""
+    """상담 목록 조회 (학생별/월별/학급별 필터, fields=로 컬럼 선택, limit/cursor로 페이지 조회)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # photo_urls, career_decision 컬럼 확인 및 추가
-        ensure_photo_urls_column(cursor, 'consultations')
-        ensure_career_decision_column(cursor)
+        joined_fields = {
+            'student_name': 's.name',
+            'student_code': 's.code',
+            'course_code': 's.course_code',
+            'instructor_name': 'i.name',
+        }
+        keyset = Keyset([('consultation_date', 'c.consultation_date', True), ('id', 'c.id', True)])
+        select_sql = select_fields(
+            fields,
+            {**table_fields('c', table_columns(cursor, 'consultations')), **joined_fields},
+            keyset.names
+        ) or """
+            c.*, s.name as student_name, s.code as student_code, s.course_code,
+            i.name as instructor_name
+        """
         
         query = """
-            SELECT c.*, s.name as student_name, s.code as student_code, s.course_code,
-                   i.name as instructor_name
             FROM consultations c
             LEFT JOIN students s ON c.student_id = s.id
             LEFT JOIN instructors i ON c.instructor_code = i.code
@@ -2533,29 +2239,21 @@ async def get_counselings(
             params.append(student_id)
         
         if month:  # 형식: "2025-01"
-            query += " AND DATE_FORMAT(c.consultation_date, '%%Y-%%m') = %s"
-            params.append(month)
+            query += " AND c.consultation_date >= %s AND c.consultation_date < %s"
+            params.extend(month_range(month))
         
         if course_code:
             query += " AND s.course_code = %s"
             params.append(course_code)
         
-        query += " ORDER BY c.consultation_date DESC"
-        
-        cursor.execute(query, params)
-        counselings = cursor.fetchall()
-        
-        for counseling in counselings:
-            for key, value in counseling.items():
-                if isinstance(value, (datetime, date)):
-                    counseling[key] = value.isoformat()
+        counselings = fetch_list(cursor, select_sql, query, params, keyset, limit, page_cursor, include_total)
         
-        return counselings
+        return FastJSONResponse(counselings)
     finally:
         conn.close()
 
 @app.get("/api/counselings/{counseling_id}")
-async def get_counseling(counseling_id: int):
+def get_counseling(counseling_id: int):
     """특정 상담 조회"""
     conn = get_db_connection()
     try:
@@ -2582,16 +2280,12 @@ async def get_counseling(counseling_id: int):
         conn.close()
 
 @app.post("/api/counselings")
-async def create_counseling(data: dict):
+def create_counseling(data: dict):
     """상담 생성"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # photo_urls, career_decision 컬럼 확인 및 추가
-        ensure_photo_urls_column(cursor, 'consultations')
-        ensure_career_decision_column(cursor)
-        
         # consultations 테이블 구조에 맞게 조정
         query = """
             INSERT INTO consultations 
@@ -2626,16 +2320,12 @@ async def create_counseling(data: dict):
         conn.close()
 
 @app.put("/api/counselings/{counseling_id}")
-async def update_counseling(counseling_id: int, data: dict):
+def update_counseling(counseling_id: int, data: dict):
     """상담 수정"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # photo_urls, career_decision 컬럼 확인 및 추가
-        ensure_photo_urls_column(cursor, 'consultations')
-        ensure_career_decision_column(cursor)
-        
         query = """
             UPDATE consultations 
             SET student_id = %s, instructor_code = %s, consultation_date = %s, consultation_type = %s,
@@ -2667,7 +2357,7 @@ async def update_counseling(counseling_id: int, data: dict):
         conn.close()
 
 @app.delete("/api/counselings/{counseling_id}")
-async def delete_counseling(counseling_id: int):
+def delete_counseling(counseling_id: int):
     """상담 삭제"""
     conn = get_db_connection()
     try:
@@ -2681,42 +2371,45 @@ async def delete_counseling(counseling_id: int):
 # ==================== 훈련일지 관리 API ====================
 
 @app.get("/api/training-logs")
-async def get_training_logs(
+def get_training_logs(
     course_code: Optional[str] = None,
     instructor_code: Optional[str] = None,
     year: Optional[int] = None,
     month: Optional[int] = None,
-    timetable_id: Optional[int] = None
+    timetable_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False
 ):
-    """훈련일지 목록 조회"""
+    """훈련일지 목록 조회 (fields=로 컬럼 선택, limit/cursor로 페이지 조회)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # training_logs 테이블이 없으면 생성
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS training_logs (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                timetable_id INT NOT NULL,
-                course_code VARCHAR(50),
-                instructor_code VARCHAR(50),
-                class_date DATE,
-                content TEXT,
-                homework TEXT,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                FOREIGN KEY (timetable_id) REFERENCES timetables(id) ON DELETE CASCADE
-            )
-        """)
-        conn.commit()
+        # class_date 등 시간표 컬럼은 training_logs 컬럼보다 우선
+        # (정렬 키를 t.class_date 그대로 두어야 idx_timetables_* 인덱스를 탄다.
+        #  시간표가 없는 행의 NULL 키는 Keyset.after()가 MySQL 정렬 규칙대로 처리)
+        joined_fields = {
+            'class_date': 't.class_date',
+            'start_time': 't.start_time',
+            'end_time': 't.end_time',
+            'type': 't.type',
+            'subject_name': 's.name',
+            'instructor_name': 'i.name',
+            'course_name': 'c.name',
+        }
+        keyset = Keyset([
+            ('class_date', 't.class_date', False),
+            ('start_time', 't.start_time', False),
+            ('id', 'tl.id', False),
+        ])
+        available = {**table_fields('tl', table_columns(cursor, 'training_logs')), **joined_fields}
+        # 기본 SELECT도 컬럼을 이름으로 나열: tl.* 와 t.class_date를 함께 고르면
+        # DictCursor의 class_date 키가 tl.class_date가 되어 keyset 커서 값이 정렬 키와 달라짐
+        select_sql = select_fields(fields or ','.join(available), available, keyset.names)
         
         query = """
-            SELECT tl.*, 
-                   t.class_date, t.start_time, t.end_time, t.type,
-                   s.name as subject_name,
-                   i.name as instructor_name,
-                   c.name as course_name
             FROM training_logs tl
             LEFT JOIN timetables t ON tl.timetable_id = t.id
             LEFT JOIN subjects s ON t.subject_code = s.code
@@ -2739,29 +2432,18 @@ async def get_training_logs(
             query += " AND t.instructor_code = %s"
             params.append(instructor_code)
         
-        if year and month:
-            query += " AND YEAR(t.class_date) = %s AND MONTH(t.class_date) = %s"
-            params.extend([year, month])
-        elif year:
-            query += " AND YEAR(t.class_date) = %s"
-            params.append(year)
-        
-        query += " ORDER BY t.class_date, t.start_time"
-        
-        cursor.execute(query, params)
-        logs = cursor.fetchall()
+        if year:
+            query += " AND t.class_date >= %s AND t.class_date < %s"
+            params.extend(period_range(year, month))
         
-        for log in logs:
-            for key, value in log.items():
-                if isinstance(value, (datetime, date)):
-                    log[key] = value.isoformat()
+        logs = fetch_list(cursor, select_sql, query, params, keyset, limit, page_cursor, include_total)
         
-        return logs
+        return FastJSONResponse(logs)
     finally:
         conn.close()
 
 @app.get("/api/training-logs/{log_id}")
-async def get_training_log(log_id: int):
+def get_training_log(log_id: int):
     """특정 훈련일지 조회"""
     conn = get_db_connection()
     try:
@@ -2793,15 +2475,12 @@ async def get_training_log(log_id: int):
         conn.close()
 
 @app.post("/api/training-logs")
-async def create_training_log(data: dict):
+def create_training_log(data: dict):
     """훈련일지 생성"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # photo_urls 컬럼이 없으면 자동 생성
-        ensure_photo_urls_column(cursor, 'training_logs')
-        
         query = """
             INSERT INTO training_logs 
             (timetable_id, course_code, instructor_code, class_date, content, homework, notes, photo_urls)
@@ -2827,15 +2506,12 @@ async def create_training_log(data: dict):
         conn.close()
 
 @app.put("/api/training-logs/{log_id}")
-async def update_training_log(log_id: int, data: dict):
+def update_training_log(log_id: int, data: dict):
     """훈련일지 수정"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
         
-        # photo_urls 컬럼이 없으면 자동 생성
-        ensure_photo_urls_column(cursor, 'training_logs')
-        
         query = """
             UPDATE training_logs 
             SET content = %s, homework = %s, notes = %s, photo_urls = %s
@@ -2856,7 +2532,7 @@ async def update_training_log(log_id: int, data: dict):
         conn.close()
 
 @app.delete("/api/training-logs/{log_id}")
-async def delete_training_log(log_id: int):
+def delete_training_log(log_id: int):
     """훈련일지 삭제"""
     conn = get_db_connection()
     try:
@@ -2868,7 +2544,7 @@ async def delete_training_log(log_id: int):
         conn.close()
 
 @app.post("/api/training-logs/generate-content")
-async def generate_training_content(data: dict):
+def generate_training_content(data: dict):
     """AI를 이용한 훈련일지 수업 내용 자동 생성 (사용자 입력 기반 확장)"""
     subject_name = data.get('subject_name', '')
     sub_subjects = data.get('sub_subjects', [])  # 세부 교과목 리스트
@@ -2881,8 +2557,8 @@ async def generate_training_content(data: dict):
     if not user_input:
         raise HTTPException(status_code=400, detail="수업 내용을 먼저 입력해주세요 (최소 몇 단어라도)")
     
-    # Groq API 키 확인
-    groq_api_key = os.getenv('GROQ_API_KEY', '')
+    # LLM API 키 확인 (Groq 실패 시 Gemini)
+    api_keys = llm_api_keys()
     
     # 세부 교과목 텍스트 포맷팅
     sub_subjects_text = ""
@@ -3087,33 +2763,15 @@ async def generate_training_content(data: dict):
     )
     
     try:
-        if groq_api_key:
-            headers = {
-                "Authorization": f"Bearer {groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": "llama-3.3-70b-versatile",  # 업데이트된 모델로 변경
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 1000
-            }
-            
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=payload,
+        if any(api_keys.values()):
+            content = llm_gateway.complete_sync(
+                chat_messages(user_prompt, system_prompt),
+                model="llama-3.3-70b-versatile",
+                api_keys=api_keys,
+                temperature=0.7,
+                max_tokens=1000,
                 timeout=30
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Groq API 오류: {response.text}")
-            
-            content = response.json()['choices'][0]['message']['content']
+            ).text
         else:
             # API 키가 없으면 템플릿 기반 생성 (타입별 템플릿)
             if timetable_type == 'project':
@@ -3846,7 +3504,7 @@ def generate_report_template(student, counselings, counseling_text, style='forma
     return report
 
 @app.post("/api/ai/generate-report")
-async def generate_ai_report(data: dict):
+def generate_ai_report(data: dict):
     """AI를 이용한 생기부 작성"""
     student_id = data.get('student_id')
     style = data.get('style', 'formal')  # formal, friendly, detailed
@@ -3855,8 +3513,8 @@ async def generate_ai_report(data: dict):
     if not student_id:
         raise HTTPException(status_code=400, detail="학생 ID가 필요합니다")
     
-    # Groq API 키 확인 (없으면 무료 API 사용)
-    groq_api_key = os.getenv('GROQ_API_KEY', '')
+    # LLM API 키 확인 (없으면 템플릿 사용, Groq 실패 시 Gemini)
+    api_keys = llm_api_keys()
     
     conn = get_db_connection()
     try:
@@ -3910,33 +3568,15 @@ async def generate_ai_report(data: dict):
 """
         
         # Groq API 사용 (무료, 빠른 추론)
-        if groq_api_key:
-            headers = {
-                "Authorization": f"Bearer {groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": "llama-3.1-70b-versatile",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 2000
-            }
-            
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=payload,
+        if any(api_keys.values()):
+            ai_report = llm_gateway.complete_sync(
+                chat_messages(user_prompt, system_prompt),
+                model="llama-3.1-70b-versatile",
+                api_keys=api_keys,
+                temperature=0.7,
+                max_tokens=2000,
                 timeout=30
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Groq API 오류: {response.text}")
-            
-            ai_report = response.json()['choices'][0]['message']['content']
+            ).text
         else:
             # API 키가 없으면 스타일별 생기부 템플릿 생성
             ai_report = generate_report_template(student, counselings, counseling_text, style)
@@ -3959,7 +3599,7 @@ async def generate_ai_report(data: dict):
 # ==================== 헬스 체크 ====================
 
 @app.get("/api/status")
-async def api_status():
+def api_status():
     """API 상태 확인"""
     return {
         "message": "학급 관리 시스템 API",
@@ -3967,284 +3607,44 @@ async def api_status():
         "status": "running"
     }
 
-def generate_calculation_pdf(calculation_result: dict, course_code: str):
-    """과정 계산 결과 PDF 생성"""
-    try:
-        # 한글 폰트 등록
-        font_path = os.path.join(os.path.dirname(__file__), 'fonts', 'NanumGothic.ttf')
-        if os.path.exists(font_path):
-            pdfmetrics.registerFont(TTFont('NanumGothic', font_path))
-            font_name = 'NanumGothic'
-        else:
-            font_name = 'Helvetica'
-        
-        # PDF 파일 경로 (크로스 플랫폼 지원)
-        import tempfile
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"course_calculation_{course_code}_{timestamp}.pdf"
-        temp_dir = tempfile.gettempdir()
-        pdf_path = os.path.join(temp_dir, filename)
-        
-        # PDF 문서 생성
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-        story = []
-        
-        # 스타일 정의
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontName=font_name,
-            fontSize=18,
-            alignment=TA_CENTER,
-            spaceAfter=30
-        )
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontName=font_name,
-            fontSize=14,
-            spaceAfter=12
-        )
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontName=font_name,
-            fontSize=10,
-            leading=16
-        )
-        
-        # 제목
-        story.append(Paragraph(f'과정 자동 계산 보고서', title_style))
-        story.append(Paragraph(f'과정 코드: {course_code}', normal_style))
-        story.append(Spacer(1, 20))
-        
-        # 1. 기본 정보
-        story.append(Paragraph('1. 과정 기본 정보', heading_style))
-        basic_data = [
-            ['항목', '내용'],
-            ['과정 시작일', calculation_result['start_date']],
-            ['과정 종료일', calculation_result['final_end_date']],
-            ['총 교육시간', f"{calculation_result['total_hours']}시간"],
-            ['일일 수업시간', f"{calculation_result['daily_hours']}시간 (오전 {calculation_result['morning_hours']}h + 오후 {calculation_result['afternoon_hours']}h)"],
-            ['주간 수업시간', f"{calculation_result['daily_hours'] * 5}시간 (월~금)"]
-        ]
-        basic_table = Table(basic_data, colWidths=[100, 300])
-        basic_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(basic_table)
-        story.append(Spacer(1, 20))
-        
-        # 2. 단계별 상세
-        story.append(Paragraph('2. 교육 단계별 상세', heading_style))
-        phase_data = [
-            ['단계', '시간', '일수', '시작일', '종료일'],
-            ['이론', f"{calculation_result['lecture_hours']}h", f"{calculation_result['lecture_days']}일", 
-             calculation_result['start_date'], calculation_result['lecture_end_date']],
-            ['프로젝트', f"{calculation_result['project_hours']}h", f"{calculation_result['project_days']}일",
-             calculation_result['lecture_end_date'], calculation_result['project_end_date']],
-            ['현장실습', f"{calculation_result['workship_hours']}h", f"{calculation_result['workship_days']}일",
-             calculation_result['project_end_date'], calculation_result['workship_end_date']]
-        ]
-        phase_table = Table(phase_data, colWidths=[80, 70, 70, 90, 90])
-        phase_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(phase_table)
-        story.append(Spacer(1, 20))
-        
-        # 3. 일수 계산
-        story.append(Paragraph('3. 교육일수 분석', heading_style))
-        days_data = [
-            ['구분', '일수'],
-            ['총 기간', f"{calculation_result['total_days']}일"],
-            ['근무일', f"{calculation_result['work_days']}일"],
-            ['주말', f"{calculation_result['weekend_days']}일"],
-            ['공휴일', f"{calculation_result['holiday_count']}일"],
-            ['제외일 합계', f"{calculation_result['excluded_days']}일"]
-        ]
-        days_table = Table(days_data, colWidths=[200, 200])
-        days_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(days_table)
-        story.append(Spacer(1, 20))
-        
-        # 4. 공휴일 목록
-        story.append(Paragraph('4. 과정 기간 내 공휴일', heading_style))
-        story.append(Paragraph(f"공휴일: {calculation_result['holidays_formatted']}", normal_style))
-        story.append(Spacer(1, 20))
-        
-        # 5. 계산 공식
-        story.append(Paragraph('5. 계산 방식', heading_style))
-        story.append(Paragraph('• 근무일 계산: 주말(토,일) 및 공휴일 제외', normal_style))
-        story.append(Paragraph(f"• 일일 수업: {calculation_result['morning_hours']}시간(오전) + {calculation_result['afternoon_hours']}시간(오후) = {calculation_result['daily_hours']}시간", normal_style))
-        story.append(Paragraph(f"• 필요 근무일 = 총 교육시간({calculation_result['total_hours']}h) ÷ 일일시간({calculation_result['daily_hours']}h) = {calculation_result['work_days']}일", normal_style))
-        story.append(Spacer(1, 20))
-        
-        # 생성 정보
-        story.append(Spacer(1, 30))
-        story.append(Paragraph(f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M:%S')}", normal_style))
-        story.append(Paragraph("시스템: 바이오헬스교육관리시스템", normal_style))
-        
-        # PDF 빌드
-        doc.build(story)
-        
-        # FTP 업로드
-        try:
-            upload_to_ftp(pdf_path, f"course_reports/{filename}")
-            print(f"[OK] PDF FTP 업로드 완료: {filename}")
-        except Exception as e:
-            print(f"[WARN] PDF FTP 업로드 실패: {str(e)}")
-        
-        return pdf_path
-        
-    except Exception as e:
-        import traceback
-        print(f"PDF 생성 오류: {str(e)}")
-        print(traceback.format_exc())
-        raise
-
 def generate_detailed_calculation(start_date, lecture_hours, project_hours, workship_hours,
                                   morning_hours, afternoon_hours, holidays_detail,
                                   lecture_end_date, project_end_date, workship_end_date,
                                   lecture_days, project_days, intern_days,
                                   weekend_days, holiday_count,
-                                  lecture_weekdays=None):
-    """상세 계산 과정 생성 - 오전/오후 분할 고려"""
-    from datetime import timedelta
-    from collections import defaultdict
+                                  lecture_weekdays=None, calendar=None):
+    """상세 계산 과정 생성 - 오전/오후 분할 고려 (calendar: 근무일 달력, 없으면 캐시된 달력)"""
+    calendar = calendar or holiday_service.calendar()
     
     # 날짜 형식 헬퍼
     def format_date(d):
         weekdays = ['월', '화', '수', '목', '금', '토', '일']
         return f"{d.year}-{d.month:02d}-{d.day:02d} ({weekdays[d.weekday()]})"
     
-    # 공휴일 set 생성
-    holidays_set = set([h['date'] for h in holidays_detail]) if holidays_detail else set()
-    
-    def is_workday(date):
-        return date.weekday() < 5 and date not in holidays_set
-    
     # 상세 계산 로직 (오전/오후 분할 정확 처리, 날짜별 상세 표시)
     # allowed_weekdays: 수업 가능한 요일 목록 (1=월~5=금), None이면 모든 평일
     def calculate_stage_detail(stage_name, start, hours, morning_h, afternoon_h, start_at_afternoon=False, allowed_weekdays=None):
-        current = start
-        remaining = hours
-        monthly_hours = defaultdict(lambda: {'days': 0, 'hours': 0, 'detail': []})
-        all_dates = []  # 모든 날짜 기록
-
-        # 첫날 오후부터 시작하는 경우
-        first_day = True
-
-        # 오전/오후 둘 다 0이면 빈 결과 즉시 반환
-        if morning_h <= 0 and afternoon_h <= 0:
-            return start, start, {}, []
-
-        while remaining > 0:
-            if not is_workday(current):
-                current += timedelta(days=1)
-                continue
-
-            # 요일 제한이 있으면 해당 요일만 수업 배치
-            if allowed_weekdays is not None:
-                today_weekday = current.weekday() + 1  # 0(월)~4(금) → 1(월)~5(금)
-                if today_weekday not in allowed_weekdays:
-                    current += timedelta(days=1)
-                    continue
+        # 근무일별 오전/오후 배치를 한 번에 계산
+        schedule = calendar.schedule_hours(
+            start, hours, morning_h, afternoon_h, start_at_afternoon, allowed_weekdays
+        )
+        end_date = schedule.end_date
+        last_day_hours = schedule.last_day_hours
 
-            month_key = f"{current.year}년 {current.month}월"
-            day_hours = 0
-            time_str = ""
-
-            # 첫날이고 오후부터 시작하는 경우
-            if first_day and start_at_afternoon:
-                # 오후만
-                if remaining >= afternoon_h:
-                    day_hours = afternoon_h
-                    remaining -= afternoon_h
-                    time_str = f"오후 {afternoon_h}시간"
-                else:
-                    day_hours = remaining
-                    remaining = 0
-                    time_str = f"오후 {day_hours}시간"
-                first_day = False
+        all_dates = []  # 모든 날짜 기록
+        for day, morning_done, afternoon_done, cumulative in zip(
+            schedule.dates.tolist(), schedule.morning.tolist(),
+            schedule.afternoon.tolist(), schedule.cumulative.tolist()
+        ):
+            if morning_done > 0 and afternoon_done > 0:
+                time_str = f"오전 {morning_done}시간 + 오후 {afternoon_done}시간"
+            elif morning_done > 0:
+                time_str = f"오전 {morning_done}시간"
             else:
-                # 일반적인 경우: 오전 + 오후
-                morning_done = 0
-                afternoon_done = 0
-                
-                # 오전
-                if remaining >= morning_h:
-                    morning_done = morning_h
-                    remaining -= morning_h
-                elif remaining > 0:
-                    morning_done = remaining
-                    remaining = 0
-                
-                # 오후
-                if remaining >= afternoon_h:
-                    afternoon_done = afternoon_h
-                    remaining -= afternoon_h
-                elif remaining > 0:
-                    afternoon_done = remaining
-                    remaining = 0
-                
-                day_hours = morning_done + afternoon_done
-                
-                if morning_done > 0 and afternoon_done > 0:
-                    time_str = f"오전 {morning_done}시간 + 오후 {afternoon_done}시간"
-                elif morning_done > 0:
-                    time_str = f"오전 {morning_done}시간"
-                elif afternoon_done > 0:
-                    time_str = f"오후 {afternoon_done}시간"
-                
-                first_day = False
-            
-            if day_hours > 0:
-                monthly_hours[month_key]['hours'] += day_hours
-                monthly_hours[month_key]['days'] += 1
-                all_dates.append(f"    {format_date(current)}: {time_str} (누적: {hours - remaining}시간)")
-            
-            current += timedelta(days=1)
-        
-        # 종료일 찾기
-        end_date = current - timedelta(days=1)
-        while not is_workday(end_date):
-            end_date -= timedelta(days=1)
-        
-        # 종료 시간 판단
-        # 오후부터 시작한 경우: (hours - afternoon_h) % 8을 기준으로 계산
-        # 그 외: hours % 8을 기준으로 계산
-        if start_at_afternoon:
-            # 첫날 오후(4시간) + N일 + 마지막날
-            # 예: 220 = 4(첫날) + 208(26일) + 8(마지막날)
-            remaining_after_first = hours - afternoon_h
-            total_h = morning_h + afternoon_h
-            last_day_hours = (remaining_after_first % total_h) if total_h > 0 else 0
-        else:
-            total_h = morning_h + afternoon_h
-            last_day_hours = (hours % total_h) if total_h > 0 else 0
+                time_str = f"오후 {afternoon_done}시간"
+            all_dates.append(f"    {format_date(day)}: {time_str} (누적: {cumulative}시간)")
         
+        # 종료 시간 판단 (마지막 날 오전만 사용했으면 13:00)
         if last_day_hours == 0:
             end_time = "18:00"
         elif last_day_hours <= morning_h:
@@ -4262,8 +3662,8 @@ def generate_detailed_calculation(start_date, lecture_hours, project_hours, work
             summary += date_line + "\n"
         
         summary += "\n  [STAT] 월별 집계:\n"
-        for month, data in sorted(monthly_hours.items()):
-            summary += f"    {month}: 근무일 {data['days']}일, 수업시간 {data['hours']}시간\n"
+        for (year, month), (days, month_hours) in sorted(schedule.monthly().items()):
+            summary += f"    {year}년 {month}월: 근무일 {days}일, 수업시간 {month_hours}시간\n"
         
         summary += f"\n  [OK] 총: {hours}시간 완료\n"
         
@@ -4271,9 +3671,7 @@ def generate_detailed_calculation(start_date, lecture_hours, project_hours, work
         # last_day_hours == 0이면 오전+오후 모두 사용 → 다음은 다음날 오전부터
         # last_day_hours <= morning_h이면 오전만 사용 → 다음은 같은 날 오후부터
         # last_day_hours > morning_h이면 오전+오후 모두 사용 → 다음은 다음날 오전부터
-        ends_with_afternoon = (last_day_hours == 0 or last_day_hours > morning_h)
-        
-        return summary, end_date, ends_with_afternoon
+        return summary, end_date, schedule.ends_with_afternoon
     
     # 공휴일 정보 포맷팅
     holidays_str = ""
@@ -4290,10 +3688,8 @@ def generate_detailed_calculation(start_date, lecture_hours, project_hours, work
     
     # 프로젝트 시작일 결정
     if lecture_ends_afternoon:
-        # 이론이 하루 전체를 사용했다면 다음날부터
-        project_start = lecture_actual_end + timedelta(days=1)
-        while not is_workday(project_start):
-            project_start += timedelta(days=1)
+        # 이론이 하루 전체를 사용했다면 다음 근무일부터
+        project_start = calendar.next_workday(lecture_actual_end)
         project_starts_afternoon = False
     else:
         # 이론이 오전만 사용했다면 같은 날 오후부터
@@ -4306,9 +3702,7 @@ def generate_detailed_calculation(start_date, lecture_hours, project_hours, work
     
     # 현장실습 시작일 결정
     if project_ends_afternoon:
-        intern_start = project_actual_end + timedelta(days=1)
-        while not is_workday(intern_start):
-            intern_start += timedelta(days=1)
+        intern_start = calendar.next_workday(project_actual_end)
         intern_starts_afternoon = False
     else:
         intern_start = project_actual_end
@@ -4364,203 +3758,157 @@ def generate_detailed_calculation(start_date, lecture_hours, project_hours, work
     return details, actual_dates
     return details
 
-@app.post("/api/courses/calculate-dates")
-async def calculate_course_dates(data: dict):
+def compute_course_dates(data: dict) -> dict:
     """
-    과정 날짜 자동 계산 (공휴일 제외)
+    과정 날짜 자동 계산 결과 (공휴일 제외, DB 쓰기 없음)
     - start_date: 시작일
     - lecture_hours: 강의시간
     - project_hours: 프로젝트시간
     - workship_hours: 현장실습시간
     """
-    from datetime import timedelta
-    
-    try:
-        start_date_str = data.get('start_date')
-        lecture_hours = int(data.get('lecture_hours', 0))
-        project_hours = int(data.get('project_hours', 0))
-        workship_hours = int(data.get('workship_hours', 0))
-        daily_hours = int(data.get('daily_hours', 8))  # 일일 수업시간 (기본값 8시간)
-        morning_hours = int(data.get('morning_hours', 4))
-        afternoon_hours = int(data.get('afternoon_hours', 4))
-        course_code = data.get('course_code')
-
-        if not start_date_str:
-            raise HTTPException(status_code=400, detail="시작일은 필수입니다.")
-
-        if daily_hours <= 0:
-            raise HTTPException(status_code=400, detail="일일 수업시간(오전+오후)은 0보다 커야 합니다.")
+    start_date_str = data.get('start_date')
+    lecture_hours = int(data.get('lecture_hours', 0))
+    project_hours = int(data.get('project_hours', 0))
+    workship_hours = int(data.get('workship_hours', 0))
+    daily_hours = int(data.get('daily_hours', 8))  # 일일 수업시간 (기본값 8시간)
+    morning_hours = int(data.get('morning_hours', 4))
+    afternoon_hours = int(data.get('afternoon_hours', 4))
+    course_code = data.get('course_code')
 
-        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+    if not start_date_str:
+        raise HTTPException(status_code=400, detail="시작일은 필수입니다.")
 
-        # 교과목 요일 배정 조회 (이론 단계에서 사용)
-        lecture_weekdays = None  # None이면 모든 평일
-        if course_code:
-            conn_subj = get_db_connection()
-            cursor_subj = conn_subj.cursor(pymysql.cursors.DictCursor)
-            cursor_subj.execute("""
-                SELECT DISTINCT s.day_of_week
-                FROM course_subjects cs
-                JOIN subjects s ON cs.subject_code = s.code
-                WHERE cs.course_code = %s AND s.day_of_week IS NOT NULL AND s.day_of_week BETWEEN 1 AND 5
-            """, (course_code,))
-            weekday_rows = cursor_subj.fetchall()
-            cursor_subj.close()
-            conn_subj.close()
-            if weekday_rows:
-                lecture_weekdays = set(row['day_of_week'] for row in weekday_rows)
-
-        # 시간을 일수로 변환 (입력된 일일 시간 기준)
-        lecture_days = (lecture_hours + daily_hours - 1) // daily_hours  # 올림 처리
-        project_days = (project_hours + daily_hours - 1) // daily_hours
-        intern_days = (workship_hours + daily_hours - 1) // daily_hours
-
-        # 공휴일 가져오기
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # 시작일로부터 1년간의 공휴일 조회
-        end_year = start_date.year + 1
-        cursor.execute("""
-            SELECT holiday_date 
-            FROM holidays 
-            WHERE holiday_date >= %s 
-            AND YEAR(holiday_date) BETWEEN %s AND %s
-        """, (start_date_str, start_date.year, end_year))
-        
-        holidays_result = cursor.fetchall()
-        holidays = set(row[0] for row in holidays_result)
-        
-        cursor.close()
-        conn.close()
-        
-        # 근무일 계산 함수 (주말 및 공휴일 제외)
-        # allowed_weekdays: 수업 가능한 요일 (1=월~5=금), None이면 모든 평일
-        def add_business_days(start, days_to_add, allowed_weekdays=None):
-            current = start
-            added_days = 0
+    if daily_hours <= 0:
+        raise HTTPException(status_code=400, detail="일일 수업시간(오전+오후)은 0보다 커야 합니다.")
 
-            while added_days < days_to_add:
-                current += timedelta(days=1)
-                if current.weekday() < 5 and current not in holidays:
-                    if allowed_weekdays is None or (current.weekday() + 1) in allowed_weekdays:
-                        added_days += 1
+    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
 
-            return current
+    # 교과목 요일 배정 조회 (이론 단계에서 사용)
+    lecture_weekdays = None  # None이면 모든 평일
+    if course_code:
+        conn_subj = get_db_connection()
+        cursor_subj = conn_subj.cursor(pymysql.cursors.DictCursor)
+        cursor_subj.execute("""
+            SELECT DISTINCT s.day_of_week
+            FROM course_subjects cs
+            JOIN subjects s ON cs.subject_code = s.code
+            WHERE cs.course_code = %s AND s.day_of_week IS NOT NULL AND s.day_of_week BETWEEN 1 AND 5
+        """, (course_code,))
+        weekday_rows = cursor_subj.fetchall()
+        cursor_subj.close()
+        conn_subj.close()
+        if weekday_rows:
+            lecture_weekdays = set(row['day_of_week'] for row in weekday_rows)
+
+    # 시간을 일수로 변환 (입력된 일일 시간 기준)
+    lecture_days = (lecture_hours + daily_hours - 1) // daily_hours  # 올림 처리
+    project_days = (project_hours + daily_hours - 1) // daily_hours
+    intern_days = (workship_hours + daily_hours - 1) // daily_hours
+
+    # 근무일 달력 (공휴일 변경 시에만 다시 적재)
+    calendar = holiday_service.calendar()
+
+    # 각 단계별 종료일 계산 (이론은 요일 제한 적용)
+    lecture_end_date = calendar.add_workdays(start_date, lecture_days, allowed_weekdays=lecture_weekdays)
+    project_end_date = calendar.add_workdays(lecture_end_date, project_days)
+    workship_end_date = calendar.add_workdays(project_end_date, intern_days)
+    
+    # 과정 기간 내 공휴일 목록 생성 (상세)
+    holidays_in_period = []
+    holidays_detail = []  # 상세 정보 저장
+    for holiday_date, holiday_name in calendar.holidays_between(start_date, workship_end_date):
+        holidays_in_period.append(holiday_date)
+        holidays_detail.append({
+            'date': holiday_date,
+            'name': holiday_name,
+            'weekday': ['월', '화', '수', '목', '금', '토', '일'][holiday_date.weekday()]
+        })
+    
+    # 공휴일을 그룹화 (연속된 날짜는 범위로 표시)
+    holiday_strings = []
+    if holidays_in_period:
+        holidays_in_period.sort()
+        i = 0
+        while i < len(holidays_in_period):
+            start_holiday = holidays_in_period[i]
+            end_holiday = start_holiday
+            
+            # 연속된 날짜 찾기
+            j = i + 1
+            while j < len(holidays_in_period) and (holidays_in_period[j] - holidays_in_period[j-1]).days == 1:
+                end_holiday = holidays_in_period[j]
+                j += 1
+            
+            # 포맷팅 (연속이면 범위로, 아니면 단일 날짜로)
+            if start_holiday == end_holiday:
+                holiday_strings.append(start_holiday.strftime('%-m/%-d'))
+            else:
+                holiday_strings.append(f"{start_holiday.strftime('%-m/%-d')}~{end_holiday.strftime('%-m/%-d')}")
+            
+            i = j
+    
+    # 주말 일수 계산
+    weekend_days = calendar.weekend_days(start_date, workship_end_date)
+    
+    # 제외 일수 (주말 + 공휴일)
+    excluded_days = weekend_days + len(holidays_in_period)
+    
+    # 상세 계산 과정 생성 (정확한 종료일 포함)
+    calculation_details, actual_dates = generate_detailed_calculation(
+        start_date, lecture_hours, project_hours, workship_hours,
+        morning_hours, afternoon_hours, holidays_detail,
+        lecture_end_date, project_end_date, workship_end_date,
+        lecture_days, project_days, intern_days,
+        weekend_days, len(holidays_in_period),
+        lecture_weekdays=lecture_weekdays, calendar=calendar
+    )
+    
+    # 정확한 종료일 사용
+    lecture_end_date = actual_dates['lecture_end']
+    project_end_date = actual_dates['project_end']
+    workship_end_date = actual_dates['workship_end']
+    
+    result = {
+        "start_date": start_date_str,
+        "lecture_end_date": lecture_end_date.strftime('%Y-%m-%d'),
+        "project_end_date": project_end_date.strftime('%Y-%m-%d'),
+        "workship_end_date": workship_end_date.strftime('%Y-%m-%d'),
+        "final_end_date": workship_end_date.strftime('%Y-%m-%d'),
+        "total_days": (workship_end_date - start_date).days,
+        "lecture_days": lecture_days,
+        "project_days": project_days,
+        "workship_days": intern_days,
+        "work_days": lecture_days + project_days + intern_days,
+        "weekend_days": weekend_days,
+        "holiday_count": len(holidays_in_period),
+        "excluded_days": excluded_days,
+        "holidays_formatted": ", ".join(holiday_strings) if holiday_strings else "없음",
+        "holidays_detail": holidays_detail,
+        "lecture_hours": lecture_hours,
+        "project_hours": project_hours,
+        "workship_hours": workship_hours,
+        "total_hours": lecture_hours + project_hours + workship_hours,
+        "morning_hours": morning_hours,
+        "afternoon_hours": afternoon_hours,
+        "daily_hours": daily_hours,
+        "course_code": data.get('course_code', ''),
+        "calculation_details": calculation_details
+    }
+    return result
 
-        # 각 단계별 종료일 계산 (이론은 요일 제한 적용)
-        lecture_end_date = add_business_days(start_date, lecture_days, allowed_weekdays=lecture_weekdays)
-        project_end_date = add_business_days(lecture_end_date, project_days)
-        workship_end_date = add_business_days(project_end_date, intern_days)
-        
-        # 총 일수 계산 (실제 캘린더 일수)
-        total_days = (workship_end_date - start_date).days
-        
-        # 과정 기간 내 공휴일 목록 생성 (상세)
-        holidays_in_period = []
-        holidays_detail = []  # 상세 정보 저장
-        current = start_date
-        
-        # 공휴일 이름 조회를 위한 DB 연결
-        conn_holiday = get_db_connection()
-        cursor_holiday = conn_holiday.cursor(pymysql.cursors.DictCursor)
-        
-        while current <= workship_end_date:
-            if current in holidays:
-                # 공휴일 이름 조회
-                cursor_holiday.execute(
-                    "SELECT name FROM holidays WHERE holiday_date = %s",
-                    (current,)
-                )
-                holiday_info = cursor_holiday.fetchone()
-                holiday_name = holiday_info['name'] if holiday_info else '공휴일'
-                
-                holidays_in_period.append(current)
-                holidays_detail.append({
-                    'date': current,
-                    'name': holiday_name,
-                    'weekday': ['월', '화', '수', '목', '금', '토', '일'][current.weekday()]
-                })
-            current += timedelta(days=1)
-        
-        cursor_holiday.close()
-        conn_holiday.close()
-        
-        # 공휴일을 그룹화 (연속된 날짜는 범위로 표시)
-        holiday_strings = []
-        if holidays_in_period:
-            holidays_in_period.sort()
-            i = 0
-            while i < len(holidays_in_period):
-                start_holiday = holidays_in_period[i]
-                end_holiday = start_holiday
-                
-                # 연속된 날짜 찾기
-                j = i + 1
-                while j < len(holidays_in_period) and (holidays_in_period[j] - holidays_in_period[j-1]).days == 1:
-                    end_holiday = holidays_in_period[j]
-                    j += 1
-                
-                # 포맷팅 (연속이면 범위로, 아니면 단일 날짜로)
-                if start_holiday == end_holiday:
-                    holiday_strings.append(start_holiday.strftime('%-m/%-d'))
-                else:
-                    holiday_strings.append(f"{start_holiday.strftime('%-m/%-d')}~{end_holiday.strftime('%-m/%-d')}")
-                
-                i = j
-        
-        # 주말 일수 계산
-        weekend_days = 0
-        current = start_date
-        while current <= workship_end_date:
-            if current.weekday() >= 5:  # 토요일(5), 일요일(6)
-                weekend_days += 1
-            current += timedelta(days=1)
-        
-        # 제외 일수 (주말 + 공휴일)
-        excluded_days = weekend_days + len(holidays_in_period)
-        
-        # 상세 계산 과정 생성 (정확한 종료일 포함)
-        calculation_details, actual_dates = generate_detailed_calculation(
-            start_date, lecture_hours, project_hours, workship_hours,
-            morning_hours, afternoon_hours, holidays_detail,
-            lecture_end_date, project_end_date, workship_end_date,
-            lecture_days, project_days, intern_days,
-            weekend_days, len(holidays_in_period),
-            lecture_weekdays=lecture_weekdays
-        )
-        
-        # 정확한 종료일 사용
-        lecture_end_date = actual_dates['lecture_end']
-        project_end_date = actual_dates['project_end']
-        workship_end_date = actual_dates['workship_end']
-        
-        result = {
-            "start_date": start_date_str,
-            "lecture_end_date": lecture_end_date.strftime('%Y-%m-%d'),
-            "project_end_date": project_end_date.strftime('%Y-%m-%d'),
-            "workship_end_date": workship_end_date.strftime('%Y-%m-%d'),
-            "final_end_date": workship_end_date.strftime('%Y-%m-%d'),
-            "total_days": (workship_end_date - start_date).days,
-            "lecture_days": lecture_days,
-            "project_days": project_days,
-            "workship_days": intern_days,
-            "work_days": lecture_days + project_days + intern_days,
-            "weekend_days": weekend_days,
-            "holiday_count": len(holidays_in_period),
-            "excluded_days": excluded_days,
-            "holidays_formatted": ", ".join(holiday_strings) if holiday_strings else "없음",
-            "holidays_detail": holidays_detail,
-            "lecture_hours": lecture_hours,
-            "project_hours": project_hours,
-            "workship_hours": workship_hours,
-            "total_hours": lecture_hours + project_hours + workship_hours,
-            "morning_hours": morning_hours,
-            "afternoon_hours": afternoon_hours,
-            "daily_hours": daily_hours,
-            "course_code": data.get('course_code', ''),
-            "calculation_details": calculation_details
-        }
+@app.post("/api/courses/calculate-dates")
+def calculate_course_dates(data: dict):
+    """
+    과정 날짜 자동 계산 (공휴일 제외)
+    - start_date: 시작일
+    - lecture_hours: 강의시간
+    - project_hours: 프로젝트시간
+    - workship_hours: 현장실습시간
+    - generate_pdf: True면 계산서 PDF 생성 작업 등록 (pdf_job_id / pdf_url 반환)
+    """
+    try:
+        result = compute_course_dates(data)
+        calculation_details = result['calculation_details']
         
         # course_code가 있으면 비고란에 상세 계산 과정 저장
         course_code = data.get('course_code')
@@ -4589,6 +3937,7 @@ async def calculate_course_dates(data: dict):
                     WHERE code = %s
                 """, (notes_text, course_code))
                 conn_update.commit()
+                ref_cache.invalidate('courses')
                 cursor_update.close()
                 conn_update.close()
                 
@@ -4617,17 +3966,17 @@ async def calculate_course_dates(data: dict):
                     
                     timetable_data = {
                         'course_code': course_code,
-                        'start_date': start_date_str,
-                        'lecture_hours': lecture_hours,
-                        'project_hours': project_hours,
-                        'workship_hours': workship_hours,
-                        'morning_hours': morning_hours,
-                        'afternoon_hours': afternoon_hours,
+                        'start_date': result['start_date'],
+                        'lecture_hours': result['lecture_hours'],
+                        'project_hours': result['project_hours'],
+                        'workship_hours': result['workship_hours'],
+                        'morning_hours': result['morning_hours'],
+                        'afternoon_hours': result['afternoon_hours'],
                         'subject_codes': subject_codes
                     }
                     # 시간표 생성 로직 호출 (동일 함수 재사용)
                     from fastapi.responses import Response
-                    timetable_result = await auto_generate_timetables(timetable_data)
+                    timetable_result = auto_generate_timetables(timetable_data)
                     result['timetable_generated'] = True
                     result['timetable_count'] = timetable_result.get('generated_count', 0)
                 except Exception as e:
@@ -4635,12 +3984,15 @@ async def calculate_course_dates(data: dict):
                     result['timetable_generated'] = False
                     result['timetable_error'] = str(e)
         
-        # PDF 생성 옵션이 있으면 PDF도 생성
+        # PDF 생성 옵션이 있으면 계산서 생성 작업 등록 (응답은 기다리지 않음)
         if data.get('generate_pdf', False):
             try:
-                pdf_path = generate_calculation_pdf(result, data.get('course_code', 'COURSE'))
+                job = pdf_service.submit_job('course_calculation', [
+                    calculation_pdf_document(result, course_code or 'COURSE')
+                ], archive_name=f"course_calculation_{course_code or 'COURSE'}")
                 result['pdf_generated'] = True
-                result['pdf_path'] = pdf_path
+                result['pdf_job_id'] = job.id
+                result['pdf_url'] = f"/api/pdf/jobs/{job.id}/download"
             except Exception as e:
                 print(f"PDF 생성 실패: {str(e)}")
                 result['pdf_generated'] = False
@@ -4648,33 +4000,208 @@ async def calculate_course_dates(data: dict):
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"날짜 계산 실패: {str(e)}")
 
-@app.post("/api/ai/generate-training-logs")
-async def generate_ai_training_logs(data: dict):
-    """AI 훈련일지 자동 생성"""
-    timetable_ids = data.get('timetable_ids', [])
-    prompt_guide = data.get('prompt', '')
-    delete_before_create = data.get('delete_before_create', False)
-    
-    if not timetable_ids:
-        raise HTTPException(status_code=400, detail="시간표 ID가 필요합니다")
-    
+# ==================== PDF 보고서 ====================
+
+def calculation_pdf_document(result: dict, course_code: str):
+    """과정 계산서 PDF 작업 항목 (파일명, payload)"""
+    return f"course_calculation_{course_code}.pdf", {'result': result, 'course_code': course_code}
+
+def pdf_response(content: bytes, filename: str, media_type: str = 'application/pdf') -> Response:
+    from urllib.parse import quote
+    # 학생 이름 등 한글 파일명은 RFC 5987 형식으로
+    return Response(content=content, media_type=media_type, headers={
+        'Content-Disposition': f"attachment; filename*=UTF-8''{quote(filename)}",
+        'Cache-Control': 'no-store'
+    })
+
+def course_calculation_input(course: dict) -> dict:
+    """courses 행 → compute_course_dates 입력"""
+    start_date = course['start_date']
+    return {
+        'course_code': course['code'],
+        'start_date': start_date.strftime('%Y-%m-%d') if hasattr(start_date, 'strftime') else str(start_date)[:10],
+        'lecture_hours': course.get('lecture_hours') or 0,
+        'project_hours': course.get('project_hours') or 0,
+        'workship_hours': course.get('internship_hours') or 0,
+        'morning_hours': course.get('morning_hours') or 4,
+        'afternoon_hours': course.get('afternoon_hours') or 4,
+        'daily_hours': (course.get('morning_hours') or 4) + (course.get('afternoon_hours') or 4),
+    }
+
+def load_courses_for_pdf(course_codes: Optional[List[str]] = None) -> List[dict]:
+    """시작일이 있는 과정 (course_codes가 없으면 전체)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        success_count = 0
-        failed_count = 0
-        
-        for timetable_id in timetable_ids:
-            try:
-                # 시간표 정보 가져오기
-                cursor.execute("""
-                    SELECT t.*, 
-                           c.name as course_name,
-                           s.name as subject_name,
-                           i.name as instructor_name
+        query = """
+            SELECT code, name, start_date, lecture_hours, project_hours, internship_hours,
+                   morning_hours, afternoon_hours
+            FROM courses
+            WHERE start_date IS NOT NULL
+        """
+        params = []
+        if course_codes:
+            query += f" AND code IN ({', '.join(['%s'] * len(course_codes))})"
+            params = list(course_codes)
+        cursor.execute(query + " ORDER BY code", params)
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+@app.get("/api/courses/{course_code}/calculation-pdf")
+def download_course_calculation_pdf(course_code: str):
+    """과정 계산서 PDF (메모리에서 생성해 바로 응답)"""
+    courses = load_courses_for_pdf([course_code])
+    if not courses:
+        raise HTTPException(status_code=404, detail="시작일이 등록된 과정을 찾을 수 없습니다")
+    try:
+        result = compute_course_dates(course_calculation_input(courses[0]))
+        filename, payload = calculation_pdf_document(result, course_code)
+        return pdf_response(pdf_service.render('course_calculation', payload), filename)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF 생성 실패: {str(e)}")
+
+@app.post("/api/pdf/course-calculations")
+def create_course_calculation_pdfs(data: dict = None):
+    """
+    과정 계산서 PDF 일괄 생성 작업 등록
+    - course_codes: 과정 코드 목록 (없으면 시작일이 있는 전체 과정)
+    진행률은 GET /api/pdf/jobs/{job_id}, 결과는 .../download (ZIP)
+    """
+    course_codes = (data or {}).get('course_codes') or None
+    documents = []
+    skipped = {}
+    for course in load_courses_for_pdf(course_codes):
+        try:
+            result = compute_course_dates(course_calculation_input(course))
+        except HTTPException as e:
+            skipped[course['code']] = e.detail
+            continue
+        except Exception as e:
+            skipped[course['code']] = str(e)
+            continue
+        documents.append(calculation_pdf_document(result, course['code']))
+    if not documents:
+        raise HTTPException(status_code=404, detail="PDF를 생성할 과정이 없습니다")
+    job = pdf_service.submit_job('course_calculation', documents, archive_name='course_calculations')
+    status = job.status()
+    status['skipped'] = skipped
+    return status
+
+@app.post("/api/pdf/student-reports")
+def create_student_report_pdfs(data: dict):
+    """
+    과정 학생 보고서 PDF 일괄 생성 작업 등록 (학생별 기본 정보 + 상담 내역)
+    - course_code: 과정 코드
+    - student_ids: 학생 ID 목록 (선택, 없으면 과정 전체)
+    """
+    course_code = data.get('course_code')
+    student_ids = data.get('student_ids') or []
+    if not course_code and not student_ids:
+        raise HTTPException(status_code=400, detail="course_code 또는 student_ids가 필요합니다")
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        query = """
+            SELECT s.id, s.code, s.name, s.birth_date, s.education, s.interests, s.career_path,
+                   s.course_code, c.name AS course_name
+            FROM students s
+            LEFT JOIN courses c ON s.course_code = c.code
+            WHERE 1=1
+        """
+        params = []
+        if course_code:
+            query += " AND s.course_code = %s"
+            params.append(course_code)
+        if student_ids:
+            query += f" AND s.id IN ({', '.join(['%s'] * len(student_ids))})"
+            params.extend(student_ids)
+        cursor.execute(query + " ORDER BY s.code", params)
+        students = cursor.fetchall()
+        if not students:
+            raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다")
+
+        # 상담 내역은 한 번에 조회해 학생별로 묶음
+        ids = [s['id'] for s in students]
+        cursor.execute(f"""
+            SELECT student_id, consultation_date, consultation_type, main_topic, content
+            FROM consultations
+            WHERE student_id IN ({', '.join(['%s'] * len(ids))})
+            ORDER BY consultation_date
+        """, ids)
+        consultations = {}
+        for row in cursor.fetchall():
+            consultations.setdefault(row.pop('student_id'), []).append(row)
+    finally:
+        conn.close()
+
+    documents = [
+        (f"student_report_{s['code'] or s['id']}_{s['name']}.pdf",
+         {'student': s, 'consultations': consultations.get(s['id'], [])})
+        for s in students
+    ]
+    job = pdf_service.submit_job('student_report', documents,
+                                 archive_name=f"student_reports_{course_code or 'selected'}")
+    return job.status()
+
+@app.get("/api/pdf/stats")
+def get_pdf_stats():
+    """PDF 생성 수 / 실패 수 / 진행 중 작업 수"""
+    return pdf_service.stats()
+
+@app.get("/api/pdf/jobs/{job_id}")
+def get_pdf_job(job_id: str):
+    """PDF 생성 작업 진행률"""
+    job = pdf_service.job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF 작업을 찾을 수 없습니다 (만료되었을 수 있습니다)")
+    return job.status()
+
+@app.get("/api/pdf/jobs/{job_id}/download")
+def download_pdf_job(job_id: str):
+    """PDF 생성 작업 결과 (문서 1개면 PDF, 여러 개면 ZIP)"""
+    job = pdf_service.job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF 작업을 찾을 수 없습니다 (만료되었을 수 있습니다)")
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"PDF 생성 중입니다 ({job.status()['progress']}%)")
+    if not job.results:
+        raise HTTPException(status_code=500, detail="PDF 생성에 모두 실패했습니다")
+    content, filename, media_type = job.output()
+    return pdf_response(content, filename, media_type)
+
+@app.post("/api/ai/generate-training-logs")
+def generate_ai_training_logs(data: dict):
+    """AI 훈련일지 자동 생성"""
+    timetable_ids = data.get('timetable_ids', [])
+    prompt_guide = data.get('prompt', '')
+    delete_before_create = data.get('delete_before_create', False)
+    
+    if not timetable_ids:
+        raise HTTPException(status_code=400, detail="시간표 ID가 필요합니다")
+    
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        success_count = 0
+        failed_count = 0
+        
+        for timetable_id in timetable_ids:
+            try:
+                # 시간표 정보 가져오기
+                cursor.execute("""
+                    SELECT t.*, 
+                           c.name as course_name,
+                           s.name as subject_name,
+                           i.name as instructor_name
                     FROM timetables t
                     LEFT JOIN courses c ON t.course_code = c.code
                     LEFT JOIN subjects s ON t.subject_code = s.code
@@ -4850,7 +4377,7 @@ async def generate_ai_training_logs(data: dict):
         conn.close()
 
 @app.post("/api/counselings/ai-generate")
-async def generate_ai_counseling(data: dict):
+def generate_ai_counseling(data: dict):
     """AI 상담일지 자동 생성"""
     student_code = data.get('student_code')
     course_code = data.get('course_code')
@@ -4939,7 +4466,7 @@ async def generate_ai_counseling(data: dict):
         conn.close()
 
 @app.post("/api/ai/replace-timetable")
-async def replace_timetable(data: dict):
+def replace_timetable(data: dict):
     """AI 시간표 대체: 시간표 날짜 변경 및 원래 날짜를 공휴일로 등록"""
     course_code = data.get('course_code')
     original_date = data.get('original_date')
@@ -4984,16 +4511,18 @@ async def replace_timetable(data: dict):
         cursor.execute("""
             SELECT id FROM holidays
             WHERE holiday_date = %s
+            ORDER BY id
+            LIMIT 1
         """, (original_date,))
         existing_holiday = cursor.fetchone()
         
         if existing_holiday:
-            # 기존 공휴일 업데이트
+            # 기존 공휴일 업데이트 (같은 날짜 공휴일이 여러 개면 첫 행만 - (날짜, 이름) UNIQUE 키)
             cursor.execute("""
                 UPDATE holidays
                 SET name = %s
-                WHERE holiday_date = %s
-            """, (holiday_name, original_date))
+                WHERE id = %s
+            """, (holiday_name, existing_holiday['id']))
         else:
             # 새 공휴일 등록
             cursor.execute("""
@@ -5002,6 +4531,7 @@ async def replace_timetable(data: dict):
             """, (original_date, holiday_name))
         
         conn.commit()
+        ref_cache.invalidate('holidays')
         
         return {
             "success": True,
@@ -5030,7 +4560,7 @@ async def replace_timetable(data: dict):
             conn.close()
 
 @app.post("/api/upload-image")
-async def upload_image(
+def upload_image(
     file: UploadFile = File(...),
     category: str = Query(..., description="guidance, train, student, teacher, team")
 ):
@@ -5064,53 +4594,25 @@ async def upload_image(
             )
         
         # 파일 크기 체크 (100MB 제한)
-        contents = await file.read()
-        file_size = len(contents)
-        await file.seek(0)  # 파일 처음으로 되돌림
+        file.file.seek(0, 2)
+        file_size = file.file.tell()
+        file.file.seek(0)
         
         if file_size > 100 * 1024 * 1024:
             raise HTTPException(status_code=413, detail=f"파일 크기는 100MB를 초과할 수 없습니다 (현재: {file_size / 1024 / 1024:.2f}MB)")
         
-        # 원본 파일명 보존 (타임스탬프 접두어로 중복 방지)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_id = str(uuid.uuid4())[:8]
-        
-        # 원본 파일명에서 확장자 제거
-        original_name = os.path.splitext(file.filename)[0]
-        
-        # 안전한 파일명으로 변환 (ASCII 문자만 허용)
-        # 한글/특수문자는 언더스코어로, 영문/숫자/-/_/.만 유지
-        safe_name = ""
-        for c in original_name:
-            if c.isascii() and (c.isalnum() or c in ('-', '_', '.')):
-                safe_name += c
-            else:
-                safe_name += '_'
-        
-        # 연속된 언더스코어 제거
-        import re
-        safe_name = re.sub(r'_+', '_', safe_name)
-        safe_name = safe_name.strip('_')
-        
-        # 너무 긴 파일명은 자르기
-        if len(safe_name) > 50:
-            safe_name = safe_name[:50]
-        
-        # 파일명이 비어있으면 file로 대체
-        if not safe_name:
-            safe_name = "file"
-        
-        new_filename = f"{timestamp}_{unique_id}_{safe_name}{file_ext}"
-        
-        # 스트리밍 FTP 업로드 (메모리 절약)
-        file_url = await upload_stream_to_ftp(file, new_filename, category)
+        # 내용 해시 파일명으로 스트리밍 FTP 업로드 (같은 파일이 이미 있으면 전송 생략)
+        stored = store_upload(file.file, file_ext, category)
+        file_url = stored.url
+        new_filename = stored.filename
         
         return {
             "success": True,
             "url": file_url,
             "filename": new_filename,
             "original_filename": file.filename,  # 원본 파일명 추가
-            "size": file_size
+            "size": file_size,
+            "deduplicated": stored.deduplicated
         }
         
     except HTTPException:
@@ -5119,7 +4621,7 @@ async def upload_image(
         raise HTTPException(status_code=500, detail=f"이미지 업로드 실패: {str(e)}")
 
 @app.post("/api/upload-image-base64")
-async def upload_image_base64(data: dict):
+def upload_image_base64(data: dict):
     """
     Base64 인코딩된 이미지를 FTP 서버에 업로드 (모바일 카메라 촬영용)
     
@@ -5159,19 +4661,15 @@ async def upload_image_base64(data: dict):
         if len(file_data) > 100 * 1024 * 1024:
             raise HTTPException(status_code=413, detail=f"파일 크기는 100MB를 초과할 수 없습니다 (현재: {len(file_data) / 1024 / 1024:.2f}MB)")
         
-        # 고유한 파일명 생성
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_id = str(uuid.uuid4())[:8]
-        new_filename = f"{timestamp}_{unique_id}{file_ext}"
-        
-        # FTP 업로드
-        file_url = upload_to_ftp(file_data, new_filename, category)
+        # FTP 업로드 (내용 해시 파일명, 같은 파일이 이미 있으면 전송 생략)
+        stored = store_upload(io.BytesIO(file_data), file_ext, category)
         
         return {
             "success": True,
-            "url": file_url,
-            "filename": new_filename,
-            "size": len(file_data)
+            "url": stored.url,
+            "filename": stored.filename,
+            "size": len(file_data),
+            "deduplicated": stored.deduplicated
         }
         
     except HTTPException:
@@ -5180,7 +4678,7 @@ async def upload_image_base64(data: dict):
         raise HTTPException(status_code=500, detail=f"이미지 업로드 실패: {str(e)}")
 
 @app.get("/api/download-image")
-async def download_image(url: str = Query(..., description="FTP URL to download")):
+def download_image(request: Request, url: str = Query(..., description="FTP URL to download")):
     """
     FTP 서버의 이미지를 다운로드하는 프록시 API
     
@@ -5197,43 +4695,13 @@ async def download_image(url: str = Query(..., description="FTP URL to download"
         
         # URL에서 정보 추출
         # ftp://bitnmeta2.synology.me:2121/homes/ha/camFTP/BH2025/guidance/file.jpg
+        check_ftp_url_server(url)
         url_parts = url.replace('ftp://', '').split('/', 1)
-        host_port = url_parts[0]
         file_path = url_parts[1] if len(url_parts) > 1 else ''
         
-        # 호스트와 포트 분리
-        if ':' in host_port:
-            host, port = host_port.split(':')
-            port = int(port)
-        else:
-            host = host_port
-            port = 21
-        
         # 파일명 추출
         filename = file_path.split('/')[-1]
         
-        # FTP 연결 및 다운로드
-        ftp = FTP()
-        ftp.encoding = 'utf-8'  # 한글 파일명 지원
-        ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
-        ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
-        
-        # 파일 다운로드
-        file_data = io.BytesIO()
-        ftp.retrbinary(f'RETR /{file_path}', file_data.write)
-        ftp.quit()
-        
-        # 파일 데이터 가져오기
-        file_data.seek(0)
-        file_bytes = file_data.read()
-        
-        # 임시 파일로 저장 (크로스 플랫폼 지원)
-        import tempfile
-        temp_dir = tempfile.gettempdir()
-        temp_filename = os.path.join(temp_dir, filename)
-        with open(temp_filename, 'wb') as f:
-            f.write(file_bytes)
-        
         # 파일 확장자로 MIME 타입 결정
         ext = os.path.splitext(filename)[1].lower()
         media_type_map = {
@@ -5259,12 +4727,14 @@ async def download_image(url: str = Query(..., description="FTP URL to download"
         inline_types = ['.pdf', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.txt']
         disposition_type = 'inline' if ext in inline_types else 'attachment'
         
-        return FileResponse(
-            temp_filename,
-            media_type=media_type,
-            filename=filename,
+        # 캐시에 있으면 파일에서, 없으면 FTP에서 받는 대로 스트리밍 (Range 지원)
+        return ftp_file_cache.respond(
+            request,
+            f'/{file_path}',
+            media_type,
             headers={
-                'Content-Disposition': f'{disposition_type}; filename="{filename}"'
+                'Content-Disposition': f'{disposition_type}; filename="{filename}"',
+                'Cache-Control': 'private, max-age=86400'
             }
         )
         
@@ -5275,77 +4745,60 @@ async def download_image(url: str = Query(..., description="FTP URL to download"
 
 @app.get("/api/thumbnail")
 @app.head("/api/thumbnail")
-async def get_thumbnail(url: str = Query(..., description="FTP URL")):
+def get_thumbnail(
+    url: str = Query(..., description="FTP URL"),
+    size: int = Query(200, description="썸네일 크기 (64, 200, 800)"),
+    format: str = Query('jpeg', description="이미지 형식 (jpeg, webp)")
+):
     """
     이미지 썸네일 제공 API
     
     Args:
         url: FTP URL
+        size: 긴 변 최대 크기 (px)
+        format: jpeg 또는 webp
     
     Returns:
-        썸네일 이미지 (있으면 제공, 없으면 FTP에서 다운로드하여 생성)
+        썸네일 이미지 (있으면 제공, 없으면 FTP 원본으로 모든 크기/형식을 생성)
     """
+    fmt = format.lower()
+    if fmt == 'jpg':
+        fmt = 'jpeg'
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 썸네일 크기: {size} (가능: {', '.join(map(str, THUMBNAIL_SIZES))})")
+    if fmt not in THUMBNAIL_FORMATS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 썸네일 형식: {format} (가능: {', '.join(THUMBNAIL_FORMATS)})")
+    
     try:
         # URL에서 파일명 추출
         filename = url.split('/')[-1]
-        thumb_filename = f"thumb_{filename}"
-        # 크로스 플랫폼 지원 경로
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        thumbnails_dir = os.path.join(backend_dir, 'thumbnails')
-        thumb_path = os.path.join(thumbnails_dir, thumb_filename)
-        
-        # 썸네일 디렉토리 생성 (없으면)
-        os.makedirs(thumbnails_dir, exist_ok=True)
-        
-        # 썸네일이 있으면 반환
-        if os.path.exists(thumb_path):
-            return FileResponse(
-                thumb_path,
-                media_type='image/jpeg',
-                headers={
-                    'Cache-Control': 'public, max-age=86400'  # 1일 캐싱
-                }
-            )
         
-        # 썸네일이 없으면 FTP에서 원본 다운로드하여 생성
+        # FTP URL 파싱
+        check_ftp_url_server(url)
+        url_parts = url.replace('ftp://', '').split('/', 1)
+        file_path = url_parts[1] if len(url_parts) > 1 else ''
+        
+        def load_original() -> bytes:
+            # 원본 (로컬 디스크 캐시, 없으면 FTP에서 받아 저장)
+            return ftp_file_cache.fetch(f'/{file_path}').read()
+        
+        # 썸네일이 없으면 생성 (같은 이미지의 동시 요청은 하나의 작업을 함께 대기)
         try:
-            # FTP URL 파싱
-            url_parts = url.replace('ftp://', '').split('/', 1)
-            file_path = url_parts[1] if len(url_parts) > 1 else ''
-            
-            # FTP 연결 및 다운로드
-            ftp = FTP()
-            ftp.encoding = 'utf-8'  # 한글 파일명 지원
-            ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
-            ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
-            
-            # 파일 다운로드
-            file_data = io.BytesIO()
-            ftp.retrbinary(f'RETR /{file_path}', file_data.write)
-            ftp.quit()
-            
-            # 파일 데이터 가져오기
-            file_data.seek(0)
-            file_bytes = file_data.read()
-            
-            # 썸네일 생성
-            thumb_result = create_thumbnail(file_bytes, filename)
-            
-            if thumb_result and os.path.exists(thumb_path):
-                return FileResponse(
-                    thumb_path,
-                    media_type='image/jpeg',
-                    headers={
-                        'Cache-Control': 'public, max-age=86400'
-                    }
-                )
-            else:
-                # 썸네일 생성 실패
-                raise HTTPException(status_code=404, detail="썸네일 생성 실패")
-                
+            thumb_path = thumbnail_service.get(filename, size, fmt, load_original)
         except Exception as e:
             print(f"FTP 다운로드 및 썸네일 생성 실패: {str(e)}")
             raise HTTPException(status_code=404, detail="썸네일을 생성할 수 없습니다")
+        
+        if not os.path.exists(thumb_path):
+            raise HTTPException(status_code=404, detail="썸네일 생성 실패")
+        
+        return FileResponse(
+            thumb_path,
+            media_type=MEDIA_TYPES[fmt],
+            headers={
+                'Cache-Control': 'public, max-age=86400'  # 1일 캐싱
+            }
+        )
             
     except HTTPException:
         raise
@@ -5353,7 +4806,7 @@ async def get_thumbnail(url: str = Query(..., description="FTP URL")):
         raise HTTPException(status_code=500, detail=f"썸네일 조회 실패: {str(e)}")
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """헬스 체크"""
     try:
         conn = get_db_connection()
@@ -5362,10 +4815,60 @@ async def health_check():
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
 
+@app.get("/api/db-pool/stats")
+def get_db_pool_stats():
+    """DB 커넥션 풀 상태 (대여 대기 시간, 포화도)"""
+    return db_pool.stats()
+
+@app.get("/api/event-loop/stats")
+def get_event_loop_stats():
+    """이벤트 루프 지연(블로킹 감지) / 스레드풀 사용 현황"""
+    return loop_stats()
+
+@app.get("/api/llm/stats")
+def get_llm_stats():
+    """LLM 제공자별 호출 수 / 재시도 / 429 / 전환 / 지연시간 / 토큰 사용량"""
+    return llm_gateway.stats()
+
+@app.get("/api/ftp-pool/stats")
+def get_ftp_pool_stats():
+    """FTP 세션 풀 상태 (재사용/재연결 횟수)"""
+    return ftp_pool.stats()
+
+@app.get("/api/ftp-cache/stats")
+def get_ftp_cache_stats():
+    """FTP 원본 파일 캐시 적중/미적중/삭제 횟수"""
+    return ftp_file_cache.stats()
+
+@app.get("/api/thumbnail/stats")
+def get_thumbnail_stats():
+    """썸네일 생성/재사용/중복 요청 병합 횟수"""
+    return thumbnail_service.stats()
+
+@app.get("/api/content-store/stats")
+def get_content_store_stats():
+    """내용 주소 저장소 객체 수 / 용량 / 참조 없는 객체 수"""
+    return content_store.stats()
+
+@app.post("/api/content-store/gc")
+def collect_content_store_garbage(
+    dry_run: bool = True,
+    grace_hours: int = Query(24, ge=1, description="마지막 업로드 후 보호 시간")
+):
+    """참조 컬럼을 훑어(mark) 참조 없는 저장 객체 삭제 (dry_run=true면 목록만 반환)"""
+    return content_store.collect_garbage(grace_hours=grace_hours, dry_run=dry_run)
+
+@app.get("/api/ref-cache/stats")
+def get_ref_cache_stats():
+    """참조 데이터 캐시 적중률 / 항목 수 (근무일 달력 캐시 포함)"""
+    stats = ref_cache.stats()
+    stats['holiday_service'] = holiday_service.stats()
+    return stats
+
 # ==================== 인증 API ====================
 
 @app.post("/api/auth/login")
-async def login(credentials: dict):
+def login(credentials: dict):
     """
     통합 로그인 API
     - 이름으로 강사 또는 학생 자동 구분 로그인
@@ -5425,10 +4928,7 @@ async def login(credentials: dict):
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
         # 1️⃣ 먼저 강사 테이블에서 검색
-        cursor.execute("SHOW COLUMNS FROM instructors LIKE 'password'")
-        has_instructor_password = cursor.fetchone() is not None
-        
-        ensure_profile_photo_columns(cursor, 'instructors')
+        has_instructor_password = 'password' in table_columns(cursor, 'instructors')
         
         if has_instructor_password:
             cursor.execute("""
@@ -5514,13 +5014,6 @@ async def login(credentials: dict):
             }
         
         # 3️⃣ 강사가 아니면 학생 테이블에서 검색
-        ensure_profile_photo_columns(cursor, 'students')
-        
-        cursor.execute("SHOW COLUMNS FROM students LIKE 'password'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE students ADD COLUMN password VARCHAR(100) DEFAULT 'kdt2025'")
-            conn.commit()
-        
         cursor.execute("""
             SELECT s.*, 
                    c.name as course_name,
@@ -5536,9 +5029,6 @@ async def login(credentials: dict):
 
         if not student:
             # 4️⃣ 학생도 아니면 신규가입 신청자 테이블에서 검색
-            ensure_student_registrations_table(cursor)
-            conn.commit()
-
             cursor.execute("""
                 SELECT * FROM student_registrations
                 WHERE name = %s
@@ -5619,7 +5109,7 @@ async def login(credentials: dict):
         conn.close()
 
 @app.post("/api/auth/student-login")
-async def student_login(credentials: dict):
+def student_login(credentials: dict):
     """
     학생 로그인 API
     - 학생 이름과 비밀번호로 로그인
@@ -5638,15 +5128,6 @@ async def student_login(credentials: dict):
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # profile_photo와 attachments 컬럼이 없으면 자동 생성
-        ensure_profile_photo_columns(cursor, 'students')
-        
-        # password 컬럼이 없으면 추가
-        cursor.execute("SHOW COLUMNS FROM students LIKE 'password'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE students ADD COLUMN password VARCHAR(100) DEFAULT 'kdt2025'")
-            conn.commit()
-        
         # 학생 조회 (이름으로)
         cursor.execute("""
             SELECT s.*, 
@@ -5695,7 +5176,7 @@ async def student_login(credentials: dict):
         conn.close()
 
 @app.post("/api/auth/change-password")
-async def change_password(data: dict):
+def change_password(data: dict):
     """
     비밀번호 변경 API
     - old_password가 있으면: 본인이 비밀번호 변경 (기존 비밀번호 확인 필요)
@@ -5712,12 +5193,6 @@ async def change_password(data: dict):
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
-        # password 컬럼이 없으면 추가
-        cursor.execute("SHOW COLUMNS FROM instructors LIKE 'password'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE instructors ADD COLUMN password VARCHAR(100) DEFAULT 'kdt2025'")
-            conn.commit()
-        
         # 기존 비밀번호 확인 (old_password가 제공된 경우에만)
         if old_password:
             cursor.execute("SELECT password FROM instructors WHERE code = %s", (instructor_code,))
@@ -5746,6 +5221,7 @@ async def change_password(data: dict):
         """, (new_password, instructor_code))
         
         conn.commit()
+        ref_cache.invalidate('instructors')
         
         return {
             "success": True,
@@ -5761,7 +5237,7 @@ async def change_password(data: dict):
         conn.close()
 
 @app.get("/", response_class=HTMLResponse)
-async def serve_index():
+def serve_index():
     """프론트엔드 index.html 서빙"""
     try:
         index_path = os.path.join(frontend_dir, "index.html")
@@ -5773,7 +5249,7 @@ async def serve_index():
 # ==================== 팀 활동일지 API ====================
 
 @app.get("/api/team-activity-logs")
-async def get_team_activity_logs(project_id: Optional[int] = None):
+def get_team_activity_logs(project_id: Optional[int] = None):
     """팀 활동일지 조회"""
     conn = get_db_connection()
     try:
@@ -5802,7 +5278,7 @@ async def get_team_activity_logs(project_id: Optional[int] = None):
         conn.close()
 
 @app.post("/api/team-activity-logs")
-async def create_team_activity_log(log: dict):
+def create_team_activity_log(log: dict):
     """팀 활동일지 생성"""
     conn = get_db_connection()
     try:
@@ -5835,7 +5311,7 @@ async def create_team_activity_log(log: dict):
         conn.close()
 
 @app.put("/api/team-activity-logs/{log_id}")
-async def update_team_activity_log(log_id: int, log: dict):
+def update_team_activity_log(log_id: int, log: dict):
     """팀 활동일지 수정"""
     conn = get_db_connection()
     try:
@@ -5873,7 +5349,7 @@ async def update_team_activity_log(log_id: int, log: dict):
         conn.close()
 
 @app.delete("/api/team-activity-logs/{log_id}")
-async def delete_team_activity_log(log_id: int):
+def delete_team_activity_log(log_id: int):
     """팀 활동일지 삭제"""
     conn = get_db_connection()
     try:
@@ -5895,7 +5371,7 @@ async def delete_team_activity_log(log_id: int):
         conn.close()
 
 @app.get("/login", response_class=HTMLResponse)
-async def serve_login():
+def serve_login():
     """로그인 페이지 서빙"""
     try:
         login_path = os.path.join(frontend_dir, "login.html")
@@ -5905,7 +5381,7 @@ async def serve_login():
         raise HTTPException(status_code=404, detail="Login page not found")
 
 @app.get("/manifest.json")
-async def serve_manifest():
+def serve_manifest():
     """manifest.json 서빙"""
     from fastapi.responses import FileResponse
     manifest_path = os.path.join(frontend_dir, "manifest.json")
@@ -5914,7 +5390,7 @@ async def serve_manifest():
     raise HTTPException(status_code=404, detail="manifest.json not found")
 
 @app.get("/{filename}.html", response_class=HTMLResponse)
-async def serve_html(filename: str):
+def serve_html(filename: str):
     """프론트엔드 HTML 파일 서빙"""
     try:
         html_path = os.path.join(frontend_dir, f"{filename}.html")
@@ -5926,7 +5402,7 @@ async def serve_html(filename: str):
         raise HTTPException(status_code=404, detail=f"{filename}.html not found")
 
 @app.get("/{filename:path}.js")
-async def serve_js(filename: str):
+def serve_js(filename: str):
     """프론트엔드 JS 파일 서빙"""
     from fastapi.responses import FileResponse
     js_path = os.path.join(frontend_dir, f"{filename}.js")
@@ -5935,7 +5411,7 @@ async def serve_js(filename: str):
     raise HTTPException(status_code=404, detail=f"{filename}.js not found")
 
 @app.get("/{filename:path}.css")
-async def serve_css(filename: str):
+def serve_css(filename: str):
     """프론트엔드 CSS 파일 서빙"""
     from fastapi.responses import FileResponse
     css_path = os.path.join(frontend_dir, f"{filename}.css")
@@ -5944,7 +5420,7 @@ async def serve_css(filename: str):
     raise HTTPException(status_code=404, detail=f"{filename}.css not found")
 
 @app.get("/favicon.ico")
-async def serve_favicon():
+def serve_favicon():
     """favicon.ico 서빙"""
     from fastapi.responses import FileResponse
     favicon_path = os.path.join(frontend_dir, "favicon.ico")
@@ -5953,7 +5429,7 @@ async def serve_favicon():
     raise HTTPException(status_code=404, detail="favicon.ico not found")
 
 @app.get("/{filename}.png")
-async def serve_png(filename: str):
+def serve_png(filename: str):
     """PNG 이미지 파일 서빙"""
     from fastapi.responses import FileResponse
     png_path = os.path.join(frontend_dir, f"{filename}.png")
@@ -5966,7 +5442,7 @@ from fastapi.responses import StreamingResponse
 from urllib.parse import urlparse, unquote
 
 @app.get("/api/proxy-image")
-async def proxy_ftp_image(url: str):
+def proxy_ftp_image(request: Request, url: str):
     """FTP 이미지를 HTTP로 프록시"""
     try:
         # URL 파싱
@@ -5974,24 +5450,11 @@ async def proxy_ftp_image(url: str):
         
         if parsed.scheme != 'ftp':
             raise HTTPException(status_code=400, detail="FTP URL만 지원됩니다")
-        
-        # FTP 연결
-        ftp = FTP()
-        ftp.encoding = 'utf-8'  # 한글 파일명 지원
-        ftp.connect(parsed.hostname or FTP_CONFIG['host'], parsed.port or FTP_CONFIG['port'])
-        ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
+        check_ftp_url_server(url)
         
         # 파일 경로 추출 (URL 디코딩)
         file_path = unquote(parsed.path)
         
-        # 파일을 메모리로 읽기
-        file_data = io.BytesIO()
-        ftp.retrbinary(f'RETR {file_path}', file_data.write)
-        ftp.quit()
-        
-        # 파일 포인터를 처음으로 이동
-        file_data.seek(0)
-        
         # 파일 확장자로 MIME 타입 결정
         ext = file_path.lower().split('.')[-1]
         mime_types = {
@@ -6004,30 +5467,19 @@ async def proxy_ftp_image(url: str):
         }
         media_type = mime_types.get(ext, 'image/jpeg')
         
-        return StreamingResponse(file_data, media_type=media_type)
+        # 캐시에 있으면 파일에서, 없으면 FTP에서 받는 대로 스트리밍
+        return ftp_file_cache.respond(request, file_path, media_type, headers={'Cache-Control': 'private, max-age=86400'})
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"FTP 이미지 프록시 에러: {e}")
         raise HTTPException(status_code=500, detail=f"이미지를 불러올 수 없습니다: {str(e)}")
 
 # ==================== 시스템 설정 API ====================
 
-def ensure_system_settings_table(cursor):
-    """system_settings 테이블이 없으면 생성"""
-    try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_settings (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                setting_key VARCHAR(50) UNIQUE NOT NULL,
-                setting_value TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            )
-        """)
-    except Exception as e:
-        pass
-
 @app.get("/api/og-logo")
-async def get_og_logo():
+def get_og_logo():
     """Open Graph용 로고 이미지 - 시스템 설정의 로고로 리다이렉트"""
     conn = get_db_connection()
     cursor = conn.cursor(pymysql.cursors.DictCursor)
@@ -6050,15 +5502,12 @@ async def get_og_logo():
         conn.close()
 
 @app.get("/api/system-settings")
-async def get_system_settings():
+def get_system_settings():
     """시스템 설정 조회"""
     conn = get_db_connection()
     cursor = conn.cursor(pymysql.cursors.DictCursor)
     
     try:
-        ensure_system_settings_table(cursor)
-        conn.commit()
-        
         cursor.execute("SELECT * FROM system_settings")
         settings = cursor.fetchall()
         
@@ -6086,7 +5535,7 @@ async def get_system_settings():
         conn.close()
 
 @app.post("/api/system-settings")
-async def update_system_settings(
+def update_system_settings(
     system_title: Optional[str] = Form(None),
     system_subtitle1: Optional[str] = Form(None),
     system_subtitle2: Optional[str] = Form(None),
@@ -6111,9 +5560,6 @@ async def update_system_settings(
     cursor = conn.cursor()
 
     try:
-        ensure_system_settings_table(cursor)
-        conn.commit()
-
         updates = {
             'system_title': system_title,
             'system_subtitle1': system_subtitle1,
@@ -6157,17 +5603,10 @@ async def update_system_settings(
                     url_parts = logo_url.replace('ftp://', '').split('/', 1)
                     file_path = url_parts[1] if len(url_parts) > 1 else ''
 
-                    ftp = FTP()
-                    ftp.encoding = 'utf-8'
-                    ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
-                    ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
-
-                    file_data = io.BytesIO()
-                    ftp.retrbinary(f'RETR /{file_path}', file_data.write)
-                    ftp.quit()
+                    logo_bytes = ftp_pool.call(lambda ftp: ftp.read_bytes(f'/{file_path}'))
 
                     with open(og_image_path, 'wb') as f:
-                        f.write(file_data.getvalue())
+                        f.write(logo_bytes)
                 else:
                     # 일반 URL인 경우 직접 다운로드
                     import requests
@@ -6188,45 +5627,13 @@ async def update_system_settings(
 
 # ==================== 신규가입 (학생 등록 신청) API ====================
 
-def ensure_student_registrations_table(cursor):
-    """student_registrations 테이블이 없으면 생성"""
-    try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS student_registrations (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                birth_date VARCHAR(20),
-                gender VARCHAR(10),
-                phone VARCHAR(50),
-                email VARCHAR(100),
-                address TEXT,
-                interests TEXT,
-                education TEXT,
-                introduction TEXT,
-                course_code VARCHAR(50),
-                profile_photo TEXT,
-                status ENUM('pending', 'approved', 'rejected') DEFAULT 'pending',
-                processed_at DATETIME,
-                processed_by VARCHAR(50),
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                INDEX idx_status (status),
-                INDEX idx_created_at (created_at)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-    except Exception as e:
-        pass
-
 @app.get("/api/student-registrations")
-async def get_student_registrations(status: Optional[str] = None):
+def get_student_registrations(status: Optional[str] = None):
     """신규가입 신청 목록 조회"""
     conn = get_db_connection()
     cursor = conn.cursor(pymysql.cursors.DictCursor)
 
     try:
-        ensure_student_registrations_table(cursor)
-        conn.commit()
-
         query = "SELECT * FROM student_registrations WHERE 1=1"
         params = []
 
@@ -6253,14 +5660,12 @@ async def get_student_registrations(status: Optional[str] = None):
         conn.close()
 
 @app.post("/api/student-registrations")
-async def create_student_registration(data: dict):
+def create_student_registration(data: dict):
     """신규가입 신청 등록"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        ensure_student_registrations_table(cursor)
-
         name = data.get('name')
         if not name:
             raise HTTPException(status_code=400, detail="이름은 필수입니다")
@@ -6322,13 +5727,14 @@ async def create_student_registration(data: dict):
         conn.close()
 
 @app.put("/api/student-registrations/{registration_id}/approve")
-async def approve_student_registration(registration_id: int, data: dict):
+def approve_student_registration(registration_id: int, data: dict):
     """신규가입 승인 - 학생 DB로 이동"""
     conn = get_db_connection()
     cursor = conn.cursor(pymysql.cursors.DictCursor)
 
     try:
-        ensure_student_registrations_table(cursor)
+        # 학생 코드 할당 락 (신청 조회 전에 잡아야 다른 요청이 커밋한 코드가 보임)
+        acquire_student_code_lock(cursor)
 
         # 신청 정보 조회
         cursor.execute("SELECT * FROM student_registrations WHERE id = %s", (registration_id,))
@@ -6341,9 +5747,7 @@ async def approve_student_registration(registration_id: int, data: dict):
             raise HTTPException(status_code=400, detail="이미 처리된 신청입니다")
 
         # 학생 코드 생성
-        cursor.execute("SELECT MAX(CAST(SUBSTRING(code, 2) AS UNSIGNED)) as max_code FROM students WHERE code LIKE 'S%'")
-        result = cursor.fetchone()
-        next_num = (result['max_code'] or 0) + 1
+        next_num = next_student_number(cursor)
         student_code = f"S{next_num:03d}"
 
         # 학생 테이블에 추가 (비밀번호는 생년월일 6자리)
@@ -6385,6 +5789,7 @@ async def approve_student_registration(registration_id: int, data: dict):
         """, (processed_by, registration_id))
 
         conn.commit()
+        ref_cache.invalidate('courses')
 
         print(f"[OK] 신규가입 승인 완료: 신청ID={registration_id}, 학생ID={student_id}, 학생코드={student_code}")
 
@@ -6400,18 +5805,17 @@ async def approve_student_registration(registration_id: int, data: dict):
         print(f"[ERROR] 신규가입 승인 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
+        release_student_code_lock(cursor)
         cursor.close()
         conn.close()
 
 @app.put("/api/student-registrations/{registration_id}/reject")
-async def reject_student_registration(registration_id: int, data: dict):
+def reject_student_registration(registration_id: int, data: dict):
     """신규가입 거절"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        ensure_student_registrations_table(cursor)
-
         # 신청 상태 확인
         cursor.execute("SELECT status FROM student_registrations WHERE id = %s", (registration_id,))
         result = cursor.fetchone()
@@ -6445,7 +5849,7 @@ async def reject_student_registration(registration_id: int, data: dict):
         conn.close()
 
 @app.delete("/api/student-registrations/{registration_id}")
-async def delete_student_registration(registration_id: int):
+def delete_student_registration(registration_id: int):
     """신규가입 신청 삭제"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -6463,72 +5867,25 @@ async def delete_student_registration(registration_id: int):
 
 # ==================== 학생 수업일지 API ====================
 
-def ensure_class_notes_table(cursor):
-    """class_notes 테이블이 없으면 생성하고 필요한 컬럼 추가"""
-    try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS class_notes (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                student_id INT,
-                instructor_code VARCHAR(50),
-                note_date DATE NOT NULL,
-                content TEXT,
-                photo_urls TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                INDEX idx_student_date (student_id, note_date),
-                INDEX idx_instructor_code (instructor_code, note_date)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-        
-        # 기존 테이블에 instructor_code 컬럼이 없으면 추가
-        try:
-            cursor.execute("""
-                ALTER TABLE class_notes
-                ADD COLUMN instructor_code VARCHAR(50) AFTER student_id
-            """)
-        except Exception:
-            pass  # 이미 존재하면 무시
-
-        # 기존 테이블에 photo_urls 컬럼이 없으면 추가
-        try:
-            cursor.execute("""
-                ALTER TABLE class_notes
-                ADD COLUMN photo_urls TEXT AFTER content
-            """)
-        except Exception:
-            pass  # 이미 존재하면 무시
-
-        # student_id를 NULL 허용으로 변경
-        try:
-            cursor.execute("""
-                ALTER TABLE class_notes
-                MODIFY COLUMN student_id INT NULL
-            """)
-        except Exception:
-            pass
-
-        # note_date를 DATE에서 DATETIME으로 변경 (시간 정보 저장)
-        try:
-            cursor.execute("""
-                ALTER TABLE class_notes
-                MODIFY COLUMN note_date DATETIME NOT NULL
-            """)
-        except Exception as e:
-            pass
-    except Exception as e:
-        pass
-
 @app.get("/api/class-notes")
-async def get_all_class_notes(student_id: Optional[int] = None, instructor_code: Optional[str] = None):
-    """모든 수업일지 조회 (필터링 옵션)"""
+def get_all_class_notes(
+    student_id: Optional[int] = None,
+    instructor_code: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False
+):
+    """모든 수업일지 조회 (필터링 옵션, fields=로 컬럼 선택, limit/cursor로 페이지 조회)"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        ensure_class_notes_table(cursor)
-        conn.commit()
         
-        query = "SELECT * FROM class_notes WHERE 1=1"
+        keyset = Keyset([('note_date', 'note_date', True), ('id', 'id', True)])
+        select_sql = select_fields(
+            fields, table_fields('class_notes', table_columns(cursor, 'class_notes')), keyset.names
+        ) or "*"
+        query = "FROM class_notes WHERE 1=1"
         params = []
         
         if student_id is not None:
@@ -6541,29 +5898,18 @@ async def get_all_class_notes(student_id: Optional[int] = None, instructor_code:
             query += " AND instructor_code = %s AND student_id IS NULL"
             params.append(instructor_code)
         
-        query += " ORDER BY note_date DESC"
-        
-        cursor.execute(query, params)
-        notes = cursor.fetchall()
-        
-        # datetime 변환
-        for note in notes:
-            for key, value in note.items():
-                if isinstance(value, (datetime, date)):
-                    note[key] = value.isoformat()
+        notes = fetch_list(cursor, select_sql, query, params, keyset, limit, page_cursor, include_total)
         
-        return notes
+        return FastJSONResponse(notes)
     finally:
         conn.close()
 
 @app.get("/api/class-notes/{note_id}")
-async def get_class_note_by_id(note_id: int):
+def get_class_note_by_id(note_id: int):
     """ID로 특정 수업일지 조회"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        ensure_class_notes_table(cursor)
-        conn.commit()
         
         cursor.execute("SELECT * FROM class_notes WHERE id = %s", (note_id,))
         note = cursor.fetchone()
@@ -6581,12 +5927,11 @@ async def get_class_note_by_id(note_id: int):
         conn.close()
 
 @app.post("/api/class-notes")
-async def create_class_note(data: dict):
+def create_class_note(data: dict):
     """수업일지 생성 또는 수정"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        ensure_class_notes_table(cursor)
         
         note_id = data.get('id')  # ID가 있으면 수정
         student_id = data.get('student_id')
@@ -6644,12 +5989,11 @@ async def create_class_note(data: dict):
         conn.close()
 
 @app.put("/api/class-notes/{note_id}")
-async def update_class_note(note_id: int, data: dict):
+def update_class_note(note_id: int, data: dict):
     """수업일지 수정"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        ensure_class_notes_table(cursor)
         
         note_date = data.get('note_date')
         content = data.get('content', '')
@@ -6688,7 +6032,7 @@ async def update_class_note(note_id: int, data: dict):
         conn.close()
 
 @app.delete("/api/class-notes/{note_id}")
-async def delete_class_note(note_id: int):
+def delete_class_note(note_id: int):
     """수업일지 삭제"""
     conn = get_db_connection()
     try:
@@ -6704,7 +6048,7 @@ async def delete_class_note(note_id: int):
         conn.close()
 
 @app.post("/api/upload-note-file")
-async def upload_note_file(
+def upload_note_file(
     file: UploadFile = File(...),
     note_id: int = Form(...)
 ):
@@ -6747,28 +6091,10 @@ async def upload_note_file(
                 detail=f"파일 크기는 100MB 이하여야 합니다 (현재: {file_size / 1024 / 1024:.2f}MB)"
             )
         
-        # 파일명 생성
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_id = str(uuid.uuid4())[:8]
-        original_name = os.path.splitext(file.filename)[0]
-        
-        # 안전한 파일명
-        safe_name = ""
-        for c in original_name:
-            if c.isascii() and (c.isalnum() or c in ('-', '_', '.')):
-                safe_name += c
-            else:
-                safe_name += '_'
-        
-        import re
-        safe_name = re.sub(r'_+', '_', safe_name).strip('_')[:50]
-        if not safe_name:
-            safe_name = "file"
-        
-        new_filename = f"{timestamp}_{unique_id}_{safe_name}{file_ext}"
-        
-        # FTP 업로드 (student 카테고리)
-        file_url = await upload_stream_to_ftp(file, new_filename, "student")
+        # FTP 업로드 (student 카테고리, 내용 해시 파일명)
+        stored = store_upload(file.file, file_ext, "student")
+        file_url = stored.url
+        new_filename = stored.filename
         
         # DB에 파일 URL 추가
         cursor = conn.cursor()
@@ -6812,32 +6138,12 @@ async def upload_note_file(
         conn.close()
 
 # ==================== 강사 SSIRN 메모 관리 ====================
-def ensure_instructor_notes_table(cursor):
-    """instructor_notes 테이블이 없으면 생성"""
-    try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS instructor_notes (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                instructor_id INT NOT NULL,
-                note_date DATE NOT NULL,
-                content TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                FOREIGN KEY (instructor_id) REFERENCES instructors(id) ON DELETE CASCADE,
-                INDEX idx_instructor_date (instructor_id, note_date)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-    except Exception as e:
-        pass
-
 @app.get("/api/instructors/{instructor_id}/notes")
-async def get_instructor_notes(instructor_id: int, note_date: Optional[str] = None):
+def get_instructor_notes(instructor_id: int, note_date: Optional[str] = None):
     """강사의 SSIRN 메모 조회"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        ensure_instructor_notes_table(cursor)
-        conn.commit()
         
         if note_date:
             # 특정 날짜의 메모 조회
@@ -6873,12 +6179,11 @@ async def get_instructor_notes(instructor_id: int, note_date: Optional[str] = No
         conn.close()
 
 @app.post("/api/instructors/{instructor_id}/notes")
-async def create_or_update_instructor_note(instructor_id: int, data: dict):
+def create_or_update_instructor_note(instructor_id: int, data: dict):
     """강사 SSIRN 메모 생성 또는 업데이트"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        ensure_instructor_notes_table(cursor)
         
         note_date = data.get('note_date')
         content = data.get('content', '')
@@ -6924,7 +6229,7 @@ async def create_or_update_instructor_note(instructor_id: int, data: dict):
         conn.close()
 
 @app.delete("/api/instructors/{instructor_id}/notes/{note_id}")
-async def delete_instructor_note(instructor_id: int, note_id: int):
+def delete_instructor_note(instructor_id: int, note_id: int):
     """강사 SSIRN 메모 삭제"""
     conn = get_db_connection()
     try:
@@ -6940,27 +6245,8 @@ async def delete_instructor_note(instructor_id: int, note_id: int):
         conn.close()
 
 # ==================== 공지사항 관리 ====================
-def ensure_notices_table(cursor):
-    """notices 테이블이 없으면 생성"""
-    try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS notices (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                title VARCHAR(500) NOT NULL,
-                content TEXT NOT NULL,
-                start_date DATE NOT NULL,
-                end_date DATE NOT NULL,
-                created_by VARCHAR(50),
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                INDEX idx_dates (start_date, end_date)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-    except Exception as e:
-        pass
-
 @app.get("/api/notices")
-async def get_notices(
+def get_notices(
     active_only: bool = False,
     notice_type: Optional[str] = None,
     target_code: Optional[str] = None
@@ -6969,8 +6255,6 @@ async def get_notices(
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-        ensure_notices_table(cursor)
-        conn.commit()
 
         query = """
             SELECT n.*,
@@ -7002,19 +6286,13 @@ async def get_notices(
         cursor.execute(query, params)
         notices = cursor.fetchall()
 
-        # datetime 변환
-        for notice in notices:
-            for key, value in notice.items():
-                if isinstance(value, (datetime, date)):
-                    notice[key] = value.isoformat()
-
-        return notices
+        return FastJSONResponse(notices)
     finally:
         conn.close()
 
 
 @app.get("/api/notices/student/{student_id}")
-async def get_student_notices(student_id: int, active_only: bool = True):
+def get_student_notices(student_id: int, active_only: bool = True):
     """학생용 공지사항 조회 (전체 + 해당 과정 + 수강 중인 교과목)"""
     conn = get_db_connection()
     try:
@@ -7066,18 +6344,12 @@ async def get_student_notices(student_id: int, active_only: bool = True):
         cursor.execute(query, params)
         notices = cursor.fetchall()
 
-        # datetime 변환
-        for notice in notices:
-            for key, value in notice.items():
-                if isinstance(value, (datetime, date)):
-                    notice[key] = value.isoformat()
-
-        return notices
+        return FastJSONResponse(notices)
     finally:
         conn.close()
 
 @app.get("/api/notices/{notice_id}")
-async def get_notice(notice_id: int):
+def get_notice(notice_id: int):
     """특정 공지사항 조회"""
     conn = get_db_connection()
     try:
@@ -7098,13 +6370,11 @@ async def get_notice(notice_id: int):
         conn.close()
 
 @app.post("/api/notices")
-async def create_notice(data: dict):
+def create_notice(data: dict):
     """공지사항 생성"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        ensure_notices_table(cursor)
-        conn.commit()
 
         query = """
             INSERT INTO notices (notice_type, target_code, title, content, start_date, end_date, created_by)
@@ -7126,7 +6396,7 @@ async def create_notice(data: dict):
         conn.close()
 
 @app.put("/api/notices/{notice_id}")
-async def update_notice(notice_id: int, data: dict):
+def update_notice(notice_id: int, data: dict):
     """공지사항 수정"""
     conn = get_db_connection()
     try:
@@ -7156,7 +6426,7 @@ async def update_notice(notice_id: int, data: dict):
         conn.close()
 
 @app.delete("/api/notices/{notice_id}")
-async def delete_notice(notice_id: int):
+def delete_notice(notice_id: int):
     """공지사항 삭제"""
     conn = get_db_connection()
     try:
@@ -7173,33 +6443,12 @@ async def delete_notice(notice_id: int):
 
 # ==================== 예진이 챗봇 API ====================
 @app.post("/api/aesong-chat")
-async def aesong_chat(data: dict, request: Request):
+def aesong_chat(data: dict, request: Request):
     """예진이 AI 챗봇 - GROQ, Gemini, 또는 Gemma 모델 사용"""
     message = data.get('message', '')
     character = data.get('character', '예진이')  # 캐릭터 이름 받기
     model = data.get('model', 'groq')  # 사용할 모델 (groq, gemini, gemma)
     
-    # 헤더에서 API 키 가져오기 (프론트엔드에서 전달)
-    groq_api_key_header = request.headers.get('X-GROQ-API-Key', '')
-    gemini_api_key_header = request.headers.get('X-Gemini-API-Key', '')
-    
-    # DB에서 API 키 가져오기 (헤더가 없을 경우)
-    conn = get_db_connection()
-    cursor = conn.cursor(pymysql.cursors.DictCursor)
-    
-    try:
-        cursor.execute("SELECT setting_key, setting_value FROM system_settings WHERE setting_key IN ('groq_api_key', 'gemini_api_key')")
-        db_settings = {row['setting_key']: row['setting_value'] for row in cursor.fetchall()}
-    except:
-        db_settings = {}
-    finally:
-        cursor.close()
-        conn.close()
-    
-    # API 키 우선순위: 헤더 > DB > 환경변수
-    groq_api_key = groq_api_key_header or db_settings.get('groq_api_key', '') or os.getenv('GROQ_API_KEY', '')
-    gemini_api_key = gemini_api_key_header or db_settings.get('gemini_api_key', '') or os.getenv('GOOGLE_CLOUD_TTS_API_KEY', '')
-    
     if not message:
         raise HTTPException(status_code=400, detail="메시지가 필요합니다")
     
@@ -7261,116 +6510,27 @@ async def aesong_chat(data: dict, request: Request):
 - 학생 관리, 상담, 훈련일지 등에 대해 안내
 - 친근한 대화 상대"""
 
-        # Gemini 모델 사용
-        if model == 'gemini':
-            if not gemini_api_key:
-                raise Exception("Gemini API 키가 설정되지 않았습니다. 시스템 등록에서 API 키를 입력해주세요.")
-            
-            # Gemini API 호출
-            gemini_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={gemini_api_key}"
-            
-            payload = {
-                "contents": [{
-                    "parts": [
-                        {"text": f"{system_prompt}\n\n사용자: {message}\n\n당신:"}
-                    ]
-                }],
-                "generationConfig": {
-                    "temperature": 0.8,
-                    "maxOutputTokens": 200,
-                    "topP": 0.9
-                }
-            }
-            
-            response = requests.post(gemini_url, json=payload, timeout=15)
-            
-            if response.status_code != 200:
-                raise Exception(f"Gemini API 오류: {response.text}")
-            
-            result = response.json()
-            ai_response = result['candidates'][0]['content']['parts'][0]['text']
-            
-            return {
-                "response": ai_response,
-                "model": "gemini-2.0-flash-exp"
-            }
-        
-        # Gemma-3-4B 모델 사용 (GROQ 무료 모델)
-        elif model == 'gemma':
-            if not groq_api_key:
-                raise Exception("GROQ API 키가 설정되지 않았습니다. 시스템 등록에서 API 키를 입력해주세요.")
-            
-            headers = {
-                "Authorization": f"Bearer {groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": "gemma2-9b-it",  # GROQ의 Gemma 2 9B 모델 (무료)
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message}
-                ],
-                "temperature": 0.8,
-                "max_tokens": 200,
-                "top_p": 0.9
-            }
-            
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"GROQ API 오류: {response.text}")
-            
-            ai_response = response.json()['choices'][0]['message']['content']
-            
-            return {
-                "response": ai_response,
-                "model": "gemma2-9b-it"
-            }
+        # 모델별 제공자 (키가 없거나 실패하면 다른 제공자로 전환)
+        provider, model_name = {
+            'gemini': (GEMINI, "gemini-2.0-flash-exp"),
+            'gemma': (GROQ, "gemma2-9b-it"),  # GROQ의 Gemma 2 9B 모델 (무료)
+        }.get(model, (GROQ, "llama-3.3-70b-versatile"))
+
+        result = llm_gateway.complete_sync(
+            chat_messages(message, system_prompt),
+            provider=provider,
+            model=model_name,
+            api_keys=llm_api_keys(request.headers),
+            temperature=0.8,
+            max_tokens=200,
+            top_p=0.9,
+            timeout=15
+        )
         
-        # GROQ 모델 사용 (기본값 - Llama 3.3 70B)
-        else:
-            if not groq_api_key:
-                # API 키가 없으면 안내 메시지
-                raise Exception("GROQ API 키가 설정되지 않았습니다. 시스템 등록에서 API 키를 입력해주세요.")
-            
-            headers = {
-                "Authorization": f"Bearer {groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": "llama-3.3-70b-versatile",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message}
-                ],
-                "temperature": 0.8,
-                "max_tokens": 200,
-                "top_p": 0.9
-            }
-            
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"GROQ API 오류: {response.text}")
-            
-            ai_response = response.json()['choices'][0]['message']['content']
-            
-            return {
-                "response": ai_response,
-                "model": "llama-3.3-70b-versatile"
-            }
+        return {
+            "response": result.text,
+            "model": result.model
+        }
         
     except Exception as e:
         print(f"예진이 챗봇 오류: {str(e)}")
@@ -7383,7 +6543,7 @@ async def aesong_chat(data: dict, request: Request):
 
 # ==================== Google Cloud TTS API ====================
 @app.post("/api/tts")
-async def text_to_speech(data: dict, request: Request):
+def text_to_speech(data: dict, request: Request):
     """Google Cloud TTS - 텍스트를 음성으로 변환 (개선된 파라미터)"""
     text = data.get('text', '')
     character = data.get('character', '예진이')
@@ -7473,244 +6633,279 @@ async def text_to_speech(data: dict, request: Request):
         print(f"TTS 오류 스택: {error_trace}")
         raise HTTPException(status_code=500, detail=f"TTS 생성 실패: {str(e)}")
 
-@app.post("/api/timetables/auto-generate")
-async def auto_generate_timetables(data: dict):
-    """스마트 시간표 자동 생성 (과정별 요일 배정 기반)
-    
-    Args:
-        course_code: 과정 코드
-        start_date: 시작일
-        lecture_hours: 이론 시간
-        project_hours: 프로젝트 시간
-        workship_hours: 현장실습 시간
-        morning_hours: 오전 시간 (기본 4)
-        afternoon_hours: 오후 시간 (기본 4)
-    
-    Note:
-        - course_subjects 테이블의 day_of_week, week_type을 기반으로 시간표 생성
-        - 예: 월요일=G-002, 금요일(홀수주)=G-001, 금요일(짝수주)=G-003
+def plan_auto_timetables(cursor, course_code: str, start_date: date, lecture_hours: int,
+                         project_hours: int, workship_hours: int,
+                         morning_hours: int, afternoon_hours: int) -> List[dict]:
     """
-    conn = get_db_connection()
-    try:
-        course_code = data['course_code']
-        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
-        lecture_hours = data['lecture_hours']
-        project_hours = data['project_hours']
-        workship_hours = data['workship_hours']
-        morning_hours = data.get('morning_hours', 4)
-        afternoon_hours = data.get('afternoon_hours', 4)
+    과정별 요일 배정 기반 시간표를 메모리에서 생성 (DB는 조회만)
 
-        if morning_hours + afternoon_hours <= 0:
-            return JSONResponse(status_code=400, content={"detail": "오전/오후 수업시간 합계가 0보다 커야 합니다."})
-
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
+    course_subjects / subjects의 day_of_week, is_biweekly, week_offset에 따라
+    이론 → 프로젝트 → 현장실습 순으로 오전/오후 슬롯을 채운다.
+    instructor_candidates는 강사 중복 배정 해소(solve_instructor_assignments)에 쓰는 선호 순 후보이다.
+    """
+    # 공휴일 (공휴일 서비스 스냅샷)
+    holidays = holiday_service.snapshot()
+    
+    # 과정별 요일 배정 정보 가져오기 (subjects 테이블의 day_of_week 사용)
+    reserve_field = (
+        's.reserve_instructor' if 'reserve_instructor' in table_columns(cursor, 'subjects')
+        else 'NULL AS reserve_instructor'
+    )
+    cursor.execute(f"""
+        SELECT cs.subject_code, s.day_of_week, s.is_biweekly, s.week_offset,
+               s.name, s.hours, s.main_instructor, {reserve_field}
+        FROM course_subjects cs
+        JOIN subjects s ON cs.subject_code = s.code
+        WHERE cs.course_code = %s
+        ORDER BY s.day_of_week, s.week_offset
+    """, (course_code,))
+    course_subject_assignments = cursor.fetchall()
+    
+    # 요일별 교과목 매핑 생성 (day_of_week -> [(subject_code, week_type), ...])
+    day_subject_map = {}
+    for assignment in course_subject_assignments:
+        day = assignment['day_of_week']
+        if day is None:
+            continue
+        
+        if day not in day_subject_map:
+            day_subject_map[day] = []
+        
+        day_subject_map[day].append({
+            'subject_code': assignment['subject_code'],
+            'is_biweekly': assignment['is_biweekly'],
+            'week_offset': assignment['week_offset'],
+            'name': assignment['name'],
+            'hours': assignment['hours'],
+            'instructor': assignment['main_instructor'],
+            'reserve_instructor': assignment['reserve_instructor']
+        })
+    
+    # 주강사 추출
+    course_instructors = []
+    seen_instructors = set()
+    for assignment in course_subject_assignments:
+        instructor = assignment['main_instructor']
+        if instructor and instructor not in seen_instructors:
+            course_instructors.append(instructor)
+            seen_instructors.add(instructor)
+    
+    if not course_instructors:
+        cursor.execute("""
+            SELECT code FROM instructors 
+            WHERE instructor_type = '주강사' 
+            ORDER BY code 
+            LIMIT 3
+        """)
+        course_instructors = [row['code'] for row in cursor.fetchall()]
+    
+    print(f"📋 과정 {course_code}의 요일별 배정:")
+    for day, subjects in sorted(day_subject_map.items()):
+        # day_of_week는 1(월) ~ 5(금)이므로 -1 해야 함
+        day_name = ['월', '화', '수', '목', '금'][day - 1] if 1 <= day <= 5 else f"[{day}]"
+        for subj in subjects:
+            week_info = f" ({'짝수' if subj['week_offset'] == 0 else '홀수'}주)" if subj['is_biweekly'] else ""
+            print(f"  {day_name}{week_info}: {subj['subject_code']} - {subj['name']}")
+    
+    # 헬퍼 함수
+    def is_weekend(date_obj):
+        return date_obj.weekday() >= 5
+    
+    def is_holiday(date_obj):
+        return holidays.contains(date_obj)
+    
+    def subject_instructors(subj):
+        """교과목 후보 강사 (주강사 → 예비강사)"""
+        return [code for code in (subj['instructor'], subj['reserve_instructor']) if code]
+    
+    def rotated_instructors(idx):
+        """프로젝트/현장실습 후보 강사 (그날 순번 강사부터 과정 강사 순환)"""
+        return [course_instructors[(idx + k) % len(course_instructors)] for k in range(len(course_instructors))]
+    
+    def get_week_number(date_obj, start_date):
+        """과정 시작일로부터 몇 주차인지 계산 (0부터 시작)"""
+        days_diff = (date_obj - start_date).days
+        return days_diff // 7
+    
+    timetables = []
+    current_date = start_date
+    
+    # 각 교과목별 남은 시간 추적
+    subject_remaining = {}
+    for assignment in course_subject_assignments:
+        subject_remaining[assignment['subject_code']] = assignment['hours']
+    
+    # 1단계: 이론 (lecture) - 과정별 요일 배정 기반
+    total_remaining = lecture_hours
+    MAX_ITERATIONS = 500
+    iteration_count = 0
+    afternoon_slot_available = False  # 오후 슬롯 사용 가능 여부
+    
+    while total_remaining > 0 and iteration_count < MAX_ITERATIONS:
+        iteration_count += 1
         
-        # 기존 시간표 삭제
-        cursor.execute("DELETE FROM timetables WHERE course_code = %s", (course_code,))
+        if is_weekend(current_date) or is_holiday(current_date):
+            current_date += timedelta(days=1)
+            afternoon_slot_available = False
+            continue
         
-        # 공휴일 목록 가져오기
-        cursor.execute("SELECT holiday_date FROM holidays ORDER BY holiday_date")
-        holidays = [row['holiday_date'] for row in cursor.fetchall()]
+        # 오늘 요일에 배정된 교과목 찾기
+        # subjects 테이블의 day_of_week는 1(월)~7(일)이므로 weekday()+1로 변환
+        today_weekday = current_date.weekday() + 1  # 0(월)~6(일) → 1(월)~7(일)
+        if today_weekday not in day_subject_map:
+            current_date += timedelta(days=1)
+            afternoon_slot_available = False
+            continue
         
-        # 과정별 요일 배정 정보 가져오기 (subjects 테이블의 day_of_week 사용)
-        cursor.execute("""
-            SELECT cs.subject_code, s.day_of_week, s.is_biweekly, s.week_offset,
-                   s.name, s.hours, s.main_instructor
-            FROM course_subjects cs
-            JOIN subjects s ON cs.subject_code = s.code
-            WHERE cs.course_code = %s
-            ORDER BY s.day_of_week, s.week_offset
-        """, (course_code,))
-        course_subject_assignments = cursor.fetchall()
+        week_number = get_week_number(current_date, start_date)
         
-        # 요일별 교과목 매핑 생성 (day_of_week -> [(subject_code, week_type), ...])
-        day_subject_map = {}
-        for assignment in course_subject_assignments:
-            day = assignment['day_of_week']
-            if day is None:
-                continue
-            
-            if day not in day_subject_map:
-                day_subject_map[day] = []
-            
-            day_subject_map[day].append({
-                'subject_code': assignment['subject_code'],
-                'is_biweekly': assignment['is_biweekly'],
-                'week_offset': assignment['week_offset'],
-                'name': assignment['name'],
-                'hours': assignment['hours'],
-                'instructor': assignment['main_instructor']
+        # 오늘 수업 가능한 교과목 필터링
+        available_subjects = []
+        for subj in day_subject_map[today_weekday]:
+            # 격주 체크 (is_biweekly=1이면 격주, week_offset으로 짝수주/홀수주 구분)
+            if subj['is_biweekly']:
+                if (week_number % 2) != subj['week_offset']:
+                    continue
+            # ★★★ 핵심: 남은 시간이 0보다 큰 교과목만 선택 ★★★
+            if subject_remaining.get(subj['subject_code'], 0) > 0:
+                available_subjects.append(subj)
+        
+        # 해당 요일 배정 과목이 모두 소진되면 빈 요일로 건너뛰기
+        if not available_subjects:
+            # 모든 교과목이 소진되었는지 확인
+            all_subjects_exhausted = all(hours <= 0 for hours in subject_remaining.values())
+            if all_subjects_exhausted or total_remaining <= 0:
+                # 이론 완전 종료
+                break
+
+            # 해당 요일 과목은 소진 → 빈 요일로 넘김
+            current_date += timedelta(days=1)
+            afternoon_slot_available = False
+            continue
+        
+        # 남은 시수가 많은 순으로 정렬
+        available_subjects.sort(key=lambda s: subject_remaining.get(s['subject_code'], 0), reverse=True)
+        
+        # 오전 슬롯
+        if total_remaining > 0 and available_subjects and morning_hours > 0:
+            subj = available_subjects[0]  # 남은 시수가 가장 많은 교과목
+            hours_to_use = min(morning_hours, subject_remaining[subj['subject_code']], total_remaining)
+
+            timetables.append({
+                'course_code': course_code,
+                'subject_code': subj['subject_code'],
+                'class_date': current_date,
+                'start_time': '09:00:00',
+                'end_time': f'{9 + int(hours_to_use):02d}:00:00',
+                'instructor_code': subj['instructor'],
+                'instructor_candidates': subject_instructors(subj),
+                'type': 'lecture'
             })
+
+            subject_remaining[subj['subject_code']] -= hours_to_use
+            total_remaining -= hours_to_use
+
+            # ★★★ 핵심: 이론이 오전에 완전히 끝났는지 체크 ★★★
+            if total_remaining <= 0:
+                # 이론이 오전에 끝남 → 오후부터 프로젝트 시작
+                afternoon_slot_available = True
+                break
         
-        # 주강사 추출
-        course_instructors = []
-        seen_instructors = set()
-        for assignment in course_subject_assignments:
-            instructor = assignment['main_instructor']
-            if instructor and instructor not in seen_instructors:
-                course_instructors.append(instructor)
-                seen_instructors.add(instructor)
-        
-        if not course_instructors:
-            cursor.execute("""
-                SELECT code FROM instructors 
-                WHERE instructor_type = '주강사' 
-                ORDER BY code 
-                LIMIT 3
-            """)
-            course_instructors = [row['code'] for row in cursor.fetchall()]
-        
-        print(f"📋 과정 {course_code}의 요일별 배정:")
-        for day, subjects in sorted(day_subject_map.items()):
-            # day_of_week는 1(월) ~ 5(금)이므로 -1 해야 함
-            day_name = ['월', '화', '수', '목', '금'][day - 1] if 1 <= day <= 5 else f"[{day}]"
-            for subj in subjects:
-                week_info = f" ({'짝수' if subj['week_offset'] == 0 else '홀수'}주)" if subj['is_biweekly'] else ""
-                print(f"  {day_name}{week_info}: {subj['subject_code']} - {subj['name']}")
-        
-        # 헬퍼 함수
-        def is_weekend(date_obj):
-            return date_obj.weekday() >= 5
-        
-        def is_holiday(date_obj):
-            return date_obj in holidays
-        
-        def get_week_number(date_obj, start_date):
-            """과정 시작일로부터 몇 주차인지 계산 (0부터 시작)"""
-            days_diff = (date_obj - start_date).days
-            return days_diff // 7
-        
-        timetables = []
-        current_date = start_date
-        
-        # 각 교과목별 남은 시간 추적
-        subject_remaining = {}
-        for assignment in course_subject_assignments:
-            subject_remaining[assignment['subject_code']] = assignment['hours']
-        
-        # 1단계: 이론 (lecture) - 과정별 요일 배정 기반
-        total_remaining = lecture_hours
-        MAX_ITERATIONS = 500
-        iteration_count = 0
-        afternoon_slot_available = False  # 오후 슬롯 사용 가능 여부
-        
-        while total_remaining > 0 and iteration_count < MAX_ITERATIONS:
-            iteration_count += 1
-            
-            if is_weekend(current_date) or is_holiday(current_date):
-                current_date += timedelta(days=1)
-                afternoon_slot_available = False
-                continue
+        # 오후 슬롯 - 이론이 아직 남아있는 경우에만
+        if total_remaining > 0:
+            # ★★★ 1일 1과목 원칙: 오전 과목이 남아있으면 계속, 소진되었으면 다른 과목 ★★★
+            afternoon_subject = None
             
-            # 오늘 요일에 배정된 교과목 찾기
-            # subjects 테이블의 day_of_week는 1(월)~7(일)이므로 weekday()+1로 변환
-            today_weekday = current_date.weekday() + 1  # 0(월)~6(일) → 1(월)~7(일)
-            if today_weekday not in day_subject_map:
-                current_date += timedelta(days=1)
-                afternoon_slot_available = False
-                continue
-            
-            week_number = get_week_number(current_date, start_date)
-            
-            # 오늘 수업 가능한 교과목 필터링
-            available_subjects = []
-            for subj in day_subject_map[today_weekday]:
-                # 격주 체크 (is_biweekly=1이면 격주, week_offset으로 짝수주/홀수주 구분)
-                if subj['is_biweekly']:
-                    if (week_number % 2) != subj['week_offset']:
-                        continue
-                # ★★★ 핵심: 남은 시간이 0보다 큰 교과목만 선택 ★★★
-                if subject_remaining.get(subj['subject_code'], 0) > 0:
-                    available_subjects.append(subj)
+            # 1. 오전에 사용한 과목이 아직 남아있는지 확인
+            morning_subject_code = subj['subject_code'] if 'subj' in locals() else None
+            if morning_subject_code and subject_remaining.get(morning_subject_code, 0) > 0:
+                # 오전 과목이 남아있으면 계속 사용
+                afternoon_subject = subj
+            else:
+                # 2. 오전 과목이 소진되었으면 같은 요일 배정 과목 중에서만 선택
+                for s in available_subjects:
+                    if subject_remaining.get(s['subject_code'], 0) > 0:
+                        afternoon_subject = s
+                        break
             
-            # 해당 요일 배정 과목이 모두 소진되면 빈 요일로 건너뛰기
-            if not available_subjects:
-                # 모든 교과목이 소진되었는지 확인
-                all_subjects_exhausted = all(hours <= 0 for hours in subject_remaining.values())
-                if all_subjects_exhausted or total_remaining <= 0:
-                    # 이론 완전 종료
-                    break
+            # 오후 슬롯 생성
+            if afternoon_subject and afternoon_hours > 0:
+                hours_to_use = min(afternoon_hours, subject_remaining[afternoon_subject['subject_code']], total_remaining)
+                
+                timetables.append({
+                    'course_code': course_code,
+                    'subject_code': afternoon_subject['subject_code'],
+                    'class_date': current_date,
+                    'start_time': '14:00:00',
+                    'end_time': f'{14 + int(hours_to_use):02d}:00:00',
+                    'instructor_code': afternoon_subject['instructor'],
+                    'instructor_candidates': subject_instructors(afternoon_subject),
+                    'type': 'lecture'
+                })
+                
+                subject_remaining[afternoon_subject['subject_code']] -= hours_to_use
+                total_remaining -= hours_to_use
+        
+        # 다음날로 이동
+        current_date += timedelta(days=1)
+        afternoon_slot_available = False
+    
+    # 프로젝트/현장실습에서는 course_instructors를 그대로 사용
+    instructor_idx = 0
+    
+    # 2단계: 프로젝트 (project)
+    if project_hours > 0:
+        remaining_hours = project_hours
+        
+        # 이론이 오전에 끝나고 오후가 비어있으면 같은 날 오후부터 시작
+        if afternoon_slot_available and remaining_hours > 0 and afternoon_hours > 0:
+            daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
+            hours_to_use = min(afternoon_hours, remaining_hours)
+            timetables.append({
+                'course_code': course_code,
+                'subject_code': None,
+                'class_date': current_date,
+                'start_time': '14:00:00',
+                'end_time': f'{14 + int(hours_to_use):02d}:00:00',
+                'instructor_code': daily_instructor,
+                'instructor_candidates': rotated_instructors(instructor_idx),
+                'type': 'project'
+            })
+            remaining_hours -= hours_to_use
+            instructor_idx += 1
+            current_date += timedelta(days=1)
+            afternoon_slot_available = False
 
-                # 해당 요일 과목은 소진 → 빈 요일로 넘김
+        while remaining_hours > 0:
+            if is_weekend(current_date) or is_holiday(current_date):
                 current_date += timedelta(days=1)
-                afternoon_slot_available = False
                 continue
-            
-            # 남은 시수가 많은 순으로 정렬
-            available_subjects.sort(key=lambda s: subject_remaining.get(s['subject_code'], 0), reverse=True)
-            
-            # 오전 슬롯
-            if total_remaining > 0 and available_subjects and morning_hours > 0:
-                subj = available_subjects[0]  # 남은 시수가 가장 많은 교과목
-                hours_to_use = min(morning_hours, subject_remaining[subj['subject_code']], total_remaining)
 
+            daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
+
+            # 오전
+            if remaining_hours > 0 and morning_hours > 0:
+                hours_to_use = min(morning_hours, remaining_hours)
                 timetables.append({
                     'course_code': course_code,
-                    'subject_code': subj['subject_code'],
+                    'subject_code': None,
                     'class_date': current_date,
                     'start_time': '09:00:00',
                     'end_time': f'{9 + int(hours_to_use):02d}:00:00',
-                    'instructor_code': subj['instructor'],
-                    'type': 'lecture'
+                    'instructor_code': daily_instructor,
+                    'instructor_candidates': rotated_instructors(instructor_idx),
+                    'type': 'project'
                 })
+                remaining_hours -= hours_to_use
 
-                subject_remaining[subj['subject_code']] -= hours_to_use
-                total_remaining -= hours_to_use
-
-                # ★★★ 핵심: 이론이 오전에 완전히 끝났는지 체크 ★★★
-                if total_remaining <= 0:
-                    # 이론이 오전에 끝남 → 오후부터 프로젝트 시작
+                # ★★★ 핵심: 프로젝트가 오전에 완전히 끝났는지 체크 ★★★
+                if remaining_hours <= 0:
+                    # 프로젝트가 오전에 끝남 → 오후부터 현장실습 시작
                     afternoon_slot_available = True
                     break
-            
-            # 오후 슬롯 - 이론이 아직 남아있는 경우에만
-            if total_remaining > 0:
-                # ★★★ 1일 1과목 원칙: 오전 과목이 남아있으면 계속, 소진되었으면 다른 과목 ★★★
-                afternoon_subject = None
-                
-                # 1. 오전에 사용한 과목이 아직 남아있는지 확인
-                morning_subject_code = subj['subject_code'] if 'subj' in locals() else None
-                if morning_subject_code and subject_remaining.get(morning_subject_code, 0) > 0:
-                    # 오전 과목이 남아있으면 계속 사용
-                    afternoon_subject = subj
-                else:
-                    # 2. 오전 과목이 소진되었으면 같은 요일 배정 과목 중에서만 선택
-                    for s in available_subjects:
-                        if subject_remaining.get(s['subject_code'], 0) > 0:
-                            afternoon_subject = s
-                            break
-                
-                # 오후 슬롯 생성
-                if afternoon_subject and afternoon_hours > 0:
-                    hours_to_use = min(afternoon_hours, subject_remaining[afternoon_subject['subject_code']], total_remaining)
-                    
-                    timetables.append({
-                        'course_code': course_code,
-                        'subject_code': afternoon_subject['subject_code'],
-                        'class_date': current_date,
-                        'start_time': '14:00:00',
-                        'end_time': f'{14 + int(hours_to_use):02d}:00:00',
-                        'instructor_code': afternoon_subject['instructor'],
-                        'type': 'lecture'
-                    })
-                    
-                    subject_remaining[afternoon_subject['subject_code']] -= hours_to_use
-                    total_remaining -= hours_to_use
-            
-            # 다음날로 이동
-            current_date += timedelta(days=1)
-            afternoon_slot_available = False
-        
-        # 프로젝트/현장실습에서는 course_instructors를 그대로 사용
-        instructor_idx = 0
-        
-        # 2단계: 프로젝트 (project)
-        if project_hours > 0:
-            remaining_hours = project_hours
-            
-            # 이론이 오전에 끝나고 오후가 비어있으면 같은 날 오후부터 시작
-            if afternoon_slot_available and remaining_hours > 0 and afternoon_hours > 0:
-                daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
+
+            # 오후 - 프로젝트가 아직 남아있는 경우에만
+            if remaining_hours > 0 and afternoon_hours > 0:
                 hours_to_use = min(afternoon_hours, remaining_hours)
                 timetables.append({
                     'course_code': course_code,
@@ -7719,65 +6914,61 @@ async def auto_generate_timetables(data: dict):
                     'start_time': '14:00:00',
                     'end_time': f'{14 + int(hours_to_use):02d}:00:00',
                     'instructor_code': daily_instructor,
+                    'instructor_candidates': rotated_instructors(instructor_idx),
                     'type': 'project'
                 })
                 remaining_hours -= hours_to_use
-                instructor_idx += 1
-                current_date += timedelta(days=1)
-                afternoon_slot_available = False
 
-            while remaining_hours > 0:
-                if is_weekend(current_date) or is_holiday(current_date):
-                    current_date += timedelta(days=1)
-                    continue
+            instructor_idx += 1
+            current_date += timedelta(days=1)
+            afternoon_slot_available = False
+    
+    # 3단계: 현장실습 (workship)
+    if workship_hours > 0:
+        remaining_hours = workship_hours
+        
+        # 프로젝트가 오전에 끝나고 오후가 비어있으면 같은 날 오후부터 시작
+        if afternoon_slot_available and remaining_hours > 0 and afternoon_hours > 0:
+            daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
+            hours_to_use = min(afternoon_hours, remaining_hours)
+            timetables.append({
+                'course_code': course_code,
+                'subject_code': None,
+                'class_date': current_date,
+                'start_time': '14:00:00',
+                'end_time': f'{14 + int(hours_to_use):02d}:00:00',
+                'instructor_code': daily_instructor,
+                'instructor_candidates': rotated_instructors(instructor_idx),
+                'type': 'workship'
+            })
+            remaining_hours -= hours_to_use
+            instructor_idx += 1
+            current_date += timedelta(days=1)
 
-                daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
+        while remaining_hours > 0:
+            if is_weekend(current_date) or is_holiday(current_date):
+                current_date += timedelta(days=1)
+                continue
 
-                # 오전
-                if remaining_hours > 0 and morning_hours > 0:
-                    hours_to_use = min(morning_hours, remaining_hours)
-                    timetables.append({
-                        'course_code': course_code,
-                        'subject_code': None,
-                        'class_date': current_date,
-                        'start_time': '09:00:00',
-                        'end_time': f'{9 + int(hours_to_use):02d}:00:00',
-                        'instructor_code': daily_instructor,
-                        'type': 'project'
-                    })
-                    remaining_hours -= hours_to_use
-
-                    # ★★★ 핵심: 프로젝트가 오전에 완전히 끝났는지 체크 ★★★
-                    if remaining_hours <= 0:
-                        # 프로젝트가 오전에 끝남 → 오후부터 현장실습 시작
-                        afternoon_slot_available = True
-                        break
+            daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
 
-                # 오후 - 프로젝트가 아직 남아있는 경우에만
-                if remaining_hours > 0 and afternoon_hours > 0:
-                    hours_to_use = min(afternoon_hours, remaining_hours)
-                    timetables.append({
-                        'course_code': course_code,
-                        'subject_code': None,
-                        'class_date': current_date,
-                        'start_time': '14:00:00',
-                        'end_time': f'{14 + int(hours_to_use):02d}:00:00',
-                        'instructor_code': daily_instructor,
-                        'type': 'project'
-                    })
-                    remaining_hours -= hours_to_use
-
-                instructor_idx += 1
-                current_date += timedelta(days=1)
-                afternoon_slot_available = False
-        
-        # 3단계: 현장실습 (workship)
-        if workship_hours > 0:
-            remaining_hours = workship_hours
-            
-            # 프로젝트가 오전에 끝나고 오후가 비어있으면 같은 날 오후부터 시작
-            if afternoon_slot_available and remaining_hours > 0 and afternoon_hours > 0:
-                daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
+            # 오전
+            if remaining_hours > 0 and morning_hours > 0:
+                hours_to_use = min(morning_hours, remaining_hours)
+                timetables.append({
+                    'course_code': course_code,
+                    'subject_code': None,
+                    'class_date': current_date,
+                    'start_time': '09:00:00',
+                    'end_time': f'{9 + int(hours_to_use):02d}:00:00',
+                    'instructor_code': daily_instructor,
+                    'instructor_candidates': rotated_instructors(instructor_idx),
+                    'type': 'workship'
+                })
+                remaining_hours -= hours_to_use
+
+            # 오후
+            if remaining_hours > 0 and afternoon_hours > 0:
                 hours_to_use = min(afternoon_hours, remaining_hours)
                 timetables.append({
                     'course_code': course_code,
@@ -7786,77 +6977,142 @@ async def auto_generate_timetables(data: dict):
                     'start_time': '14:00:00',
                     'end_time': f'{14 + int(hours_to_use):02d}:00:00',
                     'instructor_code': daily_instructor,
+                    'instructor_candidates': rotated_instructors(instructor_idx),
                     'type': 'workship'
                 })
                 remaining_hours -= hours_to_use
-                instructor_idx += 1
-                current_date += timedelta(days=1)
+            
+            instructor_idx += 1
+            current_date += timedelta(days=1)
 
-            while remaining_hours > 0:
-                if is_weekend(current_date) or is_holiday(current_date):
-                    current_date += timedelta(days=1)
-                    continue
+    return timetables
 
-                daily_instructor = course_instructors[instructor_idx % len(course_instructors)]
 
-                # 오전
-                if remaining_hours > 0 and morning_hours > 0:
-                    hours_to_use = min(morning_hours, remaining_hours)
-                    timetables.append({
-                        'course_code': course_code,
-                        'subject_code': None,
-                        'class_date': current_date,
-                        'start_time': '09:00:00',
-                        'end_time': f'{9 + int(hours_to_use):02d}:00:00',
-                        'instructor_code': daily_instructor,
-                        'type': 'workship'
-                    })
-                    remaining_hours -= hours_to_use
-
-                # 오후
-                if remaining_hours > 0 and afternoon_hours > 0:
-                    hours_to_use = min(afternoon_hours, remaining_hours)
-                    timetables.append({
-                        'course_code': course_code,
-                        'subject_code': None,
-                        'class_date': current_date,
-                        'start_time': '14:00:00',
-                        'end_time': f'{14 + int(hours_to_use):02d}:00:00',
-                        'instructor_code': daily_instructor,
-                        'type': 'workship'
-                    })
-                    remaining_hours -= hours_to_use
-                
-                instructor_idx += 1
-                current_date += timedelta(days=1)
-        
-        # DB에 삽입
-        insert_query = """
-            INSERT INTO timetables 
-            (course_code, subject_code, class_date, start_time, end_time, 
-             instructor_code, type)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        for tt in timetables:
-            cursor.execute(insert_query, (
-                tt['course_code'],
-                tt['subject_code'],
-                tt['class_date'],
-                tt['start_time'],
-                tt['end_time'],
-                tt['instructor_code'],
-                tt['type']
-            ))
-        
-        conn.commit()
-        
-        return {
-            "success": True,
+def _auto_generate_params(data: dict) -> dict:
+    """자동 생성 요청 값 (과정 1개)"""
+    params = {
+        'course_code': data['course_code'],
+        'start_date': datetime.strptime(str(data['start_date'])[:10], '%Y-%m-%d').date(),
+        'lecture_hours': data['lecture_hours'],
+        'project_hours': data['project_hours'],
+        'workship_hours': data['workship_hours'],
+        'morning_hours': data.get('morning_hours', 4),
+        'afternoon_hours': data.get('afternoon_hours', 4),
+    }
+    if params['morning_hours'] + params['afternoon_hours'] <= 0:
+        raise HTTPException(status_code=400, detail="오전/오후 수업시간 합계가 0보다 커야 합니다.")
+    return params
+
+
+def solve_course_instructors(cursor, plans: dict) -> SolveResult:
+    """
+    새 시간표들의 강사 배정 (plans: 과정 코드 → plan_auto_timetables() 결과, 행을 직접 수정)
+
+    이번에 생성하지 않는 과정의 기존 시간표와 같은 실행의 다른 과정 사이에서 강사가 겹치지 않게 고른다.
+    """
+    dates = [row['class_date'] for rows in plans.values() for row in rows]
+    if not dates:
+        return SolveResult(0, [], [], 0.0)
+    index = InstructorIndex.load(cursor, min(dates), max(dates), exclude_courses=list(plans))
+    return solve_instructor_assignments(plans, index)
+
+
+def generate_course_timetables(conn, items: List[dict], preview: bool, protect_logged: bool,
+                               resolve_instructors: bool = True) -> dict:
+    """
+    여러 과정 시간표 생성 → 강사 배정 → 기존 시간표와 diff 적용 (한 트랜잭션)
+
+    preview면 적용하지 않고 롤백한다.
+    """
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    params = [_auto_generate_params(item) for item in items]
+    codes = [p['course_code'] for p in params]
+    if len(set(codes)) != len(codes):
+        raise HTTPException(status_code=400, detail="같은 과정이 여러 번 포함되어 있습니다.")
+
+    plans = {p['course_code']: plan_auto_timetables(cursor, **p) for p in params}
+
+    # 과정 간 강사 중복 배정 해소
+    solve = solve_course_instructors(cursor, plans) if resolve_instructors else None
+
+    courses = []
+    diffs = []
+    for course_code, timetables in plans.items():
+        # 기존 시간표와 (수업일, 오전/오후) 슬롯 단위 비교 → 바뀐 행만 반영 (훈련일지 유지)
+        existing = load_course_timetables(cursor, course_code, for_update=not preview)
+        diff = diff_timetables(existing, timetables, protect_logged=protect_logged)
+        diffs.append((course_code, diff))
+        course = {
+            "course_code": course_code,
             "generated_count": len(timetables),
-            "message": f"{len(timetables)}개의 시간표가 생성되었습니다."
+            "existing_count": len(existing),
+            **diff.summary(),
         }
+        if preview:
+            course["changes"] = diff.changes()
+        courses.append(course)
+
+    if preview:
+        conn.rollback()
+    else:
+        for course_code, diff in diffs:
+            apply_timetable_diff(cursor, course_code, diff)
+        conn.commit()
+
+    return {
+        "success": True,
+        "preview": preview,
+        "courses": courses,
+        "instructor_solver": solve.to_dict() if solve else None,
+    }
+
+
+@app.post("/api/timetables/auto-generate")
+def auto_generate_timetables(data: dict):
+    """스마트 시간표 자동 생성 (과정별 요일 배정 기반)
+    
+    Args:
+        course_code: 과정 코드
+        start_date: 시작일
+        lecture_hours: 이론 시간
+        project_hours: 프로젝트 시간
+        workship_hours: 현장실습 시간
+        morning_hours: 오전 시간 (기본 4)
+        afternoon_hours: 오후 시간 (기본 4)
+        preview: True면 적용하지 않고 변경 내역(changes)만 반환
+        protect_logged: 훈련일지가 있는 시간표는 삭제하지 않음 (기본 True)
+        resolve_instructors: 다른 과정과 강사가 겹치지 않게 배정 (기본 True)
+    
+    Note:
+        - course_subjects 테이블의 day_of_week, week_type을 기반으로 시간표 생성
+        - 다른 과정의 기존 시간표와 겹치는 강사는 예비강사/다른 과정 강사로 바꾸고, 불가능하면 conflicts로 보고
+        - 기존 시간표와 (수업일, 오전/오후) 슬롯 단위로 비교해 추가/변경/삭제만 한 트랜잭션으로 반영
+        - 예: 월요일=G-002, 금요일(홀수주)=G-001, 금요일(짝수주)=G-003
+    """
+    conn = get_db_connection()
+    try:
+        result = generate_course_timetables(
+            conn, [data],
+            preview=bool(data.get('preview', False)),
+            protect_logged=data.get('protect_logged', True) is not False,
+            resolve_instructors=data.get('resolve_instructors', True) is not False
+        )
+        course = result['courses'][0]
+        solver = result['instructor_solver']
+        response = {"success": True, "preview": result['preview'], **course, "instructor_solver": solver}
+        if not result['preview']:
+            response["message"] = (
+                f"{course['generated_count']}개의 시간표가 생성되었습니다. "
+                f"(추가 {course['inserted']}, 변경 {course['updated']}, 삭제 {course['deleted']}, "
+                f"유지 {course['unchanged']}, 훈련일지 보호 {course['protected']})"
+            )
+            if solver and solver['conflict_count']:
+                response["message"] += f" 강사 중복 {solver['conflict_count']}건을 확인하세요."
+        return response
         
+    except HTTPException:
+        conn.rollback()
+        raise
     except Exception as e:
         conn.rollback()
         import traceback
@@ -7867,75 +7123,96 @@ async def auto_generate_timetables(data: dict):
         conn.close()
 
 
+@app.post("/api/timetables/auto-generate/batch")
+def auto_generate_timetables_batch(data: dict):
+    """여러 과정 시간표 동시 생성 (과정 간 강사 중복 배정을 함께 해소)
+    
+    Args:
+        courses: [{course_code, start_date, lecture_hours, project_hours, workship_hours,
+                   morning_hours, afternoon_hours}, ...]
+        preview / protect_logged / resolve_instructors: auto-generate와 같음
+    """
+    items = data.get('courses') or []
+    if not items:
+        raise HTTPException(status_code=400, detail="생성할 과정을 지정해주세요.")
+    conn = get_db_connection()
+    try:
+        return generate_course_timetables(
+            conn, items,
+            preview=bool(data.get('preview', False)),
+            protect_logged=data.get('protect_logged', True) is not False,
+            resolve_instructors=data.get('resolve_instructors', True) is not False
+        )
+    except HTTPException:
+        conn.rollback()
+        raise
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        print(f"시간표 일괄 생성 오류: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"시간표 일괄 생성 실패: {str(e)}")
+    finally:
+        conn.close()
+
 # ==================== DB 백업 API ====================
 
+# 백업 파일 저장 경로
+BACKUP_DIR = os.getenv('BACKUP_DIR', '/home/user/webapp/backend/backups')
+
+# 전체 백업 1개 뒤에 이어 붙일 수 있는 최대 증분 백업 수 (넘으면 전체 백업)
+BACKUP_MAX_CHAIN = int(os.getenv('BACKUP_MAX_CHAIN', '48'))
+
+
+def get_incremental_parent(cursor) -> Optional[dict]:
+    """
+    증분 백업 기준 백업 header (전체 백업이 필요하면 None)
+
+    마지막 DB 복구 이후의 백업만 기준으로 사용한다.
+    """
+    cursor.execute("""
+        SELECT MAX(created_at) AS last_restore FROM db_management_logs
+        WHERE action_type IN ('restore', 'partial_restore')
+    """)
+    row = cursor.fetchone()
+    last_restore = row['last_restore'] if isinstance(row, dict) else row[0]
+    return incremental_parent(BACKUP_DIR, BACKUP_MAX_CHAIN, not_before=last_restore)
+
+
+def index_existing_backups():
+    """사이드카 manifest가 없는 기존 백업 색인 (서버 시작 시 백그라운드로 실행, 이후에는 건너뜀)"""
+    try:
+        results = index_backups(BACKUP_DIR)
+    except OSError as e:
+        logger.warning(f"백업 manifest 색인 실패: {e}")
+        return
+    indexed = [name for name, result in results.items() if result != 'skipped']
+    if indexed:
+        logger.info(f"백업 manifest 색인: {len(indexed)}개 ({', '.join(f'{n} {results[n]}' for n in indexed)})")
+
+
 @app.post("/api/backup/create")
-async def create_backup():
-    """수동 DB 백업 생성"""
-    import json
-    from datetime import datetime, date, timedelta
-    
-    def convert_to_json_serializable(obj):
-        """모든 객체를 JSON 직렬화 가능하게 변환"""
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        elif isinstance(obj, timedelta):
-            return str(obj)
-        elif obj is None:
-            return None
-        return obj
-    
+def create_backup(incremental: bool = False):
+    """
+    수동 DB 백업 생성 (테이블별 NDJSON 스트리밍 + 압축)
+
+    incremental=true 이면 직전 백업 이후 변경분만 기록한다 (기준 백업이 없으면 전체 백업).
+    """
     conn = get_db_connection()
     try:
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-        
-        backup_data = {}
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # 백업할 테이블 목록
-        tables = [
-            'timetables', 'training_logs', 'courses', 'subjects', 
-            'instructors', 'students', 'course_subjects', 'holidays',
-            'projects', 'class_notes', 'consultations', 'notices',
-            'system_settings', 'team_activity_logs'
-        ]
-        
-        total_records = 0
-        for table in tables:
-            try:
-                cursor.execute(f"SELECT * FROM {table}")
-                rows = cursor.fetchall()
-                
-                serializable_rows = []
-                for row in rows:
-                    serializable_row = {k: convert_to_json_serializable(v) for k, v in row.items()}
-                    serializable_rows.append(serializable_row)
-                
-                backup_data[table] = serializable_rows
-                total_records += len(rows)
-            except Exception as e:
-                print(f"[WARN] {table} 백업 실패: {e}")
-                backup_data[table] = []
-        
-        # 백업 디렉토리 생성
-        backup_dir = '/home/user/webapp/backend/backups'
-        os.makedirs(backup_dir, exist_ok=True)
-        
-        # JSON 파일로 저장
-        backup_file = f'{backup_dir}/db_backup_{timestamp}.json'
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, ensure_ascii=False, indent=2)
-        
-        # 파일 크기 확인
-        file_size = os.path.getsize(backup_file)
+        parent = get_incremental_parent(conn.cursor()) if incremental else None
+        manifest = write_backup(conn, BACKUP_DIR, BACKUP_TABLES, parent=parent)
         
         return {
             "success": True,
-            "backup_file": backup_file,
-            "total_records": total_records,
-            "file_size": file_size,
-            "timestamp": timestamp,
-            "tables": {table: len(backup_data[table]) for table in tables}
+            "backup_file": manifest['path'],
+            "kind": manifest['kind'],
+            "parent": manifest['parent'],
+            "total_records": manifest['total_records'],
+            "file_size": manifest['size'],
+            "timestamp": manifest['timestamp'],
+            "compression": manifest['compression'],
+            "tables": {table: manifest['tables'].get(table, {}).get('rows', 0) for table in BACKUP_TABLES}
         }
         
     except Exception as e:
@@ -7948,12 +7225,9 @@ async def create_backup():
 
 
 @app.get("/api/backup/list")
-async def list_backups():
-    """백업 파일 목록 조회"""
-    import os
-    import json
-    
-    backup_dir = '/home/user/webapp/backend/backups'
+def list_backups():
+    """백업 파일 목록 조회 (사이드카 manifest만 읽음, 색인 전 파일은 indexed=false)"""
+    backup_dir = BACKUP_DIR
     
     try:
         if not os.path.exists(backup_dir):
@@ -7961,15 +7235,22 @@ async def list_backups():
         
         backups = []
         for filename in sorted(os.listdir(backup_dir), reverse=True):
-            if filename.startswith('db_backup_') and filename.endswith('.json'):
+            if is_backup_filename(filename):
                 filepath = os.path.join(backup_dir, filename)
                 file_stat = os.stat(filepath)
+                manifest = read_manifest(filepath, build=False)
                 
                 backups.append({
                     "filename": filename,
                     "filepath": filepath,
+                    "kind": manifest['kind'] if manifest else ('incremental' if is_incremental_filename(filename) else 'full'),
                     "size": file_stat.st_size,
-                    "created_at": datetime.fromtimestamp(file_stat.st_mtime).isoformat()
+                    "created_at": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+                    "indexed": manifest is not None,
+                    "parent": manifest.get('parent') if manifest else None,
+                    "total_records": manifest.get('total_records') if manifest else None,
+                    "table_count": len(manifest['tables']) if manifest else None,
+                    "schema_hash": manifest.get('schema_hash') if manifest else None
                 })
         
         return {"backups": backups}
@@ -7979,35 +7260,39 @@ async def list_backups():
 
 
 @app.delete("/api/backup/delete/{filename}")
-async def delete_backup(filename: str):
+def delete_backup(filename: str):
     """백업 파일 삭제"""
-    import os
-    
-    backup_dir = '/home/user/webapp/backend/backups'
+    backup_dir = BACKUP_DIR
     filepath = os.path.join(backup_dir, filename)
     
     try:
         # 보안 체크
-        if not filename.startswith('db_backup_') or not filename.endswith('.json'):
+        if not is_backup_filename(filename):
             raise HTTPException(status_code=400, detail="잘못된 백업 파일명")
         
         if not os.path.exists(filepath):
             raise HTTPException(status_code=404, detail="백업 파일이 없습니다")
+
+        # 다른 증분 백업의 복구에 필요한 파일은 삭제 불가
+        others = [name for name in os.listdir(backup_dir) if is_backup_filename(name) and name != filename]
+        if filename in required_backups(backup_dir, others):
+            raise HTTPException(status_code=409, detail="증분 백업이 참조하는 백업 파일은 삭제할 수 없습니다")
         
-        os.remove(filepath)
+        delete_backup_file(filepath)
         return {"success": True, "message": f"{filename} 삭제 완료"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"백업 삭제 실패: {str(e)}")
 
 
 @app.post("/api/backup/auto-cleanup")
-async def auto_cleanup_backups(keep_days: int = 7):
+def auto_cleanup_backups(keep_days: int = 7):
     """오래된 백업 자동 삭제 (keep_days일 이전 백업)"""
-    import os
     from datetime import datetime, timedelta
 
-    backup_dir = '/home/user/webapp/backend/backups'
+    backup_dir = BACKUP_DIR
 
     try:
         if not os.path.exists(backup_dir):
@@ -8016,15 +7301,22 @@ async def auto_cleanup_backups(keep_days: int = 7):
         cutoff_time = datetime.now() - timedelta(days=keep_days)
         deleted_count = 0
 
+        expired = []
+        kept = []
         for filename in os.listdir(backup_dir):
-            if filename.startswith('db_backup_') and filename.endswith('.json'):
+            if is_backup_filename(filename):
                 filepath = os.path.join(backup_dir, filename)
                 file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
+                (expired if file_time < cutoff_time else kept).append(filename)
 
-                if file_time < cutoff_time:
-                    os.remove(filepath)
-                    deleted_count += 1
-                    print(f"🗑️ 삭제: {filename}")
+        # 남는 증분 백업의 기준(전체/이전 증분) 백업은 기간이 지나도 유지
+        required = required_backups(backup_dir, kept)
+        for filename in expired:
+            if filename in required:
+                continue
+            delete_backup_file(os.path.join(backup_dir, filename))
+            deleted_count += 1
+            print(f"🗑️ 삭제: {filename}")
 
         return {
             "success": True,
@@ -8039,33 +7331,8 @@ async def auto_cleanup_backups(keep_days: int = 7):
 
 # ==================== DB 관리 로그 API ====================
 
-def ensure_db_management_logs_table():
-    """DB 관리 로그 테이블 생성 (없으면)"""
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS db_management_logs (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                action_type VARCHAR(50) NOT NULL COMMENT '작업 유형 (backup/reset)',
-                operator_name VARCHAR(100) NOT NULL COMMENT '작업자 이름',
-                action_result VARCHAR(20) NOT NULL COMMENT '결과 (success/fail)',
-                backup_file VARCHAR(255) COMMENT '백업 파일명',
-                details TEXT COMMENT '상세 내용',
-                ip_address VARCHAR(45) COMMENT 'IP 주소',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '작업 시간'
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='DB 관리 로그'
-        """)
-        conn.commit()
-    finally:
-        conn.close()
-
-# 서버 시작 시 테이블 확인
-ensure_db_management_logs_table()
-
-
 @app.post("/api/db-management/verify")
-async def verify_db_management_credentials(request: Request, data: dict):
+def verify_db_management_credentials(request: Request, data: dict):
     """DB 관리 접속 검증 (강사 이름과 비밀번호 확인)"""
     instructor_name = data.get('instructor_name', '').strip()
     password = data.get('password', '').strip()
@@ -8100,13 +7367,11 @@ async def verify_db_management_credentials(request: Request, data: dict):
 
 
 @app.post("/api/db-management/backup-with-log")
-async def create_backup_with_log(request: Request, data: dict):
-    """백업 생성 및 로그 기록"""
-    import json
-    from datetime import datetime, date, timedelta
-
+def create_backup_with_log(request: Request, data: dict):
+    """백업 생성 및 로그 기록 (incremental=true 이면 증분 백업)"""
     operator_name = data.get('operator_name', '')
     instructor_code = data.get('instructor_code', '')
+    incremental = bool(data.get('incremental', False))
 
     if not operator_name:
         raise HTTPException(status_code=400, detail="작업자 정보가 필요합니다")
@@ -8114,55 +7379,18 @@ async def create_backup_with_log(request: Request, data: dict):
     # 클라이언트 IP 가져오기
     client_ip = request.client.host if request.client else 'unknown'
 
-    def convert_to_json_serializable(obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        elif isinstance(obj, timedelta):
-            return str(obj)
-        elif obj is None:
-            return None
-        return obj
-
     conn = get_db_connection()
     try:
         cursor = conn.cursor(pymysql.cursors.DictCursor)
 
-        backup_data = {}
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-        tables = [
-            'timetables', 'training_logs', 'courses', 'subjects',
-            'instructors', 'students', 'course_subjects', 'holidays',
-            'projects', 'class_notes', 'consultations', 'notices',
-            'system_settings', 'team_activity_logs', 'db_management_logs'
-        ]
-
-        total_records = 0
-        for table in tables:
-            try:
-                cursor.execute(f"SELECT * FROM {table}")
-                rows = cursor.fetchall()
-
-                serializable_rows = []
-                for row in rows:
-                    serializable_row = {k: convert_to_json_serializable(v) for k, v in row.items()}
-                    serializable_rows.append(serializable_row)
-
-                backup_data[table] = serializable_rows
-                total_records += len(rows)
-            except Exception as e:
-                print(f"[WARN] {table} 백업 실패: {e}")
-                backup_data[table] = []
-
-        backup_dir = '/home/user/webapp/backend/backups'
-        os.makedirs(backup_dir, exist_ok=True)
+        tables = BACKUP_TABLES + ['db_management_logs']
+        parent = get_incremental_parent(cursor) if incremental else None
+        manifest = write_backup(conn, BACKUP_DIR, tables, parent=parent)
 
-        backup_file = f'db_backup_{timestamp}.json'
-        backup_path = f'{backup_dir}/{backup_file}'
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, ensure_ascii=False, indent=2)
-
-        file_size = os.path.getsize(backup_path)
+        backup_file = manifest['file']
+        total_records = manifest['total_records']
+        file_size = manifest['size']
+        kind_desc = f"증분(기준: {manifest['parent']}), " if manifest['kind'] == 'incremental' else ''
 
         # 로그 기록
         cursor.execute("""
@@ -8174,7 +7402,7 @@ async def create_backup_with_log(request: Request, data: dict):
             f"{operator_name} ({instructor_code})",
             'success',
             backup_file,
-            f"총 {total_records}개 레코드, {file_size / 1024 / 1024:.2f}MB",
+            f"{kind_desc}총 {total_records}개 레코드, {file_size / 1024 / 1024:.2f}MB",
             client_ip
         ))
         conn.commit()
@@ -8182,10 +7410,13 @@ async def create_backup_with_log(request: Request, data: dict):
         return {
             "success": True,
             "backup_file": backup_file,
+            "kind": manifest['kind'],
+            "parent": manifest['parent'],
             "total_records": total_records,
             "file_size": file_size,
-            "timestamp": timestamp,
-            "tables": {table: len(backup_data[table]) for table in tables}
+            "timestamp": manifest['timestamp'],
+            "compression": manifest['compression'],
+            "tables": {table: manifest['tables'].get(table, {}).get('rows', 0) for table in tables}
         }
 
     except Exception as e:
@@ -8205,7 +7436,7 @@ async def create_backup_with_log(request: Request, data: dict):
 
 
 @app.post("/api/db-management/reset")
-async def reset_database(request: Request, data: dict):
+def reset_database(request: Request, data: dict):
     """DB 초기화 (테이블 선택 가능, 백업 후 진행)"""
     import json
     from datetime import datetime, date, timedelta
@@ -8220,7 +7451,7 @@ async def reset_database(request: Request, data: dict):
     client_ip = request.client.host if request.client else 'unknown'
 
     # 먼저 백업 생성
-    backup_result = await create_backup_with_log(request, data)
+    backup_result = create_backup_with_log(request, data)
 
     if not backup_result.get('success'):
         raise HTTPException(status_code=500, detail="백업 생성 실패로 초기화를 중단합니다")
@@ -8264,6 +7495,7 @@ async def reset_database(request: Request, data: dict):
                 deleted_counts[table] = 0
 
         conn.commit()
+        ref_cache.invalidate_all()
 
         total_deleted = sum(deleted_counts.values())
 
@@ -8310,10 +7542,14 @@ async def reset_database(request: Request, data: dict):
 
 
 @app.post("/api/db-management/restore")
-async def restore_database(request: Request, data: dict):
-    """백업 파일에서 DB 복구 (테이블 선택 가능)"""
-    import json
-    from datetime import datetime
+def restore_database(request: Request, data: dict):
+    """
+    백업 파일에서 DB 복구 (테이블 선택 가능)
+    
+    테이블마다 DELETE + 배치 INSERT를 한 트랜잭션으로 실행하며,
+    실패한 테이블은 롤백되어 기존 데이터가 유지되고 errors에 보고된다.
+    증분 백업을 선택하면 기준 전체 백업부터 선택한 증분까지 순서대로 적용한다.
+    """
 
     operator_name = data.get('operator_name', '')
     instructor_code = data.get('instructor_code', '')
@@ -8326,37 +7562,34 @@ async def restore_database(request: Request, data: dict):
         raise HTTPException(status_code=400, detail="복구할 백업 파일을 선택해주세요")
 
     client_ip = request.client.host if request.client else 'unknown'
-    backup_dir = '/home/user/webapp/backend/backups'
-    backup_path = f'{backup_dir}/{backup_file}'
+    if not is_backup_filename(backup_file):
+        raise HTTPException(status_code=400, detail="잘못된 백업 파일명")
+    backup_path = os.path.join(BACKUP_DIR, backup_file)
 
     # 백업 파일 존재 확인
     if not os.path.exists(backup_path):
         raise HTTPException(status_code=404, detail="백업 파일을 찾을 수 없습니다")
 
+    # 복구할 파일 체인 (전체 백업 → 증분 백업)
+    try:
+        chain = backup_chain(BACKUP_DIR, backup_file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     # 복구 전 현재 상태 백업
-    pre_restore_backup = await create_backup_with_log(request, {
+    pre_restore_backup = create_backup_with_log(request, {
         'operator_name': f"{operator_name} (복구 전 자동백업)",
         'instructor_code': instructor_code
     })
 
-    conn = get_db_connection()
+    # LOAD DATA LOCAL INFILE은 전용 연결에서만 허용 (풀 연결은 local_infile 비활성)
+    use_load_data = os.getenv('RESTORE_LOAD_DATA', '0') == '1'
+    conn = pymysql.connect(**DB_CONFIG, local_infile=True) if use_load_data else get_db_connection()
     try:
         cursor = conn.cursor()
 
-        # 백업 파일 읽기
-        with open(backup_path, 'r', encoding='utf-8') as f:
-            backup_data = json.load(f)
-
-        restored_counts = {}
-        errors = []
-
-        # 복구 순서 (외래키 제약조건 고려)
-        all_tables = [
-            'system_settings', 'holidays', 'courses', 'subjects', 'instructors',
-            'students', 'course_subjects', 'projects', 'timetables',
-            'training_logs', 'class_notes', 'consultations', 'notices',
-            'team_activity_logs'
-        ]
+        # 복구 순서 (외래키 제약조건 고려, 백업 파일도 이 순서로 기록됨)
+        all_tables = BACKUP_TABLES
 
         # 선택된 테이블만 복구 (빈 리스트면 전체)
         restore_order = selected_tables if selected_tables else all_tables
@@ -8366,55 +7599,32 @@ async def restore_database(request: Request, data: dict):
         is_partial = len(selected_tables) > 0
         action_desc = f"선택 복구: {', '.join(restore_order)}" if is_partial else "전체 복구"
 
-        # 기존 데이터 삭제 (역순으로)
-        for table in reversed(restore_order):
-            if table in backup_data and table != 'db_management_logs':
-                try:
-                    cursor.execute(f"DELETE FROM {table}")
-                except Exception as e:
-                    print(f"[WARN] {table} 삭제 실패: {e}")
-
-        conn.commit()
-
-        # 데이터 복구
-        for table in restore_order:
-            if table not in backup_data or table == 'db_management_logs':
-                continue
-
-            rows = backup_data[table]
-            if not rows:
-                restored_counts[table] = 0
-                continue
-
-            try:
-                # 첫 번째 행에서 컬럼 이름 가져오기
-                columns = list(rows[0].keys())
-                placeholders = ', '.join(['%s'] * len(columns))
-                columns_str = ', '.join([f'`{col}`' for col in columns])
-
-                insert_sql = f"INSERT INTO `{table}` ({columns_str}) VALUES ({placeholders})"
-
-                success_count = 0
-                for row in rows:
-                    try:
-                        values = [row.get(col) for col in columns]
-                        cursor.execute(insert_sql, values)
-                        success_count += 1
-                    except Exception as row_error:
-                        # 개별 행 오류는 건너뛰고 계속 진행
-                        pass
-
-                restored_counts[table] = success_count
-            except Exception as e:
-                errors.append(f"{table}: {str(e)}")
-                restored_counts[table] = 0
+        # 백업 파일을 테이블 단위로 스트리밍하며 테이블별 트랜잭션으로 복구
+        started = time.perf_counter()
+        results = restore_chain(
+            conn, [os.path.join(BACKUP_DIR, name) for name in chain], restore_order,
+            batch_size=RESTORE_BATCH_SIZE, use_load_data=use_load_data
+        )
+        elapsed = time.perf_counter() - started
+        ref_cache.invalidate_all()
 
-        conn.commit()
+        restored_counts = {}
+        for r in results:
+            restored_counts[r.table] = restored_counts.get(r.table, 0) + r.rows
+        errors = [f"{r.file} {r.table}: {r.error}" for r in results if r.error]
 
         total_restored = sum(restored_counts.values())
 
         # 로그 기록
-        log_details = f"{action_desc}. 총 {total_restored}개 레코드 복구. 복구 전 백업: {pre_restore_backup.get('backup_file', 'N/A')}"
+        rows_per_sec = round(total_restored / elapsed, 1) if elapsed > 0 else total_restored
+        if len(chain) > 1:
+            action_desc += f" (전체 백업 {chain[0]} + 증분 {len(chain) - 1}개)"
+        log_details = (
+            f"{action_desc}. 총 {total_restored}개 레코드 복구 ({elapsed:.1f}초, {rows_per_sec} rows/s). "
+            f"복구 전 백업: {pre_restore_backup.get('backup_file', 'N/A')}"
+        )
+        if errors:
+            log_details += f" 실패(롤백): {', '.join(r.table for r in results if r.error)}"
         cursor.execute("""
             INSERT INTO db_management_logs
             (action_type, operator_name, action_result, backup_file, details, ip_address)
@@ -8422,7 +7632,7 @@ async def restore_database(request: Request, data: dict):
         """, (
             'restore' if not is_partial else 'partial_restore',
             f"{operator_name} ({instructor_code})",
-            'success',
+            'success' if not errors else 'fail',
             backup_file,
             log_details,
             client_ip
@@ -8433,11 +7643,15 @@ async def restore_database(request: Request, data: dict):
             "success": True,
             "message": "선택 테이블 복구 완료" if is_partial else "DB 복구 완료",
             "backup_file": backup_file,
+            "backup_chain": chain,
             "pre_restore_backup": pre_restore_backup.get('backup_file', ''),
             "restored_counts": restored_counts,
             "restored_tables": restore_order,
             "total_restored": total_restored,
             "is_partial": is_partial,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_sec": rows_per_sec,
+            "table_results": [r.to_dict() for r in results],
             "errors": errors if errors else None
         }
 
@@ -8459,19 +7673,19 @@ async def restore_database(request: Request, data: dict):
 
 
 @app.get("/api/db-management/backup-info/{filename}")
-async def get_backup_info(filename: str):
-    """백업 파일의 테이블 정보 조회"""
+def get_backup_info(filename: str):
+    """백업 파일의 테이블 정보 조회 (사이드카 manifest, 없으면 한 번 색인해 저장)"""
     import json
 
-    backup_dir = '/home/user/webapp/backend/backups'
-    backup_path = f'{backup_dir}/{filename}'
+    if not is_backup_filename(filename):
+        raise HTTPException(status_code=400, detail="잘못된 백업 파일명")
+    backup_path = os.path.join(BACKUP_DIR, filename)
 
     if not os.path.exists(backup_path):
         raise HTTPException(status_code=404, detail="백업 파일을 찾을 수 없습니다")
 
     try:
-        with open(backup_path, 'r', encoding='utf-8') as f:
-            backup_data = json.load(f)
+        manifest = read_manifest(backup_path)
 
         # 테이블별 정보 (한글 이름 매핑)
         table_names_kr = {
@@ -8492,15 +7706,16 @@ async def get_backup_info(filename: str):
         }
 
         tables_info = []
-        for table, rows in backup_data.items():
+        for table, stats in manifest['tables'].items():
             if table == 'db_management_logs':
                 continue
-            if isinstance(rows, list):
-                tables_info.append({
-                    'table': table,
-                    'name_kr': table_names_kr.get(table, table),
-                    'count': len(rows)
-                })
+            tables_info.append({
+                'table': table,
+                'name_kr': table_names_kr.get(table, table),
+                'count': stats['rows'],
+                'bytes': stats.get('bytes'),
+                'mode': stats.get('mode', 'full')
+            })
 
         # 순서 정렬 (외래키 고려)
         order = ['system_settings', 'holidays', 'courses', 'subjects', 'instructors',
@@ -8510,17 +7725,24 @@ async def get_backup_info(filename: str):
 
         return {
             "filename": filename,
+            "kind": manifest.get('kind', 'full'),
+            "parent": manifest.get('parent'),
+            "base": manifest.get('base'),
+            "timestamp": manifest.get('timestamp'),
+            "created_at": manifest.get('created_at'),
+            "file_size": manifest.get('size'),
+            "schema_hash": manifest.get('schema_hash'),
             "tables": tables_info,
             "total_records": sum(t['count'] for t in tables_info)
         }
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, ValueError):
         raise HTTPException(status_code=400, detail="백업 파일 형식이 올바르지 않습니다")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"파일 읽기 실패: {str(e)}")
 
 
 @app.get("/api/db-management/current-tables")
-async def get_current_tables():
+def get_current_tables():
     """현재 DB의 테이블별 레코드 수 조회"""
     conn = get_db_connection()
     try:
@@ -8569,7 +7791,7 @@ async def get_current_tables():
 
 
 @app.get("/api/db-management/logs")
-async def get_db_management_logs(limit: int = 50):
+def get_db_management_logs(limit: int = 50):
     """DB 관리 로그 조회"""
     conn = get_db_connection()
     try:
@@ -8812,119 +8034,54 @@ print("[INFO] RAG 시스템 백그라운드 로딩 시작 (서버는 즉시 사
 
 # ==================== Startup 이벤트 ====================
 def auto_migrate_tables():
-    """서버 시작 시 필수 테이블 자동 생성/마이그레이션"""
+    """
+    서버 시작 시 미적용 스키마 마이그레이션 실행 (schema_migrations.py)
+
+    실패하면 예외를 그대로 올려 startup을 중단시킨다. 스키마가 없는 채로 요청을 받지 않고,
+    pm2가 재시작하면서 기록되지 않은 버전을 다시 시도한다.
+    """
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # exam_bank 테이블
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS exam_bank (
-                exam_id INT AUTO_INCREMENT PRIMARY KEY,
-                exam_name VARCHAR(200) NOT NULL,
-                subject VARCHAR(100),
-                exam_date DATE,
-                exam_time TIME,
-                total_questions INT DEFAULT 0,
-                question_type VARCHAR(50) DEFAULT 'multiple_choice',
-                difficulty VARCHAR(20) DEFAULT 'medium',
-                instructor_code VARCHAR(50),
-                description TEXT,
-                questions_text LONGTEXT,
-                sources TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # exam_bank_questions 테이블
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS exam_bank_questions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                exam_id INT NOT NULL,
-                question_number INT,
-                question_text TEXT,
-                question_type VARCHAR(50) DEFAULT 'multiple_choice',
-                options TEXT,
-                correct_answer VARCHAR(500),
-                explanation TEXT,
-                source_reference VARCHAR(500),
-                points INT DEFAULT 10,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (exam_id) REFERENCES exam_bank(exam_id) ON DELETE CASCADE
-            )
-        """)
-
-        # online_exams 테이블
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS online_exams (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                title VARCHAR(200) NOT NULL,
-                exam_type ENUM('exam', 'quiz', 'assignment') DEFAULT 'exam',
-                exam_bank_id INT,
-                course_code VARCHAR(50),
-                instructor_code VARCHAR(50),
-                duration INT DEFAULT 60,
-                scheduled_at DATETIME,
-                started_at DATETIME,
-                ended_at DATETIME,
-                deadline DATETIME,
-                description TEXT,
-                pass_score INT DEFAULT 60,
-                shuffle_questions TINYINT DEFAULT 0,
-                shuffle_options TINYINT DEFAULT 0,
-                show_result TINYINT DEFAULT 1,
-                status ENUM('scheduled', 'waiting', 'ongoing', 'ended', 'graded') DEFAULT 'scheduled',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (exam_bank_id) REFERENCES exam_bank(exam_id) ON DELETE SET NULL
-            )
-        """)
-
-        # online_exam_participants 테이블
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS online_exam_participants (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                online_exam_id INT NOT NULL,
-                student_id INT NOT NULL,
-                status ENUM('waiting', 'taking', 'submitted', 'graded') DEFAULT 'waiting',
-                entered_at DATETIME,
-                started_at DATETIME,
-                submitted_at DATETIME,
-                answers JSON,
-                file_path VARCHAR(500),
-                file_name VARCHAR(255),
-                score INT,
-                feedback TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (online_exam_id) REFERENCES online_exams(id) ON DELETE CASCADE
-            )
-        """)
-
-        # notices 테이블 컬럼 추가
-        try:
-            cursor.execute("ALTER TABLE notices ADD COLUMN notice_type ENUM('all', 'course', 'subject') DEFAULT 'all'")
-        except:
-            pass
         try:
-            cursor.execute("ALTER TABLE notices ADD COLUMN target_code VARCHAR(50) DEFAULT NULL")
-        except:
-            pass
-
-        conn.commit()
-        conn.close()
-        return True
+            applied = apply_migrations(conn)
+        finally:
+            conn.close()
     except Exception as e:
-        return False
+        logger.error(f"스키마 마이그레이션 실패 - 서버 시작 중단: {e}")
+        raise
+    if applied:
+        logger.info(f"스키마 마이그레이션 적용 완료: {applied}")
+    return applied
 
 
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 실행"""
-    auto_migrate_tables()
+    configure_threadpool()
+    start_background(monitor_loop_lag(), 'loop_lag_monitor')
+    await run_blocking(auto_migrate_tables)
+    start_background(run_blocking(index_existing_backups), 'backup_index')
+    start_background(
+        run_blocking(warm_lunar_table, range(date.today().year - 1, date.today().year + 6)), 'lunar_warmup'
+    )
+    start_background(run_blocking(pdf_service.start), 'pdf_pool_start')
     print("[OK] Server started: http://localhost:8000")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 실행 (백그라운드 태스크, 프로세스 풀, 외부 연결 정리)"""
+    await stop_background()
+    await llm_gateway.aclose()
+    pdf_service.shutdown()
+    thumbnail_service.shutdown()
+    # QUIT / 연결 종료는 네트워크 I/O이므로 스레드풀에서
+    await run_blocking(ftp_pool.close_all)
+    await run_blocking(db_pool.close_all)
+
+
 @app.post("/api/rag/upload")
-async def upload_rag_document(
+def upload_rag_document(
     file: UploadFile = File(...),
     subject: Optional[str] = Form(None),
     instructor: Optional[str] = Form(None),
@@ -8950,7 +8107,7 @@ async def upload_rag_document(
     
     # 파일 크기 확인 (50MB 제한)
     file_size = 0
-    content = await file.read()
+    content = file.file.read()
     file_size = len(content)
     
     if file_size > 50 * 1024 * 1024:  # 50MB
@@ -9016,7 +8173,7 @@ async def upload_rag_document(
 
 
 @app.get("/api/rag/documents")
-async def list_rag_documents(limit: int = 100):
+def list_rag_documents(limit: int = 100):
     """RAG 문서 목록 조회"""
     if not vector_store_manager:
         raise HTTPException(status_code=503, detail="RAG 시스템이 초기화되지 않았습니다")
@@ -9051,6 +8208,73 @@ async def list_rag_documents(limit: int = 100):
         raise HTTPException(status_code=500, detail=f"문서 목록 조회 실패: {str(e)}")
 
 
+def _fetch_system_settings(keys: List[str]) -> dict:
+    """system_settings에서 지정한 키의 값 조회 (rag_chat 등 async 핸들러용)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        placeholders = ', '.join(['%s'] * len(keys))
+        cursor.execute(f"SELECT setting_key, setting_value FROM system_settings WHERE setting_key IN ({placeholders})", keys)
+        return {item['setting_key']: item['setting_value'] for item in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def llm_api_keys(headers=None) -> dict:
+    """LLM API 키 {'groq': ..., 'gemini': ...} (헤더 > DB 시스템 설정 > 환경변수)"""
+    headers = headers or {}
+    try:
+        db_settings = _fetch_system_settings(['groq_api_key', 'gemini_api_key'])
+    except Exception:
+        db_settings = {}
+    return {
+        GROQ: headers.get('X-GROQ-API-Key') or db_settings.get('groq_api_key') or os.getenv('GROQ_API_KEY', ''),
+        GEMINI: (headers.get('X-Gemini-API-Key') or db_settings.get('gemini_api_key')
+                 or os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_CLOUD_TTS_API_KEY', '')),
+    }
+
+
+def _fetch_instructor_stats():
+    """강사 수와 상위 10명 목록 조회"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("SELECT COUNT(*) as count FROM instructors")
+        result = cursor.fetchone()
+        instructor_count = result['count'] if result else 0
+        
+        cursor.execute("""
+            SELECT name, email 
+            FROM instructors 
+            ORDER BY id 
+            LIMIT 10
+        """)
+        return instructor_count, cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def _fetch_student_stats():
+    """학생 수와 과정별 상위 5개 통계 조회"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("SELECT COUNT(*) as count FROM students")
+        result = cursor.fetchone()
+        student_count = result['count'] if result else 0
+        
+        cursor.execute("""
+            SELECT course_code, COUNT(*) as count 
+            FROM students 
+            GROUP BY course_code 
+            ORDER BY count DESC 
+            LIMIT 5
+        """)
+        return student_count, cursor.fetchall()
+    finally:
+        conn.close()
+
+
 @app.post("/api/rag/chat")
 async def rag_chat(request: Request):
     """
@@ -9103,24 +8327,7 @@ async def rag_chat(request: Request):
         if any(keyword in message_lower for keyword in ['강사', '강사수', '강사 수', '강사는', '강사 수는', '몇 명', '몇명', '인원']):
             if any(keyword in message_lower for keyword in ['수', '명', '얼마', '몇', '많', '인원']):
                 try:
-                    conn = get_db_connection()
-                    cursor = conn.cursor(pymysql.cursors.DictCursor)
-                    
-                    # 강사 수 조회
-                    cursor.execute("SELECT COUNT(*) as count FROM instructors")
-                    result = cursor.fetchone()
-                    instructor_count = result['count'] if result else 0
-                    
-                    # 강사 이름 목록 (상위 10명)
-                    cursor.execute("""
-                        SELECT name, email 
-                        FROM instructors 
-                        ORDER BY id 
-                        LIMIT 10
-                    """)
-                    instructor_list = cursor.fetchall()
-                    
-                    conn.close()
+                    instructor_count, instructor_list = await run_blocking(_fetch_instructor_stats)
                     
                     # 답변 생성
                     answer = f"현재 시스템에 등록된 강사 수는 **총 {instructor_count}명**입니다.\n\n"
@@ -9157,24 +8364,7 @@ async def rag_chat(request: Request):
         if any(keyword in message_lower for keyword in ['학생', '학생수', '학생 수', '수강생', '훈련생']):
             if any(keyword in message_lower for keyword in ['수', '명', '얼마', '몇', '많', '인원']):
                 try:
-                    conn = get_db_connection()
-                    cursor = conn.cursor(pymysql.cursors.DictCursor)
-                    
-                    cursor.execute("SELECT COUNT(*) as count FROM students")
-                    result = cursor.fetchone()
-                    student_count = result['count'] if result else 0
-                    
-                    # 과정별 통계
-                    cursor.execute("""
-                        SELECT course_code, COUNT(*) as count 
-                        FROM students 
-                        GROUP BY course_code 
-                        ORDER BY count DESC 
-                        LIMIT 5
-                    """)
-                    course_stats = cursor.fetchall()
-                    
-                    conn.close()
+                    student_count, course_stats = await run_blocking(_fetch_student_stats)
                     
                     answer = f"현재 시스템에 등록된 학생 수는 **총 {student_count}명**입니다.\n\n"
                     
@@ -9202,13 +8392,7 @@ async def rag_chat(request: Request):
         
         # ==================== RAG 처리 ====================
         # API 키 가져오기 (DB → 헤더 → 환경변수 순서)
-        conn = get_db_connection()
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-        cursor.execute("SELECT setting_key, setting_value FROM system_settings WHERE setting_key IN ('groq_api_key', 'gemini_api_key')")
-        db_settings_list = cursor.fetchall()
-        conn.close()
-        
-        db_settings = {item['setting_key']: item['setting_value'] for item in db_settings_list}
+        db_settings = await run_blocking(_fetch_system_settings, ['groq_api_key', 'gemini_api_key'])
         
         groq_api_key = request.headers.get('X-GROQ-API-Key') or db_settings.get('groq_api_key', '') or os.getenv('GROQ_API_KEY', '')
         gemini_api_key = request.headers.get('X-Gemini-API-Key') or db_settings.get('gemini_api_key', '') or os.getenv('GOOGLE_CLOUD_TTS_API_KEY', '')
@@ -9232,7 +8416,8 @@ async def rag_chat(request: Request):
             )
         
         # RAG 체인 생성
-        rag_chain = RAGChain(vector_store_manager, api_key, api_type)
+        rag_chain = RAGChain(vector_store_manager, api_key, api_type, gateway=llm_gateway,
+                             fallback_keys={GROQ: groq_api_key, GEMINI: gemini_api_key})
         
         # RAG 질문 처리 (유사도 임계값 0.008 = 0.8%)
         print(f"💬 RAG 질문: {message_with_context if document_context else message}")
@@ -9281,7 +8466,7 @@ async def rag_chat(request: Request):
 
 
 @app.post("/api/rag/search")
-async def rag_search(
+def rag_search(
     query: str = Form(...),
     k: int = Form(5),
     subject: Optional[str] = Form(None)
@@ -9320,7 +8505,7 @@ async def rag_search(
 
 
 @app.delete("/api/rag/clear")
-async def clear_rag_database():
+def clear_rag_database():
     """RAG 데이터베이스 초기화 (모든 문서 삭제)"""
     if not vector_store_manager:
         raise HTTPException(status_code=503, detail="RAG 시스템이 초기화되지 않았습니다")
@@ -9340,7 +8525,7 @@ async def clear_rag_database():
 
 
 @app.get("/api/rag/status")
-async def rag_status():
+def rag_status():
     """RAG 시스템 상태 확인"""
     if not vector_store_manager:
         return {
@@ -9389,12 +8574,9 @@ async def generate_exam_questions(request: Request):
             raise HTTPException(status_code=503, detail="RAG 시스템이 초기화되지 않았습니다")
         
         # GROQ API 키 가져오기
-        conn = get_db_connection()
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-        cursor.execute("SELECT setting_value FROM system_settings WHERE setting_key = 'groq_api_key'")
-        result = cursor.fetchone()
-        groq_api_key = result['setting_value'] if result else os.getenv('GROQ_API_KEY', '')
-        conn.close()
+        db_settings = await run_blocking(_fetch_system_settings, ['groq_api_key', 'gemini_api_key'])
+        groq_api_key = db_settings['groq_api_key'] if 'groq_api_key' in db_settings else os.getenv('GROQ_API_KEY', '')
+        gemini_api_key = db_settings.get('gemini_api_key') or os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_CLOUD_TTS_API_KEY', '')
         
         if not groq_api_key:
             raise HTTPException(status_code=400, detail="GROQ API 키가 설정되지 않았습니다")
@@ -9496,7 +8678,8 @@ async def generate_exam_questions(request: Request):
             print(f"[RAG] 선택된 문서 ({len(rag_documents)}개): {doc_names}")
 
         # RAGChain 인스턴스 생성
-        rag_chain = RAGChain(vector_store_manager, groq_api_key, "groq")
+        rag_chain = RAGChain(vector_store_manager, groq_api_key, "groq", gateway=llm_gateway,
+                             fallback_keys={GEMINI: gemini_api_key})
 
         # RAG를 사용하여 문제 생성 (문제 생성은 유사도 임계값을 낮춤)
         result = await rag_chain.query(
@@ -9527,10 +8710,9 @@ async def generate_exam_questions(request: Request):
 
 
 @app.post("/api/exam-bank/save")
-async def save_exam(request: Request):
+def save_exam(data: dict):
     """생성된 문제를 데이터베이스에 저장"""
     try:
-        data = await request.json()
         exam_name = data.get('exam_name')
         subject = data.get('subject')
         exam_date = data.get('exam_date')
@@ -9586,7 +8768,7 @@ async def save_exam(request: Request):
 
 
 @app.get("/api/exam-bank/list")
-async def get_exam_list():
+def get_exam_list():
     """저장된 시험 목록 조회"""
     try:
         conn = get_db_connection()
@@ -9614,7 +8796,7 @@ async def get_exam_list():
 
 
 @app.get("/api/exam-bank/{exam_id}")
-async def get_exam_detail(exam_id: int):
+def get_exam_detail(exam_id: int):
     """시험 상세 정보 및 문제 조회"""
     try:
         conn = get_db_connection()
@@ -9672,7 +8854,7 @@ async def get_exam_detail(exam_id: int):
 
 
 @app.delete("/api/exam-bank/{exam_id}")
-async def delete_exam(exam_id: int):
+def delete_exam(exam_id: int):
     """시험 삭제"""
     try:
         conn = get_db_connection()
@@ -9703,11 +8885,9 @@ async def delete_exam(exam_id: int):
 
 
 @app.put("/api/exam-bank/{exam_id}")
-async def update_exam(exam_id: int, request: Request):
+def update_exam(exam_id: int, data: dict):
     """시험 정보 수정"""
     try:
-        data = await request.json()
-        
         conn = get_db_connection()
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         
@@ -9759,11 +8939,9 @@ async def update_exam(exam_id: int, request: Request):
 # ==================== 개별 문제 CRUD API ====================
 
 @app.post("/api/exam-bank/{exam_id}/questions")
-async def add_question(exam_id: int, request: Request):
+def add_question(exam_id: int, data: dict):
     """시험에 새 문제 추가"""
     try:
-        data = await request.json()
-
         conn = get_db_connection()
         cursor = conn.cursor(pymysql.cursors.DictCursor)
 
@@ -9818,11 +8996,9 @@ async def add_question(exam_id: int, request: Request):
 
 
 @app.put("/api/exam-bank/questions/{question_id}")
-async def update_question(question_id: int, request: Request):
+def update_question(question_id: int, data: dict):
     """개별 문제 수정"""
     try:
-        data = await request.json()
-
         conn = get_db_connection()
         cursor = conn.cursor(pymysql.cursors.DictCursor)
 
@@ -9885,7 +9061,7 @@ async def update_question(question_id: int, request: Request):
 
 
 @app.delete("/api/exam-bank/questions/{question_id}")
-async def delete_question(question_id: int):
+def delete_question(question_id: int):
     """개별 문제 삭제"""
     try:
         conn = get_db_connection()
@@ -9932,7 +9108,7 @@ async def delete_question(question_id: int):
 # ==================== 온라인 시험 API ====================
 
 @app.get("/api/online-exams")
-async def get_online_exams(
+def get_online_exams(
     course_code: Optional[str] = None,
     status: Optional[str] = None,
     instructor_code: Optional[str] = None
@@ -9977,11 +9153,9 @@ async def get_online_exams(
 
 
 @app.post("/api/online-exams")
-async def create_online_exam(request: Request):
+def create_online_exam(data: dict):
     """온라인 시험/과제 등록"""
     try:
-        data = await request.json()
-
         conn = get_db_connection()
         cursor = conn.cursor(pymysql.cursors.DictCursor)
 
@@ -10036,7 +9210,7 @@ async def create_online_exam(request: Request):
 
 
 @app.get("/api/online-exams/{exam_id}")
-async def get_online_exam(exam_id: int):
+def get_online_exam(exam_id: int):
     """온라인 시험 상세 조회"""
     try:
         conn = get_db_connection()
@@ -10065,7 +9239,7 @@ async def get_online_exam(exam_id: int):
 
 
 @app.post("/api/online-exams/{exam_id}/open-waiting")
-async def open_waiting_room(exam_id: int, request: Request):
+def open_waiting_room(exam_id: int, request: Request):
     """대기실 오픈 (강사)"""
     try:
         conn = get_db_connection()
@@ -10095,7 +9269,7 @@ async def open_waiting_room(exam_id: int, request: Request):
 
 
 @app.post("/api/online-exams/{exam_id}/start")
-async def start_online_exam(exam_id: int, request: Request):
+def start_online_exam(exam_id: int, request: Request):
     """시험 시작 (강사)"""
     try:
         conn = get_db_connection()
@@ -10144,7 +9318,7 @@ async def start_online_exam(exam_id: int, request: Request):
 
 
 @app.post("/api/online-exams/{exam_id}/end")
-async def end_online_exam(exam_id: int, request: Request):
+def end_online_exam(exam_id: int, request: Request):
     """시험 종료 (강사) - 강제 종료"""
     try:
         conn = get_db_connection()
@@ -10180,10 +9354,9 @@ async def end_online_exam(exam_id: int, request: Request):
 
 
 @app.post("/api/online-exams/{exam_id}/enter")
-async def enter_exam_waiting_room(exam_id: int, request: Request):
+def enter_exam_waiting_room(exam_id: int, data: dict):
     """대기실 입장 (학생)"""
     try:
-        data = await request.json()
         student_id = data.get('student_id')
 
         if not student_id:
@@ -10297,7 +9470,7 @@ async def enter_exam_waiting_room(exam_id: int, request: Request):
 
 
 @app.get("/api/online-exams/{exam_id}/questions")
-async def get_exam_questions(exam_id: int, student_id: Optional[int] = None):
+def get_exam_questions(exam_id: int, student_id: Optional[int] = None):
     """시험 문제 조회 (시험 시작 후에만)"""
     try:
         conn = get_db_connection()
@@ -10369,10 +9542,9 @@ async def get_exam_questions(exam_id: int, student_id: Optional[int] = None):
 
 
 @app.post("/api/online-exams/{exam_id}/submit")
-async def submit_exam_answers(exam_id: int, request: Request):
+def submit_exam_answers(exam_id: int, data: dict):
     """답안 제출 (학생)"""
     try:
-        data = await request.json()
         student_id = data.get('student_id')
         answers = data.get('answers', {})  # {"question_id": "answer", ...}
 
@@ -10430,7 +9602,7 @@ async def submit_exam_answers(exam_id: int, request: Request):
 
 
 @app.get("/api/online-exams/{exam_id}/monitor")
-async def monitor_exam(exam_id: int):
+def monitor_exam(exam_id: int):
     """시험 모니터링 (강사)"""
     try:
         conn = get_db_connection()
@@ -10497,7 +9669,7 @@ async def monitor_exam(exam_id: int):
 
 
 @app.get("/api/online-exams/{exam_id}/status")
-async def get_exam_status(exam_id: int, student_id: Optional[int] = None):
+def get_exam_status(exam_id: int, student_id: Optional[int] = None):
     """시험 상태 조회 (폴링용)"""
     try:
         conn = get_db_connection()
@@ -10560,7 +9732,7 @@ async def get_exam_status(exam_id: int, student_id: Optional[int] = None):
 
 
 @app.post("/api/online-exams/{exam_id}/grade")
-async def grade_exam(exam_id: int, request: Request):
+def grade_exam(exam_id: int, request: Request):
     """자동 채점 (강사)"""
     try:
         conn = get_db_connection()
@@ -10661,7 +9833,7 @@ async def grade_exam(exam_id: int, request: Request):
 
 
 @app.get("/api/online-exams/{exam_id}/results")
-async def get_exam_results(exam_id: int):
+def get_exam_results(exam_id: int):
     """시험 결과 조회 (강사)"""
     try:
         conn = get_db_connection()
@@ -10734,7 +9906,7 @@ async def get_exam_results(exam_id: int):
 
 
 @app.delete("/api/online-exams/{exam_id}")
-async def delete_online_exam(exam_id: int):
+def delete_online_exam(exam_id: int):
     """온라인 시험 삭제"""
     try:
         conn = get_db_connection()
@@ -10761,7 +9933,7 @@ async def delete_online_exam(exam_id: int):
 
 
 @app.post("/api/online-exams/{exam_id}/submit-assignment")
-async def submit_assignment(exam_id: int, student_id: int = Form(...), file: UploadFile = File(None), answer_text: str = Form(None)):
+def submit_assignment(exam_id: int, student_id: int = Form(...), file: UploadFile = File(None), answer_text: str = Form(None)):
     """과제 제출 (파일 첨부 또는 텍스트)"""
     try:
         conn = get_db_connection()
@@ -10793,20 +9965,16 @@ async def submit_assignment(exam_id: int, student_id: int = Form(...), file: Upl
 
         # 파일 업로드 처리
         if file and file.filename:
-            import os
-            upload_dir = "/usr/miniLMS/uploads/assignments"
-            os.makedirs(upload_dir, exist_ok=True)
-
-            # 파일명 생성 (exam_id_student_id_timestamp_원본파일명)
+            # 표시용 파일명 (exam_id_student_id_timestamp_원본파일명)
             timestamp = now.strftime("%Y%m%d_%H%M%S")
             safe_filename = file.filename.replace(" ", "_")
             file_name = f"{exam_id}_{student_id}_{timestamp}_{safe_filename}"
-            file_path = os.path.join(upload_dir, file_name)
 
-            # 파일 저장
-            content = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            # 파일 저장 (내용 해시 파일명, 같은 파일은 한 번만 저장)
+            stored = content_store.put_local(
+                file.file, os.path.splitext(file.filename)[1], ASSIGNMENT_UPLOAD_DIR, 'assignments'
+            )
+            file_path = stored.url
 
         # 답안 데이터 (텍스트 또는 파일 정보)
         import json
@@ -10853,7 +10021,7 @@ async def submit_assignment(exam_id: int, student_id: int = Form(...), file: Upl
 
 
 @app.get("/api/online-exams/{exam_id}/assignment-status")
-async def get_assignment_status(exam_id: int, student_id: int):
+def get_assignment_status(exam_id: int, student_id: int):
     """과제 제출 상태 조회"""
     try:
         conn = get_db_connection()
@@ -10911,15 +10079,27 @@ async def get_assignment_status(exam_id: int, student_id: int):
 
 
 @app.get("/api/assignments/download/{filename}")
-async def download_assignment(filename: str):
+def download_assignment(filename: str):
     """과제 파일 다운로드"""
     from fastapi.responses import FileResponse
     import os
 
-    file_path = os.path.join("/usr/miniLMS/uploads/assignments", filename)
+    file_path = os.path.join(ASSIGNMENT_UPLOAD_DIR, filename)
 
     if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
+        # 내용 해시로 저장된 파일은 제출 기록의 file_path로 찾기
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT file_path FROM online_exam_participants WHERE file_name = %s LIMIT 1", (filename,)
+            )
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        file_path = row[0] if row and row[0] else None
+        if not file_path or not os.path.exists(file_path):
+            raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
 
     # 원본 파일명 추출 (exam_id_student_id_timestamp_원본파일명)
     parts = filename.split("_", 3)
@@ -10933,10 +10113,9 @@ async def download_assignment(filename: str):
 
 
 @app.post("/api/online-exams/{exam_id}/grade-assignment")
-async def grade_assignment(exam_id: int, request: Request):
+def grade_assignment(exam_id: int, data: dict):
     """과제 수동 채점 (강사)"""
     try:
-        data = await request.json()
         participant_id = data.get('participant_id')
         score = data.get('score')
         feedback = data.get('feedback', '')
@@ -10977,10 +10156,9 @@ async def grade_assignment(exam_id: int, request: Request):
 
 
 @app.post("/api/online-exams/{exam_id}/grade-all-assignments")
-async def grade_all_assignments(exam_id: int, request: Request):
+def grade_all_assignments(exam_id: int, data: dict):
     """모든 과제 일괄 채점 (강사)"""
     try:
-        data = await request.json()
         grades = data.get('grades', [])  # [{participant_id, score, feedback}, ...]
 
         if not grades:
@@ -11026,7 +10204,7 @@ async def grade_all_assignments(exam_id: int, request: Request):
 # ====================문서 관리 API====================
 
 @app.post("/api/documents/upload")
-async def upload_document(
+def upload_document(
     file: UploadFile = File(...),
     category: Optional[str] = Form("general")
 ):
@@ -11046,7 +10224,7 @@ async def upload_document(
             )
         
         # 파일 읽기
-        content = await file.read()
+        content = file.file.read()
         file_size = len(content)
         
         # 파일 크기 확인 (100MB 제한)
@@ -11093,7 +10271,7 @@ async def upload_document(
 
 
 @app.get("/api/documents/list")
-async def list_documents():
+def list_documents():
     """documents 및 rag_documents 폴더의 파일 목록 조회"""
     try:
         documents = []
@@ -11130,7 +10308,7 @@ async def list_documents():
 
 
 @app.delete("/api/documents/{filename}")
-async def delete_document(filename: str):
+def delete_document(filename: str):
     """문서 삭제 (documents 및 rag_documents 폴더에서 검색)"""
     try:
         # 파일명 검증 (경로 탐색 공격 방지)
@@ -11169,7 +10347,7 @@ async def delete_document(filename: str):
 
 
 @app.get("/api/documents/download/{filename}")
-async def download_document(filename: str):
+def download_document(filename: str):
     """문서 다운로드 (documents 및 rag_documents 폴더에서 검색)"""
     try:
         # 파일명 검증
@@ -11203,7 +10381,7 @@ async def download_document(filename: str):
 
 
 @app.post("/api/rag/index-document")
-async def index_document_to_rag(request: Request):
+def index_document_to_rag(data: dict):
     """
     문서를 RAG 시스템에 인덱싱
     - filename: rag_documents 또는 documents 폴더에 있는 파일명
@@ -11213,9 +10391,8 @@ async def index_document_to_rag(request: Request):
         raise HTTPException(status_code=503, detail="RAG 시스템이 초기화되지 않았습니다")
     
     try:
-        body = await request.json()
-        filename = body.get('filename')
-        original_filename = body.get('original_filename', filename)
+        filename = data.get('filename')
+        original_filename = data.get('original_filename', filename)
         
         if not filename:
             raise HTTPException(status_code=400, detail="filename이 필요합니다")
@@ -11287,7 +10464,7 @@ async def index_document_to_rag(request: Request):
 
 
 @app.get("/api/rag/task-status/{task_id}")
-async def get_rag_task_status(task_id: str):
+def get_rag_task_status(task_id: str):
     """RAG 백그라운드 태스크 상태 조회"""
     task = rag_task_status.get(task_id)
     if not task:
@@ -11296,7 +10473,7 @@ async def get_rag_task_status(task_id: str):
 
 
 @app.get("/api/rag/document-status/{filename}")
-async def get_document_rag_status(filename: str):
+def get_document_rag_status(filename: str):
     """
     문서의 RAG 인덱싱 상태 확인
     """
@@ -11332,7 +10509,7 @@ async def get_document_rag_status(filename: str):
 # ==================== 시스템 종합 점검 API ====================
 
 @app.get("/api/system-check")
-async def system_check():
+def system_check():
     """시스템 종합 진단"""
     import time
     result = {}
@@ -11355,14 +10532,9 @@ async def system_check():
     # 2. FTP 연결 테스트
     ftp_start = time.time()
     try:
-        from ftplib import FTP as FTPClient
-        ftp = FTPClient()
-        ftp.encoding = 'utf-8'
-        ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
-        ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
-        ftp.quit()
+        ftp_pool.call(lambda ftp: ftp.voidcmd('NOOP'))
         ftp_time = int((time.time() - ftp_start) * 1000)
-        result['ftp'] = {"success": True, "response_time": ftp_time, "host": FTP_CONFIG['host']}
+        result['ftp'] = {"success": True, "response_time": ftp_time, "host": FTP_CONFIG['host'], "pool": ftp_pool.stats()}
     except Exception as e:
         ftp_time = int((time.time() - ftp_start) * 1000)
         result['ftp'] = {"success": False, "response_time": ftp_time, "error": str(e)}
@@ -11484,7 +10656,7 @@ async def system_check():
 # ==================== 시스템 연결 테스트 API ====================
 
 @app.get("/api/test/database")
-async def test_database_connection():
+def test_database_connection():
     """데이터베이스 연결 테스트"""
     import time
     start_time = time.time()
@@ -11517,25 +10689,15 @@ async def test_database_connection():
         )
 
 @app.get("/api/test/ftp")
-async def test_ftp_connection():
+def test_ftp_connection():
     """FTP 서버 연결 테스트"""
     import time
-    from ftplib import FTP
 
     start_time = time.time()
 
     try:
-        ftp = FTP()
-        ftp.encoding = 'utf-8'
-
-        # FTP 연결
-        ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
-        ftp.login(FTP_CONFIG['user'], FTP_CONFIG['passwd'])
-
-        # 현재 디렉토리 확인
-        current_dir = ftp.pwd()
-
-        ftp.quit()
+        # 풀 세션으로 현재 디렉토리 확인 (끊긴 세션은 자동 재연결)
+        current_dir = ftp_pool.call(lambda ftp: ftp.pwd())
 
         response_time = int((time.time() - start_time) * 1000)
 
@@ -11562,7 +10724,7 @@ import json as json_module
 import time as time_module
 
 @app.get("/api/server/services")
-async def get_server_services():
+def get_server_services():
     """PM2 프로세스 목록 조회"""
     try:
         result = subprocess.run(
@@ -11614,7 +10776,7 @@ async def get_server_services():
 
 
 @app.post("/api/server/services/{pm_id}/{action}")
-async def control_server_service(pm_id: int, action: str):
+def control_server_service(pm_id: int, action: str):
     """PM2 서비스 제어 (restart/stop)"""
     if action not in ("restart", "stop"):
         raise HTTPException(status_code=400, detail="허용된 액션: restart, stop")
@@ -11661,7 +10823,7 @@ async def control_server_service(pm_id: int, action: str):
 
 
 @app.get("/api/server/connections")
-async def get_server_connections():
+def get_server_connections():
     """서버 접속자(established 커넥션) 수 조회"""
     try:
         result = subprocess.run(
@@ -11690,7 +10852,7 @@ async def get_server_connections():
 
 
 @app.get("/api/server/resources")
-async def get_server_resources():
+def get_server_resources():
     """서버 시스템 리소스(CPU, RAM, Disk) 사용량 조회"""
     try:
         # CPU 사용률 - /proc/stat 기반 (1초 샘플링 없이 즉시 반환)
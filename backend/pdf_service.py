@@ -0,0 +1,484 @@
+"""
+PDF 생성 서비스
+
+요청마다 한글 TTF(약 4MB)를 다시 registerFont 하고 요청 스레드에서 ReportLab 문서를
+임시 파일로 만들던 것을
+- 폰트는 프로세스(서버 + 풀 워커)마다 한 번만 등록
+- 문서는 프로세스 풀에서 메모리(BytesIO)로 생성해 bytes로 반환 (임시 파일 없음)
+- 여러 문서(전체 과정 계산서, 과정 학생 보고서 등)는 하나의 작업으로 등록하고
+  진행률을 조회한 뒤 PDF 1개 또는 ZIP으로 내려받음
+으로 바꾼다.
+
+작업 상태(status.json)와 생성된 PDF는 job_dir/<job_id>/ 에 저장하므로
+같은 서버의 다른 uvicorn 워커로 진행률/다운로드 요청이 가도 결과를 찾을 수 있다.
+(여러 서버로 나눠 띄우는 경우 job_dir은 공유 디스크여야 한다)
+
+프로세스 풀 작업 함수는 Windows(spawn)에서도 import 가능하도록
+FastAPI 앱과 분리된 이 모듈의 최상위 함수로 둔다.
+"""
+
+import io
+import os
+import re
+import json
+import shutil
+import time
+import uuid
+import logging
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+logger = logging.getLogger("riselms")
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+KOREAN_FONT = 'NanumGothic'
+FALLBACK_FONT = 'Helvetica'
+
+# 작업 상태/결과 저장 경로, 완료된 작업 보관 시간
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_jobs')
+JOB_TTL = 3600.0
+JOB_STATUS_FILE = 'status.json'
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+# ==================== 폰트 ====================
+
+_font_name: Optional[str] = None
+_font_lock = threading.Lock()
+
+
+def register_fonts(font_dir: str = FONT_DIR) -> str:
+    """한글 폰트 등록 (프로세스당 한 번), 사용할 폰트 이름 반환"""
+    global _font_name
+    if _font_name is not None:
+        return _font_name
+    with _font_lock:
+        if _font_name is None:
+            font_path = os.path.join(font_dir, f'{KOREAN_FONT}.ttf')
+            if KOREAN_FONT in pdfmetrics.getRegisteredFontNames():
+                _font_name = KOREAN_FONT
+            elif os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont(KOREAN_FONT, font_path))
+                _font_name = KOREAN_FONT
+            else:
+                logger.warning(f"한글 폰트가 없어 {FALLBACK_FONT}로 생성합니다: {font_path}")
+                _font_name = FALLBACK_FONT
+    return _font_name
+
+
+def _init_worker(font_dir: str):
+    register_fonts(font_dir)
+
+
+# ==================== 문서 ====================
+
+def _styles(font_name: str) -> Dict[str, ParagraphStyle]:
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontName=font_name,
+                                fontSize=18, alignment=TA_CENTER, spaceAfter=30),
+        'heading': ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontName=font_name,
+                                  fontSize=14, spaceAfter=12),
+        'normal': ParagraphStyle('CustomNormal', parent=styles['Normal'], fontName=font_name,
+                                 fontSize=10, leading=16),
+    }
+
+
+def _table(data: list, col_widths: list, font_name: str, align: str = 'LEFT') -> Table:
+    table = Table(data, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), align),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('FONTNAME', (0, 0), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    return table
+
+
+def _footer(story: list, styles: Dict[str, ParagraphStyle]):
+    story.append(Spacer(1, 30))
+    story.append(Paragraph(f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M:%S')}", styles['normal']))
+    story.append(Paragraph("시스템: 바이오헬스교육관리시스템", styles['normal']))
+
+
+def calculation_story(result: dict, course_code: str, font_name: str) -> list:
+    """과정 자동 계산 보고서 (calculate_course_dates 결과)"""
+    styles = _styles(font_name)
+    story = []
+
+    # 제목
+    story.append(Paragraph('과정 자동 계산 보고서', styles['title']))
+    story.append(Paragraph(f'과정 코드: {escape(str(course_code))}', styles['normal']))
+    story.append(Spacer(1, 20))
+
+    # 1. 기본 정보
+    story.append(Paragraph('1. 과정 기본 정보', styles['heading']))
+    story.append(_table([
+        ['항목', '내용'],
+        ['과정 시작일', result['start_date']],
+        ['과정 종료일', result['final_end_date']],
+        ['총 교육시간', f"{result['total_hours']}시간"],
+        ['일일 수업시간', f"{result['daily_hours']}시간 (오전 {result['morning_hours']}h + 오후 {result['afternoon_hours']}h)"],
+        ['주간 수업시간', f"{result['daily_hours'] * 5}시간 (월~금)"]
+    ], [100, 300], font_name))
+    story.append(Spacer(1, 20))
+
+    # 2. 단계별 상세
+    story.append(Paragraph('2. 교육 단계별 상세', styles['heading']))
+    story.append(_table([
+        ['단계', '시간', '일수', '시작일', '종료일'],
+        ['이론', f"{result['lecture_hours']}h", f"{result['lecture_days']}일",
+         result['start_date'], result['lecture_end_date']],
+        ['프로젝트', f"{result['project_hours']}h", f"{result['project_days']}일",
+         result['lecture_end_date'], result['project_end_date']],
+        ['현장실습', f"{result['workship_hours']}h", f"{result['workship_days']}일",
+         result['project_end_date'], result['workship_end_date']]
+    ], [80, 70, 70, 90, 90], font_name, align='CENTER'))
+    story.append(Spacer(1, 20))
+
+    # 3. 일수 계산
+    story.append(Paragraph('3. 교육일수 분석', styles['heading']))
+    story.append(_table([
+        ['구분', '일수'],
+        ['총 기간', f"{result['total_days']}일"],
+        ['근무일', f"{result['work_days']}일"],
+        ['주말', f"{result['weekend_days']}일"],
+        ['공휴일', f"{result['holiday_count']}일"],
+        ['제외일 합계', f"{result['excluded_days']}일"]
+    ], [200, 200], font_name))
+    story.append(Spacer(1, 20))
+
+    # 4. 공휴일 목록
+    story.append(Paragraph('4. 과정 기간 내 공휴일', styles['heading']))
+    story.append(Paragraph(f"공휴일: {escape(str(result['holidays_formatted']))}", styles['normal']))
+    story.append(Spacer(1, 20))
+
+    # 5. 계산 공식
+    story.append(Paragraph('5. 계산 방식', styles['heading']))
+    story.append(Paragraph('• 근무일 계산: 주말(토,일) 및 공휴일 제외', styles['normal']))
+    story.append(Paragraph(
+        f"• 일일 수업: {result['morning_hours']}시간(오전) + {result['afternoon_hours']}시간(오후) = {result['daily_hours']}시간",
+        styles['normal']))
+    story.append(Paragraph(
+        f"• 필요 근무일 = 총 교육시간({result['total_hours']}h) ÷ 일일시간({result['daily_hours']}h) = {result['work_days']}일",
+        styles['normal']))
+    story.append(Spacer(1, 20))
+
+    _footer(story, styles)
+    return story
+
+
+def student_report_story(student: dict, consultations: List[dict], font_name: str) -> list:
+    """학생 보고서 (기본 정보 + 상담 이력)"""
+    styles = _styles(font_name)
+    story = []
+
+    story.append(Paragraph('학생 보고서', styles['title']))
+    course = student.get('course_name') or student.get('course_code') or '-'
+    story.append(Paragraph(f"과정: {escape(str(course))}", styles['normal']))
+    story.append(Spacer(1, 20))
+
+    story.append(Paragraph('1. 기본 정보', styles['heading']))
+    story.append(_table([
+        ['항목', '내용'],
+        ['성명', f"{student.get('name', '')} ({student.get('code') or '-'})"],
+        ['생년월일', str(student.get('birth_date') or '-')],
+        ['학력', student.get('education') or '-'],
+        ['관심분야', student.get('interests') or '-'],
+        ['진로', student.get('career_path') or '-'],
+        ['상담 이력', f"총 {len(consultations)}회"],
+    ], [100, 300], font_name))
+    story.append(Spacer(1, 20))
+
+    story.append(Paragraph('2. 상담 내역', styles['heading']))
+    if consultations:
+        cell = styles['normal']
+        rows = [['상담일', '유형', '주제 / 내용']]
+        for c in consultations:
+            # Paragraph는 마크업을 해석하므로 사용자 입력(<, &)은 이스케이프한 뒤 줄바꿈만 <br/>로
+            topic = escape(c.get('main_topic') or '')
+            content = escape(c.get('content') or '').replace('\n', '<br/>')
+            rows.append([
+                str(c.get('consultation_date') or ''),
+                c.get('consultation_type') or '',
+                Paragraph(f"<b>{topic}</b><br/>{content}" if topic else content, cell),
+            ])
+        story.append(_table(rows, [70, 60, 320], font_name))
+    else:
+        story.append(Paragraph('상담 기록이 없습니다.', styles['normal']))
+
+    _footer(story, styles)
+    return story
+
+
+def _build(story_factory: Callable[[str], list]) -> bytes:
+    font_name = register_fonts()
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build(story_factory(font_name))
+    return buffer.getvalue()
+
+
+def render_document(kind: str, payload: dict) -> bytes:
+    """문서 종류별 PDF bytes 생성 (프로세스 풀 작업)"""
+    if kind == 'course_calculation':
+        return _build(lambda font: calculation_story(payload['result'], payload['course_code'], font))
+    if kind == 'student_report':
+        return _build(lambda font: student_report_story(payload['student'], payload['consultations'], font))
+    raise ValueError(f"알 수 없는 문서 종류: {kind}")
+
+
+DOCUMENT_KINDS = ('course_calculation', 'student_report')
+
+
+# ==================== 작업 ====================
+
+@dataclass
+class PDFJob:
+    """문서 여러 개를 묶은 생성 작업 (상태/결과는 directory에 저장)"""
+    id: str
+    kind: str
+    archive_name: str
+    filenames: List[str]
+    directory: str
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    # 파일명 → directory 안에 저장된 PDF 파일 이름
+    results: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return len(self.filenames)
+
+    @property
+    def done(self) -> bool:
+        return len(self.results) + len(self.errors) >= self.total
+
+    def status(self) -> dict:
+        completed = len(self.results) + len(self.errors)
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': 'done' if self.done else 'running',
+            'total': self.total,
+            'completed': completed,
+            'succeeded': len(self.results),
+            'failed': len(self.errors),
+            'progress': round(completed / self.total * 100, 1) if self.total else 100.0,
+            'errors': self.errors,
+            'elapsed': round((self.finished_at or time.time()) - self.created_at, 2),
+        }
+
+    def save(self):
+        """상태를 status.json에 저장 (다른 워커가 읽는 중에도 깨진 파일이 보이지 않도록 교체)"""
+        data = {
+            'id': self.id, 'kind': self.kind, 'archive_name': self.archive_name,
+            'filenames': self.filenames, 'created_at': self.created_at,
+            'finished_at': self.finished_at, 'results': self.results, 'errors': self.errors,
+        }
+        path = os.path.join(self.directory, JOB_STATUS_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['PDFJob']:
+        """status.json에서 작업 복원 (없거나 읽을 수 없으면 None)"""
+        try:
+            with open(os.path.join(directory, JOB_STATUS_FILE), encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(directory=directory, **data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def write_result(self, index: int, data: bytes) -> str:
+        """생성된 PDF를 작업 디렉터리에 저장하고 저장 파일 이름 반환"""
+        stored = f"{index:04d}.pdf"
+        path = os.path.join(self.directory, stored)
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+        return stored
+
+    def _read(self, filename: str) -> bytes:
+        with open(os.path.join(self.directory, self.results[filename]), 'rb') as f:
+            return f.read()
+
+    def output(self) -> Tuple[bytes, str, str]:
+        """(내용, 파일명, media type) - 문서 1개면 PDF, 여러 개면 ZIP"""
+        if len(self.filenames) == 1 and self.results:
+            filename = self.filenames[0]
+            return self._read(filename), filename, 'application/pdf'
+        buffer = io.BytesIO()
+        # PDF는 이미 압축되어 있으므로 저장만
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            for filename in self.filenames:
+                if filename in self.results:
+                    archive.writestr(filename, self._read(filename))
+        return buffer.getvalue(), f"{self.archive_name}.zip", 'application/zip'
+
+
+class PDFService:
+    """프로세스 풀 기반 PDF 생성 (작업 진행률 / 결과는 job_dir에 보관)"""
+
+    def __init__(self, max_workers: Optional[int] = None, font_dir: str = FONT_DIR,
+                 job_dir: str = JOB_DIR, job_ttl: float = JOB_TTL):
+        self.max_workers = max_workers
+        self.font_dir = font_dir
+        self.job_dir = job_dir
+        self.job_ttl = job_ttl
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 이 프로세스에서 진행 중인 작업 (완료되면 디스크의 상태만 남김)
+        self._jobs: Dict[str, PDFJob] = {}
+        self._lock = threading.Lock()
+        self._stats = {'rendered': 0, 'failures': 0, 'jobs': 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # 스레드가 많은 서버 프로세스를 fork하지 않도록 spawn, 워커마다 폰트를 한 번 등록
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.font_dir,),
+                )
+            return self._executor
+
+    def start(self):
+        """서버 시작 시 호출: 서버 프로세스 폰트 등록 + 워커 생성"""
+        register_fonts(self.font_dir)
+        self._get_executor().submit(register_fonts, self.font_dir)
+
+    def _submit(self, kind: str, payload: dict) -> Future:
+        if kind not in DOCUMENT_KINDS:
+            raise ValueError(f"알 수 없는 문서 종류: {kind}")
+        return self._get_executor().submit(render_document, kind, payload)
+
+    def render(self, kind: str, payload: dict, timeout: float = 120.0) -> bytes:
+        """문서 1개를 생성해 bytes 반환 (결과를 기다림)"""
+        try:
+            data = self._submit(kind, payload).result(timeout=timeout)
+        except BaseException:
+            self._stats['failures'] += 1
+            raise
+        self._stats['rendered'] += 1
+        return data
+
+    def submit_job(self, kind: str, documents: List[Tuple[str, dict]], archive_name: str) -> PDFJob:
+        """
+        문서 여러 개 생성 작업 등록 (바로 반환, 진행률은 job(job_id).status())
+
+        documents: [(파일명, payload), ...]
+        """
+        self._prune()
+        job_id = uuid.uuid4().hex
+        directory = os.path.join(self.job_dir, job_id)
+        os.makedirs(directory, exist_ok=True)
+        job = PDFJob(job_id, kind, archive_name, [name for name, _ in documents], directory)
+        if not documents:
+            job.finished_at = time.time()
+        job.save()
+        with self._lock:
+            self._stats['jobs'] += 1
+            if documents:
+                self._jobs[job.id] = job
+        for index, (filename, payload) in enumerate(documents):
+            try:
+                future = self._submit(kind, payload)
+            except Exception as e:
+                self._finish(job, index, filename, error=e)
+                continue
+            future.add_done_callback(lambda f, i=index, name=filename: self._finish(job, i, name, future=f))
+        return job
+
+    def _finish(self, job: PDFJob, index: int, filename: str, future: Optional[Future] = None,
+                error: Optional[BaseException] = None):
+        stored = None
+        if future is not None:
+            error = future.exception() if not future.cancelled() else RuntimeError('취소됨')
+        if error is None:
+            try:
+                stored = job.write_result(index, future.result())
+            except OSError as e:
+                error = e
+        with self._lock:
+            if error is not None:
+                job.errors[filename] = str(error)
+                self._stats['failures'] += 1
+                logger.warning(f"PDF 생성 실패 ({job.kind}, {filename}): {error}")
+            else:
+                job.results[filename] = stored
+                self._stats['rendered'] += 1
+            if job.done and job.finished_at is None:
+                job.finished_at = time.time()
+                self._jobs.pop(job.id, None)
+            try:
+                job.save()
+            except OSError as e:
+                logger.warning(f"PDF 작업 상태 저장 실패 ({job.id}): {e}")
+
+    def _prune(self):
+        """보관 시간이 지난 작업 디렉터리 삭제 (다른 워커가 만든 작업 포함)"""
+        try:
+            names = os.listdir(self.job_dir)
+        except FileNotFoundError:
+            return
+        now = time.time()
+        with self._lock:
+            running = set(self._jobs)
+        for name in names:
+            directory = os.path.join(self.job_dir, name)
+            if name in running or not JOB_ID_PATTERN.match(name):
+                continue
+            job = PDFJob.load(directory)
+            try:
+                since = (job.finished_at or job.created_at) if job else os.path.getmtime(directory)
+            except OSError:
+                continue
+            if now - since > self.job_ttl:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def job(self, job_id: str) -> Optional[PDFJob]:
+        """작업 조회 (이 프로세스에서 진행 중이면 메모리, 아니면 job_dir의 상태 파일)"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job or PDFJob.load(os.path.join(self.job_dir, job_id))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['active_jobs'] = len(self._jobs)
+        try:
+            stats['stored_jobs'] = sum(1 for name in os.listdir(self.job_dir) if JOB_ID_PATTERN.match(name))
+        except FileNotFoundError:
+            stats['stored_jobs'] = 0
+        stats['font'] = _font_name
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
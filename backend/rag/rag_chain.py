@@ -4,7 +4,10 @@ RAG 체인 모듈
 """
 
 from typing import List, Dict, Optional
-import httpx
+import functools
+from anyio import to_thread
+
+from llm_gateway import LLMGateway, GROQ, GEMINI, chat_messages
 
 # LangChain imports - 버전 호환성 처리
 try:
@@ -16,16 +19,21 @@ except ImportError:
 class RAGChain:
     """RAG 체인 클래스"""
     
-    def __init__(self, vector_store_manager, api_key: str, api_type: str = "groq"):
+    def __init__(self, vector_store_manager, api_key: str, api_type: str = "groq",
+                 gateway: Optional[LLMGateway] = None, fallback_keys: Optional[Dict[str, str]] = None):
         """
         Args:
             vector_store_manager: VectorStoreManager 인스턴스
             api_key: AI API 키 (GROQ, Gemini 등)
             api_type: API 타입 ('groq', 'gemini', 'gemma')
+            gateway: 공용 LLMGateway (없으면 체인 전용으로 생성)
+            fallback_keys: 실패 시 전환할 제공자 키 {'groq': ..., 'gemini': ...}
         """
         self.vector_store = vector_store_manager
         self.api_key = api_key
         self.api_type = api_type.lower()
+        self.gateway = gateway or LLMGateway()
+        self.fallback_keys = fallback_keys or {}
     
     def _format_context(self, documents: List[Document]) -> str:
         """
@@ -85,63 +93,38 @@ class RAGChain:
         
         return prompt
     
-    async def _call_groq_api(self, prompt: str) -> str:
-        """GROQ API 호출"""
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "llama-3.3-70b-versatile",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.3,  # 정확도 우선
-            "max_tokens": 8000,  # 문제 생성 등 긴 응답을 위해 증가
-            "top_p": 0.9
-        }
+    def _api_keys(self, provider: str) -> Dict[str, str]:
+        keys = dict(self.fallback_keys)
+        keys[provider] = self.api_key
+        return keys
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=120.0)  # 타임아웃 증가
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('choices'):
-                return data['choices'][0]['message']['content']
-            else:
-                return "응답을 생성할 수 없습니다."
+    async def _call_groq_api(self, prompt: str) -> str:
+        """GROQ API 호출 (실패 시 Gemini로 전환)"""
+        result = await self.gateway.complete(
+            chat_messages(prompt),
+            provider=GROQ,
+            model="llama-3.3-70b-versatile",
+            api_keys=self._api_keys(GROQ),
+            temperature=0.3,  # 정확도 우선
+            max_tokens=8000,  # 문제 생성 등 긴 응답을 위해 증가
+            top_p=0.9,
+            timeout=120.0
+        )
+        return result.text or "응답을 생성할 수 없습니다."
     
     async def _call_gemini_api(self, prompt: str) -> str:
-        """Gemini API 호출"""
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={self.api_key}"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "temperature": 0.3,
-                "maxOutputTokens": 1000,
-                "topP": 0.9
-            }
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('candidates'):
-                return data['candidates'][0]['content']['parts'][0]['text']
-            else:
-                return "응답을 생성할 수 없습니다."
+        """Gemini API 호출 (실패 시 GROQ로 전환)"""
+        result = await self.gateway.complete(
+            chat_messages(prompt),
+            provider=GEMINI,
+            model="gemini-2.0-flash-exp",
+            api_keys=self._api_keys(GEMINI),
+            temperature=0.3,
+            max_tokens=1000,
+            top_p=0.9,
+            timeout=30.0
+        )
+        return result.text or "응답을 생성할 수 없습니다."
     
     async def query(self,
                     question: str,
@@ -177,7 +160,10 @@ class RAGChain:
             print(f"[DEBUG] 질문: {question[:100]}...")
             print(f"[DOC] {k}개 문서 검색 중...")
 
-            documents = self.vector_store.search_with_score(question, k=k * 2 if document_context else k)
+            # 임베딩 계산/유사도 검색은 CPU 작업이므로 스레드풀에서 실행 (이벤트 루프 블로킹 방지)
+            documents = await to_thread.run_sync(
+                functools.partial(self.vector_store.search_with_score, question, k=k * 2 if document_context else k)
+            )
 
             # 문서 컨텍스트가 지정된 경우 필터링
             if document_context and len(document_context) > 0:
@@ -0,0 +1,226 @@
+"""
+참조 데이터 캐시 모듈
+
+과정/교과목/강사/강사코드/공휴일처럼 거의 바뀌지 않지만 매 화면마다 조회되는
+목록을 프로세스 메모리에 캐시한다.
+- TTL 만료 + 쓰기 API에서의 명시적 무효화
+- 무효화 버전을 공유하는 백엔드 교체 가능 (단일 프로세스 / DB 버전 폴링)
+- 캐시 버전 기반 ETag / Last-Modified 응답으로 브라우저 304 지원
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from fast_json import dumps
+
+logger = logging.getLogger("riselms")
+
+# 캐시 대상 네임스페이스
+REFERENCE_NAMESPACES = ('courses', 'subjects', 'instructors', 'instructor_codes', 'holidays')
+
+
+class LocalVersionBackend:
+    """단일 프로세스용 무효화 백엔드 (버전을 메모리에만 보관)"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def current_versions(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+    def bump(self, namespaces: Iterable[str]):
+        with self._lock:
+            for ns in namespaces:
+                self._versions[ns] = self._versions.get(ns, 0) + 1
+
+
+class DBVersionBackend:
+    """
+    여러 워커가 무효화를 공유하는 백엔드
+
+    cache_versions 테이블의 네임스페이스별 버전을 poll_interval마다 한 번 조회한다.
+    쓰기 API는 bump()로 버전을 올리고, 다른 워커는 다음 폴링 때 변경을 감지한다.
+    """
+
+    def __init__(self, get_connection: Callable, poll_interval: float = 2.0):
+        self._get_connection = get_connection
+        self.poll_interval = poll_interval
+        self._versions: Dict[str, int] = {}
+        self._polled_at = 0.0
+        self._lock = threading.Lock()
+
+    def current_versions(self) -> Dict[str, int]:
+        with self._lock:
+            if time.monotonic() - self._polled_at < self.poll_interval:
+                return dict(self._versions)
+        try:
+            conn = self._get_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT namespace, version FROM cache_versions")
+                versions = {row[0]: row[1] for row in cursor.fetchall()}
+            finally:
+                conn.close()
+        except Exception as e:
+            # DB 조회 실패 시 마지막으로 알려진 버전 사용 (TTL로 최종 정합성 보장)
+            logger.warning(f"캐시 버전 조회 실패: {e}")
+            with self._lock:
+                self._polled_at = time.monotonic()
+                return dict(self._versions)
+        with self._lock:
+            self._versions = versions
+            self._polled_at = time.monotonic()
+            return dict(versions)
+
+    def bump(self, namespaces: Iterable[str]):
+        namespaces = list(namespaces)
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO cache_versions (namespace, version) VALUES (%s, 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """, [(ns,) for ns in namespaces])
+            conn.commit()
+        finally:
+            conn.close()
+        # 현재 워커는 다음 조회 시 즉시 다시 폴링
+        with self._lock:
+            self._polled_at = 0.0
+
+
+class CacheEntry:
+    """직렬화된 응답 본문과 검증자(ETag / Last-Modified)"""
+
+    __slots__ = ('body', 'version', 'etag', 'loaded_at')
+
+    def __init__(self, body: bytes, version: int, etag: str, loaded_at: float):
+        self.body = body
+        self.version = version
+        self.etag = etag
+        self.loaded_at = loaded_at
+
+
+class ReferenceCache:
+    """TTL + 버전 기반 참조 데이터 캐시"""
+
+    def __init__(self, backend, ttl: float = 300.0):
+        self.backend = backend
+        self.ttl = ttl
+        self._entries: Dict[tuple, CacheEntry] = {}
+        self._load_locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'invalidations': 0}
+
+    def _fresh(self, entry: Optional[CacheEntry], version: int) -> bool:
+        return (
+            entry is not None
+            and entry.version == version
+            and time.time() - entry.loaded_at < self.ttl
+        )
+
+    def get(self, namespace: str, key: Hashable, loader: Callable) -> CacheEntry:
+        """
+        캐시 조회, 없거나 오래됐으면 loader()로 다시 적재
+
+        같은 키를 동시에 요청하면 한 요청만 DB를 조회하고 나머지는 결과를 기다린다.
+        """
+        cache_key = (namespace, key)
+        version = self.backend.current_versions().get(namespace, 0)
+
+        entry = self._entries.get(cache_key)
+        if self._fresh(entry, version):
+            self._stats['hits'] += 1
+            return entry
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(cache_key, threading.Lock())
+
+        with load_lock:
+            entry = self._entries.get(cache_key)
+            if self._fresh(entry, version):
+                self._stats['hits'] += 1
+                return entry
+
+            self._stats['misses'] += 1
+            value = loader()
+            body = dumps(value)
+            digest = hashlib.sha1(body).hexdigest()[:16]
+            entry = CacheEntry(
+                body=body,
+                version=version,
+                etag=f'"{namespace}-v{version}-{digest}"',
+                loaded_at=time.time(),
+            )
+            self._entries[cache_key] = entry
+            return entry
+
+    def version(self, namespace: str) -> int:
+        """네임스페이스의 현재 무효화 버전 (파생 캐시의 유효성 확인용)"""
+        return self.backend.current_versions().get(namespace, 0)
+
+    def invalidate(self, *namespaces: str):
+        """네임스페이스 무효화 (다른 워커에도 전파)"""
+        with self._lock:
+            for cache_key in list(self._entries):
+                if cache_key[0] in namespaces:
+                    del self._entries[cache_key]
+        self._stats['invalidations'] += 1
+        try:
+            self.backend.bump(namespaces)
+        except Exception as e:
+            logger.warning(f"캐시 무효화 전파 실패 ({', '.join(namespaces)}): {e}")
+
+    def invalidate_all(self):
+        """전체 참조 데이터 무효화 (DB 복원/초기화 후)"""
+        self.invalidate(*REFERENCE_NAMESPACES)
+
+    def respond(self, request: Request, namespace: str, key: Hashable, loader: Callable) -> Response:
+        """
+        캐시된 JSON 응답 반환
+
+        If-None-Match / If-Modified-Since가 현재 버전과 일치하면 304를 반환한다.
+        """
+        entry = self.get(namespace, key, loader)
+        last_modified = formatdate(entry.loaded_at, usegmt=True)
+        headers = {
+            'ETag': entry.etag,
+            'Last-Modified': last_modified,
+            # 브라우저가 매번 재검증하도록 (변경 시 즉시 반영)
+            'Cache-Control': 'no-cache',
+        }
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match:
+            if entry.etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+                self._stats['not_modified'] += 1
+                return Response(status_code=304, headers=headers)
+        else:
+            if_modified_since = request.headers.get('if-modified-since')
+            if if_modified_since:
+                try:
+                    since = parsedate_to_datetime(if_modified_since).timestamp()
+                    if int(entry.loaded_at) <= since:
+                        self._stats['not_modified'] += 1
+                        return Response(status_code=304, headers=headers)
+                except (TypeError, ValueError):
+                    pass
+
+        return Response(content=entry.body, media_type='application/json', headers=headers)
+
+    def stats(self) -> dict:
+        """캐시 적중률 / 항목 수"""
+        stats = dict(self._stats)
+        stats['entries'] = len(self._entries)
+        stats['ttl'] = self.ttl
+        stats['backend'] = type(self.backend).__name__
+        return stats
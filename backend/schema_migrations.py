@@ -0,0 +1,661 @@
+"""
+스키마 마이그레이션 모듈
+
+요청 처리 중에 실행되던 SHOW COLUMNS / CREATE TABLE IF NOT EXISTS / ALTER TABLE
+스키마 가드를 한 곳에 모아, 서버 시작 시(auto_migrate_tables) 또는 CLI로
+한 번만 실행한다. 적용된 버전은 schema_migrations 테이블에 기록되므로
+이후 요청 핸들러는 DDL 조회를 전혀 하지 않는다.
+
+CLI 사용법:
+    python backend/schema_migrations.py          # 미적용 마이그레이션 실행
+    python backend/schema_migrations.py --status # 적용 현황 출력
+    python backend/schema_migrations.py --explain # 주요 목록 쿼리 인덱스 사용 확인
+"""
+
+import os
+import re
+import sys
+import logging
+from pathlib import Path
+
+logger = logging.getLogger("riselms")
+
+# 여러 워커가 동시에 시작해도 한 번만 실행되도록 사용하는 MySQL 네임드 락
+MIGRATION_LOCK_NAME = 'riselms_schema_migrations'
+
+# SQL 마이그레이션 파일 위치 (저장소 루트의 migrations/)
+SQL_MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / 'migrations'
+
+
+# ==================== 스키마 가드 (멱등) ====================
+#
+# 존재 여부를 먼저 확인하므로 다시 실행해도 안전하다. 실패(권한, FK 대상 없음 등)는
+# 삼키지 않고 그대로 올려 보내 해당 마이그레이션 버전이 기록되지 않고 다음 시작 때 재시도되게 한다.
+
+def ensure_photo_urls_column(cursor, table_name: str):
+    """photo_urls 컬럼이 없으면 추가"""
+    ensure_column(cursor, table_name, 'photo_urls', 'TEXT')
+
+
+def ensure_career_path_column(cursor):
+    """students 테이블에 career_path 컬럼이 없으면 추가하고 기본값 설정"""
+    if ensure_column(cursor, 'students', 'career_path', "VARCHAR(50) DEFAULT '4. 미정'"):
+        # 기존 데이터의 NULL 값을 '4. 미정'으로 업데이트
+        cursor.execute("UPDATE students SET career_path = '4. 미정' WHERE career_path IS NULL")
+
+
+def ensure_career_decision_column(cursor):
+    """consultations 테이블에 career_decision 컬럼이 없으면 추가"""
+    ensure_column(cursor, 'consultations', 'career_decision', 'VARCHAR(50) DEFAULT NULL')
+
+
+def ensure_profile_photo_columns(cursor, table_name: str):
+    """profile_photo와 attachments 컬럼이 없으면 추가"""
+    # 단일 프로필 사진
+    ensure_column(cursor, table_name, 'profile_photo', 'VARCHAR(500) DEFAULT NULL')
+    # 첨부 파일 배열 (최대 20개)
+    ensure_column(cursor, table_name, 'attachments', 'TEXT DEFAULT NULL')
+
+
+def ensure_menu_permissions_column(cursor):
+    """instructor_codes 테이블에 menu_permissions 컬럼이 없으면 추가"""
+    ensure_column(cursor, 'instructor_codes', 'menu_permissions', 'TEXT DEFAULT NULL')
+
+
+def ensure_instructor_courses_table(cursor):
+    """instructor_courses 테이블이 없으면 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS instructor_courses (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            instructor_code VARCHAR(50) NOT NULL,
+            course_code VARCHAR(50) NOT NULL,
+            UNIQUE KEY uk_instructor_course (instructor_code, course_code),
+            INDEX idx_instructor_code (instructor_code),
+            INDEX idx_course_code (course_code)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def ensure_system_settings_table(cursor):
+    """system_settings 테이블이 없으면 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS system_settings (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            setting_key VARCHAR(50) UNIQUE NOT NULL,
+            setting_value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def ensure_student_registrations_table(cursor):
+    """student_registrations 테이블이 없으면 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS student_registrations (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            birth_date VARCHAR(20),
+            gender VARCHAR(10),
+            phone VARCHAR(50),
+            email VARCHAR(100),
+            address TEXT,
+            interests TEXT,
+            education TEXT,
+            introduction TEXT,
+            course_code VARCHAR(50),
+            profile_photo TEXT,
+            status ENUM('pending', 'approved', 'rejected') DEFAULT 'pending',
+            processed_at DATETIME,
+            processed_by VARCHAR(50),
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_status (status),
+            INDEX idx_created_at (created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def ensure_class_notes_table(cursor):
+    """class_notes 테이블이 없으면 생성하고 필요한 컬럼 추가"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS class_notes (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            student_id INT,
+            instructor_code VARCHAR(50),
+            note_date DATE NOT NULL,
+            content TEXT,
+            photo_urls TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_student_date (student_id, note_date),
+            INDEX idx_instructor_code (instructor_code, note_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+    # 기존 테이블에 없던 컬럼 추가
+    ensure_column(cursor, 'class_notes', 'instructor_code', 'VARCHAR(50) AFTER student_id')
+    ensure_column(cursor, 'class_notes', 'photo_urls', 'TEXT AFTER content')
+
+    # student_id를 NULL 허용으로, note_date를 DATE에서 DATETIME으로 변경 (시간 정보 저장)
+    cursor.execute("ALTER TABLE class_notes MODIFY COLUMN student_id INT NULL")
+    cursor.execute("ALTER TABLE class_notes MODIFY COLUMN note_date DATETIME NOT NULL")
+
+
+def ensure_instructor_notes_table(cursor):
+    """instructor_notes 테이블이 없으면 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS instructor_notes (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            instructor_id INT NOT NULL,
+            note_date DATE NOT NULL,
+            content TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (instructor_id) REFERENCES instructors(id) ON DELETE CASCADE,
+            INDEX idx_instructor_date (instructor_id, note_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def ensure_notices_table(cursor):
+    """notices 테이블이 없으면 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS notices (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(500) NOT NULL,
+            content TEXT NOT NULL,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            created_by VARCHAR(50),
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_dates (start_date, end_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def ensure_db_management_logs_table(cursor):
+    """DB 관리 로그 테이블 생성 (없으면)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS db_management_logs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            action_type VARCHAR(50) NOT NULL COMMENT '작업 유형 (backup/reset)',
+            operator_name VARCHAR(100) NOT NULL COMMENT '작업자 이름',
+            action_result VARCHAR(20) NOT NULL COMMENT '결과 (success/fail)',
+            backup_file VARCHAR(255) COMMENT '백업 파일명',
+            details TEXT COMMENT '상세 내용',
+            ip_address VARCHAR(45) COMMENT 'IP 주소',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '작업 시간'
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='DB 관리 로그'
+    """)
+
+
+def ensure_training_logs_table(cursor):
+    """training_logs 테이블이 없으면 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS training_logs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            timetable_id INT NOT NULL,
+            course_code VARCHAR(50),
+            instructor_code VARCHAR(50),
+            class_date DATE,
+            content TEXT,
+            homework TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (timetable_id) REFERENCES timetables(id) ON DELETE CASCADE
+        )
+    """)
+
+
+def ensure_column(cursor, table_name: str, column_name: str, definition: str) -> bool:
+    """컬럼이 없으면 추가 (추가했으면 True)"""
+    cursor.execute(f"SHOW COLUMNS FROM {table_name} LIKE %s", (column_name,))
+    if cursor.fetchone():
+        return False
+    cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}")
+    return True
+
+
+def ensure_index(cursor, table_name: str, index_name: str, columns: list) -> bool:
+    """
+    인덱스가 없으면 생성 (생성했으면 True)
+
+    같은 이름의 인덱스가 있거나, 같은 컬럼으로 시작하는 인덱스(FK 자동 인덱스 등)가
+    이미 있으면 중복 생성하지 않는다.
+    """
+    cursor.execute(f"SHOW INDEX FROM {table_name}")
+    existing = {}
+    for row in cursor.fetchall():
+        # Key_name, Seq_in_index, Column_name
+        existing.setdefault(row[2], []).append((row[3], row[4]))
+    for key_name, key_columns in existing.items():
+        key_columns = [col for _, col in sorted(key_columns)]
+        if key_name == index_name or key_columns[:len(columns)] == columns:
+            return False
+    cursor.execute(f"CREATE INDEX {index_name} ON {table_name} ({', '.join(columns)})")
+    return True
+
+
+def apply_index_file(cursor, filename: str):
+    """migrations/*.sql의 CREATE INDEX 문을 멱등하게 적용"""
+    sql = (SQL_MIGRATIONS_DIR / filename).read_text(encoding='utf-8')
+    pattern = re.compile(r'CREATE\s+INDEX\s+(\w+)\s+ON\s+(\w+)\s*\(([^)]+)\)', re.IGNORECASE)
+    for index_name, table_name, columns in pattern.findall(sql):
+        columns = [col.strip() for col in columns.split(',')]
+        if ensure_index(cursor, table_name, index_name, columns):
+            logger.info(f"인덱스 생성: {table_name}.{index_name} ({', '.join(columns)})")
+
+
+def ensure_instructor_codes_columns(cursor):
+    """instructor_codes 권한/화면 설정 컬럼 및 관리자(IC-999) 코드 보장"""
+    ensure_menu_permissions_column(cursor)
+    ensure_column(cursor, 'instructor_codes', 'permissions', 'TEXT DEFAULT NULL')
+    ensure_column(cursor, 'instructor_codes', 'default_screen', 'VARCHAR(50) DEFAULT NULL')
+    ensure_column(cursor, 'instructor_codes', 'dashboard_charts', 'TEXT DEFAULT NULL')
+
+    # 관리자(IC-999) 타입이 없으면 추가
+    cursor.execute("SELECT code FROM instructor_codes WHERE code = 'IC-999'")
+    if not cursor.fetchone():
+        cursor.execute("""
+            INSERT INTO instructor_codes (code, name, type, permissions)
+            VALUES ('IC-999', '관리자', '0. 관리자', NULL)
+        """)
+
+    # 레거시 코드 '0'이 남아있으면 IC-999로 마이그레이션
+    cursor.execute("SELECT code FROM instructor_codes WHERE code = '0'")
+    if cursor.fetchone():
+        cursor.execute("UPDATE instructors SET instructor_type = 'IC-999' WHERE instructor_type = '0'")
+        cursor.execute("DELETE FROM instructor_codes WHERE code = '0'")
+
+
+def ensure_instructors_columns(cursor):
+    """instructors 프로필/비밀번호/소개 컬럼 보장"""
+    ensure_profile_photo_columns(cursor, 'instructors')
+    ensure_column(cursor, 'instructors', 'password', "VARCHAR(100) DEFAULT 'kdt2025'")
+    ensure_column(cursor, 'instructors', 'motto', 'TEXT')
+    ensure_column(cursor, 'instructors', 'affiliation', 'VARCHAR(255)')
+
+
+def ensure_students_columns(cursor):
+    """students 진로/프로필/비밀번호 컬럼 보장"""
+    ensure_career_path_column(cursor)
+    ensure_profile_photo_columns(cursor, 'students')
+    ensure_column(cursor, 'students', 'password', "VARCHAR(100) DEFAULT 'kdt2025'")
+
+
+def ensure_courses_columns(cursor):
+    """courses 오전/오후 수업 시간 컬럼 보장"""
+    ensure_column(cursor, 'courses', 'morning_hours', 'INT DEFAULT 4')
+    ensure_column(cursor, 'courses', 'afternoon_hours', 'INT DEFAULT 4')
+
+
+def ensure_projects_columns(cursor):
+    """projects 팀원/담당자/공용계정/사진/설명 컬럼 보장"""
+    for i in range(1, 7):
+        ensure_column(cursor, 'projects', f'member{i}_code', 'VARCHAR(50)')
+    ensure_column(cursor, 'projects', 'group_type', 'VARCHAR(50)')
+    ensure_column(cursor, 'projects', 'instructor_code', 'VARCHAR(50)')
+    ensure_column(cursor, 'projects', 'mentor_code', 'VARCHAR(50)')
+    for i in range(1, 6):
+        ensure_column(cursor, 'projects', f'account{i}_name', 'VARCHAR(100)')
+        ensure_column(cursor, 'projects', f'account{i}_id', 'VARCHAR(100)')
+        ensure_column(cursor, 'projects', f'account{i}_pw', 'VARCHAR(100)')
+    ensure_photo_urls_column(cursor, 'projects')
+    ensure_column(cursor, 'projects', 'description', 'TEXT')
+
+
+def ensure_exam_tables(cursor):
+    """문제은행 / 온라인 시험 테이블 생성"""
+    # exam_bank 테이블
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS exam_bank (
+            exam_id INT AUTO_INCREMENT PRIMARY KEY,
+            exam_name VARCHAR(200) NOT NULL,
+            subject VARCHAR(100),
+            exam_date DATE,
+            exam_time TIME,
+            total_questions INT DEFAULT 0,
+            question_type VARCHAR(50) DEFAULT 'multiple_choice',
+            difficulty VARCHAR(20) DEFAULT 'medium',
+            instructor_code VARCHAR(50),
+            description TEXT,
+            questions_text LONGTEXT,
+            sources TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # exam_bank_questions 테이블
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS exam_bank_questions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            exam_id INT NOT NULL,
+            question_number INT,
+            question_text TEXT,
+            question_type VARCHAR(50) DEFAULT 'multiple_choice',
+            options TEXT,
+            correct_answer VARCHAR(500),
+            explanation TEXT,
+            source_reference VARCHAR(500),
+            points INT DEFAULT 10,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (exam_id) REFERENCES exam_bank(exam_id) ON DELETE CASCADE
+        )
+    """)
+
+    # online_exams 테이블
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS online_exams (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            exam_type ENUM('exam', 'quiz', 'assignment') DEFAULT 'exam',
+            exam_bank_id INT,
+            course_code VARCHAR(50),
+            instructor_code VARCHAR(50),
+            duration INT DEFAULT 60,
+            scheduled_at DATETIME,
+            started_at DATETIME,
+            ended_at DATETIME,
+            deadline DATETIME,
+            description TEXT,
+            pass_score INT DEFAULT 60,
+            shuffle_questions TINYINT DEFAULT 0,
+            shuffle_options TINYINT DEFAULT 0,
+            show_result TINYINT DEFAULT 1,
+            status ENUM('scheduled', 'waiting', 'ongoing', 'ended', 'graded') DEFAULT 'scheduled',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (exam_bank_id) REFERENCES exam_bank(exam_id) ON DELETE SET NULL
+        )
+    """)
+
+    # online_exam_participants 테이블
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS online_exam_participants (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            online_exam_id INT NOT NULL,
+            student_id INT NOT NULL,
+            status ENUM('waiting', 'taking', 'submitted', 'graded') DEFAULT 'waiting',
+            entered_at DATETIME,
+            started_at DATETIME,
+            submitted_at DATETIME,
+            answers JSON,
+            file_path VARCHAR(500),
+            file_name VARCHAR(255),
+            score INT,
+            feedback TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (online_exam_id) REFERENCES online_exams(id) ON DELETE CASCADE
+        )
+    """)
+
+    # notices 테이블 컬럼 추가
+    ensure_column(cursor, 'notices', 'notice_type', "ENUM('all', 'course', 'subject') DEFAULT 'all'")
+    ensure_column(cursor, 'notices', 'target_code', 'VARCHAR(50) DEFAULT NULL')
+
+
+# ==================== 버전별 마이그레이션 ====================
+
+def _migration_runtime_schema_guards(cursor):
+    """요청 처리 중 실행되던 스키마 가드를 일괄 적용"""
+    ensure_instructor_codes_columns(cursor)
+    ensure_instructors_columns(cursor)
+    ensure_instructor_courses_table(cursor)
+    ensure_students_columns(cursor)
+    ensure_courses_columns(cursor)
+    ensure_projects_columns(cursor)
+    ensure_photo_urls_column(cursor, 'consultations')
+    ensure_career_decision_column(cursor)
+    ensure_training_logs_table(cursor)
+    ensure_photo_urls_column(cursor, 'training_logs')
+    ensure_system_settings_table(cursor)
+    ensure_student_registrations_table(cursor)
+    ensure_class_notes_table(cursor)
+    ensure_instructor_notes_table(cursor)
+    ensure_notices_table(cursor)
+    ensure_db_management_logs_table(cursor)
+    ensure_exam_tables(cursor)
+
+
+def _migration_cache_versions(cursor):
+    """참조 데이터 캐시 무효화 버전 테이블 (워커 간 공유)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cache_versions (
+            namespace VARCHAR(50) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def _migration_list_query_indexes(cursor):
+    """목록 조회 / 기간 필터용 복합 인덱스 (migrations/0008_list_query_indexes.sql)"""
+    apply_index_file(cursor, '0008_list_query_indexes.sql')
+
+
+def _migration_content_objects(cursor):
+    """내용 주소 기반 업로드 저장소 객체 테이블 (참조는 GC 때 mark-and-sweep으로 확인)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS content_objects (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            location VARCHAR(10) NOT NULL COMMENT 'ftp 또는 local',
+            category VARCHAR(50) NOT NULL,
+            sha256 CHAR(64) NOT NULL,
+            ext VARCHAR(16) NOT NULL DEFAULT '',
+            url VARCHAR(500) NOT NULL COMMENT 'FTP URL 또는 로컬 경로',
+            size BIGINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_uploaded_at TIMESTAMP NULL DEFAULT NULL,
+            UNIQUE KEY uq_content_objects (location, category, sha256, ext),
+            INDEX idx_content_objects_gc (last_uploaded_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def _migration_backup_updated_at_indexes(cursor):
+    """증분 백업 워터마크(MAX(updated_at)) / 변경분 조회용 updated_at 인덱스"""
+    from backup_store import BACKUP_TABLES
+
+    for table in BACKUP_TABLES:
+        try:
+            cursor.execute(f"SHOW COLUMNS FROM {table} LIKE 'updated_at'")
+        except Exception:
+            continue  # 아직 생성되지 않은 테이블
+        if cursor.fetchone() and ensure_index(cursor, table, f'idx_{table}_updated_at', ['updated_at']):
+            logger.info(f"인덱스 생성: {table}.idx_{table}_updated_at (updated_at)")
+
+
+def _migration_holidays_unique(cursor):
+    """공휴일 일괄 등록(INSERT ... ON DUPLICATE KEY)용 (holiday_date, name) UNIQUE 키"""
+    cursor.execute("SHOW INDEX FROM holidays WHERE Key_name = 'uq_holidays_date_name'")
+    if cursor.fetchone():
+        return
+    # 같은 날짜 + 이름 중복 행은 먼저 등록된 행만 남김
+    cursor.execute("""
+        DELETE h1 FROM holidays h1
+        JOIN holidays h2 ON h1.holiday_date = h2.holiday_date AND h1.name = h2.name AND h1.id > h2.id
+    """)
+    if cursor.rowcount:
+        logger.info(f"중복 공휴일 {cursor.rowcount}건 삭제")
+    cursor.execute("ALTER TABLE holidays ADD UNIQUE KEY uq_holidays_date_name (holiday_date, name)")
+
+
+# (버전, 이름, 함수) - 버전 번호는 migrations/*.sql 번호에 이어서 부여
+MIGRATIONS = [
+    (6, 'runtime_schema_guards', _migration_runtime_schema_guards),
+    (7, 'cache_versions', _migration_cache_versions),
+    (8, 'list_query_indexes', _migration_list_query_indexes),
+    (9, 'content_objects', _migration_content_objects),
+    (10, 'backup_updated_at_indexes', _migration_backup_updated_at_indexes),
+    (11, 'holidays_unique', _migration_holidays_unique),
+]
+
+
+def ensure_migrations_table(cursor):
+    """적용 버전 기록 테이블 생성"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def get_applied_versions(cursor) -> set:
+    """적용된 마이그레이션 버전 목록"""
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] if isinstance(row, (tuple, list)) else row['version'] for row in cursor.fetchall()}
+
+
+def apply_migrations(conn) -> list:
+    """
+    미적용 마이그레이션을 버전 순서대로 실행
+
+    Args:
+        conn: DB 연결 (pymysql 또는 풀 연결)
+
+    Returns:
+        이번에 적용된 버전 목록
+    """
+    cursor = conn.cursor()
+    # 여러 워커가 동시에 시작해도 한 곳에서만 실행 (락을 못 얻으면 적용하지 않음)
+    cursor.execute("SELECT GET_LOCK(%s, 60)", (MIGRATION_LOCK_NAME,))
+    row = cursor.fetchone()
+    locked = row[0] if isinstance(row, (tuple, list)) else next(iter(row.values()))
+    if locked != 1:
+        cursor.close()
+        raise RuntimeError("다른 프로세스가 스키마 마이그레이션 중입니다 (락 대기 시간 초과)")
+    try:
+        ensure_migrations_table(cursor)
+        conn.commit()
+        applied = get_applied_versions(cursor)
+
+        newly_applied = []
+        for version, name, migrate in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in applied:
+                continue
+            logger.info(f"스키마 마이그레이션 적용: {version} {name}")
+            try:
+                migrate(cursor)
+            except Exception:
+                # 버전을 기록하지 않으므로 다음 실행 때 다시 시도됨 (가드는 멱등)
+                conn.rollback()
+                logger.error(f"스키마 마이그레이션 실패: {version} {name}")
+                raise
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+            conn.commit()
+            newly_applied.append(version)
+        return newly_applied
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+        cursor.fetchone()
+        cursor.close()
+
+
+# ==================== 컬럼 존재 여부 캐시 ====================
+
+_column_cache = {}
+
+
+def table_columns(cursor, table_name: str) -> set:
+    """테이블 컬럼 목록 (프로세스당 한 번만 조회)"""
+    if table_name not in _column_cache:
+        cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+        _column_cache[table_name] = {
+            row[0] if isinstance(row, (tuple, list)) else row['Field'] for row in cursor.fetchall()
+        }
+    return _column_cache[table_name]
+
+
+# ==================== 인덱스 사용 확인 (EXPLAIN) ====================
+
+# (설명, 쿼리, 파라미터, 기대 인덱스 후보)
+EXPLAIN_CHECKS = [
+    (
+        '과정별 시간표',
+        "SELECT id FROM timetables WHERE course_code = %s AND class_date >= %s AND class_date < %s "
+        "ORDER BY class_date, start_time",
+        ('C-001', '2025-01-01', '2025-02-01'),
+        ('idx_timetables_course_date',),
+    ),
+    (
+        '기간별 훈련일지',
+        "SELECT tl.id FROM training_logs tl JOIN timetables t ON tl.timetable_id = t.id "
+        "WHERE t.class_date >= %s AND t.class_date < %s ORDER BY t.class_date, t.start_time, tl.id",
+        ('2025-01-01', '2025-02-01'),
+        ('idx_timetables_date', 'idx_timetables_course_date', 'idx_training_logs_timetable', 'timetable_id'),
+    ),
+    (
+        '학생별 상담 (월)',
+        "SELECT id FROM consultations WHERE student_id = %s "
+        "AND consultation_date >= %s AND consultation_date < %s",
+        (1, '2025-01-01', '2025-02-01'),
+        ('idx_consultations_student_date',),
+    ),
+    (
+        '과정별 학생',
+        "SELECT id FROM students WHERE course_code = %s ORDER BY code",
+        ('C-001',),
+        ('idx_students_course_code',),
+    ),
+]
+
+
+def explain_checks(cursor) -> bool:
+    """
+    EXPLAIN으로 주요 목록 쿼리가 인덱스를 사용하는지 확인 (DictCursor 필요)
+
+    기대 인덱스를 사용하지 않는 쿼리가 있으면 False
+    """
+    ok = True
+    for label, sql, params, expected in EXPLAIN_CHECKS:
+        cursor.execute(f"EXPLAIN {sql}", params)
+        # MySQL / MariaDB는 EXPLAIN 컬럼 구성이 달라 이름으로 조회
+        keys = [row['key'] for row in cursor.fetchall() if row.get('key')]
+        used = any(key in expected for key in keys)
+        ok = ok and used
+        print(f"{'[OK]' if used else '[NG]'} {label:<20} key={', '.join(keys) or '없음(전체 스캔)'}")
+    return ok
+
+
+if __name__ == "__main__":
+    import pymysql
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+    logging.basicConfig(level=logging.INFO)
+
+    missing = [name for name in ('DB_USER', 'DB_PASSWORD') if not os.getenv(name)]
+    if missing:
+        print(f"[ERROR] 환경변수가 필요합니다: {', '.join(missing)} (.env 또는 셸에서 설정)")
+        sys.exit(2)
+
+    conn = pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER'),
+        passwd=os.getenv('DB_PASSWORD'),
+        db=os.getenv('DB_NAME', 'minilms'),
+        charset='utf8',
+        port=int(os.getenv('DB_PORT', '3306'))
+    )
+    try:
+        if '--status' in sys.argv:
+            cursor = conn.cursor()
+            ensure_migrations_table(cursor)
+            applied = get_applied_versions(cursor)
+            for version, name, _ in MIGRATIONS:
+                mark = '적용됨' if version in applied else '미적용'
+                print(f"{version:>4}  {name:<40} {mark}")
+        elif '--explain' in sys.argv:
+            if not explain_checks(conn.cursor(pymysql.cursors.DictCursor)):
+                sys.exit(1)
+        else:
+            versions = apply_migrations(conn)
+            print(f"[OK] 적용된 마이그레이션: {versions or '없음'}")
+    finally:
+        conn.close()
@@ -0,0 +1,261 @@
+"""
+학생 Excel 일괄 등록 모듈
+
+행마다 iterrows() + INSERT를 반복하고 전체 학생을 읽어 중복을 확인하던 방식을
+- pandas 문자열 연산으로 매핑 컬럼 일괄 정규화
+- 업로드한 이름으로만 기존 학생을 조회해 merge로 중복 판정
+- 한 트랜잭션 안에서 executemany 배치 INSERT (실패한 배치만 행 단위로 재시도해 행별 오류 보고)
+- 학생 코드(S001...) 할당은 DB 네임드 락으로 직렬화 (동시 업로드/등록 시 코드 중복 방지)
+로 처리한다. Excel은 청크 단위 DataFrame으로 받아 순서대로 처리하며,
+dry_run이면 같은 과정을 실행한 뒤 롤백해 결과만 보고한다.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pymysql
+from fastapi import HTTPException
+
+logger = logging.getLogger("riselms")
+
+# 학생 코드 할당 락 이름 (MySQL GET_LOCK, 연결 단위)
+STUDENT_CODE_LOCK_NAME = 'riselms_student_code'
+
+# Excel 매핑 대상 필드 (STUDENT_FIELDS의 key)
+IMPORT_FIELDS = [
+    'name', 'birth_date', 'gender', 'phone', 'email', 'address',
+    'interests', 'education', 'introduction', 'campus',
+]
+
+# 중복 판정 키 (이름, 전화번호(숫자만), 성별)
+DUPLICATE_KEY = ['name', 'phone_key', 'gender']
+
+INSERT_BATCH_SIZE = 500
+LOOKUP_BATCH_SIZE = 1000
+
+INSERT_SQL = """
+    INSERT INTO students
+    (code, name, birth_date, gender, phone, email, address, interests, education, introduction, campus, course_code, password)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _scalar(row, key: str):
+    return row[key] if isinstance(row, dict) else row[0]
+
+
+def acquire_student_code_lock(cursor, timeout: int = 30):
+    """
+    학생 코드 할당 락 획득
+
+    MAX(code) 조회부터 INSERT 커밋까지 같은 락 안에서 실행해야
+    동시에 등록하는 요청끼리 같은 코드를 받지 않는다.
+    """
+    cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (STUDENT_CODE_LOCK_NAME, timeout))
+    if _scalar(cursor.fetchone(), 'locked') != 1:
+        raise HTTPException(status_code=503, detail="다른 학생 등록 작업이 진행 중입니다. 잠시 후 다시 시도해주세요")
+
+
+def release_student_code_lock(cursor):
+    """학생 코드 할당 락 해제 (보유하지 않았으면 무시)"""
+    try:
+        cursor.execute("SELECT RELEASE_LOCK(%s) AS released", (STUDENT_CODE_LOCK_NAME,))
+        cursor.fetchone()
+    except Exception:
+        pass
+
+
+def next_student_number(cursor) -> int:
+    """다음 학생 코드 번호 (S 뒤 숫자)"""
+    cursor.execute(
+        "SELECT MAX(CAST(SUBSTRING(code, 2) AS UNSIGNED)) AS max_code FROM students WHERE code LIKE 'S%'"
+    )
+    return (_scalar(cursor.fetchone(), 'max_code') or 0) + 1
+
+
+def normalize_frame(df: pd.DataFrame, field_mapping: Dict[str, str], course_name: str = '') -> pd.DataFrame:
+    """
+    Excel DataFrame을 학생 필드 DataFrame으로 변환
+
+    매핑되지 않았거나 비어 있는 값은 '' 이며, row 컬럼에 Excel 행 번호(헤더 다음 행이 2)를 둔다.
+    df.index는 0부터 시작하는 데이터 행 번호여야 한다 (청크로 나눠 읽어도 이어지는 번호).
+    """
+    frame = pd.DataFrame(index=df.index)
+    frame['row'] = np.asarray(df.index, dtype=np.int64) + 2
+    for key in IMPORT_FIELDS:
+        col_name = field_mapping.get(key)
+        if col_name and col_name in df.columns:
+            values = df[col_name]
+            frame[key] = values.where(values.notna(), '').astype(str).str.strip()
+        else:
+            frame[key] = ''
+
+    frame['phone_key'] = frame['phone'].str.replace('-', '', regex=False).str.replace(' ', '', regex=False)
+
+    # 캠퍼스가 빈칸이면 과정명으로 자동 입력
+    if course_name:
+        frame.loc[frame['campus'] == '', 'campus'] = course_name
+
+    # 생년월일이 빈칸이면 기본 비밀번호 설정
+    frame['password'] = np.where(frame['birth_date'] == '', 'kdt2025', '')
+    return frame
+
+
+def fetch_existing_keys(cursor, names: List[str]) -> pd.DataFrame:
+    """업로드한 이름과 같은 기존 학생의 중복 판정 키만 조회"""
+    rows = []
+    for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+        batch = names[start:start + LOOKUP_BATCH_SIZE]
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(
+            f"SELECT name, phone, gender FROM students WHERE name IN ({placeholders})", batch
+        )
+        rows.extend(tuple(row.values()) if isinstance(row, dict) else row for row in cursor.fetchall())
+
+    existing = pd.DataFrame(rows, columns=['name', 'phone', 'gender'], dtype=object).fillna('')
+    existing['name'] = existing['name'].astype(str).str.strip()
+    existing['gender'] = existing['gender'].astype(str).str.strip()
+    existing['phone_key'] = (
+        existing['phone'].astype(str).str.replace('-', '', regex=False).str.replace(' ', '', regex=False)
+    )
+    return existing[DUPLICATE_KEY].drop_duplicates()
+
+
+def split_rows(frame: pd.DataFrame, existing: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    (등록 대상, 중복, 이름 없음) 으로 분리
+
+    기존 학생과 키가 같거나 파일 안에서 앞 행과 키가 같은 행은 중복으로 본다.
+    """
+    missing_name = frame[frame['name'] == '']
+    candidates = frame[frame['name'] != '']
+
+    merged = candidates.merge(existing.assign(_exists=True), on=DUPLICATE_KEY, how='left')
+    merged.index = candidates.index
+    is_duplicate = merged['_exists'].eq(True) | candidates.duplicated(DUPLICATE_KEY, keep='first')
+    return candidates[~is_duplicate], candidates[is_duplicate], missing_name
+
+
+def insert_students(cursor, rows: pd.DataFrame, course_code: Optional[str], next_num: int,
+                    batch_size: int = INSERT_BATCH_SIZE):
+    """
+    학생 배치 INSERT (호출 측 트랜잭션 안에서 실행)
+
+    배치 INSERT가 실패하면 해당 배치만 SAVEPOINT로 되돌려 행 단위로 다시 넣고,
+    실패한 행은 오류로 보고한다 (코드는 성공한 행에만 순서대로 부여).
+
+    Returns:
+        (등록 목록 [{row, code, name}], 오류 목록 [{row, name, error}], 다음 코드 번호)
+    """
+    columns = ['name', 'birth_date', 'gender', 'phone', 'email', 'address',
+               'interests', 'education', 'introduction', 'campus']
+    records = list(zip(
+        rows['row'].tolist(),
+        *(rows[col].tolist() for col in columns),
+        rows['password'].tolist(),
+    ))
+
+    registered = []
+    errors = []
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        params = [
+            (f"S{next_num + i:03d}", *record[1:11], course_code, record[11])
+            for i, record in enumerate(batch)
+        ]
+        cursor.execute("SAVEPOINT student_import_batch")
+        try:
+            cursor.executemany(INSERT_SQL, params)
+        except pymysql.MySQLError:
+            cursor.execute("ROLLBACK TO SAVEPOINT student_import_batch")
+        else:
+            registered.extend(
+                {"row": record[0], "code": param[0], "name": record[1]}
+                for record, param in zip(batch, params)
+            )
+            next_num += len(batch)
+            continue
+
+        # 실패한 배치는 행 단위로 재시도
+        for record in batch:
+            code = f"S{next_num:03d}"
+            cursor.execute("SAVEPOINT student_import_row")
+            try:
+                cursor.execute(INSERT_SQL, (code, *record[1:11], course_code, record[11]))
+            except pymysql.MySQLError as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT student_import_row")
+                errors.append({"row": record[0], "name": record[1], "error": str(e)})
+                continue
+            registered.append({"row": record[0], "code": code, "name": record[1]})
+            next_num += 1
+
+    return registered, errors, next_num
+
+
+def import_students(conn, chunks: Iterable[pd.DataFrame], field_mapping: Dict[str, str],
+                    course_code: Optional[str] = None, dry_run: bool = False) -> dict:
+    """
+    학생 일괄 등록 (전체가 한 트랜잭션, dry_run이면 롤백)
+
+    chunks는 Excel 행 묶음(DataFrame) 목록/이터레이터이며 묶음마다 정규화 → 중복 판정 → INSERT를
+    순서대로 실행한다. 앞 묶음에서 넣은 학생은 같은 트랜잭션 안에서 조회되므로
+    파일 안의 묶음 간 중복도 기존 학생 조회로 걸러진다.
+
+    Returns:
+        registered, duplicates, errors(이름 없음 포함), total
+    """
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+
+    total = 0
+    registered = []
+    duplicates = []
+    errors = []
+
+    # 트랜잭션의 첫 조회보다 먼저 락을 잡아야 다른 요청이 커밋한 코드/학생이 보인다
+    acquire_student_code_lock(cursor)
+    try:
+        # 과정명 조회 (캠퍼스 자동 입력용)
+        course_name = ''
+        if course_code:
+            cursor.execute("SELECT name FROM courses WHERE code = %s", (course_code,))
+            course = cursor.fetchone()
+            if course:
+                course_name = course['name']
+
+        next_num = next_student_number(cursor)
+        for chunk in chunks:
+            frame = normalize_frame(chunk, field_mapping, course_name)
+            total += len(frame)
+            names = frame.loc[frame['name'] != '', 'name'].unique().tolist()
+            existing = fetch_existing_keys(cursor, names)
+            to_insert, chunk_duplicates, missing_name = split_rows(frame, existing)
+
+            chunk_registered, chunk_errors, next_num = insert_students(cursor, to_insert, course_code, next_num)
+            registered.extend(chunk_registered)
+            errors.extend(chunk_errors)
+            errors.extend({"row": int(row), "name": '', "error": "이름 없음"} for row in missing_name['row'])
+            duplicates.extend(
+                chunk_duplicates[['row', 'name', 'phone', 'gender']].astype(object).to_dict('records')
+            )
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        release_student_code_lock(cursor)
+
+    errors.sort(key=lambda e: e['row'])
+    duplicates.sort(key=lambda d: d['row'])
+
+    return {
+        "total": total,
+        "registered": registered,
+        "duplicates": duplicates,
+        "errors": errors,
+    }
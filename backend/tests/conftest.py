@@ -0,0 +1,99 @@
+"""
+백엔드 테스트 공용 설정
+
+backend/ 에서 실행한다.
+    python -m pytest -q tests
+
+실제 MySQL이 필요한 테스트는 TEST_DB_NAME(과 TEST_DB_HOST / TEST_DB_PORT / TEST_DB_USER /
+TEST_DB_PASSWORD)이 설정된 경우에만 실행한다. 마이그레이션을 적용하므로 운영 DB가 아닌
+백업에서 복구한 테스트 DB를 지정한다.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+class FTPStandIn:
+    """테스트용 로컬 FTP 서버 (pyftpdlib), 받은 명령을 commands에 기록"""
+
+    def __init__(self, root: str):
+        authorizers = pytest.importorskip('pyftpdlib.authorizers')
+        handlers = pytest.importorskip('pyftpdlib.handlers')
+        servers = pytest.importorskip('pyftpdlib.servers')
+
+        self.root = root
+        self.commands = []
+        commands = self.commands
+
+        authorizer = authorizers.DummyAuthorizer()
+        authorizer.add_user('tester', 'secret', root, perm='elradfmwMT')
+
+        class RecordingHandler(handlers.FTPHandler):
+            def pre_process_command(self, line, cmd, arg):
+                commands.append(cmd)
+                return super().pre_process_command(line, cmd, arg)
+
+        RecordingHandler.authorizer = authorizer
+        self.handler = RecordingHandler
+        self.server = servers.FTPServer(('127.0.0.1', 0), RecordingHandler)
+        self.host, self.port = self.server.address[:2]
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={'timeout': 0.05}, daemon=True)
+
+    @property
+    def config(self) -> dict:
+        return {'host': self.host, 'port': self.port, 'user': 'tester', 'passwd': 'secret'}
+
+    def count(self, cmd: str) -> int:
+        return self.commands.count(cmd)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.close_all()
+        self._thread.join(timeout=5)
+
+
+@pytest.fixture
+def ftp_server(tmp_path):
+    """로컬 pyftpdlib 서버 (tmp_path/ftp가 루트)"""
+    root = tmp_path / 'ftp'
+    root.mkdir()
+    server = FTPStandIn(str(root))
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def mysql_conn():
+    """테스트 DB 연결 (TEST_DB_NAME이 없으면 건너뜀)"""
+    db_name = os.getenv('TEST_DB_NAME')
+    if not db_name:
+        pytest.skip('TEST_DB_NAME이 설정되지 않아 DB 테스트를 건너뜁니다')
+    pymysql = pytest.importorskip('pymysql')
+    conn = pymysql.connect(
+        host=os.getenv('TEST_DB_HOST', 'localhost'),
+        port=int(os.getenv('TEST_DB_PORT', '3306')),
+        user=os.getenv('TEST_DB_USER', os.getenv('DB_USER')),
+        passwd=os.getenv('TEST_DB_PASSWORD', os.getenv('DB_PASSWORD')),
+        db=db_name,
+        charset='utf8mb4',
+    )
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='session')
+def main_module():
+    """FastAPI 앱 모듈 (참조 캐시는 DB 없이 프로세스 로컬 버전 사용, 시작 이벤트는 실행하지 않음)"""
+    os.environ.setdefault('REF_CACHE_BACKEND', 'local')
+    pytest.importorskip('httpx')  # fastapi.testclient
+    return pytest.importorskip('main')
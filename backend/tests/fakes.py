@@ -0,0 +1,133 @@
+"""
+테스트용 가짜 DB 연결
+
+실행된 쿼리를 기록하고, responder(sql, params)가 돌려준 행을 결과로 반환한다.
+main.get_db_connection을 monkeypatch로 바꿔 끼워 쿼리 수 / 블로킹 여부를 확인한다.
+"""
+
+import time
+from typing import Callable, List, Optional
+
+
+class FakeDB:
+    """쿼리 기록 + 응답 행 생성 (delay초 동안 블로킹해 원격 DB 지연을 흉내)"""
+
+    def __init__(self, responder: Callable[[str, tuple], list], delay: float = 0.0):
+        self.responder = responder
+        self.delay = delay
+        self.queries: List[str] = []
+
+    def connect(self) -> 'FakeConnection':
+        return FakeConnection(self)
+
+
+class FakeCursor:
+    def __init__(self, db: FakeDB):
+        self.db = db
+        self._rows: list = []
+        self.rowcount = 0
+        self.lastrowid: Optional[int] = None
+
+    def execute(self, sql: str, params=None):
+        self.db.queries.append(' '.join(sql.split()))
+        if self.db.delay:
+            time.sleep(self.db.delay)
+        self._rows = list(self.db.responder(sql, tuple(params or ())))
+        self.rowcount = len(self._rows)
+
+    def fetchall(self) -> list:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db: FakeDB):
+        self.db = db
+
+    def cursor(self, cursor_class=None) -> FakeCursor:
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _FakeDataConnection:
+    def __init__(self, data: bytes, delay: float):
+        self.data = data
+        self.delay = delay
+
+    def recv(self, size: int) -> bytes:
+        if self.delay:
+            time.sleep(self.delay)
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+    def close(self):
+        pass
+
+
+class FakeFTPSession:
+    """files(경로 → bytes)를 돌려주는 FTP 세션, 명령마다 delay초 블로킹"""
+
+    def __init__(self, files: dict, delay: float):
+        self.files = files
+        self.delay = delay
+
+    def _wait(self):
+        if self.delay:
+            time.sleep(self.delay)
+
+    def voidcmd(self, cmd: str):
+        self._wait()
+
+    def voidresp(self):
+        self._wait()
+
+    def size(self, path: str) -> int:
+        self._wait()
+        return len(self.files[path])
+
+    def sendcmd(self, cmd: str) -> str:
+        self._wait()
+        return '213 20250101000000'
+
+    def retrieve(self, path: str, callback, blocksize: int = 8192):
+        self._wait()
+        callback(self.files[path])
+
+    def transfercmd(self, cmd: str, rest=None):
+        self._wait()
+        path = cmd.split(' ', 1)[1]
+        return _FakeDataConnection(self.files[path][rest or 0:], self.delay)
+
+
+class FakeFTPPool:
+    """FTPPool 대역 (call / acquire / release / discard)"""
+
+    def __init__(self, files: dict, delay: float = 0.0):
+        self.files = files
+        self.delay = delay
+
+    def call(self, func):
+        return func(FakeFTPSession(self.files, self.delay))
+
+    def acquire(self) -> FakeFTPSession:
+        return FakeFTPSession(self.files, self.delay)
+
+    def release(self, session):
+        pass
+
+    def discard(self, session, graceful: bool = True):
+        pass
@@ -0,0 +1,52 @@
+"""ContentStore 로컬 저장 (임시 파일 + 해시 파일명, 중복 제거)"""
+
+import hashlib
+import io
+import os
+
+from content_store import OBJECT_REF_PATTERN, ContentStore
+from fakes import FakeDB
+
+
+def _store():
+    """content_objects를 dict로 흉내 내는 FakeDB 기반 저장소"""
+    objects = {}
+
+    def responder(sql, params):
+        if 'GET_LOCK' in sql:
+            return [{'locked': 1}]
+        if 'RELEASE_LOCK' in sql:
+            return [{'released': 1}]
+        if sql.lstrip().startswith('SELECT id, url, size FROM content_objects'):
+            row = objects.get(params)
+            return [row] if row else []
+        if 'INSERT INTO content_objects' in sql:
+            location, category, sha256, ext, url, size = params
+            objects[(location, category, sha256, ext)] = {'id': len(objects) + 1, 'url': url, 'size': size}
+            return []
+        if 'UPDATE content_objects' in sql:
+            return [{}]
+        return []
+
+    return ContentStore(None, '', {}, FakeDB(responder).connect), objects
+
+
+def test_put_local_stores_once_by_hash(tmp_path):
+    store, objects = _store()
+    data = b'x' * (3 * 1024 * 1024 + 17)
+
+    first = store.put_local(io.BytesIO(data), '.PDF', str(tmp_path), 'assignments')
+    second = store.put_local(io.BytesIO(data), '.pdf', str(tmp_path), 'assignments')
+
+    sha256 = hashlib.sha256(data).hexdigest()
+    assert (first.sha256, first.size, first.deduplicated) == (sha256, len(data), False)
+    assert second.deduplicated and second.url == first.url
+    assert len(objects) == 1
+
+    # 해시 파일 하나만 남고 임시 파일은 정리됨
+    objects_dir = tmp_path / 'objects'
+    assert os.listdir(objects_dir) == [f'{sha256}.pdf']
+    assert (objects_dir / f'{sha256}.pdf').read_bytes() == data
+
+    # GC 참조 패턴이 URL을 인식해야 함 ('/' 구분)
+    assert OBJECT_REF_PATTERN.findall(f'["{first.url}"]') == [first.url]
@@ -0,0 +1,95 @@
+"""
+이벤트 루프 블로킹 회귀 테스트
+
+DB / FTP 대역이 호출마다 sleep 하도록 바꾼 뒤 여러 엔드포인트를 동시에 호출하고,
+asyncio 디버그 모드(slow_callback_duration)로 루프 위에서 오래 걸린 콜백이 없는지 확인한다.
+핸들러가 async def 안에서 동기 I/O를 직접 호출하면 이 테스트가 실패한다.
+"""
+
+import time
+import asyncio
+import logging
+
+import pytest
+
+from fakes import FakeDB, FakeFTPPool
+
+# 대역 I/O 지연 / 루프 블로킹으로 판단하는 콜백 실행 시간
+IO_DELAY = 0.2
+SLOW_CALLBACK = 0.1
+IMAGE = b'\x89PNG' + b'0' * 4096
+
+
+def respond(sql, params):
+    if sql.startswith('SHOW COLUMNS'):
+        return [{'Field': name} for name in ('id', 'code', 'name', 'email', 'course_code')]
+    if 'FROM course_subjects' in sql:
+        return [{'course_code': 'C001', 'subject_code': 'S01'}]
+    if 'COUNT(*)' in sql and 'FROM courses' not in sql:
+        return [{'count': 3, 'cnt': 3}]
+    return [{'id': 1, 'code': 'S001', 'name': '홍길동', 'email': 'a@example.com', 'course_code': 'C001'}]
+
+
+async def run_requests(app, requests):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        responses = await asyncio.gather(*(client.request(method, url, **kwargs) for method, url, kwargs in requests))
+    return responses
+
+
+def run_with_slow_callback_log(coro_factory, caplog):
+    """디버그 모드 이벤트 루프에서 실행하고 느린 콜백 경고 목록 반환"""
+    loop = asyncio.new_event_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = SLOW_CALLBACK
+    caplog.set_level(logging.WARNING, logger='asyncio')
+    try:
+        result = loop.run_until_complete(coro_factory())
+    finally:
+        loop.close()
+    slow = [record.getMessage() for record in caplog.records
+            if record.name == 'asyncio' and 'took' in record.getMessage()]
+    return result, slow
+
+
+def test_detector_catches_blocking_call(caplog):
+    """대조군: 루프 위에서 동기 sleep 하면 감지되어야 함"""
+    async def blocking():
+        time.sleep(IO_DELAY)
+
+    _, slow = run_with_slow_callback_log(blocking, caplog)
+    assert slow
+
+
+def test_concurrent_requests_do_not_block_loop(main_module, monkeypatch, tmp_path, caplog):
+    from ftp_cache import FTPFileCache
+
+    db = FakeDB(respond, delay=IO_DELAY)
+    monkeypatch.setattr(main_module, 'get_db_connection', db.connect)
+    main_module.ref_cache.invalidate('courses')
+    ftp_pool = FakeFTPPool({'/photos/a.png': IMAGE}, delay=IO_DELAY / 4)
+    monkeypatch.setattr(main_module, 'ftp_file_cache', FTPFileCache(ftp_pool, str(tmp_path / 'cache')))
+    # rag_chat은 벡터 스토어가 없으면 503 (통계 질문은 DB만 조회)
+    monkeypatch.setattr(main_module, 'vector_store_manager', object())
+
+    ftp = main_module.FTP_CONFIG
+    image_url = f"ftp://{ftp['host']}:{ftp['port']}/photos/a.png"
+    requests = (
+        [('GET', '/api/students', {})] * 4
+        + [('GET', '/api/courses', {})] * 2
+        + [('GET', '/api/download-image', {'params': {'url': image_url}})] * 2
+        + [('POST', '/api/rag/chat', {'json': {'message': '강사 수는 몇 명인가요?'}})] * 2
+    )
+
+    started = time.perf_counter()
+    responses, slow = run_with_slow_callback_log(lambda: run_requests(main_module.app, requests), caplog)
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * len(requests)
+    assert responses[4].json()[0]['code'] == 'S001'
+    assert responses[6].content == IMAGE
+    assert slow == []
+    # 요청마다 DB 대역이 여러 번 sleep 하므로, 순차 실행되었다면 훨씬 오래 걸림
+    assert elapsed < IO_DELAY * len(db.queries) / 2
@@ -0,0 +1,65 @@
+"""FTPFileCache - 로컬 pyftpdlib 서버 대상 (캐시 적중/미적중, Range/REST)"""
+
+import os
+
+import pytest
+
+pytest.importorskip('fastapi')
+
+from ftp_pool import FTPPool
+from ftp_cache import FTPFileCache
+
+DATA = bytes(range(256)) * 4096  # 1MB
+
+
+@pytest.fixture
+def cache(ftp_server, tmp_path):
+    with open(os.path.join(ftp_server.root, 'big.bin'), 'wb') as f:
+        f.write(DATA)
+    pool = FTPPool(ftp_server.config, connect_timeout=5.0)
+    cache = FTPFileCache(pool, str(tmp_path / 'cache'), max_bytes=10 * len(DATA))
+    yield cache
+    pool.close_all()
+
+
+def test_fetch_downloads_once_then_hits(cache, ftp_server):
+    first = cache.fetch('/big.bin')
+    assert first.read() == DATA
+    second = cache.fetch('/big.bin')
+    assert second.read() == DATA
+
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    assert ftp_server.count('RETR') == 1
+
+
+@pytest.mark.parametrize('start, length', [(0, 10), (1000, 5000), (len(DATA) - 7, 7)])
+def test_range_read_uses_rest(cache, ftp_server, start, length):
+    data = b''.join(cache.iter_ftp('/big.bin', start, length))
+
+    assert data == DATA[start:start + length]
+    assert ftp_server.count('REST') == (1 if start else 0)
+    # 범위만 읽은 뒤 ABOR로 끊고 세션을 풀에 반환
+    assert ftp_server.count('ABOR') == 1
+    stats = cache.ftp_pool.stats()
+    assert (stats['discarded'], stats['idle']) == (0, 1)
+
+    # 반환된 세션의 제어 연결이 맞춰져 있어 다음 전송에 그대로 재사용됨
+    assert b''.join(cache.iter_ftp('/big.bin')) == DATA
+    assert b''.join(cache.iter_ftp('/big.bin', 5, 3)) == DATA[5:8]
+    stats = cache.ftp_pool.stats()
+    assert (stats['logins'], stats['discarded']) == (1, 0)
+
+
+def test_full_stream_is_stored_in_cache(cache, ftp_server):
+    key, size, cached = cache.lookup('/big.bin')
+    assert cached is None
+
+    data = b''.join(cache._iter_and_store(key, '/big.bin', size))
+
+    assert data == DATA
+    key, size, cached = cache.lookup('/big.bin')
+    assert cached is not None
+    assert cached.read() == DATA
+    assert ftp_server.count('RETR') == 1
@@ -0,0 +1,143 @@
+"""FTPPool / FTPSession - 로컬 pyftpdlib 서버 대상"""
+
+import io
+import os
+import ftplib
+import shutil
+import time
+
+import pytest
+
+from ftp_pool import FTPPool
+
+
+def make_pool(ftp_server, **kwargs) -> FTPPool:
+    kwargs.setdefault('connect_timeout', 5.0)
+    return FTPPool(ftp_server.config, **kwargs)
+
+
+def write_file(ftp_server, path: str, data: bytes):
+    full_path = os.path.join(ftp_server.root, path.lstrip('/'))
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'wb') as f:
+        f.write(data)
+
+
+def test_session_is_reused_without_new_login(ftp_server):
+    write_file(ftp_server, '/a.txt', b'hello')
+    pool = make_pool(ftp_server)
+
+    assert pool.call(lambda s: s.read_bytes('/a.txt')) == b'hello'
+    assert pool.call(lambda s: s.read_bytes('/a.txt')) == b'hello'
+
+    stats = pool.stats()
+    assert stats['logins'] == 1
+    assert stats['reused'] == 1
+    assert ftp_server.count('USER') == 1
+    pool.close_all()
+
+
+def test_idle_session_is_checked_with_noop(ftp_server):
+    pool = make_pool(ftp_server, keepalive_interval=0.0)
+
+    pool.release(pool.acquire())
+    pool.release(pool.acquire())
+
+    assert ftp_server.count('NOOP') == 1
+    assert pool.stats()['logins'] == 1
+    pool.close_all()
+
+
+def test_reconnects_after_server_side_disconnect(ftp_server):
+    write_file(ftp_server, '/a.txt', b'hello')
+    # 서버 유휴 타임아웃으로 세션이 끊긴 상황 (NAS 타임아웃)
+    ftp_server.handler.timeout = 0.3
+    pool = make_pool(ftp_server, keepalive_interval=60.0)
+
+    assert pool.call(lambda s: s.read_bytes('/a.txt')) == b'hello'
+    time.sleep(1.0)
+    # keepalive 확인 없이 대여된 끊긴 세션 → 연결 오류 → 새 세션으로 재시도
+    assert pool.call(lambda s: s.read_bytes('/a.txt')) == b'hello'
+
+    stats = pool.stats()
+    assert stats['logins'] == 2
+    assert stats['retries'] == 1
+    assert stats['discarded'] == 1
+    assert stats['size'] == 1
+    pool.close_all()
+
+
+def test_keepalive_failure_reconnects_on_checkout(ftp_server):
+    ftp_server.handler.timeout = 0.3
+    pool = make_pool(ftp_server, keepalive_interval=0.0)
+
+    pool.release(pool.acquire())
+    time.sleep(1.0)
+    session = pool.acquire()
+    assert session.ftp.pwd() == '/'
+    pool.release(session)
+
+    stats = pool.stats()
+    assert stats['keepalive_failures'] == 1
+    assert stats['logins'] == 2
+    pool.close_all()
+
+
+def test_store_creates_directories_once(ftp_server):
+    pool = make_pool(ftp_server)
+
+    pool.call(lambda s: s.store('/photos/2024', 'a.jpg', io.BytesIO(b'1')))
+    pool.call(lambda s: s.store('/photos/2024', 'b.jpg', io.BytesIO(b'2')))
+
+    assert sorted(os.listdir(os.path.join(ftp_server.root, 'photos', '2024'))) == ['a.jpg', 'b.jpg']
+    # 두 번째 업로드는 현재 디렉토리 캐시로 cwd/mkd 생략
+    assert ftp_server.count('MKD') == 2
+    assert pool.stats()['known_dirs'] == 1
+    pool.close_all()
+
+
+def test_known_dir_is_forgotten_after_failed_cwd(ftp_server):
+    pool = make_pool(ftp_server)
+    with pool.session() as session:
+        session.chdir('/notes/a', create=True)
+        session.chdir('/')
+        shutil.rmtree(os.path.join(ftp_server.root, 'notes'))
+
+        # create=False: 실패하고 기억/현재 디렉토리 캐시를 모두 비움
+        with pytest.raises(ftplib.error_perm):
+            session.chdir('/notes/a')
+        assert '/notes/a' not in pool._known_dirs
+        assert session.current_dir is None
+
+        # create=True: 삭제된 경로를 다시 생성
+        session.chdir('/notes/a', create=True)
+        assert session.current_dir == '/notes/a'
+        assert os.path.isdir(os.path.join(ftp_server.root, 'notes', 'a'))
+    pool.close_all()
+
+
+def test_permission_error_releases_session(ftp_server):
+    pool = make_pool(ftp_server)
+
+    with pytest.raises(ftplib.error_perm):
+        pool.call(lambda s: s.read_bytes('/missing.txt'))
+
+    stats = pool.stats()
+    assert stats['discarded'] == 0
+    assert stats['idle'] == 1
+    assert stats['retries'] == 0
+    pool.close_all()
+
+
+def test_other_error_discards_session(ftp_server):
+    pool = make_pool(ftp_server)
+
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            raise RuntimeError('전송 도중 실패')
+
+    stats = pool.stats()
+    assert stats['discarded'] == 1
+    assert stats['size'] == 0
+    assert stats['idle'] == 0
+    pool.close_all()
@@ -0,0 +1,48 @@
+"""keyset 페이지네이션 - 정렬 키 / 커서 조건"""
+
+from datetime import date, timedelta
+
+from fakes import FakeDB
+from list_query import Keyset
+
+
+def test_after_pages_over_null_keys():
+    keyset = Keyset([('class_date', 't.class_date', False), ('id', 'tl.id', False)])
+
+    condition, params = keyset.after([None, 7])
+
+    # ASC에서 NULL은 맨 앞이므로 다음 행은 같은 NULL 키의 뒤 id이거나 NULL이 아닌 모든 값
+    assert condition == '((t.class_date IS NOT NULL) OR (t.class_date <=> %s AND tl.id > %s))'
+    assert params == [None, 7]
+
+
+def test_training_logs_sort_on_timetable_columns(main_module, monkeypatch):
+    from fastapi.testclient import TestClient
+    import schema_migrations
+
+    rows = [
+        {'id': i, 'class_date': date(2025, 3, 1 + i), 'start_time': timedelta(hours=9)}
+        for i in range(3)
+    ]
+
+    def respond(sql, params):
+        if sql.startswith('SHOW COLUMNS FROM training_logs'):
+            return [{'Field': name} for name in ('id', 'timetable_id', 'class_date', 'content')]
+        if 'FROM training_logs tl' in sql:
+            return rows
+        raise AssertionError(f'예상하지 못한 쿼리: {sql}')
+
+    db = FakeDB(respond)
+    monkeypatch.setattr(main_module, 'get_db_connection', db.connect)
+    monkeypatch.setattr(schema_migrations, '_column_cache', {})
+    client = TestClient(main_module.app)
+
+    page = client.get('/api/training-logs', params={'limit': 2}).json()
+    assert [item['id'] for item in page['items']] == [0, 1]
+    client.get('/api/training-logs', params={'limit': 2, 'cursor': page['next_cursor']})
+
+    list_queries = [q for q in db.queries if 'FROM training_logs tl' in q]
+    # 정렬 키가 인덱스 컬럼 그대로여야 idx_timetables_*를 사용 (COALESCE 등 식 금지)
+    assert all('ORDER BY t.class_date ASC, t.start_time ASC, tl.id ASC' in q for q in list_queries)
+    assert not any('COALESCE' in q for q in list_queries)
+    assert '(t.class_date > %s)' in list_queries[-1]
@@ -0,0 +1,63 @@
+"""목록 API 쿼리 수 - 과정/강사 수와 무관하게 일정해야 함 (N+1 방지)"""
+
+import pytest
+
+from fakes import FakeDB
+
+
+def courses_db(n: int) -> FakeDB:
+    def respond(sql, params):
+        if 'FROM courses c' in sql:
+            return [{'code': f'C{i:03d}', 'name': f'과정 {i}', 'student_count': i} for i in range(n)]
+        if 'FROM course_subjects' in sql:
+            return [{'course_code': f'C{i:03d}', 'subject_code': f'S{j}'} for i in range(n) for j in range(3)]
+        raise AssertionError(f'예상하지 못한 쿼리: {sql}')
+    return FakeDB(respond)
+
+
+def instructors_db(n: int) -> FakeDB:
+    def respond(sql, params):
+        if sql.startswith('SHOW COLUMNS FROM instructors'):
+            return [{'Field': name} for name in ('code', 'name', 'phone', 'password')]
+        if 'FROM instructors i' in sql:
+            return [{'code': f'I{i:03d}', 'name': f'강사 {i}'} for i in range(n)]
+        if 'FROM instructor_courses' in sql:
+            return [{'instructor_code': code, 'course_code': 'C001'} for code in params]
+        raise AssertionError(f'예상하지 못한 쿼리: {sql}')
+    return FakeDB(respond)
+
+
+def count_queries(main_module, monkeypatch, db: FakeDB, path: str, namespace: str) -> int:
+    from fastapi.testclient import TestClient
+    import schema_migrations
+
+    monkeypatch.setattr(main_module, 'get_db_connection', db.connect)
+    # 참조 캐시 / 컬럼 캐시를 비워 매번 DB 조회가 일어나도록
+    main_module.ref_cache.invalidate(namespace)
+    monkeypatch.setattr(schema_migrations, '_column_cache', {})
+
+    response = TestClient(main_module.app).get(path)
+    assert response.status_code == 200
+    return len(db.queries)
+
+
+@pytest.mark.parametrize('path, namespace, make_db, expected', [
+    ('/api/courses', 'courses', courses_db, 2),
+    ('/api/instructors', 'instructors', instructors_db, 3),
+])
+def test_query_count_is_constant(main_module, monkeypatch, path, namespace, make_db, expected):
+    counts = {n: count_queries(main_module, monkeypatch, make_db(n), path, namespace) for n in (1, 10, 100)}
+
+    assert set(counts.values()) == {expected}, counts
+
+
+def test_courses_response_groups_subjects(main_module, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(main_module, 'get_db_connection', courses_db(2).connect)
+    main_module.ref_cache.invalidate('courses')
+
+    courses = TestClient(main_module.app).get('/api/courses').json()
+
+    assert [c['subjects'] for c in courses] == [['S0', 'S1', 'S2']] * 2
+    assert [c['subject_count'] for c in courses] == [3, 3]
@@ -0,0 +1,36 @@
+"""스키마 마이그레이션 + 인덱스 사용 확인"""
+
+import pytest
+
+from fakes import FakeDB
+from schema_migrations import apply_migrations, explain_checks
+
+
+def test_failed_guard_does_not_record_version():
+    """가드 DDL이 실패하면 예외가 올라오고 해당 버전은 기록되지 않아야 한다"""
+    def responder(sql, params):
+        if 'GET_LOCK' in sql or 'RELEASE_LOCK' in sql:
+            return [(1,)]
+        if 'CREATE TABLE IF NOT EXISTS instructor_notes' in sql:
+            raise RuntimeError("Cannot add foreign key constraint")
+        return []
+
+    db = FakeDB(responder)
+    with pytest.raises(RuntimeError):
+        apply_migrations(db.connect())
+
+    assert not [q for q in db.queries if q.startswith('INSERT INTO schema_migrations')]
+    # 락은 반드시 해제
+    assert 'RELEASE_LOCK' in db.queries[-1]
+
+
+def test_list_queries_use_indexes(mysql_conn):
+    pymysql = pytest.importorskip('pymysql')
+    apply_migrations(mysql_conn)
+
+    cursor = mysql_conn.cursor(pymysql.cursors.DictCursor)
+    # 통계가 오래되면 옵티마이저가 전체 스캔을 고를 수 있으므로 갱신 후 확인
+    cursor.execute("ANALYZE TABLE timetables, training_logs, consultations, students")
+    cursor.fetchall()
+
+    assert explain_checks(cursor) is True
@@ -0,0 +1,210 @@
+"""
+썸네일 생성 서비스
+
+요청 처리 스레드에서 LANCZOS 리사이즈를 하던 단일 200x200 JPEG 썸네일을
+여러 크기(64/200/800) x 형식(JPEG/WebP)으로 프로세스 풀에서 생성한다.
+- JPEG 원본은 Image.draft()로 디코딩 단계에서 축소 (전체 해상도 디코딩 생략)
+- 원본을 한 번 열어 큰 크기부터 차례로 축소하며 모든 크기/형식을 저장
+- 같은 이미지에 대한 동시 요청은 하나의 작업 결과를 함께 기다림
+- 업로드 시 백그라운드로 미리 생성
+
+프로세스 풀 작업 함수는 Windows(spawn)에서도 import 가능하도록
+FastAPI 앱과 분리된 이 모듈의 최상위 함수로 둔다.
+"""
+
+import io
+import os
+import logging
+import tempfile
+import multiprocessing
+import threading
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("riselms")
+
+# 생성하는 썸네일 크기(긴 변 최대 px)와 형식
+THUMBNAIL_SIZES = (64, 200, 800)
+THUMBNAIL_FORMATS = ('jpeg', 'webp')
+DEFAULT_SIZE = 200
+DEFAULT_FORMAT = 'jpeg'
+
+MEDIA_TYPES = {'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+
+
+def thumbnail_path(thumbnails_dir: str, filename: str, size: int, fmt: str) -> str:
+    """
+    썸네일 저장 경로
+
+    기본 크기/형식(200, jpeg)은 기존 thumbnails/thumb_{파일명} 경로를 그대로 사용해
+    이미 만들어 둔 썸네일을 재사용한다.
+    """
+    if size == DEFAULT_SIZE and fmt == DEFAULT_FORMAT:
+        return os.path.join(thumbnails_dir, f"thumb_{filename}")
+    return os.path.join(thumbnails_dir, f"{size}_{fmt}", f"thumb_{filename}.{fmt}")
+
+
+def render_thumbnails(data: bytes, filename: str, thumbnails_dir: str,
+                      specs: List[Tuple[int, str]]) -> List[str]:
+    """
+    원본 이미지에서 지정한 (크기, 형식) 썸네일을 모두 생성 (프로세스 풀 작업)
+
+    Returns:
+        생성한 썸네일 경로 목록
+    """
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(data))
+    largest = max(size for size, _ in specs)
+    # JPEG은 디코딩 단계에서 1/2, 1/4, 1/8로 축소 (요청 크기 이상으로만)
+    image.draft('RGB', (largest, largest))
+
+    # EXIF 방향 정보 처리
+    try:
+        image = ImageOps.exif_transpose(image)
+    except Exception:
+        pass
+
+    # RGB로 변환 (PNG 투명도는 흰 배경으로)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    written = []
+    # 큰 크기부터 축소해 다음 크기의 입력으로 재사용
+    for size in sorted({size for size, _ in specs}, reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for spec_size, fmt in specs:
+            if spec_size != size:
+                continue
+            path = thumbnail_path(thumbnails_dir, filename, size, fmt)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp', dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    if fmt == 'webp':
+                        image.save(f, 'WEBP', quality=80, method=4)
+                    else:
+                        image.save(f, 'JPEG', quality=85, optimize=True)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            written.append(path)
+    return written
+
+
+class ThumbnailService:
+    """프로세스 풀 기반 썸네일 생성 (동시 요청 중복 제거)"""
+
+    def __init__(self, thumbnails_dir: str, max_workers: Optional[int] = None):
+        self.thumbnails_dir = thumbnails_dir
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'generated': 0, 'deduplicated': 0, 'failures': 0}
+        os.makedirs(thumbnails_dir, exist_ok=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # 워커 프로세스는 첫 사용 시 생성 (서버 시작/import 시 부담 없음)
+        # 스레드가 많은 서버 프로세스를 fork하지 않도록 spawn 사용
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._executor
+
+    def path(self, filename: str, size: int, fmt: str) -> str:
+        return thumbnail_path(self.thumbnails_dir, filename, size, fmt)
+
+    def all_specs(self) -> List[Tuple[int, str]]:
+        return [(size, fmt) for size in THUMBNAIL_SIZES for fmt in THUMBNAIL_FORMATS]
+
+    def submit(self, filename: str, load: Callable[[], bytes],
+               specs: Optional[Iterable[Tuple[int, str]]] = None) -> Future:
+        """
+        썸네일 생성 작업 등록
+
+        같은 파일의 작업이 진행 중이면 새로 만들지 않고 기존 작업을 반환한다.
+        load()는 원본 bytes를 반환하며 작업을 새로 등록할 때만 호출된다.
+        """
+        with self._lock:
+            future = self._inflight.get(filename)
+            if future is not None:
+                self._stats['deduplicated'] += 1
+                return future
+            future = Future()
+            self._inflight[filename] = future
+
+        try:
+            data = load()
+            inner = self._get_executor().submit(
+                render_thumbnails, data, filename, self.thumbnails_dir, list(specs or self.all_specs())
+            )
+        except BaseException as e:
+            self._finish(filename, future, error=e)
+            raise
+
+        inner.add_done_callback(lambda f: self._finish(filename, future, inner=f))
+        return future
+
+    def _finish(self, filename: str, future: Future, inner: Optional[Future] = None,
+                error: Optional[BaseException] = None):
+        with self._lock:
+            self._inflight.pop(filename, None)
+        if inner is not None:
+            error = CancelledError() if inner.cancelled() else inner.exception()
+        if error is not None:
+            self._stats['failures'] += 1
+            future.set_exception(error)
+        else:
+            self._stats['generated'] += 1
+            future.set_result(inner.result())
+
+    def get(self, filename: str, size: int, fmt: str, load: Callable[[], bytes],
+            timeout: float = 60.0) -> str:
+        """썸네일 경로 반환, 없으면 전체 크기/형식을 생성한 뒤 반환"""
+        path = self.path(filename, size, fmt)
+        if os.path.exists(path):
+            self._stats['hits'] += 1
+            return path
+        self.submit(filename, load).result(timeout=timeout)
+        return path
+
+    def pregenerate(self, filename: str, data: bytes):
+        """업로드 직후 백그라운드 생성 (결과를 기다리지 않음, 실패는 로그만)"""
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            return
+        try:
+            future = self.submit(filename, lambda: data)
+        except Exception as e:
+            logger.warning(f"썸네일 생성 등록 실패 ({filename}): {e}")
+            return
+        future.add_done_callback(
+            lambda f: f.exception() and logger.warning(f"썸네일 생성 실패 ({filename}): {f.exception()}")
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['inflight'] = len(self._inflight)
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,178 @@
+"""
+시간표 재생성 diff 엔진
+
+자동 생성은 기존 시간표를 DELETE 한 뒤 전체를 다시 INSERT 했기 때문에
+training_logs(ON DELETE CASCADE)의 훈련일지까지 함께 지워졌다.
+새 시간표를 메모리에서 만든 뒤 기존 행과 (수업일, 오전/오후 슬롯)으로 비교해
+- 같은 슬롯: 값이 다를 때만 UPDATE (id 유지 → 훈련일지 유지)
+- 새 슬롯: INSERT
+- 없어진 슬롯: DELETE (훈련일지가 있는 행은 기본적으로 보호)
+만 executemany로 한 트랜잭션 안에서 적용한다.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fast_json import format_timedelta
+
+# 비교/갱신 대상 컬럼 (notes 등 수동 입력 컬럼은 건드리지 않음)
+SYNC_FIELDS = ('subject_code', 'start_time', 'end_time', 'instructor_code', 'type')
+
+SLOT_MORNING = 'morning'
+SLOT_AFTERNOON = 'afternoon'
+
+DELETE_BATCH_SIZE = 500
+
+
+def _time_str(value) -> Optional[str]:
+    """TIME 값(timedelta / time / 문자열)을 HH:MM:SS로 통일"""
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return format_timedelta(value)
+    if isinstance(value, dt_time):
+        return value.strftime('%H:%M:%S')
+    text = str(value)
+    return f"{text}:00" if len(text) == 5 else text.zfill(8)
+
+
+def _date_value(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def slot_of(start_time) -> str:
+    """시작 시각 기준 오전/오후 슬롯"""
+    return SLOT_MORNING if _time_str(start_time) < '12:00:00' else SLOT_AFTERNOON
+
+
+def slot_key(row: dict) -> Tuple[date, str]:
+    return _date_value(row['class_date']), slot_of(row['start_time'])
+
+
+def _normalized(row: dict) -> Dict[str, object]:
+    values = {name: row.get(name) for name in SYNC_FIELDS}
+    values['start_time'] = _time_str(values['start_time'])
+    values['end_time'] = _time_str(values['end_time'])
+    return values
+
+
+@dataclass
+class TimetableDiff:
+    """기존 시간표 → 새 시간표 변경 내역"""
+    inserts: List[dict] = field(default_factory=list)
+    updates: List[Tuple[dict, dict]] = field(default_factory=list)   # (기존 행, 새 값)
+    deletes: List[dict] = field(default_factory=list)
+    protected: List[dict] = field(default_factory=list)              # 훈련일지가 있어 삭제하지 않은 행
+    unchanged: int = 0
+
+    def summary(self) -> dict:
+        return {
+            'inserted': len(self.inserts),
+            'updated': len(self.updates),
+            'deleted': len(self.deletes),
+            'protected': len(self.protected),
+            'unchanged': self.unchanged,
+            'logs_kept': sum(1 for row, _ in self.updates if row.get('has_log')),
+        }
+
+    def changes(self) -> List[dict]:
+        """미리보기용 변경 목록 (수업일/슬롯 순)"""
+        items = []
+        for row in self.inserts:
+            items.append({'action': 'insert', 'before': None, 'after': _view(row)})
+        for row, planned in self.updates:
+            items.append({'action': 'update', 'id': row['id'], 'has_log': bool(row.get('has_log')),
+                          'before': _view(row), 'after': _view(planned)})
+        for row in self.deletes:
+            items.append({'action': 'delete', 'id': row['id'], 'has_log': bool(row.get('has_log')),
+                          'before': _view(row), 'after': None})
+        for row in self.protected:
+            items.append({'action': 'protect', 'id': row['id'], 'has_log': True,
+                          'before': _view(row), 'after': None})
+        items.sort(key=lambda item: (item['after'] or item['before'])['class_date'] +
+                   (item['after'] or item['before'])['start_time'])
+        return items
+
+
+def _view(row: dict) -> dict:
+    view = _normalized(row)
+    view['class_date'] = _date_value(row['class_date']).isoformat()
+    return view
+
+
+def load_course_timetables(cursor, course_code: str, for_update: bool = False) -> List[dict]:
+    """과정의 기존 시간표 + 훈련일지 존재 여부 (cursor는 DictCursor)"""
+    cursor.execute(f"""
+        SELECT t.id, t.class_date, t.start_time, t.end_time, t.subject_code,
+               t.instructor_code, t.type,
+               EXISTS(SELECT 1 FROM training_logs tl WHERE tl.timetable_id = t.id) AS has_log
+        FROM timetables t
+        WHERE t.course_code = %s
+        ORDER BY t.class_date, t.start_time, t.id
+        {'FOR UPDATE' if for_update else ''}
+    """, (course_code,))
+    return cursor.fetchall()
+
+
+def diff_timetables(existing: Iterable[dict], planned: Iterable[dict],
+                    protect_logged: bool = True) -> TimetableDiff:
+    """
+    (수업일, 슬롯) 기준으로 기존 행과 새 시간표 비교
+
+    같은 슬롯에 기존 행이 여러 개면 훈련일지가 있는 행 → id 순으로 하나를 대응시키고
+    나머지는 삭제 대상으로 본다.
+    """
+    by_slot: Dict[Tuple[date, str], List[dict]] = {}
+    for row in existing:
+        by_slot.setdefault(slot_key(row), []).append(row)
+    for rows in by_slot.values():
+        rows.sort(key=lambda r: (not r.get('has_log'), r['id']))
+
+    diff = TimetableDiff()
+    for row in planned:
+        candidates = by_slot.get(slot_key(row))
+        if not candidates:
+            diff.inserts.append(row)
+            continue
+        current = candidates.pop(0)
+        if _normalized(current) == _normalized(row):
+            diff.unchanged += 1
+        else:
+            diff.updates.append((current, row))
+
+    for rows in by_slot.values():
+        for row in rows:
+            if protect_logged and row.get('has_log'):
+                diff.protected.append(row)
+            else:
+                diff.deletes.append(row)
+    return diff
+
+
+def apply_timetable_diff(cursor, course_code: str, diff: TimetableDiff) -> None:
+    """diff 적용 (커밋/롤백은 호출하는 쪽에서)"""
+    ids = [row['id'] for row in diff.deletes]
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        batch = ids[start:start + DELETE_BATCH_SIZE]
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(f"DELETE FROM timetables WHERE id IN ({placeholders})", batch)
+
+    if diff.updates:
+        assignments = ', '.join(f'{name} = %s' for name in SYNC_FIELDS)
+        cursor.executemany(
+            f"UPDATE timetables SET {assignments} WHERE id = %s",
+            [tuple(_normalized(planned).values()) + (row['id'],) for row, planned in diff.updates]
+        )
+
+    if diff.inserts:
+        cursor.executemany(
+            f"INSERT INTO timetables (course_code, class_date, {', '.join(SYNC_FIELDS)}) "
+            f"VALUES (%s, %s, {', '.join(['%s'] * len(SYNC_FIELDS))})",
+            [(course_code, _date_value(row['class_date'])) + tuple(_normalized(row).values())
+             for row in diff.inserts]
+        )
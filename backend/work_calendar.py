@@ -0,0 +1,235 @@
+"""
+근무일 달력 엔진
+
+과정 날짜 계산이 요청마다 공휴일을 다시 조회하고 하루씩 while 루프로 진행하던 것을
+NumPy 영업일 달력(np.busdaycalendar)으로 대체한다.
+- 공휴일 목록으로 만든 달력을 프로세스에 캐시 (공휴일 캐시 버전이 바뀌거나 TTL이 지나면 다시 적재)
+- 요일 제한(교과목 요일 배정)별 weekmask 달력도 캐시
+- N 근무일 뒤 날짜 / 기간 내 근무일·주말·공휴일 수를 np.busday_offset / np.busday_count로 계산
+- 오전/오후 분할 시간 배치(schedule_hours)를 누적합으로 한 번에 계산
+"""
+
+import time
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 월~금 (np.busdaycalendar weekmask, 월요일부터)
+WEEKDAY_MASK = '1111100'
+WEEKDAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+
+_ONE_DAY = np.timedelta64(1, 'D')
+
+
+def _to_date(value: np.datetime64) -> date:
+    return value.astype('datetime64[D]').astype(object)
+
+
+def weekmask_for(allowed_weekdays: Optional[Iterable[int]]) -> str:
+    """수업 가능한 요일(1=월~5=금) → weekmask, None이면 월~금"""
+    if allowed_weekdays is None:
+        return WEEKDAY_MASK
+    allowed = set(allowed_weekdays)
+    return ''.join('1' if day in allowed else '0' for day in range(1, 8))
+
+
+@dataclass
+class StageSchedule:
+    """schedule_hours() 결과 (수업이 배치된 날만)"""
+    dates: np.ndarray            # datetime64[D]
+    morning: np.ndarray          # 날짜별 오전 시간
+    afternoon: np.ndarray        # 날짜별 오후 시간
+    cumulative: np.ndarray       # 날짜별 누적 시간
+    end_date: date
+    last_day_hours: int          # 마지막 날 사용 시간 (0이면 하루 전체)
+    ends_with_afternoon: bool    # 마지막 날 오후까지 사용 → 다음 단계는 다음 근무일 오전부터
+
+    @property
+    def hours(self) -> np.ndarray:
+        return self.morning + self.afternoon
+
+    def monthly(self) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """(연, 월) → (수업일 수, 수업 시간)"""
+        months = self.dates.astype('datetime64[M]')
+        keys, index = np.unique(months, return_inverse=True)
+        days = np.bincount(index, minlength=len(keys))
+        hours = np.bincount(index, weights=self.hours, minlength=len(keys))
+        result = {}
+        for key, day_count, hour_sum in zip(keys, days, hours):
+            month = _to_date(key)
+            result[(month.year, month.month)] = (int(day_count), int(hour_sum))
+        return result
+
+
+class WorkCalendar:
+    """공휴일 + 요일 마스크 기반 근무일 달력 (생성 후 변경 없음)"""
+
+    def __init__(self, holidays: Iterable[Tuple[date, str]] = ()):
+        names: Dict[date, str] = {}
+        for holiday_date, name in holidays:
+            # 같은 날짜에 여러 이름이면 먼저 등록된 이름 사용
+            names.setdefault(holiday_date, name or '공휴일')
+        self.holiday_names = names
+        self.holiday_dates = np.array(sorted(names), dtype='datetime64[D]')
+        self._calendars: Dict[str, np.busdaycalendar] = {}
+        self._lock = threading.Lock()
+
+    def calendar(self, allowed_weekdays: Optional[Iterable[int]] = None) -> np.busdaycalendar:
+        weekmask = weekmask_for(allowed_weekdays)
+        busdaycal = self._calendars.get(weekmask)
+        if busdaycal is None:
+            with self._lock:
+                busdaycal = self._calendars.get(weekmask)
+                if busdaycal is None:
+                    busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=self.holiday_dates)
+                    self._calendars[weekmask] = busdaycal
+        return busdaycal
+
+    # ---------- 단일 날짜 ----------
+
+    def is_workday(self, day: date, allowed_weekdays: Optional[Iterable[int]] = None) -> bool:
+        return bool(np.is_busday(np.datetime64(day, 'D'), busdaycal=self.calendar(allowed_weekdays)))
+
+    def next_workday(self, day: date) -> date:
+        """day 다음 근무일 (day 제외)"""
+        return _to_date(np.busday_offset(np.datetime64(day, 'D') + _ONE_DAY, 0, roll='forward',
+                                         busdaycal=self.calendar()))
+
+    def add_workdays(self, start: date, days: int, allowed_weekdays: Optional[Iterable[int]] = None) -> date:
+        """start 다음 날부터 세어 days번째 근무일 (days가 0이면 start)"""
+        if days <= 0:
+            return start
+        # start가 근무일이 아니면 직전 근무일로 당긴 뒤 이동해도 결과가 같다
+        return _to_date(np.busday_offset(np.datetime64(start, 'D'), days, roll='backward',
+                                         busdaycal=self.calendar(allowed_weekdays)))
+
+    # ---------- 기간 집계 (양 끝 포함) ----------
+
+    def count_workdays(self, start: date, end: date, allowed_weekdays: Optional[Iterable[int]] = None) -> int:
+        return int(np.busday_count(np.datetime64(start, 'D'), np.datetime64(end, 'D') + _ONE_DAY,
+                                   busdaycal=self.calendar(allowed_weekdays)))
+
+    def weekend_days(self, start: date, end: date) -> int:
+        """기간 내 토/일요일 수"""
+        total = (end - start).days + 1
+        if total <= 0:
+            return 0
+        weekdays = np.busday_count(np.datetime64(start, 'D'), np.datetime64(end, 'D') + _ONE_DAY,
+                                   weekmask=WEEKDAY_MASK)
+        return int(total - weekdays)
+
+    def holidays_between(self, start: date, end: date) -> List[Tuple[date, str]]:
+        """기간 내 공휴일 (주말과 겹치는 날 포함), 날짜순"""
+        lo = np.searchsorted(self.holiday_dates, np.datetime64(start, 'D'), side='left')
+        hi = np.searchsorted(self.holiday_dates, np.datetime64(end, 'D'), side='right')
+        days = [_to_date(d) for d in self.holiday_dates[lo:hi]]
+        return [(d, self.holiday_names[d]) for d in days]
+
+    # ---------- 시간 배치 ----------
+
+    def schedule_hours(self, start: date, hours: int, morning_hours: int, afternoon_hours: int,
+                       start_at_afternoon: bool = False,
+                       allowed_weekdays: Optional[Iterable[int]] = None) -> StageSchedule:
+        """
+        start부터 근무일(요일 제한 적용)마다 오전 → 오후 순으로 hours를 배치
+
+        start_at_afternoon이면 첫 근무일은 오후만 사용한다.
+        hours가 0이면 수업일 없이 종료일은 start 직전 근무일이다.
+        """
+        daily = morning_hours + afternoon_hours
+        first = afternoon_hours if start_at_afternoon else daily
+        if hours <= 0 or daily <= 0:
+            n_days = 0
+        elif start_at_afternoon:
+            n_days = 1 + (-(-max(hours - first, 0) // daily))
+        else:
+            n_days = -(-hours // daily)
+
+        dates = np.busday_offset(np.datetime64(start, 'D'), np.arange(n_days), roll='forward',
+                                 busdaycal=self.calendar(allowed_weekdays))
+        caps = np.full(n_days, daily, dtype=np.int64)
+        if n_days and start_at_afternoon:
+            caps[0] = first
+        before = np.cumsum(caps) - caps
+        day_hours = np.clip(hours - before, 0, caps)
+
+        morning = np.minimum(day_hours, morning_hours)
+        if n_days and start_at_afternoon:
+            morning[0] = 0
+        afternoon = day_hours - morning
+
+        # 실제 수업이 배치된 날만 (오후만 쓰는 첫날의 오후가 0시간인 경우 제외)
+        used = day_hours > 0
+        if n_days:
+            end_date = _to_date(dates[-1])
+        else:
+            end_date = _to_date(np.busday_offset(np.datetime64(start, 'D') - _ONE_DAY, 0, roll='backward',
+                                                 busdaycal=self.calendar()))
+
+        # 마지막 날 사용 시간으로 다음 단계 시작(같은 날 오후 / 다음 날 오전) 판단
+        remaining_after_first = hours - afternoon_hours if start_at_afternoon else hours
+        last_day_hours = (remaining_after_first % daily) if daily > 0 else 0
+        ends_with_afternoon = last_day_hours == 0 or last_day_hours > morning_hours
+
+        return StageSchedule(
+            dates=dates[used],
+            morning=morning[used],
+            afternoon=afternoon[used],
+            cumulative=np.cumsum(day_hours)[used],
+            end_date=end_date,
+            last_day_hours=int(last_day_hours),
+            ends_with_afternoon=ends_with_afternoon,
+        )
+
+
+class CalendarCache:
+    """
+    WorkCalendar 프로세스 캐시
+
+    version()이 바뀌면 (공휴일 쓰기 API → ref_cache.invalidate('holidays'), 다른 워커에도 전파)
+    또는 ttl이 지나면 loader()로 공휴일을 다시 읽어 factory(기본 WorkCalendar)로 만든다.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable], version: Callable[[], int],
+                 ttl: float = 300.0, factory: Callable = WorkCalendar):
+        self._loader = loader
+        self._factory = factory
+        self._version = version
+        self.ttl = ttl
+        self._calendar: Optional[WorkCalendar] = None
+        self._loaded_version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'loads': 0}
+
+    def get(self):
+        version = self._version()
+        if self._fresh(version):
+            self._stats['hits'] += 1
+            return self._calendar
+        with self._lock:
+            if self._fresh(version):
+                self._stats['hits'] += 1
+                return self._calendar
+            self._calendar = self._factory(self._loader())
+            self._loaded_version = version
+            self._loaded_at = time.time()
+            self._stats['loads'] += 1
+            return self._calendar
+
+    def _fresh(self, version: int) -> bool:
+        return (
+            self._calendar is not None
+            and self._loaded_version == version
+            and time.time() - self._loaded_at < self.ttl
+        )
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        calendar = getattr(self._calendar, 'calendar', self._calendar)
+        stats['holidays'] = len(calendar.holiday_names) if calendar else 0
+        stats['version'] = self._loaded_version
+        return stats
@@ -10594,6 +10594,25 @@ window.showCalculationResult = function(result, startDate, endDate) {
     modal.classList.remove('hidden');
 }
 
+// 시간표 자동 생성 미리보기 (기존 시간표 대비 변경 내역 문구)
+async function previewTimetableChanges(payload) {
+    const res = await axios.post('/api/timetables/auto-generate', { ...payload, preview: true });
+    const d = res.data;
+    let text = `• 생성 시간표: ${d.generated_count}개 (기존 ${d.existing_count}개)\n` +
+        `• 추가 ${d.inserted} / 변경 ${d.updated} / 삭제 ${d.deleted} / 유지 ${d.unchanged}`;
+    if (d.protected > 0) {
+        text += `\n• 훈련일지가 있어 삭제하지 않는 시간표: ${d.protected}개`;
+    }
+    const solver = d.instructor_solver;
+    if (solver && solver.reassigned_count > 0) {
+        text += `\n• 다른 과정과 겹쳐 강사를 바꾼 시간표: ${solver.reassigned_count}개`;
+    }
+    if (solver && solver.conflict_count > 0) {
+        text += `\n⚠️ 해소하지 못한 강사 중복: ${solver.conflict_count}건`;
+    }
+    return text;
+}
+
 // 시간표생성 버튼에서 호출되는 함수
 window.generateTimetableFromButton = async function(courseCode) {
     if (!courseCode) {
@@ -10612,35 +10631,43 @@ window.generateTimetableFromButton = async function(courseCode) {
             return;
         }
         
+        const payload = {
+            course_code: courseCode,
+            start_date: course.start_date,
+            lecture_hours: course.lecture_hours,
+            project_hours: course.project_hours,
+            workship_hours: course.workship_hours,
+            morning_hours: course.morning_hours != null ? Number(course.morning_hours) : 4,
+            afternoon_hours: course.afternoon_hours != null ? Number(course.afternoon_hours) : 4
+        };
+        
+        // 기존 시간표 대비 변경 내역 미리보기
+        window.showLoading('변경 내역을 확인하는 중...');
+        const changesText = await previewTimetableChanges(payload);
+        window.hideLoading();
+        
         // 확인 모달
         const confirmed = await window.showConfirm(
             `📅 ${course.name || courseCode} 과정의 시간표를 자동으로 생성하시겠습니까?\\n\\n` +
-            `⚠️ 기존 시간표가 있다면 모두 삭제됩니다!\\n\\n` +
             `• 이론: ${course.lecture_hours}시간\\n` +
             `• 프로젝트: ${course.project_hours}시간\\n` +
-            `• 현장실습: ${course.workship_hours}시간`
+            `• 현장실습: ${course.workship_hours}시간\\n\\n` +
+            changesText.replace(/\n/g, '\\n')
         );
         if (!confirmed) return;
         
         window.showLoading('시간표를 생성하는 중...');
         
-        // 시간표 자동 생성 API 호출
-        const response = await axios.post('/api/timetables/auto-generate', {
-            course_code: courseCode,
-            start_date: course.start_date,
-            lecture_hours: course.lecture_hours,
-            project_hours: course.project_hours,
-            workship_hours: course.workship_hours,
-            morning_hours: course.morning_hours != null ? Number(course.morning_hours) : 4,
-            afternoon_hours: course.afternoon_hours != null ? Number(course.afternoon_hours) : 4
-        });
+        // 시간표 자동 생성 API 호출 (변경된 시간표만 반영)
+        const response = await axios.post('/api/timetables/auto-generate', payload);
 
         window.hideLoading();
 
         if (response.data.success) {
             await window.showAlert(
                 `✅ 시간표 자동 생성 완료!\\n\\n` +
-                `📅 ${response.data.generated_count}개의 시간표가 생성되었습니다.\\n\\n` +
+                `📅 ${response.data.generated_count}개의 시간표가 생성되었습니다.\\n` +
+                `(추가 ${response.data.inserted} / 변경 ${response.data.updated} / 삭제 ${response.data.deleted})\\n\\n` +
                 `시간표 관리 메뉴에서 확인하실 수 있습니다.`,
                 'success'
             );
@@ -10676,7 +10703,7 @@ window.generateTimetable = async function(courseCode, calculationResult) {
     // 확인 모달
     const confirmed = await window.showConfirm(
         `📅 ${courseCode} 과정의 시간표를 자동으로 생성하시겠습니까?\n\n` +
-        `⚠️ 기존 시간표가 있다면 모두 삭제됩니다!`
+        `기존 시간표는 바뀐 부분만 반영되며, 훈련일지가 있는 시간표는 삭제되지 않습니다.`
     );
     if (!confirmed) return;
     
@@ -10833,7 +10860,7 @@ window.autoCalculateDates = async function() {
         
         // PDF 생성 결과 표시
         if (result.pdf_generated) {
-            console.log('✅ PDF 생성 완료:', result.pdf_path);
+            console.log('✅ PDF 생성 작업 등록:', result.pdf_url);
         }
         
         // 시간표 자동 생성 결과 표시
@@ -0,0 +1,12 @@
+-- 목록 조회 / 기간 필터용 복합 인덱스
+-- 시간표: 과정별 일정 조회 + 날짜/시간 정렬
+CREATE INDEX idx_timetables_course_date ON timetables (course_code, class_date, start_time);
+-- 시간표: 과정 없이 기간만으로 조회하는 경우
+CREATE INDEX idx_timetables_date ON timetables (class_date, start_time);
+-- 훈련일지: 시간표 조인
+CREATE INDEX idx_training_logs_timetable ON training_logs (timetable_id);
+-- 상담: 학생별 상담 이력 + 월별 필터
+CREATE INDEX idx_consultations_student_date ON consultations (student_id, consultation_date);
+CREATE INDEX idx_consultations_date ON consultations (consultation_date);
+-- 학생: 과정별 목록 (ORDER BY code)
+CREATE INDEX idx_students_course_code ON students (course_code, code);